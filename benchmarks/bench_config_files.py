@@ -0,0 +1,101 @@
+"""Benchmark parsing a directory of YAML and JSON config files with
+`ploigos_step_runner.utils.file` against the previous JSON-then-YAML double parse,
+and loading the same directory with `ploigos_step_runner.config.Config`.
+
+Examples
+--------
+>>> python benchmarks/bench_config_files.py
+>>> python benchmarks/bench_config_files.py --files 500 --repeat 10
+"""
+import argparse
+import json
+import os
+import tempfile
+import timeit
+
+import yaml
+from ploigos_step_runner.config import Config
+from ploigos_step_runner.utils.file import (parse_yaml_or_json_file,
+                                            parse_yaml_or_json_files)
+from ploigos_step_runner.utils.yaml import yaml_safe_load
+
+
+def write_config_files(directory, files):
+    """Writes the given number of config files, alternating between YAML and JSON."""
+    file_paths = []
+    for index in range(files):
+        config = {
+            'step-runner-config': {
+                f'step-{index}': [{
+                    'implementer': f'Implementer{index}',
+                    'config': {f'key-{key}': f'value {index} {key}' for key in range(20)}
+                }]
+            }
+        }
+        if index % 2:
+            file_path = os.path.join(directory, f'config-{index}.yml')
+            with open(file_path, 'w') as config_file:
+                yaml.dump(config, config_file)
+        else:
+            file_path = os.path.join(directory, f'config-{index}.json')
+            with open(file_path, 'w') as config_file:
+                json.dump(config, config_file, indent=2)
+        file_paths.append(file_path)
+
+    return file_paths
+
+
+def double_parse(file_path):
+    """Parses a file the way `parse_yaml_or_json_file` used to, JSON first then YAML."""
+    with open(file_path, 'r') as open_file:
+        file_contents = open_file.read()
+
+    parsed_file = None
+    try:
+        parsed_file = json.loads(file_contents)
+    except ValueError:
+        pass
+
+    if not parsed_file:
+        parsed_file = yaml_safe_load(file_contents)
+
+    return parsed_file
+
+
+def bench(name, files, func, repeat):
+    """Times the given function and prints the throughput."""
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{name:<40} {best * 1000:10.2f} ms {files / best:10.0f} files/s")
+    return best
+
+
+def main():
+    """Runs the config file parsing benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        file_paths = write_config_files(directory, args.files)
+
+        expected = [double_parse(file_path) for file_path in file_paths]
+        assert [parse_yaml_or_json_file(file_path) for file_path in file_paths] == expected
+        assert parse_yaml_or_json_files(file_paths) == expected
+
+        old = bench('json then yaml (previous)', args.files,
+                    lambda: [double_parse(file_path) for file_path in file_paths],
+                    args.repeat)
+        serial = bench('parse_yaml_or_json_file', args.files,
+                       lambda: [parse_yaml_or_json_file(file_path) for file_path in file_paths],
+                       args.repeat)
+        threaded = bench('parse_yaml_or_json_files', args.files,
+                         lambda: parse_yaml_or_json_files(file_paths),
+                         args.repeat)
+        bench('Config', args.files, lambda: Config(directory), args.repeat)
+
+    print(f"speedup: serial {old / serial:.1f}x, threaded {old / threaded:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""Benchmark `ploigos_step_runner.utils.dict.deep_merge` and `deep_merge_many` against the
+previous recursive deep merge for merging many step results, as `WorkflowResult` does.
+
+Examples
+--------
+>>> python benchmarks/bench_deep_merge.py
+>>> python benchmarks/bench_deep_merge.py --steps 500 --repeat 10
+"""
+import argparse
+import copy
+import time
+
+from ploigos_step_runner.utils.dict import deep_merge, deep_merge_many
+
+
+def recursive_deep_merge(dest, source, overwrite_duplicate_keys=False, _path=None):
+    """The previous recursive deep merge."""
+    if _path is None:
+        _path = []
+
+    for key in source:
+        if key in dest:
+            if isinstance(dest[key], dict) and isinstance(source[key], dict):
+                recursive_deep_merge(
+                    dest=dest[key],
+                    source=source[key],
+                    overwrite_duplicate_keys=overwrite_duplicate_keys,
+                    _path=_path + [str(key)]
+                )
+            elif dest[key] == source[key]:
+                pass # same leaf value
+            else:
+                if overwrite_duplicate_keys:
+                    dest[key] = source[key]
+                else:
+                    raise ValueError('Conflict at %s' % '.'.join(_path + [str(key)]))
+        else:
+            dest[key] = source[key]
+    return dest
+
+
+def generate_step_results(steps):
+    """Generates step result dictionaries like `StepResult.get_step_result_dict` returns."""
+    step_results = []
+    for step in range(steps):
+        for environment in ['DEV', 'TEST', 'PROD']:
+            step_results.append({
+                environment: {
+                    f'step-{step}': {
+                        'Implementer': {
+                            'sub-step-implementer-name': 'Implementer',
+                            'success': True,
+                            'message': '',
+                            'artifacts': {
+                                f'artifact-{artifact}': {
+                                    'description': '',
+                                    'value': f'{environment}-{step}-{artifact}'
+                                } for artifact in range(10)
+                            }
+                        }
+                    }
+                }
+            })
+    return step_results
+
+
+def bench(name, setup, func, repeat):
+    """Times the given function on fresh input from the given setup function
+    and prints the result."""
+    timings = []
+    for _ in range(repeat):
+        data = setup()
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{name:<40} {best * 1000:10.2f} ms")
+    return best
+
+
+def previous(step_results):
+    """Merges the step results the way `WorkflowResult` used to."""
+    all_results = {}
+    for step_result in step_results:
+        all_results = recursive_deep_merge(
+            dest=all_results,
+            source=step_result,
+            overwrite_duplicate_keys=True
+        )
+    return all_results
+
+
+def main():
+    """Runs the deep merge benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    def setup_step_results():
+        return generate_step_results(args.steps)
+
+    expected = previous(setup_step_results())
+    assert deep_merge_many(setup_step_results(), overwrite_duplicate_keys=True) == expected
+
+    old = bench('recursive deep merge', setup_step_results, previous, args.repeat)
+    many = bench('deep_merge_many', setup_step_results, lambda step_results: deep_merge_many(
+        step_results, overwrite_duplicate_keys=True), args.repeat)
+
+    def setup_defaults():
+        return (
+            {f'key-{key}': {'value': key} for key in range(1000)},
+            {f'key-{key}': {'other': key} for key in range(0, 1000, 10)}
+        )
+
+    old_cow = bench('deepcopy + recursive deep merge', setup_defaults,
+                    lambda defaults: recursive_deep_merge(
+                        copy.deepcopy(defaults[0]), copy.deepcopy(defaults[1])), args.repeat)
+    cow = bench('deep_merge copy_on_write', setup_defaults,
+                lambda defaults: deep_merge(
+                    defaults[0], defaults[1], copy_on_write=True), args.repeat)
+
+    print(f"speedup: merge many {old / many:.1f}x, copy on write {old_cow / cow:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
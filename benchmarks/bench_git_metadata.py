@@ -0,0 +1,119 @@
+"""Benchmark reading the branch and commit for the generate-metadata Git step with
+`ploigos_step_runner.utils.git.read_git_head` against the previous GitPython `Repo`,
+both in a fresh interpreter, as the step runs, and repeated in the same interpreter.
+
+Examples
+--------
+>>> python benchmarks/bench_git_metadata.py
+>>> python benchmarks/bench_git_metadata.py --refs 20000 --repeat 10
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from git import Repo
+
+from ploigos_step_runner.utils.git import read_git_head
+
+PREVIOUS_STEP = """
+import sys, time
+start = time.perf_counter()
+from git import Repo
+repo = Repo(sys.argv[1])
+branch, commit = str(repo.head.reference), str(repo.head.reference.commit)
+print(time.perf_counter() - start)
+"""
+
+STEP = """
+import sys, time
+start = time.perf_counter()
+from ploigos_step_runner.utils.git import get_git_head
+git_head = get_git_head(sys.argv[1])
+branch, commit = git_head.branch, git_head.commit
+print(time.perf_counter() - start)
+"""
+
+
+def generate_repo(repo_path, refs):
+    """Generates a git repository on a feature branch with the given number of packed tags."""
+    def git(*args):
+        subprocess.run(
+            ['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com', *args],
+            cwd=repo_path,
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+    git('init', '--quiet')
+    git('commit', '--quiet', '--allow-empty', '--no-gpg-sign', '--message', 'generated')
+    commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=repo_path).decode().strip()
+    with open(os.path.join(repo_path, '.git', 'packed-refs'), 'w') as packed_refs_file:
+        packed_refs_file.write('# pack-refs with: peeled fully-peeled sorted \n')
+        for ref in range(refs):
+            packed_refs_file.write(f'{commit} refs/tags/v1.0.{ref}\n')
+    git('checkout', '--quiet', '-b', 'feature/bench')
+    git('pack-refs', '--all')
+
+
+def bench(name, func, repeat):
+    """Times the given function and prints the result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{name:<40} {best * 1000:10.2f} ms")
+    return best
+
+
+def bench_fresh_interpreter(name, script, repo_path, repeat):
+    """Times the given script in fresh interpreters, not counting interpreter start up,
+    and prints the result."""
+    timings = []
+    for _ in range(repeat):
+        timings.append(float(subprocess.check_output(
+            [sys.executable, '-c', script, repo_path],
+            env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        )))
+    best = min(timings)
+    print(f"{name:<40} {best * 1000:10.2f} ms")
+    return best
+
+
+def previous(repo_path):
+    """Reads the branch and commit the way the generate-metadata Git step used to."""
+    repo = Repo(repo_path)
+    return str(repo.head.reference), str(repo.head.reference.commit)
+
+
+def main():
+    """Runs the git metadata benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--refs', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    repo_path = tempfile.mkdtemp(prefix='bench-git-metadata-')
+    try:
+        generate_repo(repo_path, args.refs)
+        git_head = read_git_head(repo_path)
+        assert (git_head.branch, git_head.commit) == previous(repo_path)
+
+        old_fresh = bench_fresh_interpreter(
+            'GitPython Repo, fresh interpreter', PREVIOUS_STEP, repo_path, args.repeat)
+        new_fresh = bench_fresh_interpreter(
+            'get_git_head, fresh interpreter', STEP, repo_path, args.repeat)
+        old = bench('GitPython Repo', lambda: previous(repo_path), args.repeat)
+        new = bench('read_git_head', lambda: read_git_head(repo_path), args.repeat)
+
+        print(f"speedup: fresh interpreter {old_fresh / new_fresh:.1f}x, repeated {old / new:.1f}x")
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
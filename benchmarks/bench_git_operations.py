@@ -0,0 +1,140 @@
+"""Benchmark the git operations the ArgoCD deploy step runs against its deployment configuration
+repository, with `ploigos_step_runner.utils.git.GitRepo` against the previous one git command
+per operation, pushing to a local bare repository.
+
+Examples
+--------
+>>> python benchmarks/bench_git_operations.py
+>>> python benchmarks/bench_git_operations.py --tags 5000 --repeat 10
+"""
+import argparse
+import io
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import redirect_stderr, redirect_stdout
+
+import sh
+
+from ploigos_step_runner.utils.git import GitRepo
+
+
+def generate_remote_repo(remote_repo_path, tags):
+    """Generates a bare git repository with the given number of tags."""
+    source_repo_path = tempfile.mkdtemp(prefix='bench-git-operations-source-')
+    try:
+        def git(*args):
+            subprocess.run(
+                ['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com', *args],
+                cwd=source_repo_path,
+                check=True,
+                stdout=subprocess.DEVNULL
+            )
+        git('init', '--quiet')
+        with open(os.path.join(source_repo_path, 'values-DEV.yaml'), 'w') as values_file:
+            values_file.write('image_tag: 1.0.0\n')
+        git('add', '--all')
+        git('commit', '--quiet', '--no-gpg-sign', '--message', 'generated')
+        subprocess.run(
+            ['git', 'update-ref', '--stdin'],
+            input=''.join(f'create refs/tags/v0.{tag} HEAD\n' for tag in range(tags)).encode(),
+            cwd=source_repo_path,
+            check=True
+        )
+        git('clone', '--quiet', '--bare', source_repo_path, remote_repo_path)
+    finally:
+        shutil.rmtree(source_repo_path, ignore_errors=True)
+
+
+def previous(remote_repo_path, repo_dir, branch, tag):
+    """Runs the git operations the way the ArgoCD deploy step used to."""
+    out = io.StringIO()
+    sh.git('clone', remote_repo_path, repo_dir, _out=out, _err=out) # pylint: disable=no-member
+    git = sh.git.bake(_cwd=repo_dir, _out=out, _err=out) # pylint: disable=no-member
+    try:
+        git('checkout', branch)
+    except sh.ErrorReturnCode:
+        git('checkout', '-b', branch)
+    git('config', 'user.email', 'bench@example.com')
+    git('config', 'user.name', 'bench')
+    git('rev-parse', '--abbrev-ref', 'HEAD')
+    update_values(repo_dir, tag)
+    git('add', 'values-DEV.yaml')
+    git('commit', '--allow-empty', '--all', '--message', tag)
+    git('push', 'origin', branch)
+    git('tag', tag, '-f')
+    git('push', 'origin', '--tag')
+
+
+def current(remote_repo_path, repo_dir, branch, tag):
+    """Runs the git operations the way the ArgoCD deploy step does with `GitRepo`."""
+    out = io.StringIO()
+    with redirect_stdout(out), redirect_stderr(out):
+        git_repo = GitRepo.clone(
+            repo_url=remote_repo_path,
+            repo_dir=repo_dir,
+            config={'user.email': 'bench@example.com', 'user.name': 'bench'}
+        )
+        git_repo.checkout_branch(branch)
+        git_repo.get_branch()
+        update_values(repo_dir, tag)
+        git_repo.add('values-DEV.yaml')
+        git_repo.commit(tag, all_changes=True, allow_empty=True)
+        git_repo.tag([tag], force=True)
+        git_repo.push(refspecs=['HEAD', f'refs/tags/{tag}'])
+
+
+def update_values(repo_dir, tag):
+    """Updates the values file the way the ArgoCD deploy step does."""
+    with open(os.path.join(repo_dir, 'values-DEV.yaml'), 'w') as values_file:
+        values_file.write(f'image_tag: {tag}\n')
+
+
+def bench(name, func, template_remote_repo_path, repeat):
+    """Times the given function, with a fresh copy of the given remote repository each run,
+    and prints the result."""
+    timings = []
+    for run in range(repeat):
+        work_dir_path = tempfile.mkdtemp(prefix='bench-git-operations-')
+        try:
+            remote_repo_path = os.path.join(work_dir_path, 'remote.git')
+            shutil.copytree(template_remote_repo_path, remote_repo_path, symlinks=True)
+            start = time.perf_counter()
+            func(
+                remote_repo_path,
+                os.path.join(work_dir_path, 'repo'),
+                f'feature/bench-{run}',
+                f'v1.0.{run}'
+            )
+            timings.append(time.perf_counter() - start)
+        finally:
+            shutil.rmtree(work_dir_path, ignore_errors=True)
+    best = min(timings)
+    print(f"{name:<40} {best * 1000:10.2f} ms")
+    return best
+
+
+def main():
+    """Runs the git operations benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tags', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    template_dir_path = tempfile.mkdtemp(prefix='bench-git-operations-template-')
+    try:
+        remote_repo_path = os.path.join(template_dir_path, 'remote.git')
+        generate_remote_repo(remote_repo_path, args.tags)
+
+        old = bench('one git command per operation', previous, remote_repo_path, args.repeat)
+        new = bench('GitRepo', current, remote_repo_path, args.repeat)
+
+        print(f"speedup: {old / new:.1f}x")
+    finally:
+        shutil.rmtree(template_dir_path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""Benchmark `ploigos_step_runner.utils.hashing.get_tree_fingerprint` against the previous
+serial walk that read and hashed every file, on a generated git repository.
+
+Examples
+--------
+>>> python benchmarks/bench_hashing.py
+>>> python benchmarks/bench_hashing.py --files 10000 --repeat 5
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+from ploigos_step_runner.utils.hashing import get_tree_fingerprint
+
+FILES_PER_DIR = 100
+
+
+def generate_repo(repo_path, files):
+    """Generates a git repository with the given number of small source files in it."""
+    for index in range(files):
+        dir_path = os.path.join(
+            repo_path,
+            'src',
+            f'module-{index // (FILES_PER_DIR * 10)}',
+            f'package-{index // FILES_PER_DIR}'
+        )
+        if index % FILES_PER_DIR == 0:
+            os.makedirs(dir_path)
+        with open(os.path.join(dir_path, f'Class{index}.java'), 'w') as file:
+            file.write(f'public class Class{index} {{\n' + '    // source\n' * (index % 50) + '}\n')
+
+    def git(*args):
+        subprocess.run(
+            ['git', '-c', 'user.name=bench', '-c', 'user.email=bench@example.com', *args],
+            cwd=repo_path,
+            check=True,
+            stdout=subprocess.DEVNULL
+        )
+    git('init', '--quiet')
+    git('add', '--all')
+    git('commit', '--quiet', '--no-gpg-sign', '--message', 'generated')
+
+
+def previous(path):
+    """Hashes the tree the way `StepResultCache` used to, reading every file serially."""
+    hasher = hashlib.sha256()
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names[:] = sorted(dir_name for dir_name in dir_names if dir_name != '.git')
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            hasher.update(f'{os.path.relpath(file_path, path)}\0'.encode('utf-8'))
+            with open(file_path, 'rb') as file:
+                hasher.update(file.read())
+            hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+def bench(name, func, repeat):
+    """Times the given function and prints the result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{name:<40} {best * 1000:10.2f} ms")
+    return best
+
+
+def main():
+    """Runs the tree hashing benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--files', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    repo_path = tempfile.mkdtemp(prefix='bench-hashing-')
+    try:
+        start = time.perf_counter()
+        generate_repo(repo_path, args.files)
+        print(f"generated {args.files} files in {time.perf_counter() - start:.1f} s")
+
+        assert get_tree_fingerprint(repo_path) == get_tree_fingerprint(repo_path, use_git=False)
+
+        old = bench('serial walk, hash every file', lambda: previous(repo_path), args.repeat)
+        walked = bench('fingerprint, parallel walk', lambda: get_tree_fingerprint(
+            repo_path, use_git=False), args.repeat)
+        clean = bench('fingerprint, git index, clean', lambda: get_tree_fingerprint(
+            repo_path), args.repeat)
+
+        for index in range(0, args.files, max(1, args.files // 10)):
+            dir_path = os.path.join(
+                repo_path,
+                'src',
+                f'module-{index // (FILES_PER_DIR * 10)}',
+                f'package-{index // FILES_PER_DIR}'
+            )
+            with open(os.path.join(dir_path, f'Class{index}.java'), 'a') as file:
+                file.write('// changed\n')
+            with open(os.path.join(dir_path, f'Untracked{index}.java'), 'w') as file:
+                file.write('// untracked\n')
+        assert get_tree_fingerprint(repo_path) == get_tree_fingerprint(repo_path, use_git=False)
+
+        dirty = bench('fingerprint, git index, 20 dirty', lambda: get_tree_fingerprint(
+            repo_path), args.repeat)
+
+        print(
+            f"speedup: parallel walk {old / walked:.1f}x,"
+            f" git clean {old / clean:.1f}x, git dirty {old / dirty:.1f}x"
+        )
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark the throughput of `ploigos_step_runner.utils.io.TextIOIndenter` against the
+previous per write regex substitution on tool output sized log output, both directly and
+layered under a `TextIOSelectiveObfuscator` as stdout is while a step runs.
+
+Examples
+--------
+>>> python benchmarks/bench_text_io_indenter.py
+>>> python benchmarks/bench_text_io_indenter.py --megabytes 10 --chunk-size 128
+"""
+import argparse
+import io
+import re
+import time
+
+from ploigos_step_runner.utils.io import (TextIOIndenter,
+                                          TextIOSelectiveObfuscator)
+
+
+class RegexTextIOIndenter(io.TextIOBase):
+    """The previous TextIOIndenter, which rebuilt the indent and ran a regex on every write."""
+
+    def __init__(self, parent_stream, indent_level=0, indent_size=4, indent_char=' '):
+        self.parent_stream = parent_stream
+        self.indent_level = indent_level
+        self.indent_size = indent_size
+        self.indent_char = indent_char
+        self.unwritten_to = True
+        super().__init__()
+
+    def write(self, given):
+        indented = given
+        indent_chars = self.indent_char * (self.indent_size * self.indent_level)
+        if self.unwritten_to:
+            self.unwritten_to = False
+            indented = f"{indent_chars}{indented}"
+        indented = re.sub(r"(\r\n|\r|\n)", r"\1" + indent_chars, indented)
+        return self.parent_stream.write(indented)
+
+
+class NullTextIO(io.TextIOBase):
+    """Text stream that discards everything written to it, so only the indenting is timed."""
+
+    def write(self, given):
+        return len(given)
+
+
+def generate_chunks(megabytes, chunk_size):
+    """Generates `mvn` like log output split into chunks of the given size."""
+    line = '[INFO] Downloading from central: https://repo.maven.apache.org/maven2/org/example\n'
+    total_size = megabytes * 1024 * 1024
+    output = (line * (chunk_size // len(line) + 1))[:chunk_size]
+    return [output] * (total_size // chunk_size)
+
+
+def bench(name, create_stream, chunks, repeat):
+    """Times writing all of the chunks to a new stream from the given function
+    and prints the throughput."""
+    timings = []
+    for _ in range(repeat):
+        stream = create_stream()
+        start = time.perf_counter()
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.flush()
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    megabytes = sum(len(chunk) for chunk in chunks) / (1024 * 1024)
+    print(f"{name:<45} {best * 1000:10.2f} ms {megabytes / best:10.1f} MB/s")
+    return best
+
+
+def obfuscated(indenter):
+    """Layers an obfuscator with a few secrets over the given indenter,
+    like stdout while a step runs."""
+    obfuscator = TextIOSelectiveObfuscator(indenter, randomize_replacment_length=False)
+    obfuscator.add_obfuscation_targets(['secret-password', 'secret-token'])
+    return obfuscator
+
+
+def main():
+    """Runs the TextIOIndenter benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--megabytes', type=int, default=100)
+    parser.add_argument('--chunk-size', type=int, default=4096,
+                        help='Size of each write, tools are read in lines or small chunks')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    chunks = generate_chunks(args.megabytes, args.chunk_size)
+
+    expected = io.StringIO()
+    actual = io.StringIO()
+    for chunk in chunks[:100]:
+        RegexTextIOIndenter(expected, indent_level=2).write(chunk)
+        TextIOIndenter(actual, indent_level=2, line_buffered=True).write(chunk)
+    assert actual.getvalue() == expected.getvalue()
+
+    old = bench('regex indenter', lambda: RegexTextIOIndenter(
+        NullTextIO(), indent_level=2), chunks, args.repeat)
+    new = bench('indenter', lambda: TextIOIndenter(
+        NullTextIO(), indent_level=2), chunks, args.repeat)
+    buffered = bench('indenter line buffered', lambda: TextIOIndenter(
+        NullTextIO(), indent_level=2, line_buffered=True), chunks, args.repeat)
+    old_obfuscated = bench('obfuscator + regex indenter', lambda: obfuscated(
+        RegexTextIOIndenter(NullTextIO(), indent_level=2)), chunks, args.repeat)
+    new_obfuscated = bench('obfuscator + indenter line buffered', lambda: obfuscated(
+        TextIOIndenter(NullTextIO(), indent_level=2, line_buffered=True)), chunks, args.repeat)
+
+    print(
+        f"speedup: indenter {old / new:.1f}x, line buffered {old / buffered:.1f}x,"
+        f" with obfuscator {old_obfuscated / new_obfuscated:.1f}x"
+    )
+
+
+if __name__ == '__main__':
+    main()
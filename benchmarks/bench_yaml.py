@@ -0,0 +1,100 @@
+"""Benchmark YAML load and dump throughput of `ploigos_step_runner.utils.yaml`
+against the pure Python PyYAML implementations for config and results files.
+
+Examples
+--------
+>>> python benchmarks/bench_yaml.py
+>>> python benchmarks/bench_yaml.py --steps 200 --repeat 10
+"""
+import argparse
+import timeit
+
+import yaml
+from ploigos_step_runner.utils.yaml import (LIBYAML_AVAILABLE, yaml_dump,
+                                            yaml_safe_load)
+
+
+def generate_config(steps):
+    """Generates a step runner configuration with the given number of steps."""
+    config = {
+        'step-runner-config': {
+            'global-defaults': {
+                'organization': 'ploigos',
+                'application-name': 'ref-quarkus',
+                'service-name': 'fruit'
+            },
+            'global-environment-defaults': {
+                env: {'kube-api-uri': f'https://api.{env}.ploigos.xyz:6443'}
+                for env in ['DEV', 'TEST', 'PROD']
+            }
+        }
+    }
+    for step in range(steps):
+        config['step-runner-config'][f'step-{step}'] = [{
+            'implementer': f'Implementer{step}',
+            'config': {f'key-{key}': f'value {step} {key}' for key in range(20)},
+            'environment-config': {
+                'DEV': {'argocd-api': 'https://argocd.dev.ploigos.xyz'},
+                'PROD': {'argocd-api': 'https://argocd.prod.ploigos.xyz'}
+            }
+        }]
+    return config
+
+
+def generate_results(steps):
+    """Generates a step runner results dictionary with the given number of steps."""
+    results = {}
+    for step in range(steps):
+        results[f'step-{step}'] = {
+            f'Implementer{step}': {
+                'sub-step-implementer-name': f'Implementer{step}',
+                'success': True,
+                'message': '',
+                'artifacts': {
+                    f'artifact-{artifact}': {
+                        'description': f'Description of artifact {artifact}.',
+                        'value': f'/tmp/step-runner-working/step-{step}/artifact-{artifact}.txt'
+                    } for artifact in range(10)
+                }
+            }
+        }
+    return {'step-runner-results': results}
+
+
+def bench(name, size, func, repeat):
+    """Times the given function and prints the throughput."""
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+    print(f"{name:<40} {best * 1000:10.2f} ms {size / best / 1024 / 1024:10.2f} MB/s")
+    return best
+
+
+def main():
+    """Runs the YAML benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--steps', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"libyaml available: {LIBYAML_AVAILABLE}")
+    for name, data in [
+            ('config', generate_config(args.steps)),
+            ('results', generate_results(args.steps))]:
+        text = yaml.dump(data, indent=4)
+        size = len(text.encode('utf-8'))
+        print(f"\n{name} ({size / 1024:.1f} KiB)")
+
+        pure_load = bench(f'{name} load (yaml.safe_load)', size,
+                          lambda text=text: yaml.safe_load(text), args.repeat)
+        fast_load = bench(f'{name} load (yaml_safe_load)', size,
+                          lambda text=text: yaml_safe_load(text), args.repeat)
+        pure_dump = bench(f'{name} dump (yaml.dump)', size,
+                          lambda data=data: yaml.dump(data, indent=4), args.repeat)
+        fast_dump = bench(f'{name} dump (yaml_dump)', size,
+                          lambda data=data: yaml_dump(data, indent=4), args.repeat)
+
+        assert yaml_dump(data, indent=4) == text
+        print(f"speedup: load {pure_load / fast_load:.1f}x, dump {pure_dump / fast_dump:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+"""Fast local stand in for the external tools the step implementers run.
+
+The end to end pipeline benchmark puts a wrapper script for each tool on the PATH that runs
+this script with the tool name as the first argument. Each stub does the minimum the calling
+step implementer needs (writes the files it expects and prints the output it parses) and
+emits a realistic volume of output so that the cost of streaming, teeing, indenting and
+obfuscating tool output is part of what is measured.
+
+The number of filler output lines each stub prints is scaled by the
+`PSR_E2E_OUTPUT_SCALE` environment variable (default 1.0).
+
+Examples
+--------
+>>> python benchmarks/e2e/stub_tool.py mvn clean install -f pom.xml
+>>> python benchmarks/e2e/stub_tool.py buildah unshare buildah mount --storage-driver vfs foo
+"""
+import base64
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import xml.etree.ElementTree as ET
+
+import yaml
+
+OUTPUT_SCALE_ENV_VAR = 'PSR_E2E_OUTPUT_SCALE'
+STATE_DIR_ENV_VAR = 'PSR_E2E_STATE_DIR'
+
+MAVEN_NAMESPACES = {'mvn': 'http://maven.apache.org/POM/4.0.0'}
+PGP_FINGERPRINT = 'DD7208BA0A6359F65B906B1CDFB9D8FF5F1A5E5B'
+SOPS_EXTRACT_PATH_PART_REGEX = re.compile(r'\["(?P<key>[^"]*)"\]|\[(?P<index>[0-9]+)\]')
+SOPS_ENCRYPTED_DATA_REGEX = re.compile(r'^ENC\[.*data:(?P<data>[^,]*),.*\]$')
+
+
+def scaled(lines):
+    """Scales a number of filler output lines by the output scale environment variable."""
+    return int(lines * float(os.environ.get(OUTPUT_SCALE_ENV_VAR, '1.0')))
+
+
+def emit(template, lines, stream=sys.stdout):
+    """Writes the given number of filler lines generated from the given template."""
+    for index in range(scaled(lines)):
+        stream.write(template.format(index=index, digest=sha256(str(index))[:12]) + '\n')
+    stream.flush()
+
+
+def sha256(value):
+    """Returns the hex SHA-256 digest of the given string."""
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+def get_option(args, name, default=None):
+    """Gets the value of an option given as either `name value` or `name=value`."""
+    for index, arg in enumerate(args):
+        if arg == name and index + 1 < len(args):
+            return args[index + 1]
+        if arg.startswith(name + '='):
+            return arg[len(name) + 1:]
+    return default
+
+
+def get_state_dir():
+    """Gets the directory stubs keep state in across invocations (e.g. container mounts)."""
+    state_dir = os.environ.get(STATE_DIR_ENV_VAR, tempfile.gettempdir())
+    os.makedirs(state_dir, exist_ok=True)
+    return state_dir
+
+
+def mvn(args):
+    """Stub for `mvn help:effective-pom`, `mvn clean install` and `mvn clean test`."""
+    pom_file = os.path.abspath(get_option(args, '-f', 'pom.xml'))
+    target_dir = os.path.join(os.path.dirname(pom_file), 'target')
+
+    if 'help:effective-pom' in args:
+        shutil.copyfile(pom_file, get_option(args, '-Doutput'))
+        return 0
+
+    emit(
+        '[INFO] Downloading from central: https://repo.maven.apache.org/maven2/org/example'
+        '/dependency-{index}/1.0.{index}/dependency-{index}-1.0.{index}.pom',
+        2000
+    )
+    emit('[INFO] Compiling source file src/main/java/com/example/Class{index}.java', 500)
+
+    if 'install' in args:
+        pom = ET.parse(pom_file).getroot()
+        artifact_id = pom.find('mvn:artifactId', MAVEN_NAMESPACES).text
+        version = pom.find('mvn:version', MAVEN_NAMESPACES).text
+        os.makedirs(target_dir, exist_ok=True)
+        with open(os.path.join(target_dir, f'{artifact_id}-{version}.jar'), 'wb') as jar_file:
+            jar_file.write(os.urandom(1024 * 1024))
+
+    if 'test' in args:
+        emit('[INFO] Tests run: 1, Failures: 0, Errors: 0, Skipped: 0 - in com.example.Test{index}',
+            1000
+        )
+        reports_dir = os.path.join(target_dir, 'surefire-reports')
+        os.makedirs(reports_dir, exist_ok=True)
+        with open(os.path.join(reports_dir, 'TEST-com.example.AppTest.xml'), 'w') as report:
+            report.write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<testsuite name="com.example.AppTest" tests="1" failures="0" errors="0">\n'
+                '  <testcase name="test" classname="com.example.AppTest" time="0.001"/>\n'
+                '</testsuite>\n'
+            )
+
+        cucumber_plugin = get_option(args, '-Dcucumber.plugin')
+        if cucumber_plugin:
+            for report_format, report_path in (
+                    plugin.split(':', 1) for plugin in cucumber_plugin.split(',')):
+                with open(report_path, 'w') as report:
+                    report.write('[]' if report_format == 'json' else '<html></html>')
+
+    print('[INFO] BUILD SUCCESS')
+    return 0
+
+
+def buildah(args):
+    """Stub for the `buildah` sub commands used to build, push, import and mount images."""
+    command = args[0]
+
+    if command == 'unshare':
+        sys.stdout.flush()
+        os.execvp(args[1], args[1:])
+
+    if command == 'bud':
+        emit('STEP {index}: RUN echo layer-{index}\nSTEP {index}: COMMIT\n--> {digest}', 200)
+    elif command == 'push':
+        image_tar_path = args[-1][len('docker-archive:'):]
+        emit('Copying blob sha256:{digest}', 50, sys.stderr)
+        with open(image_tar_path, 'wb') as image_tar_file:
+            image_tar_file.write(os.urandom(4 * 1024 * 1024))
+        print('Writing manifest to image destination')
+    elif command == 'from':
+        emit('Copying blob sha256:{digest}', 50, sys.stderr)
+        print(get_option(args, '--name'))
+    elif command == 'mount':
+        mount_path = os.path.join(get_state_dir(), 'containers', args[-1], 'merged')
+        os.makedirs(mount_path, exist_ok=True)
+        print(mount_path)
+    elif command == 'login':
+        sys.stdin.read()
+        print('Login Succeeded!')
+
+    return 0
+
+
+def skopeo(args):
+    """Stub for `skopeo copy` and `skopeo login`."""
+    if args[0] == 'login':
+        sys.stdin.read()
+        print('Login Succeeded!')
+        return 0
+
+    print('Getting image source signatures')
+    emit('Copying blob sha256:{digest}', 50)
+    print('Writing manifest to image destination\nStoring signatures')
+    return 0
+
+
+def argocd(args):
+    """Stub for the `argocd` commands used to deploy an application.
+
+    `argocd login` writes a config file with an auth token valid for an hour, and
+    `argocd cluster add` registers the cluster in it, so sessions are reused like with ArgoCD.
+    `argocd app get` reports the application as already synced and healthy.
+    """
+    config_file = get_option(args, '--config')
+    if args[0] == 'login':
+        if config_file:
+            claims = json.dumps({'sub': 'admin', 'exp': int(time.time()) + 3600})
+            auth_token = 'e30.' + base64.urlsafe_b64encode(claims.encode()).decode().rstrip('=')
+            with open(config_file, 'w') as config:
+                yaml.safe_dump({
+                    'contexts': [{'name': args[-1], 'server': args[-1], 'user': args[-1]}],
+                    'current-context': args[-1],
+                    'servers': [{'server': args[-1]}],
+                    'users': [{'name': args[-1], 'auth-token': auth_token + '.c2ln'}]
+                }, config)
+        print(f"'admin:login' logged in successfully\nContext '{args[-1]}' updated")
+        return 0
+
+    if args[0] == 'cluster':
+        clusters_file = f'{config_file}.clusters' if config_file else os.devnull
+        if args[1] == 'get':
+            server = args[-3]
+            if not os.path.exists(clusters_file):
+                return 1
+            with open(clusters_file) as clusters:
+                return 0 if server in clusters.read().splitlines() else 1
+        with open(get_option(args, '--kubeconfig')) as kubeconfig:
+            server = yaml.safe_load(kubeconfig)['clusters'][0]['cluster']['server']
+        with open(clusters_file, 'a') as clusters:
+            clusters.write(server + '\n')
+        print(f"Cluster '{server}' added")
+        return 0
+
+    command = args[1]
+    if command in ('sync', 'wait'):
+        emit(
+            '2020-12-18T14:48:00-05:00  apps  Deployment  example  resource-{index}'
+            '  Synced  Healthy  deployment.apps/resource-{index} configured',
+            200
+        )
+    elif command == 'get':
+        print(json.dumps({
+            'metadata': {'name': args[-3], 'namespace': 'argocd'},
+            'status': {
+                'sync': {'status': 'Synced'},
+                'health': {'status': 'Healthy'},
+                'operationState': {'phase': 'Succeeded', 'message': 'successfully synced'}
+            }
+        }))
+    elif command == 'manifests':
+        app_name = args[-1]
+        for index in range(scaled(100)):
+            print(yaml.safe_dump({
+                'apiVersion': 'v1',
+                'kind': 'ConfigMap',
+                'metadata': {'name': f'{app_name}-{index}'},
+                'data': {'key': sha256(str(index))}
+            }))
+            print('---')
+        print(yaml.safe_dump({
+            'apiVersion': 'route.openshift.io/v1',
+            'kind': 'Route',
+            'metadata': {'name': app_name},
+            'spec': {'host': f'{app_name}.apps.example.com', 'tls': {'termination': 'edge'}}
+        }))
+    else:
+        print(f"application '{args[-1]}' {command}d")
+
+    return 0
+
+
+def oscap(args):
+    """Stub for `oscap info`."""
+    print(f'Document type: XCCDF Checklist\nImported: {args[-1]}')
+    return 0
+
+
+def oscap_chroot(args):
+    """Stub for `oscap-chroot <mount> xccdf eval`."""
+    for option, contents in (('--results', '<Benchmark/>'), ('--report', '<html></html>')):
+        with open(get_option(args, option), 'w') as output_file:
+            output_file.write(contents)
+
+    emit('Title\texample rule {index}\nRule\txccdf_org.example_rule_{index}\nResult\tpass\n', 500)
+    return 0
+
+
+def podman(args):
+    """Stub for `podman image sign`."""
+    signature_dir = os.path.join(
+        get_option(args, '--directory'),
+        args[-1][len('docker://'):].replace(':', '@sha256=', 1)
+    )
+    os.makedirs(signature_dir, exist_ok=True)
+    with open(os.path.join(signature_dir, 'signature-1'), 'wb') as signature_file:
+        signature_file.write(os.urandom(1024))
+    return 0
+
+
+def gpg(args):  # pylint: disable=unused-argument
+    """Stub for `gpg --import` that prints the imported key fingerprint."""
+    sys.stdin.read()
+    print(f'gpg: key {PGP_FINGERPRINT[-16:]}: secret key imported')
+    print(f'fpr:::::::::{PGP_FINGERPRINT}:')
+    return 0
+
+
+def yq(args):
+    """Stub for `yq write <file> --script=<script> --inplace`."""
+    yaml_file_path = args[1]
+    with open(get_option(args, '--script')) as script_file:
+        script = yaml.safe_load(script_file)
+    with open(yaml_file_path) as yaml_file:
+        document = yaml.safe_load(yaml_file) or {}
+
+    for command in script:
+        parent = document
+        keys = command['path'].split('.')
+        for key in keys[:-1]:
+            parent = parent.setdefault(key, {})
+        parent[keys[-1]] = command['value']
+
+    with open(yaml_file_path, 'w') as yaml_file:
+        yaml.safe_dump(document, yaml_file)
+    return 0
+
+
+def sops(args):
+    """Stub for `sops --decrypt --extract=<path> <file>`.
+
+    The "encrypted" values are the base64 encoded plain text in the `data` field of the
+    SOPS value format, e.g. `ENC[AES256_GCM,data:<base64>,type:str]`.
+    """
+    target_file = [arg for arg in args[1:] if not arg.startswith('--')][-1]
+    if target_file == '/dev/stdin':
+        value = json.load(sys.stdin)
+    else:
+        with open(target_file) as sops_file:
+            value = yaml.safe_load(sops_file)
+
+    for match in SOPS_EXTRACT_PATH_PART_REGEX.finditer(get_option(args, '--extract')):
+        if match.group('index') is not None:
+            value = value[int(match.group('index'))]
+        else:
+            value = value[match.group('key')]
+
+    sys.stdout.write(
+        base64.b64decode(SOPS_ENCRYPTED_DATA_REGEX.match(value).group('data')).decode('utf-8')
+    )
+    return 0
+
+
+TOOLS = {
+    'mvn': mvn,
+    'buildah': buildah,
+    'skopeo': skopeo,
+    'argocd': argocd,
+    'oscap': oscap,
+    'oscap-chroot': oscap_chroot,
+    'podman': podman,
+    'gpg': gpg,
+    'yq': yq,
+    'sops': sops
+}
+
+
+def main(argv):
+    """Runs the stub for the tool named by the first argument."""
+    return TOOLS[argv[0]](argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
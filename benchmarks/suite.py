@@ -0,0 +1,345 @@
+"""Benchmark suite for the step runner hot paths that fails if any benchmark regresses
+against the stored baselines.
+
+Each benchmark is timed relative to a fixed pure Python calibration workload run on the same
+machine, so that the stored baselines are comparable across machines of different speeds.
+A benchmark regresses if its relative time is more than the tolerance slower than its baseline.
+
+Examples
+--------
+>>> python benchmarks/suite.py
+>>> python benchmarks/suite.py --filter pickle --repeat 10
+>>> python benchmarks/suite.py --update-baselines
+"""
+import argparse
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+from contextlib import redirect_stdout
+
+import yaml
+from ploigos_step_runner import StepImplementer, StepResult, WorkflowResult
+from ploigos_step_runner.config import Config
+from ploigos_step_runner.utils.dict import deep_merge, deep_merge_many
+from ploigos_step_runner.utils.io import (TextIOIndenter,
+                                          TextIOSelectiveObfuscator)
+
+DEFAULT_BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_TOLERANCE = 0.5
+ENVIRONMENTS = ['DEV', 'TEST', 'PROD']
+
+BENCHMARKS = {}
+
+
+def benchmark(name, number=1):
+    """Registers a benchmark.
+
+    The decorated function is given a temporary directory, does any setup,
+    and returns the function to time. The returned function is called `number` times per timing.
+    """
+    def register(setup):
+        BENCHMARKS[name] = (setup, number)
+        return setup
+    return register
+
+
+class StubStepImplementer(StepImplementer):
+    """Step implementer that only adds artifacts from its configuration to its result."""
+
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {'default-key': 'default-value'}
+
+    @staticmethod
+    def _required_config_or_result_keys():
+        return ['key-0']
+
+    def _run_step(self):
+        step_result = StepResult.from_step_implementer(self)
+        for key in ['key-0', 'key-1', 'default-key']:
+            step_result.add_artifact(name=key, value=self.get_value(key))
+        return step_result
+
+
+def generate_config(steps):
+    """Generates a step runner configuration with the given number of steps."""
+    config = {
+        'step-runner-config': {
+            'global-defaults': {
+                'organization': 'ploigos',
+                'application-name': 'ref-quarkus',
+                'service-name': 'fruit'
+            },
+            'global-environment-defaults': {
+                environment: {'kube-api-uri': f'https://api.{environment}.ploigos.xyz:6443'}
+                for environment in ENVIRONMENTS
+            }
+        }
+    }
+    for step in range(steps):
+        config['step-runner-config'][f'step-{step}'] = [{
+            'implementer': 'StubStepImplementer',
+            'config': {f'key-{key}': f'value {step} {key}' for key in range(20)},
+            'environment-config': {
+                environment: {'argocd-api': f'https://argocd.{environment}.ploigos.xyz'}
+                for environment in ENVIRONMENTS
+            }
+        }]
+    return config
+
+
+def generate_workflow_result(steps):
+    """Generates a workflow result with a stub step result for each step and environment."""
+    workflow_result = WorkflowResult()
+    for step in range(steps):
+        for environment in ENVIRONMENTS:
+            step_result = StepResult(
+                step_name=f'step-{step}',
+                sub_step_name='StubStepImplementer',
+                sub_step_implementer_name='StubStepImplementer',
+                environment=environment
+            )
+            for artifact in range(10):
+                step_result.add_artifact(
+                    name=f'artifact-{step}-{artifact}',
+                    value=f'{environment}-{step}-{artifact}'
+                )
+            workflow_result.add_step_result(step_result)
+    return workflow_result
+
+
+@benchmark('calibration', number=5)
+def bench_calibration(_):
+    """Fixed pure Python workload that every other benchmark is timed relative to."""
+    def calibration():
+        data = {}
+        for index in range(20000):
+            data[f'key-{index}'] = [index, str(index)]
+        return sorted(data.items(), key=lambda item: item[1][1])
+    return calibration
+
+
+@benchmark('config-load-dir')
+def bench_config_load_dir(temp_dir):
+    """Loads a directory of 200 YAML config files."""
+    config_dir = os.path.join(temp_dir, 'config')
+    os.makedirs(config_dir)
+    config = generate_config(200)['step-runner-config']
+    for index, (key, value) in enumerate(config.items()):
+        with open(os.path.join(config_dir, f'config-{index:03}.yml'), 'w') as config_file:
+            yaml.dump({'step-runner-config': {key: value}}, config_file)
+    return lambda: Config(config_dir)
+
+
+@benchmark('sub-step-config-get-config-value', number=10)
+def bench_get_config_value(_):
+    """Gets a value from the runtime configuration of a sub step of a large configuration."""
+    sub_step_config = Config(generate_config(200)).get_sub_step_configs('step-100')[0]
+    return lambda: sub_step_config.get_config_value(
+        'argocd-api',
+        environment='PROD',
+        defaults={'default-key': 'default-value'}
+    )
+
+
+@benchmark('workflow-result-get-artifact-value', number=10)
+def bench_get_artifact_value(_):
+    """Gets an artifact from the last of 3000 step results, and one that does not exist."""
+    workflow_result = generate_workflow_result(1000)
+
+    def get_artifact_values():
+        workflow_result.get_artifact_value('artifact-999-9', environment='PROD')
+        workflow_result.get_artifact_value('does-not-exist')
+    return get_artifact_values
+
+
+@benchmark('workflow-result-pickle-write')
+def bench_pickle_write(temp_dir):
+    """Writes a workflow result of 3000 step results to a pickle file."""
+    workflow_result = generate_workflow_result(1000)
+    pickle_file_path = os.path.join(temp_dir, 'write.pkl')
+    return lambda: workflow_result.write_to_pickle_file(pickle_file_path)
+
+
+@benchmark('workflow-result-pickle-load')
+def bench_pickle_load(temp_dir):
+    """Loads a workflow result of 3000 step results from a pickle file."""
+    pickle_file_path = os.path.join(temp_dir, 'load.pkl')
+    generate_workflow_result(1000).write_to_pickle_file(pickle_file_path)
+    return lambda: WorkflowResult.load_from_pickle_file(pickle_file_path)
+
+
+@benchmark('text-io-selective-obfuscator-write')
+def bench_obfuscator_write(_):
+    """Writes 2000 lines of output through an obfuscator with 100 secrets."""
+    obfuscator = TextIOSelectiveObfuscator(io.StringIO(), randomize_replacment_length=False)
+    obfuscator.add_obfuscation_targets([f'secret-{index}-value' for index in range(100)])
+    lines = [
+        f'[INFO] line {index} using secret-{index % 200}-value of the output\n'
+        for index in range(2000)
+    ]
+
+    def write():
+        obfuscator.parent_stream.seek(0)
+        obfuscator.parent_stream.truncate()
+        for line in lines:
+            obfuscator.write(line)
+    return write
+
+
+@benchmark('text-io-indenter-write')
+def bench_indenter_write(_):
+    """Writes 10MB of output, in 4KB chunks, through an indenter."""
+    chunk = ''.join(f'[INFO] Building line {index} of the output\n' for index in range(100))
+    chunk = chunk[:4096]
+    chunks = [chunk] * (10 * 1024 * 1024 // len(chunk))
+    indenter = TextIOIndenter(io.StringIO(), indent_level=2)
+
+    def write():
+        indenter.parent_stream.seek(0)
+        indenter.parent_stream.truncate()
+        for data in chunks:
+            indenter.write(data)
+    return write
+
+
+@benchmark('deep-merge-many-step-results')
+def bench_deep_merge_many(_):
+    """Merges the result dictionaries of 3000 step results, as `WorkflowResult` does."""
+    step_result_dicts = [
+        step_result.get_step_result_dict()
+        for step_result in generate_workflow_result(1000).workflow_list
+    ]
+    return lambda: deep_merge_many(step_result_dicts, overwrite_duplicate_keys=True)
+
+
+@benchmark('deep-merge-copy-on-write', number=10)
+def bench_deep_merge_copy_on_write(_):
+    """Merges configuration overrides into defaults without modifying either."""
+    defaults = {f'key-{key}': {'value': key} for key in range(1000)}
+    overrides = {f'key-{key}': {'other': key} for key in range(0, 1000, 10)}
+    return lambda: deep_merge(defaults, overrides, copy_on_write=True)
+
+
+@benchmark('step-implementer-run-step', number=5)
+def bench_run_step(temp_dir):
+    """Runs a stub step implementer with a workflow result of 300 previous step results."""
+    config = Config(generate_config(101))
+    sub_step_config = config.get_sub_step_configs('step-100')[0]
+    work_dir_path = os.path.join(temp_dir, 'step-runner-working')
+    pickle_file_path = os.path.join(work_dir_path, 'step-runner-results.pkl')
+    previous_pickle_file_path = os.path.join(temp_dir, 'previous-step-runner-results.pkl')
+    os.makedirs(work_dir_path)
+    generate_workflow_result(100).write_to_pickle_file(previous_pickle_file_path)
+
+    def run_step():
+        # restore the previous results so the step result is not a duplicate
+        shutil.copyfile(previous_pickle_file_path, pickle_file_path)
+        step_implementer = StubStepImplementer(
+            results_dir_path=os.path.join(temp_dir, 'step-runner-results'),
+            results_file_name='step-runner-results.yml',
+            work_dir_path=work_dir_path,
+            config=sub_step_config,
+            environment='DEV'
+        )
+        with redirect_stdout(io.StringIO()):
+            assert step_implementer.run_step()
+    return run_step
+
+
+def setup_benchmark(name, temp_dir):
+    """Sets up the given benchmark and returns the function to time and times to call it."""
+    setup, number = BENCHMARKS[name]
+    benchmark_temp_dir = os.path.join(temp_dir, name)
+    os.makedirs(benchmark_temp_dir)
+    func = setup(benchmark_temp_dir)
+    func() # warm up
+    return func, number
+
+
+def measure(func, number, calibration, repeat):
+    """Times the given function interleaved with the calibration workload, so that both see the
+    same machine load, and returns the best time, in seconds, of a single call and that time
+    relative to the best time of the calibration workload."""
+    calibration_func, calibration_number = calibration
+    func_times = []
+    calibration_times = []
+    for _ in range(repeat):
+        calibration_times.append(timeit.timeit(calibration_func, number=calibration_number))
+        func_times.append(timeit.timeit(func, number=number))
+
+    seconds = min(func_times) / number
+    return seconds, seconds / (min(calibration_times) / calibration_number)
+
+
+def main(): # pylint: disable=too-many-locals
+    """Runs the benchmarks and compares them against the stored baselines."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filter', default='', help='Only run benchmarks containing this')
+    parser.add_argument('--repeat', type=int, default=7)
+    parser.add_argument('--retries', type=int, default=2,
+                        help='Times to re-measure a regressed benchmark to rule out noise')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='Allowed slow down relative to the baseline, ex: 0.5 is 50%%')
+    parser.add_argument('--baselines', default=DEFAULT_BASELINES_PATH)
+    parser.add_argument('--update-baselines', action='store_true',
+                        help='Store the results as the new baselines instead of comparing')
+    args = parser.parse_args()
+
+    try:
+        with open(args.baselines, 'r') as baselines_file:
+            baselines = json.load(baselines_file)
+    except FileNotFoundError:
+        baselines = {}
+
+    names = [name for name in BENCHMARKS if name != 'calibration' and args.filter in name]
+    regressions = []
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        calibration = setup_benchmark('calibration', temp_dir)
+        print(f"{'benchmark':<40} {'time':>15} {'relative':>10} {'baseline':>10} {'change':>8}")
+        for name in names:
+            func, number = setup_benchmark(name, temp_dir)
+            seconds, relative = measure(func, number, calibration, args.repeat)
+            baseline = baselines.get(name)
+
+            # a real regression is slow every time, noise is not
+            retries = 0
+            while not args.update_baselines and baseline and retries < args.retries \
+                    and relative / baseline - 1 > args.tolerance:
+                retry_seconds, retry_relative = measure(func, number, calibration, args.repeat)
+                seconds, relative = min(seconds, retry_seconds), min(relative, retry_relative)
+                retries += 1
+
+            results[name] = round(relative, 6)
+            if baseline:
+                change = relative / baseline - 1
+                status = 'REGRESSED' if change > args.tolerance else ''
+                if status:
+                    regressions.append(name)
+                comparison = f"{baseline:10.4f} {change:+8.1%} {status}"
+            else:
+                comparison = f"{'-':>10} {'-':>8}"
+            print(f"{name:<40} {seconds * 1000:12.4f} ms {relative:10.4f} {comparison}")
+
+    if args.update_baselines:
+        baselines.update(results)
+        with open(args.baselines, 'w') as baselines_file:
+            json.dump(dict(sorted(baselines.items())), baselines_file, indent=2)
+            baselines_file.write('\n')
+        print(f"Updated baselines: {args.baselines}")
+        return 0
+
+    if regressions:
+        print(f"Regressed more than {args.tolerance:.0%} against baseline: {', '.join(regressions)}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
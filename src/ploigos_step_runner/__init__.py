@@ -23,6 +23,45 @@ Command-Line Options
         Override step config provided by the given Ploigos
         config-file with these arguments.
 
+    --config-snapshot CONFIG_SNAPSHOT
+        Compiled configuration snapshot to load instead of parsing the given
+        configuration files, if the snapshot was compiled from the exact same files.
+        Snapshots are pickled, only give snapshots written by `psr config compile` from a
+        trusted location.
+        Default: no snapshot, the configuration files are always parsed.
+
+    --step-result-cache-dir STEP_RESULT_CACHE_DIR
+        Directory to cache the results of running steps in, for StepImplementers whose
+        results are fully determined by their configuration, previous step results, and
+        project files (such as the Maven `generate-metadata`, `package`, and `unit-test`
+        StepImplementers), to reuse instead of running them again with the same inputs.
+        Caching can be turned off for a step by setting its `step-result-cache` configuration
+        to false.
+        Default: $PSR_STEP_RESULT_CACHE_DIR, else step results are not cached.
+
+    --no-cache
+        Run the step even if a cached result of running it with the same inputs exists,
+        and do not cache its result.
+
+Sub Commands
+------------
+
+    psr config compile -c CONFIG [CONFIG ...] -o OUTPUT
+        Parse and validate the given configuration files, or directories containing files,
+        and write a compiled snapshot of them to OUTPUT so that later psr invocations with
+        the same configuration and `--config-snapshot OUTPUT` start faster.
+
+    psr preflight -c CONFIG [CONFIG ...] [-e ENVIRONMENT] [--steps STEP [STEP ...]]
+        Check, without running any steps, that every configured step can be loaded and that
+        each of its required configuration keys is configured or declared as a result
+        artifact by a step that runs before it, in every environment, reporting every problem
+        found. Exits with 103 if any errors are found.
+
+    psr --list-implementers
+        List the StepImplementers available for each step, including StepImplementers
+        provided by plugins registered as `ploigos_step_runner.step_implementers` entry points
+        named `<step-name>.<ImplementerName>`.
+
 Step Configuration
 ------------------
 
@@ -789,12 +828,40 @@ Example Running the 'generate-metadata' step
 ...     --results-file=my-app-step-runner-results.yml
 ...     --step=generate-metadata
 
+
+Example Running the 'deploy' step in multiple environments concurrently
+
+>>> psr
+...     --config=my-app-step-runner-config.yml
+...     --step=deploy
+...     --environment=PROD-EAST,PROD-WEST
+
 """
 
+from typing import TYPE_CHECKING
+
 import __main__
 
-from ploigos_step_runner.exceptions import StepRunnerException
-from ploigos_step_runner.step_implementer import DefaultSteps, StepImplementer
-from ploigos_step_runner.step_result import StepResult
-from ploigos_step_runner.step_runner import StepRunner
-from ploigos_step_runner.workflow_result import WorkflowResult
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.exceptions import StepRunnerException
+    from ploigos_step_runner.step_implementer import (
+        ConfigDumpVerbosity,
+        DefaultSteps,
+        StepImplementer
+    )
+    from ploigos_step_runner.step_result import StepResult
+    from ploigos_step_runner.step_runner import EnvironmentsSuccessPolicy, StepRunner
+    from ploigos_step_runner.workflow_result import WorkflowResult
+
+install_lazy_attributes(globals(), {
+    'StepRunnerException': '.exceptions',
+    'ConfigDumpVerbosity': '.step_implementer',
+    'DefaultSteps': '.step_implementer',
+    'EnvironmentsSuccessPolicy': '.step_runner',
+    'StepImplementer': '.step_implementer',
+    'StepResult': '.step_result',
+    'StepRunner': '.step_runner',
+    'WorkflowResult': '.workflow_result'
+})
@@ -9,6 +9,8 @@ Exit Codes
     specified -c/--config must exist and not be empty
 102
     specified -c/--config is invalid configuration
+103
+    `psr preflight` found errors in the configuration of the steps
 200
     step completed with unsuccessful results
 300
@@ -18,14 +20,20 @@ Exit Codes
 import argparse
 import os.path
 import sys
+import time
 import traceback
 from contextlib import redirect_stderr, redirect_stdout
 
 from ploigos_step_runner.config.config import Config
 from ploigos_step_runner.decryption_utils import DecryptionUtils
-from ploigos_step_runner.step_runner import StepRunner
+from ploigos_step_runner.step_implementer import ConfigDumpVerbosity
+from ploigos_step_runner.step_runner import EnvironmentsSuccessPolicy, StepRunner
 from ploigos_step_runner.utils.io import TextIOSelectiveObfuscator
+from ploigos_step_runner.utils.tracing import TRACEPARENT_ENV_VAR
 
+TRACE_FILE_ENV_VAR = 'PSR_TRACE_FILE'
+CONFIG_DUMP_ENV_VAR = 'PSR_CONFIG_DUMP'
+STEP_RESULT_CACHE_DIR_ENV_VAR = 'PSR_STEP_RESULT_CACHE_DIR'
 
 def print_error(msg):
     """
@@ -60,9 +68,196 @@ class ParseKeyValueArge(argparse.Action):  # pylint: disable=too-few-public-meth
         setattr(namespace, self.dest, key_value_dict)
 
 
+def config_compile(argv):
+    """Entry point for the `psr config compile` sub command.
+
+    Parses and validates the given configuration and writes a snapshot of it
+    that later `psr` invocations with the same configuration can load directly.
+
+    Parameters
+    ----------
+    argv : list of str
+        Arguments given after `psr config compile`.
+    """
+    parser = argparse.ArgumentParser(
+        prog='psr config compile',
+        description='Compile Ploigos Step Runner (psr) configuration into a snapshot'
+    )
+    parser.add_argument(
+        '-c',
+        '--config',
+        required=True,
+        nargs='+',
+        help='Workflow configuration files, or directories containing files, in yml or json'
+    )
+    parser.add_argument(
+        '-o',
+        '--output',
+        required=True,
+        help='Path to write the compiled configuration snapshot to'
+    )
+    args = parser.parse_args(argv)
+
+    for config_file in args.config:
+        if not os.path.exists(config_file) or os.stat(config_file).st_size == 0:
+            print_error('specified -c/--config must exist and not be empty')
+            sys.exit(101)
+
+    try:
+        config = Config(args.config)
+    except (ValueError, AssertionError) as error:
+        print_error(f"specified -c/--config is invalid configuration: {error}")
+        sys.exit(102)
+
+    config.write_snapshot(args.output)
+    print(f"Wrote configuration snapshot: {args.output}")
+
+
+def list_implementers(argv):
+    """Entry point for `psr --list-implementers`.
+
+    Prints the built in and plugin StepImplementers of every step, without importing them.
+
+    Parameters
+    ----------
+    argv : list of str
+        Arguments given after `psr --list-implementers`.
+    """
+    parser = argparse.ArgumentParser(
+        prog='psr --list-implementers',
+        description='List the StepImplementers, including plugins, available for each step'
+    )
+    parser.parse_args(argv)
+
+    for step_name, step_implementers in sorted(StepRunner.get_step_implementers().items()):
+        print(f"{step_name}:")
+        for step_implementer_name, source in sorted(step_implementers.items()):
+            print(f"  {step_implementer_name}: {source}")
+
+
+def preflight(argv):
+    """Entry point for the `psr preflight` sub command.
+
+    Statically checks the configuration of every given step, in every given environment,
+    without running any of them, and prints every problem found.
+
+    Parameters
+    ----------
+    argv : list of str
+        Arguments given after `psr preflight`.
+
+    See Also
+    --------
+    StepRunner.preflight
+    """
+    parser = argparse.ArgumentParser(
+        prog='psr preflight',
+        description='Check the configuration of every Ploigos Step Runner (psr) step before'
+                    ' running any of them'
+    )
+    parser.add_argument(
+        '-c',
+        '--config',
+        required=True,
+        nargs='+',
+        help='Workflow configuration files, or directories containing files, in yml or json'
+    )
+    parser.add_argument(
+        '-e',
+        '--environment',
+        required=False,
+        help='The environment, or comma separated list of environments, to check the steps'
+             ' against. Default: every environment in the configuration.'
+    )
+    parser.add_argument(
+        '--steps',
+        nargs='+',
+        help='Workflow steps to check, in the order they run. Default: every configured step.'
+    )
+    parser.add_argument(
+        '--config-snapshot',
+        default=None,
+        help='Compiled configuration snapshot (see `psr config compile`) to load instead of'
+             ' parsing the given configuration if compiled from the exact same configuration.'
+             ' Default: no snapshot, the given configuration is always parsed.'
+    )
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    for config_file in args.config:
+        if not os.path.exists(config_file) or os.stat(config_file).st_size == 0:
+            print_error('specified -c/--config must exist and not be empty')
+            sys.exit(101)
+
+    try:
+        config = Config(args.config, snapshot_path=args.config_snapshot)
+    except (ValueError, AssertionError) as error:
+        print_error(f"specified -c/--config is invalid configuration: {error}")
+        sys.exit(102)
+
+    problems = StepRunner(config).preflight(args.steps, args.environment)
+    elapsed_ms = (time.perf_counter() - start_time) * 1000
+
+    errors, warnings = print_preflight_problems(problems)
+    print(f"Preflight found {errors} error(s) and {warnings} warning(s) in {elapsed_ms:.1f}ms")
+    if errors:
+        sys.exit(103)
+
+
+def print_preflight_problems(problems):
+    """Prints the given preflight problems to stderr, each once with every environment it is in.
+
+    Parameters
+    ----------
+    problems : list of PreflightProblem
+        Problems found by `StepRunner.preflight`.
+
+    Returns
+    -------
+    tuple of (int, int)
+        Number of distinct errors and warnings printed.
+    """
+    problem_environments = {}
+    for problem in problems:
+        key = (problem.is_error, problem.step_name, problem.sub_step_name, problem.message)
+        problem_environments.setdefault(key, [])
+        if problem.environment:
+            problem_environments[key].append(problem.environment)
+
+    errors = 0
+    for (is_error, step_name, sub_step_name, message), environments in \
+            problem_environments.items():
+        location = step_name
+        if sub_step_name:
+            location += f" {sub_step_name}"
+        if environments:
+            location += f" ({', '.join(environments)})"
+        if is_error:
+            errors += 1
+            print_error(f"ERROR: {location}: {message}")
+        else:
+            print_error(f"WARNING: {location}: {message}")
+
+    return errors, len(problem_environments) - errors
+
+SUB_COMMANDS = {
+    ('config', 'compile'): config_compile,
+    ('preflight',): preflight,
+    ('--list-implementers',): list_implementers
+}
+
+
 def main(argv=None):
     """Main entry point for Ploigos step runner.
     """
+    if argv is None:
+        argv = sys.argv[1:]
+
+    for sub_command, sub_command_main in SUB_COMMANDS.items():
+        if tuple(argv[:len(sub_command)]) == sub_command:
+            sub_command_main(argv[len(sub_command):])
+            return
+
     parser = argparse.ArgumentParser(description='Ploigos Step Runner (psr)')
     parser.add_argument(
         '-s',
@@ -74,7 +269,22 @@ def main(argv=None):
         '-e',
         '--environment',
         required=False,
-        help='The environment to run this step against.'
+        help='The environment to run this step against, or a comma separated list of'
+             ' environments to run this step against concurrently.'
+    )
+    parser.add_argument(
+        '--environments-success-policy',
+        choices=EnvironmentsSuccessPolicy.ALL,
+        default=EnvironmentsSuccessPolicy.ALL_ENVIRONMENTS,
+        help='When running the step against multiple environments, whether the step is'
+             ' successful only if it is successful in all of them or in any of them.'
+    )
+    parser.add_argument(
+        '--max-concurrent-environments',
+        type=int,
+        default=None,
+        help='When running the step against multiple environments, the maximum number of'
+             ' environments to run it against at the same time. Default: all of them.'
     )
     parser.add_argument(
         '-c',
@@ -96,6 +306,45 @@ def main(argv=None):
         help='Override step config provided by the given config-file with these arguments.',
         action=ParseKeyValueArge
     )
+    parser.add_argument(
+        '--config-snapshot',
+        default=None,
+        help='Compiled configuration snapshot (see `psr config compile`) to load instead of'
+             ' parsing the given configuration if compiled from the exact same configuration.'
+             ' Default: no snapshot, the given configuration is always parsed.'
+    )
+    parser.add_argument(
+        '--trace-file',
+        default=os.environ.get(TRACE_FILE_ENV_VAR),
+        help='OTLP JSON lines file to append OpenTelemetry style spans for the step, its sub'
+             ' steps, and the external commands they run to. Spans of steps run with the same'
+             f' --results-dir, or the same {TRACEPARENT_ENV_VAR} environment variable, are in the'
+             f' same trace. Default: value of the {TRACE_FILE_ENV_VAR} environment variable,'
+             ' if set, else tracing is disabled.'
+    )
+    parser.add_argument(
+        '--config-dump',
+        choices=ConfigDumpVerbosity.ALL,
+        default=os.environ.get(CONFIG_DUMP_ENV_VAR, ConfigDumpVerbosity.FULL),
+        help='How much of the step configuration to print before running the step: nothing,'
+             ' only the configuration keys, or the keys and values (encrypted values are'
+             f' printed without being decrypted). Default: value of the {CONFIG_DUMP_ENV_VAR}'
+             f' environment variable, if set, else {ConfigDumpVerbosity.FULL}.'
+    )
+    parser.add_argument(
+        '--step-result-cache-dir',
+        default=os.environ.get(STEP_RESULT_CACHE_DIR_ENV_VAR),
+        help='Directory to cache the results of running steps whose StepImplementers support it'
+             ' in, to reuse instead of running them again with the same inputs in later runs.'
+             f' Default: value of the {STEP_RESULT_CACHE_DIR_ENV_VAR} environment variable,'
+             ' if set, else step results are not cached.'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Run the step even if a cached result of running it with the same inputs exists,'
+             ' and do not cache its result.'
+    )
     args = parser.parse_args(argv)
 
     obfuscated_stdout = TextIOSelectiveObfuscator(sys.stdout)
@@ -111,13 +360,21 @@ def main(argv=None):
                 sys.exit(101)
 
         try:
-            config = Config(args.config)
+            config = Config(args.config, snapshot_path=args.config_snapshot)
         except (ValueError, AssertionError) as error:
             print_error(f"specified -c/--config is invalid configuration: {error}")
             sys.exit(102)
 
         config.set_step_config_overrides(args.step, args.step_config)
-        step_runner = StepRunner(config, args.results_dir)
+        step_runner = StepRunner(
+            config,
+            args.results_dir,
+            trace_file_path=args.trace_file,
+            config_dump_verbosity=args.config_dump,
+            environments_success_policy=args.environments_success_policy,
+            max_concurrent_environments=args.max_concurrent_environments,
+            step_result_cache_dir_path=None if args.no_cache else args.step_result_cache_dir
+        )
 
         try:
             if not step_runner.run_step(args.step, args.environment):
@@ -1,8 +1,21 @@
 """Configuration for Ploigos workflow.
 """
 
-from ploigos_step_runner.config.config import Config
-from ploigos_step_runner.config.config_value import ConfigValue
-from ploigos_step_runner.config.config_value_decryptor import ConfigValueDecryptor
-from ploigos_step_runner.config.step_config import StepConfig
-from ploigos_step_runner.config.sub_step_config import SubStepConfig
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.config.config import Config
+    from ploigos_step_runner.config.config_value import ConfigValue
+    from ploigos_step_runner.config.config_value_decryptor import ConfigValueDecryptor
+    from ploigos_step_runner.config.step_config import StepConfig
+    from ploigos_step_runner.config.sub_step_config import SubStepConfig
+
+install_lazy_attributes(globals(), {
+    'Config': '.config',
+    'ConfigValue': '.config_value',
+    'ConfigValueDecryptor': '.config_value_decryptor',
+    'StepConfig': '.step_config',
+    'SubStepConfig': '.sub_step_config'
+})
@@ -2,13 +2,15 @@
 """
 
 import copy
-import glob
-import os.path
+import hashlib
+import json
+import os
+import pickle
 
 from ploigos_step_runner.decryption_utils import DecryptionUtils
 from ploigos_step_runner.config.step_config import StepConfig
 from ploigos_step_runner.config.config_value import ConfigValue
-from ploigos_step_runner.utils.file import parse_yaml_or_json_file
+from ploigos_step_runner.utils.file import parse_yaml_or_json_files
 from ploigos_step_runner.utils.dict import deep_merge
 
 class Config:
@@ -24,12 +26,21 @@ class Config:
         files that are valid YAML or JSON files that are valid
         configurations,
         or a list of any of the former.
+    snapshot_path : str, optional
+        Path to a configuration snapshot previously written by `write_snapshot`.
+        If the snapshot exists and was compiled from the exact same configuration files
+        (same paths and same content hashes) the snapshot is loaded rather then re-parsing
+        the configuration files, otherwise the given config is parsed as normal.
+        Snapshots are pickled, so only snapshots from a trusted location should be given.
 
     Attributes
     ----------
     __global_defaults : dict
     __global_environment_defaults : dict
     __step_configs : dict of str (step names) to StepConfig
+    __config_decryptor_definitions : list of dict
+    __config_files : list of str
+    __snapshotable : bool
 
     Raises
     ------
@@ -50,13 +61,19 @@ class Config:
     CONFIG_KEY_DECRYPTOR_IMPLEMENTER = 'implementer'
     CONFIG_KEY_DECRYPTOR_CONFIG = 'config'
 
-    def __init__(self, config=None):
+    SNAPSHOT_FORMAT_VERSION = 2
+
+    def __init__(self, config=None, snapshot_path=None):
         self.__global_defaults = {}
         self.__global_environment_defaults = {}
         self.__step_configs = {}
+        self.__config_decryptor_definitions = []
+        self.__config_files = []
+        self.__snapshotable = True
 
         if config is not None:
-            self.add_config(config)
+            if snapshot_path is None or not self.__load_snapshot(config, snapshot_path):
+                self.add_config(config)
 
     @property
     def global_defaults(self):
@@ -184,32 +201,88 @@ class Config:
             for _config in config:
                 self.add_config(_config)
         elif isinstance(config, str):
-            if os.path.isfile(config):
-                self.__add_config_file(config)
-            elif os.path.isdir(config):
-                # for each recursively found file in the directory add the config file
-                config_dir_files = glob.glob(config + '/**', recursive=True)
-                found_nested_file = False
-                for config_dir_file in config_dir_files:
-                    if os.path.isfile(config_dir_file):
-                        found_nested_file = True
-                        self.__add_config_file(config_dir_file)
-
-                if not found_nested_file:
+            config_files = Config.__get_config_files(config)
+
+            # parse all of the files concurrently then add them in a fixed order so that
+            # the same configuration files always result in the same configuration
+            try:
+                parsed_config_files = parse_yaml_or_json_files(config_files)
+            except ValueError as error:
+                if len(config_files) == 1:
                     raise ValueError(
-                        f"Given config string ({config}) is a directory" +
-                        " with no recursive children files."
-                    )
-            else:
+                        f"Error parsing config file ({config_files[0]}) as json or yaml"
+                    ) from error
                 raise ValueError(
-                    f"Given config string ({config}) is not a valid path."
-                )
+                    f"Error parsing config files in ({config}) as json or yaml: {error}"
+                ) from error
+
+            for config_file, parsed_config_file in zip(config_files, parsed_config_files):
+                self.__add_parsed_config_file(config_file, parsed_config_file)
         else:
             raise ValueError(
                 f"Given config ({config}) is unexpected type ({type(config)}) " +
                 "not a dictionary, string, or list of former."
             )
 
+    def write_snapshot(self, snapshot_path):
+        """Writes a snapshot of this Config that can be quickly loaded by a later Config
+        created with the same configuration files by using the `snapshot_path` parameter.
+
+        Notes
+        -----
+        The snapshot is keyed by the path and SHA-256 hash of every configuration file that
+        was added to this Config, so if any of those files change, are added, or are removed
+        the snapshot will be ignored and the configuration files will be re-parsed.
+
+        Step configuration overrides are runtime only and are not included in the snapshot.
+
+        The snapshot starts with a single line JSON header holding the format version and the
+        configuration file hashes, followed by the pickled configuration, so that a snapshot
+        for other configuration files is rejected without unpickling it.
+
+        Parameters
+        ----------
+        snapshot_path : str
+            Path to write the snapshot to.
+
+        Raises
+        ------
+        ValueError
+            If this Config was given any configuration as a dictionary rather then as a file,
+            since there is no way to know if such a configuration has changed.
+        """
+        if not self.__snapshotable:
+            raise ValueError(
+                "Can not write configuration snapshot for configuration that was given as a"
+                " dictionary rather then as configuration files or directories."
+            )
+
+        sub_step_configs = []
+        for step_config in self.step_configs.values():
+            for sub_step in step_config.sub_steps:
+                sub_step_configs.append((
+                    step_config.step_name,
+                    sub_step.sub_step_name,
+                    sub_step.sub_step_implementer_name,
+                    sub_step.sub_step_config,
+                    sub_step.sub_step_env_config
+                ))
+
+        snapshot_header = Config.__get_snapshot_header(self.__config_files)
+        snapshot = {
+            'global-defaults': self.__global_defaults,
+            'global-environment-defaults': self.__global_environment_defaults,
+            'config-decryptors': self.__config_decryptor_definitions,
+            'sub-step-configs': sub_step_configs
+        }
+
+        snapshot_dir_path = os.path.dirname(snapshot_path)
+        if snapshot_dir_path:
+            os.makedirs(snapshot_dir_path, exist_ok=True)
+        with open(snapshot_path, 'wb') as snapshot_file:
+            snapshot_file.write(json.dumps(snapshot_header).encode('utf-8') + b'\n')
+            pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+
     def set_step_config_overrides(self, step_name, step_config_overrides):
         """Sets configuration overrides for all sub steps of a given step.
 
@@ -231,30 +304,224 @@ class Config:
 
         self.step_configs[step_name].step_config_overrides = step_config_overrides
 
-    def __add_config_file(self, config_file):
-        """Adds a JSON or YAML file as config to this Config.
+    def __load_snapshot(self, config, snapshot_path):
+        """Attempts to load a snapshot written by `write_snapshot` for the given config.
 
         Parameters
         ----------
-        config_file : str (file path)
-            A string that is a path to an existing YAML or JSON file to
-            parse and validate as a configuration to add to this Config.
+        config : list, str (file or directory)
+            Configuration files, or directories of configuration files,
+            the snapshot must have been written from.
+        snapshot_path : str
+            Path to the snapshot to load.
+
+        Returns
+        -------
+        bool
+            True if the snapshot was loaded into this Config.
+            False if the snapshot does not exist, can not be read, or was not written from
+            the exact same configuration files, in which case nothing was loaded.
+
+        Notes
+        -----
+        The snapshot header is checked before anything is unpickled, so a snapshot written
+        from other configuration files, or that is not a snapshot at all, is never unpickled.
+        """
+        if not os.path.isfile(snapshot_path):
+            return False
+
+        try:
+            config_files = Config.__get_config_files(config)
+            with open(snapshot_path, 'rb') as snapshot_file:
+                snapshot_header = json.loads(snapshot_file.readline().decode('utf-8'))
+                if snapshot_header != Config.__get_snapshot_header(config_files):
+                    return False
+
+                snapshot = pickle.load(snapshot_file)
+        except (ValueError, OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return False
+
+        if not isinstance(snapshot, dict):
+            return False
+
+        if snapshot['config-decryptors']:
+            Config.parse_and_register_decryptors_definitions(snapshot['config-decryptors'])
+
+        self.__global_defaults = snapshot['global-defaults']
+        self.__global_environment_defaults = snapshot['global-environment-defaults']
+        self.__config_decryptor_definitions = snapshot['config-decryptors']
+        self.__config_files = config_files
+        for (step_name, sub_step_name, sub_step_implementer_name,
+             sub_step_config_dict, sub_step_env_config) in snapshot['sub-step-configs']:
+            self.add_or_update_step_config(
+                step_name=step_name,
+                sub_step_name=sub_step_name,
+                sub_step_implementer_name=sub_step_implementer_name,
+                sub_step_config_dict=sub_step_config_dict,
+                sub_step_env_config=sub_step_env_config
+            )
+
+        return True
+
+    @staticmethod
+    def __get_config_files(config):
+        """Gets the configuration files for a given configuration path or list of paths.
+
+        Parameters
+        ----------
+        config : list, str (file or directory)
+            A string that is a path to a configuration file,
+            or a string that is a path to a directory containing one or more configuration files,
+            or a list of any of the former.
+
+        Returns
+        -------
+        list of str
+            Paths to the configuration files in the order they should be added.
+            Files in a directory are in sorted order, see `__walk_config_dir`.
 
         Raises
         ------
         ValueError
-            If can not parse given file as YAML or JSON
-        AssertionError
-            If dictionary parsed from given YAML or JSON file is not a valid config.
+            If given config is not of expected type.
+            If given config string is not a valid path.
+            If given config string is a directory with no recursive children files.
         """
-        # parse the configuration file
-        try:
-            parsed_config_file = parse_yaml_or_json_file(config_file)
-        except ValueError as error:
+        if isinstance(config, list):
+            config_files = []
+            for _config in config:
+                config_files += Config.__get_config_files(_config)
+        elif isinstance(config, str):
+            if os.path.isfile(config):
+                config_files = [config]
+            elif os.path.isdir(config):
+                # recursively find all files in the directory
+                config_files = Config.__walk_config_dir(config)
+
+                if not config_files:
+                    raise ValueError(
+                        f"Given config string ({config}) is a directory" +
+                        " with no recursive children files."
+                    )
+            else:
+                raise ValueError(
+                    f"Given config string ({config}) is not a valid path."
+                )
+        else:
             raise ValueError(
-                f"Error parsing config file ({config_file}) as json or yaml"
-            ) from error
+                f"Given config ({config}) is unexpected type ({type(config)}) " +
+                "not a string, or list of former."
+            )
+
+        return config_files
+
+    @staticmethod
+    def __walk_config_dir(config_dir, visited_dirs=None):
+        """Recursively finds all of the configuration files in a directory.
+
+        Notes
+        -----
+        Entries in each directory are sorted by name and sub directories are walked depth first
+        at the point they sort, so the same directory tree always gives the same files in the
+        same order regardless of file system.
+        Hidden files and directories (starting with a '.') are skipped.
+        Symbolic links to directories are followed, but each directory is only walked once,
+        so symbolic link loops are not followed forever.
+
+        Parameters
+        ----------
+        config_dir : str
+            Path to directory to find the configuration files in.
+        visited_dirs : set of (int, int), optional
+            Device and inode of the directories already walked.
+
+        Returns
+        -------
+        list of str
+            Paths to all of the files in the given directory and its sub directories.
+        """
+        if visited_dirs is None:
+            visited_dirs = set()
+        config_dir_stat = os.stat(config_dir)
+        visited_dirs.add((config_dir_stat.st_dev, config_dir_stat.st_ino))
+
+        config_files = []
+        with os.scandir(config_dir) as dir_entries:
+            dir_entries = sorted(dir_entries, key=lambda dir_entry: dir_entry.name)
+
+        for dir_entry in dir_entries:
+            if dir_entry.name.startswith('.'):
+                continue
+
+            if dir_entry.is_dir():
+                dir_entry_stat = dir_entry.stat()
+                if (dir_entry_stat.st_dev, dir_entry_stat.st_ino) not in visited_dirs:
+                    config_files += Config.__walk_config_dir(dir_entry.path, visited_dirs)
+            elif dir_entry.is_file():
+                config_files.append(dir_entry.path)
+
+        return config_files
+
+    @staticmethod
+    def __get_snapshot_header(config_files):
+        """Gets the header of a snapshot of the given configuration files.
 
+        Parameters
+        ----------
+        config_files : list of str
+            Paths to the configuration files of the snapshot.
+
+        Returns
+        -------
+        dict
+            Snapshot format version and the absolute path and SHA-256 hex digest of each
+            given configuration file, as it is written to and read back from JSON.
+        """
+        return {
+            'version': Config.SNAPSHOT_FORMAT_VERSION,
+            'config-files': [
+                list(config_file_hash)
+                for config_file_hash in Config.__hash_config_files(config_files)
+            ]
+        }
+
+    @staticmethod
+    def __hash_config_files(config_files):
+        """Hashes the content of the given configuration files.
+
+        Parameters
+        ----------
+        config_files : list of str
+            Paths to configuration files to hash.
+
+        Returns
+        -------
+        list of (str, str)
+            Absolute path and SHA-256 hex digest of each given configuration file.
+        """
+        config_file_hashes = []
+        for config_file in config_files:
+            with open(config_file, 'rb') as open_config_file:
+                config_file_hash = hashlib.sha256(open_config_file.read()).hexdigest()
+            config_file_hashes.append((os.path.abspath(config_file), config_file_hash))
+
+        return config_file_hashes
+
+    def __add_parsed_config_file(self, config_file, parsed_config_file):
+        """Adds the config parsed from a JSON or YAML file to this Config.
+
+        Parameters
+        ----------
+        config_file : str (file path)
+            A string that is a path to the YAML or JSON file the given config was parsed from.
+        parsed_config_file : dict
+            Configuration parsed from the given file to validate and add to this Config.
+
+        Raises
+        ------
+        AssertionError
+            If dictionary parsed from given YAML or JSON file is not a valid config.
+        """
         # add the config parsed from file
         try:
             self.__add_config_dict(parsed_config_file, config_file)
@@ -263,6 +530,8 @@ class Config:
                 f"Failed to add parsed configuration file ({config_file}): {error}"
             ) from error
 
+        self.__config_files.append(config_file)
+
     def __add_config_dict(self, config_dict, source_file_path=None): # pylint: disable=too-many-locals, too-many-branches
         """Add a configuration dictionary to the list of configuration dictionaries.
 
@@ -301,6 +570,7 @@ class Config:
             parent_source = source_file_path
         else:
             parent_source = copy.deepcopy(config_dict)
+            self.__snapshotable = False
 
         # convert all the leaves of the configuration dictionary under
         # the Config.CONFIG_KEY to ConfigValue objects
@@ -317,8 +587,9 @@ class Config:
             if key == Config.CONFIG_KEY_GLOBAL_DEFAULTS:
                 try:
                     self.__global_defaults = deep_merge(
-                        copy.deepcopy(self.__global_defaults),
-                        copy.deepcopy(value)
+                        self.__global_defaults,
+                        value,
+                        copy_on_write=True
                     )
                 except ValueError as error:
                     raise ValueError(
@@ -333,8 +604,9 @@ class Config:
 
                     try:
                         self.__global_environment_defaults[env] = deep_merge(
-                            copy.deepcopy(self.__global_environment_defaults[env]),
-                            copy.deepcopy(env_config)
+                            self.__global_environment_defaults[env],
+                            env_config,
+                            copy_on_write=True
                         )
                     except ValueError as error:
                         raise ValueError(
@@ -343,6 +615,7 @@ class Config:
             elif key == Config.CONFIG_KEY_DECRYPTORS:
                 config_decryptor_definitions = ConfigValue.convert_leaves_to_values(value)
                 Config.parse_and_register_decryptors_definitions(config_decryptor_definitions)
+                self.__config_decryptor_definitions += config_decryptor_definitions
             else:
                 step_name = key
                 step_config = value
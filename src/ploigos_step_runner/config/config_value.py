@@ -28,6 +28,8 @@ class ConfigValue:
         List of path to the element that this is the value for.
     """
 
+    ENCRYPTED_DISPLAY_VALUE = '<encrypted>'
+
     def __init__(self, value, parent_source=None, path_parts=None):
         self.__value = value
         self.__parent_source = parent_source
@@ -81,6 +83,18 @@ class ConfigValue:
         """
         return copy.deepcopy(self.__value)
 
+    @property
+    def is_encrypted(self):
+        """Determine if this configuration value is encrypted, without decrypting it.
+
+        Returns
+        -------
+        bool
+            True if one of the registered ConfigValueDecryptors can decrypt this value.
+            False otherwise.
+        """
+        return DecryptionUtils.can_decrypt(self)
+
     @property
     def path_parts(self):
         """Gets copy of the list of path to the element that this is the value for.
@@ -236,3 +250,79 @@ class ConfigValue:
             return values.value
         else:
             return values
+
+    @staticmethod
+    def convert_leaves_to_display_values(values):
+        """Recursively creates a copy of the given values with all leaves of type ConfigValue
+        transformed to a value safe to display, without decrypting any of them.
+
+        Parameters
+        ----------
+        values : dict, list, ConfigValue, or obj
+            A collection where the leaves contain ConfigValue to transform to display values.
+
+        Returns
+        -------
+        dict, list, or obj
+            If given a dictionary returns a new dictionary with all leaves transformed to
+                display values.
+            If given a list or tuple returns a new list with all leaves transformed to
+                display values.
+            If given an encrypted ConfigValue returns ConfigValue.ENCRYPTED_DISPLAY_VALUE
+            If given any other ConfigValue returns ConfigValue.raw_value
+            If any other object returns that object
+
+        See Also
+        --------
+        ConfigValue.convert_leaves_to_values
+        """
+        if isinstance(values, dict): # pylint: disable=no-else-return
+            return {
+                child_key: ConfigValue.convert_leaves_to_display_values(child_value)
+                for child_key, child_value in values.items()
+            }
+        elif isinstance(values, (list, tuple)):
+            return [ConfigValue.convert_leaves_to_display_values(child) for child in values]
+        elif isinstance(values, ConfigValue):
+            if values.is_encrypted:
+                return ConfigValue.ENCRYPTED_DISPLAY_VALUE
+
+            return values.raw_value
+        else:
+            return values
+
+    @staticmethod
+    def convert_leaves_to_raw_values(values):
+        """Recursively creates a copy of the given values with all leaves of type ConfigValue
+        transformed to ConfigValue.raw_value, without decrypting any of them.
+
+        Parameters
+        ----------
+        values : dict, list, ConfigValue, or obj
+            A collection where the leaves contain ConfigValue to transform to raw values.
+
+        Returns
+        -------
+        dict, list, or obj
+            If given a dictionary returns a new dictionary with all leaves transformed to
+                raw values.
+            If given a list or tuple returns a new list with all leaves transformed to
+                raw values.
+            If given a ConfigValue returns ConfigValue.raw_value
+            If any other object returns that object
+
+        See Also
+        --------
+        ConfigValue.convert_leaves_to_display_values
+        """
+        if isinstance(values, dict): # pylint: disable=no-else-return
+            return {
+                child_key: ConfigValue.convert_leaves_to_raw_values(child_value)
+                for child_key, child_value in values.items()
+            }
+        elif isinstance(values, (list, tuple)):
+            return [ConfigValue.convert_leaves_to_raw_values(child) for child in values]
+        elif isinstance(values, ConfigValue):
+            return values.raw_value
+        else:
+            return values
@@ -1,4 +1,13 @@
 """Decryptors for configuration values.
 """
 
-from ploigos_step_runner.config.decryptors.sops import SOPS
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.config.decryptors.sops import SOPS
+
+install_lazy_attributes(globals(), {
+    'SOPS': '.sops'
+})
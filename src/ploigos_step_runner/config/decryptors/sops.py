@@ -13,6 +13,7 @@ import sys
 import sh
 
 from ploigos_step_runner.config.config_value_decryptor import ConfigValueDecryptor
+from ploigos_step_runner.utils.commands import run_command
 
 class SOPS(ConfigValueDecryptor):
     """ConfigValueDecryptor that uses SOPS to decyrpt ConfigValues
@@ -111,7 +112,8 @@ class SOPS(ConfigValueDecryptor):
         try:
             # use sops to decrypt the value
             out = StringIO()
-            sh.sops( # pylint: disable=no-member
+            run_command(
+                sh.sops, # pylint: disable=no-member
                 '--decrypt',
                 f'--extract={sops_path}',
                 input_type_arg,
@@ -201,8 +201,9 @@ class SubStepConfig:
         if new_sub_step_config is not None:
             try:
                 self.__sub_step_config_dict = deep_merge(
-                    self.sub_step_config,
-                    copy.deepcopy(new_sub_step_config)
+                    self.__sub_step_config_dict,
+                    new_sub_step_config,
+                    copy_on_write=True
                 )
             except ValueError as error:
                 raise ValueError(
@@ -232,7 +233,8 @@ class SubStepConfig:
             try:
                 self.__sub_step_env_config = deep_merge(
                     self.__sub_step_env_config,
-                    copy.deepcopy(new_sub_step_env_config)
+                    new_sub_step_env_config,
+                    copy_on_write=True
                 )
             except ValueError as error:
                 raise ValueError(
@@ -17,6 +17,8 @@ class DecryptionUtils:
     __obfuscation_streams : list of TextIOSelectiveObfuscator
         TextIOSelectiveObfuscators to be sure that any decrypted values are obfuscated
         on those streams.
+    __obfuscation_targets : list of str
+        Decrypted values, to obfuscate on streams registered after they were decrypted.
     __config_value_decryptors : list of ConfigValueDecryptor
         ConfigValueDecryptors that can be used to decrypt given ConfigValue.
     """
@@ -24,11 +26,14 @@ class DecryptionUtils:
     __DEFAULT_DECRYPTORS_MODULE = 'ploigos_step_runner.config.decryptors'
 
     __obfuscation_streams = []
+    __obfuscation_targets = []
     __config_value_decryptors = []
+    __decryptor_classes = {}
 
     @staticmethod
     def register_obfuscation_stream(obfuscator_stream):
-        """Add a TextIOSelectiveObfuscator to obfuscate any decrypted values on.
+        """Add a TextIOSelectiveObfuscator to obfuscate any decrypted values on,
+        including any values already decrypted.
 
         Parameters
         ----------
@@ -43,6 +48,22 @@ class DecryptionUtils:
         assert isinstance(obfuscator_stream, TextIOSelectiveObfuscator)
         DecryptionUtils.__obfuscation_streams.append(obfuscator_stream)
 
+        if DecryptionUtils.__obfuscation_targets:
+            obfuscator_stream.add_obfuscation_targets(DecryptionUtils.__obfuscation_targets)
+
+    @staticmethod
+    def unregister_obfuscation_stream(obfuscator_stream):
+        """Stop adding decrypted values to obfuscate to a TextIOSelectiveObfuscator,
+        ex: once the stream is closed.
+
+        Parameters
+        ----------
+        obfuscator_stream : TextIOSelectiveObfuscator
+            TextIOSelectiveObfuscator to stop adding decrypted values to obfuscate to.
+        """
+        if obfuscator_stream in DecryptionUtils.__obfuscation_streams:
+            DecryptionUtils.__obfuscation_streams.remove(obfuscator_stream)
+
     @staticmethod
     def register_config_value_decryptor(config_value_decryptor):
         """Add a ConfigValueDecryptor that can be used to decrypt ConfigValues.
@@ -130,16 +151,54 @@ class DecryptionUtils:
 
         return decrypted_value
 
+    @staticmethod
+    def can_decrypt(config_value):
+        """Determine if any of the registered ConfigValueDecryptors can decrypt the given
+        ConfigValue, without decrypting it.
+
+        Parameters
+        ----------
+        config_value : ConfigValue
+            ConfigValue to determine if can be decrypted.
+
+        Returns
+        -------
+        bool
+            True if one of the registered ConfigValueDecryptors can decrypt the given ConfigValue.
+            False otherwise.
+        """
+        for config_value_decryptor in DecryptionUtils.__config_value_decryptors:
+            if config_value_decryptor.can_decrypt(config_value):
+                return True
+
+        return False
+
     @staticmethod
     def __add_obfuscation_targets(targets):
-        if targets is not None:
-            for obfuscator_stream in DecryptionUtils.__obfuscation_streams:
-                obfuscator_stream.add_obfuscation_targets(targets)
+        if targets is None:
+            return
+
+        if not isinstance(targets, list):
+            targets = [targets]
+
+        # the same value is decrypted every time it is used, only obfuscate it once
+        new_targets = []
+        for target in targets:
+            if target not in DecryptionUtils.__obfuscation_targets and target not in new_targets:
+                new_targets.append(target)
+        if not new_targets:
+            return
+
+        DecryptionUtils.__obfuscation_targets.extend(new_targets)
+        for obfuscator_stream in DecryptionUtils.__obfuscation_streams:
+            obfuscator_stream.add_obfuscation_targets(new_targets)
 
     @staticmethod
     def __get_decryption_class(decryptor_implementer_name):
         """Given a decryptor implementer name dynamically loads the associated Class.
 
+        Loaded classes are cached for the life of the process.
+
         Parameters
         ----------
         decryptor_implementer_name : str
@@ -158,6 +217,10 @@ class DecryptionUtils:
             If could not find class to load
             If loaded class is not a subclass of ConfigValueDecryptor
         """
+        clazz = DecryptionUtils.__decryptor_classes.get(decryptor_implementer_name)
+        if clazz is not None:
+            return clazz
+
         parts = decryptor_implementer_name.split('.')
         class_name = parts.pop()
         module_name = '.'.join(parts)
@@ -179,4 +242,5 @@ class DecryptionUtils:
                 f" ({ConfigValueDecryptor}) and should be."
             )
 
+        DecryptionUtils.__decryptor_classes[decryptor_implementer_name] = clazz
         return clazz
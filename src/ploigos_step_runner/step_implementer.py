@@ -1,16 +1,20 @@
 """Abstract class and helper constants for StepImplementer.
 """
 import os
-import pprint
 import sys
-import textwrap
 from abc import ABC, abstractmethod
-from contextlib import redirect_stderr, redirect_stdout
 from pathlib import Path
 
-from ploigos_step_runner.config.config_value import ConfigValue
+from ploigos_step_runner.decryption_utils import DecryptionUtils
 from ploigos_step_runner.step_result import StepResult
-from ploigos_step_runner.utils.io import TextIOIndenter
+from ploigos_step_runner.step_result_cache import StepResultCache
+from ploigos_step_runner.utils.commands import CommandTrace
+from ploigos_step_runner.utils.io import TextIOPipeline, indented_output
+from ploigos_step_runner.utils.metrics import PhaseMetrics
+from ploigos_step_runner.utils.printing import (print_config, print_data,
+                                                print_section_title)
+from ploigos_step_runner.utils.tracing import (STATUS_CODE_ERROR,
+                                               STATUS_CODE_OK, start_span)
 from ploigos_step_runner.workflow_result import WorkflowResult
 
 class DefaultSteps:  # pylint: disable=too-few-public-methods
@@ -35,6 +39,47 @@ class DefaultSteps:  # pylint: disable=too-few-public-methods
     CANARY_TEST = 'canary-test'
     PUBLISH_WORKFLOW_RESULTS = 'publish-workflow-results'
 
+    # the default steps, in an order that satisfies the dependencies between them
+    ALL = (
+        GENERATE_METADATA,
+        TAG_SOURCE,
+        STATIC_CODE_ANALYSIS,
+        PACKAGE,
+        UNIT_TEST,
+        PUSH_ARTIFACTS,
+        CREATE_CONTAINER_IMAGE,
+        PUSH_CONTAINER_IMAGE,
+        SIGN_CONTAINER_IMAGE,
+        CONTAINER_IMAGE_UNIT_TEST,
+        CONTAINER_IMAGE_STATIC_COMPLIANCE_SCAN,
+        CONTAINER_IMAGE_STATIC_VULNERABILITY_SCAN,
+        CREATE_DEPLOYMENT_ENVIRONMENT,
+        DEPLOY,
+        UAT,
+        RUNTIME_VULNERABILITY_SCAN,
+        CANARY_TEST,
+        PUBLISH_WORKFLOW_RESULTS
+    )
+
+class ConfigDumpVerbosity:  # pylint: disable=too-few-public-methods
+    """Constants for how much of the step configuration a StepImplementer prints before
+    running the step.
+
+    OFF
+        Do not print the configuration.
+    KEYS
+        Print only the configuration keys of each configuration source.
+    FULL
+        Print the configuration keys and values of each configuration source.
+        Encrypted values are printed as `ConfigValue.ENCRYPTED_DISPLAY_VALUE`
+        rather than being decrypted.
+    """
+    OFF = 'off'
+    KEYS = 'keys'
+    FULL = 'full'
+
+    ALL = (OFF, KEYS, FULL)
+
 
 class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
     # pylint: disable=too-many-public-methods
@@ -54,30 +99,64 @@ class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
         Configuration for this step.
     environment : str
         Environment name to execute this step against
+    config_dump_verbosity : str, optional
+        One of `ConfigDumpVerbosity.ALL`, how much of the step configuration to print
+        before running the step.
+    step_result_cache_dir_path : str, optional
+        Path to the directory to cache the results of running this step in, to reuse instead of
+        running the step again with the same inputs, if this StepImplementer supports it,
+        see `_step_result_cache_input_paths`. If not given, results are not cached.
 
     Attributes
     __config : SubStepConfig
     __environment : str
+    __config_dump_verbosity : str
+    __step_result_cache : StepResultCache or None
+    __output_pipelines : list of TextIOPipeline
+        Output pipelines created for this step, closed when the step finishes.
+    __workflow_result_pickle_file_version : tuple or None
+        Version of the workflow result pickle file when the workflow result was loaded from it,
+        see `WorkflowResult.get_pickle_file_version`.
+    __operation_metrics : PhaseMetrics
+        Metrics for operations within running the step, see `operation_metrics`.
+
+    Raises
+    ------
+    ValueError
+        If given config_dump_verbosity is not one of `ConfigDumpVerbosity.ALL`.
     """
 
-    __TITLE_LENGTH = 80
-
     def __init__(  # pylint: disable=too-many-arguments
         self,
         results_dir_path,
         results_file_name,
         work_dir_path,
         config,
-        environment=None
+        environment=None,
+        config_dump_verbosity=ConfigDumpVerbosity.FULL,
+        step_result_cache_dir_path=None
     ):
+        if config_dump_verbosity not in ConfigDumpVerbosity.ALL:
+            raise ValueError(
+                f"Config dump verbosity ({config_dump_verbosity}) must be one of:"
+                f" {', '.join(ConfigDumpVerbosity.ALL)}"
+            )
+
         self.__results_dir_path = results_dir_path
         self.__results_file_name = results_file_name
         self.__work_dir_path = work_dir_path
 
         self.__config = config
         self.__environment = environment
+        self.__config_dump_verbosity = config_dump_verbosity
+        self.__step_result_cache = None
+        if step_result_cache_dir_path:
+            self.__step_result_cache = StepResultCache(step_result_cache_dir_path)
 
         self.__workflow_result = None
+        self.__workflow_result_pickle_file_version = None
+        self.__output_pipelines = []
+        self.__operation_metrics = PhaseMetrics()
 
         super().__init__()
 
@@ -101,6 +180,17 @@ class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
         """
         return self.__environment
 
+    @property
+    def config_dump_verbosity(self):
+        """
+        Returns
+        -------
+        str
+            How much of the step configuration to print before running the step.
+            One of `ConfigDumpVerbosity.ALL`.
+        """
+        return self.__config_dump_verbosity
+
     @property
     def step_config(self):
         """
@@ -261,6 +351,8 @@ class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
             from previous steps.
         """
         if not self.__workflow_result:
+            self.__workflow_result_pickle_file_version = \
+                WorkflowResult.get_pickle_file_version(self.__workflow_result_pickle_file_path)
             self.__workflow_result = WorkflowResult.load_from_pickle_file(
                 pickle_filename=self.__workflow_result_pickle_file_path
             )
@@ -299,6 +391,72 @@ class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
             that are required before running the step.
         """
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results,
+        so that `StepRunner.preflight` can check that the required keys of later steps will be
+        given without running any steps.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str or None
+            Keys of the artifacts this StepImplementer adds to its step results or
+            None if this StepImplementer does not declare them.
+        """
+        return None
+
+    def _step_result_cache_input_paths(self):
+        """Getter for the files and directories whose contents, along with the runtime step
+        configuration and `_step_result_cache_result_keys` values, determine the result of
+        running this step.
+
+        Notes
+        -----
+        StepImplementers opt in to having the results of running them cached, to reuse instead
+        of running them again with the same inputs, by overriding this to not return None.
+        Only StepImplementers whose results are fully determined by those inputs should.
+
+        See Also
+        --------
+        StepResultCache
+
+        Returns
+        -------
+        list of str or None
+            Files and directories whose contents determine the result of running this step
+            or None if the results of running this step can not be cached.
+        """
+        return None
+
+    @staticmethod
+    def _step_result_cache_ignore_patterns():
+        """Getter for the glob patterns of the names of files and directories under
+        `_step_result_cache_input_paths` that do not determine the result of running this step,
+        such as build output directories.
+
+        Returns
+        -------
+        list of str
+            Glob patterns of the names of files and directories to not hash.
+        """
+        return []
+
+    def _step_result_cache_result_keys(self):
+        """Getter for the keys of the previous step result artifacts whose values, if not
+        configured, determine the result of running this step.
+
+        Returns
+        -------
+        list of str
+            Keys of the previous step result artifacts whose values determine the result of
+            running this step. Default: the required configuration or result keys.
+        """
+        return self._required_config_or_result_keys()
+
     @abstractmethod
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
@@ -329,109 +487,196 @@ class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
             'Missing required step configuration or previous step result artifact keys: ' + \
             f'{invalid_required_keys}'
 
+    def get_preflight_missing_keys(self, previous_step_result_artifact_keys):
+        """Statically determines which of the required step configuration or previous step
+        result artifact keys of this step will not be given, without running any steps,
+        reading any step results, or decrypting any configuration values.
+
+        Parameters
+        ----------
+        previous_step_result_artifact_keys : set of str
+            Keys of the artifacts declared by the StepImplementers that run before this one.
+
+        Returns
+        -------
+        list of str
+            Required keys that are neither configured nor declared by a previous StepImplementer.
+
+        See Also
+        --------
+        _validate_required_config_or_previous_step_result_artifact_keys
+        """
+        runtime_step_config = self.get_copy_of_runtime_step_config()
+        return [
+            required_key for required_key in self._required_config_or_result_keys()
+            if runtime_step_config.get(required_key) is None
+            and required_key not in previous_step_result_artifact_keys
+        ]
+
     def run_step(self):
         """Wrapper for running the implemented step.
 
+        Notes
+        -----
+        Records wall time, CPU time, child process CPU time, and peak RSS for each phase of
+        running the step as the metrics of the resulting StepResult.
+        The results file write phase can only be included in the printed results,
+        not in the results file or workflow result pickle file written during it.
+
+        Records every external command run while printing the configuration, validating,
+        and running the step in a Chrome trace event format file in the step working directory,
+        see `command_trace_file_path`.
+
+        Records a span for running the step, if tracing is enabled, see `utils.tracing`.
+
         Returns
         -------
         bool
             True on step run success.
             False on step run failure.
         """
+        with start_span(
+            f"{self.step_name} {self.sub_step_name}",
+            attributes={
+                'psr.step.name': self.step_name,
+                'psr.sub_step.name': self.sub_step_name,
+                'psr.sub_step.implementer': self.sub_step_implementer_name,
+                'psr.environment': self.environment
+            }
+        ) as span:
+            step_result = self.__run_step()
+
+            if span is not None:
+                span.set_attribute('psr.step.success', step_result.success)
+                if step_result.success:
+                    span.set_status(STATUS_CODE_OK)
+                else:
+                    span.set_status(STATUS_CODE_ERROR, step_result.message)
 
-        StepImplementer.__print_section_title(f"Step Start - {self.step_name}")
+        return step_result.success
 
-        # print information about the configuration
-        StepImplementer.__print_section_title(
-            f"Configuration - {self.step_name}",
-            div_char="-",
-            indent=1
-        )
-        StepImplementer.__print_data(
-            "Step Implementer Configuration Defaults",
-            ConfigValue.convert_leaves_to_values(self.step_implementer_config_defaults())
-        )
-        StepImplementer.__print_data(
-            "Global Configuration Defaults",
-            ConfigValue.convert_leaves_to_values(self.global_config_defaults)
-        )
-        StepImplementer.__print_data(
-            "Global Environment Configuration Defaults",
-            ConfigValue.convert_leaves_to_values(self.global_environment_config_defaults)
-        )
-        StepImplementer.__print_data(
-            "Step Configuration",
-            ConfigValue.convert_leaves_to_values(self.step_config)
-        )
-        StepImplementer.__print_data(
-            "Step Environment Configuration",
-            ConfigValue.convert_leaves_to_values(self.step_environment_config)
-        )
-        StepImplementer.__print_data(
-            "Step Configuration Runtime Overrides",
-            ConfigValue.convert_leaves_to_values(self.step_config_overrides)
-        )
+    def __run_step(self):
+        """Runs the implemented step, and records, writes, and prints the results.
 
-        # create the munged runtime step configuration and print
-        copy_of_runtime_step_config = self.get_copy_of_runtime_step_config()
-        StepImplementer.__print_data(
-            "Runtime Step Configuration",
-            ConfigValue.convert_leaves_to_values(copy_of_runtime_step_config)
-        )
+        Returns
+        -------
+        StepResult
+            Result of running the step.
+        """
+        print_section_title(f"Step Start - {self.step_name}")
 
-        step_result = None
-        try:
-            # validate the runtime step configuration
-            self._validate_required_config_or_previous_step_result_artifact_keys()
+        phase_metrics = PhaseMetrics()
+        self.__operation_metrics = PhaseMetrics()
+        command_trace = CommandTrace(metadata={
+            'step-name': self.step_name,
+            'sub-step-name': self.sub_step_name,
+            'environment': self.environment
+        })
 
-            # run the step
-            StepImplementer.__print_section_title(
-                f"Standard Out - {self.step_name}",
-                div_char="-",
-                indent=1
-            )
+        # load the results of any previous steps
+        with phase_metrics.measure('workflow-result-load'):
+            self.workflow_result # pylint: disable=pointless-statement
 
-            indented_stdout = TextIOIndenter(
-                parent_stream=sys.stdout,
-                indent_level=2
-            )
-            indented_stderr = TextIOIndenter(
-                parent_stream=sys.stderr,
-                indent_level=2
-            )
+        # print information about the configuration
+        with phase_metrics.measure('config-print'), command_trace:
+            self.__print_config()
 
-            with redirect_stdout(indented_stdout), redirect_stderr(indented_stderr):
-                step_result = self._run_step()
+        try:
+            # validate the runtime step configuration
+            with phase_metrics.measure('validate'), command_trace:
+                self._validate_required_config_or_previous_step_result_artifact_keys()
+
+            step_result = self.__run_step_or_reuse_cached_result(phase_metrics, command_trace)
         except AssertionError as invalid_error:
             step_result = StepResult.from_step_implementer(self)
             step_result.success = False
             step_result.message = str(invalid_error)
-
-        # save the step results
-        self.workflow_result.add_step_result(
-            step_result=step_result
-        )
-        self.workflow_result.write_to_pickle_file(
-            pickle_filename=self.__workflow_result_pickle_file_path
-        )
-        self.workflow_result.write_results_to_yml_file(
-            yml_filename=self.results_file_path
-        )
+        finally:
+            command_trace.close()
+
+        if command_trace.command_executions:
+            command_trace.write(self.command_trace_file_path)
+
+        step_result.metrics = phase_metrics.phases
+        self.__workflow_result, self.__workflow_result_pickle_file_version = \
+            WorkflowResult.add_step_result_to_files(
+                workflow_result=self.workflow_result,
+                workflow_result_version=self.__workflow_result_pickle_file_version,
+                step_result=step_result,
+                pickle_filename=self.__workflow_result_pickle_file_path,
+                yml_filename=self.results_file_path,
+                phase_metrics=phase_metrics
+            )
 
         # print the step run results
-        StepImplementer.__print_section_title(
-            f"Results - {self.step_name}",
-            div_char="-",
-            indent=1
-        )
+        print_section_title(f"Results - {self.step_name}", div_char="-", indent=1)
+        print_data('Results File Path', self.results_file_path)
+        print_data('Results', step_result.get_step_result_dict())
+        print_section_title(f'Step End - {self.step_name}')
 
-        StepImplementer.__print_data('Results File Path', self.results_file_path)
+        return step_result
 
-        StepImplementer.__print_data('Results', step_result.get_step_result_dict())
+    def __run_step_or_reuse_cached_result(self, phase_metrics, command_trace):
+        """Runs the implemented step, with its output indented, unless a cached result of
+        running it with the same inputs can be reused, and caches the result if it was run.
 
-        StepImplementer.__print_section_title(f'Step End - {self.step_name}')
+        Parameters
+        ----------
+        phase_metrics : PhaseMetrics
+            Metrics to measure the phases of running the step in.
+        command_trace : CommandTrace
+            Trace to record the external commands run by the step in.
 
-        return step_result.success
+        Returns
+        -------
+        StepResult
+            Result of running the step, or the reused cached result.
+        """
+        # get the key to reuse the cached result of running the step with the same inputs,
+        # if there is a cache directory, the StepImplementer supports it, and it is not disabled
+        step_result_cache_key = None
+        if self.__step_result_cache is not None \
+                and self.get_config_value('step-result-cache') is not False \
+                and self._step_result_cache_input_paths() is not None:
+            with phase_metrics.measure('step-result-cache-key'):
+                step_result_cache_key = self.__step_result_cache.get_step_key(
+                    step_implementer=self,
+                    result_keys=self._step_result_cache_result_keys(),
+                    input_paths=self._step_result_cache_input_paths(),
+                    ignore_patterns=self._step_result_cache_ignore_patterns()
+                )
+
+        print_section_title(f"Standard Out - {self.step_name}", div_char="-", indent=1)
+
+        step_result = None
+        with indented_output(indent_level=2):
+            try:
+                if step_result_cache_key is not None:
+                    with phase_metrics.measure('step-result-cache-load'):
+                        step_result = self.__step_result_cache.load(
+                            step_result_cache_key, work_dir_path=self.work_dir_path
+                        )
+
+                if step_result is not None:
+                    return step_result
+
+                try:
+                    with phase_metrics.measure('run-step'), command_trace:
+                        step_result = self._run_step()
+                finally:
+                    phase_metrics.add_phases(self.__operation_metrics.phases)
+            finally:
+                self.__close_output_pipelines()
+
+        # cache the result of running the step, once its output files are closed
+        if step_result_cache_key is not None and step_result.success:
+            with indented_output(indent_level=2), \
+                    phase_metrics.measure('step-result-cache-save'):
+                self.__step_result_cache.save(
+                    step_result_cache_key, step_result, work_dir_path=self.work_dir_path
+                )
+
+        return step_result
 
     def get_value(self, key):
         """Get the value for a given key, either from given configuration or from the result
@@ -612,6 +857,32 @@ class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
         pickle_filename = os.path.splitext(self.__results_file_name)[0] + '.pkl'
         return os.path.join(self.work_dir_path, pickle_filename)
 
+    @property
+    def operation_metrics(self):
+        """
+        Get the metrics for operations within running the step, ex: git operations,
+        that are added to the metrics of the step result once the step has been run.
+
+        Returns
+        -------
+        PhaseMetrics
+            Metrics for operations within running the step.
+        """
+        return self.__operation_metrics
+
+    @property
+    def command_trace_file_path(self):
+        """
+        Get the OS path to the file the external commands run by this step are traced to.
+        EG:  /tmp/tmpno_qi7np/step-runner-working/stepname/Maven.command-trace.json
+
+        Returns
+        -------
+        str
+            OS path to the command trace file for this sub step.
+        """
+        return os.path.join(self.work_dir_path_step, f'{self.sub_step_name}.command-trace.json')
+
     def create_working_dir_sub_dir(self, sub_dir_relative_path):
         """
         Create a folder under the working/stepname folder.
@@ -652,75 +923,75 @@ class StepImplementer(ABC):  # pylint: disable=too-many-instance-attributes
                 file.write(contents)
         return file_path
 
-    @staticmethod
-    def __print_section_title(title, div_char="=", indent=0):
-        """
-        Utility function for pretty printing section title.
-
-        Parameters
-        ----------
-        title : str
-            Section title to print
-        """
-        print()
-        print()
-        StepImplementer.__print_indented(
-            text=div_char * StepImplementer.__TITLE_LENGTH,
-            indent=indent
-        )
-        StepImplementer.__print_indented(
-            text=title.center(StepImplementer.__TITLE_LENGTH),
-            indent=indent
-        )
-        StepImplementer.__print_indented(
-            text=div_char * StepImplementer.__TITLE_LENGTH,
-            indent=indent
-        )
-
-    @staticmethod
-    def __print_data(title, data, indent=2):
-        """Utility function for pretty printing data.
+    def create_output_pipeline(self, file_path, append=False):
+        """Creates a TextIOPipeline that tees the standard out and standard error of a command
+        to the standard out and standard error of this step and to a log file, obfuscating
+        any decrypted values in both.
 
         Notes
         -----
-        Indent levels are each are 4 spaces wide.
+        The pipeline is closed when this step finishes if it has not already been closed,
+        but it should be closed, or used as a context manager, before reading the log file.
 
         Parameters
         ----------
-        title : str
-            Title of the data to print.
-        data
-            Data to print
-        indent : int
-            Amount to indent the title by and then the content by this +1
-        """
-        printer = pprint.PrettyPrinter()
-        StepImplementer.__print_indented(
-            text=title,
-            indent=indent
-        )
-        StepImplementer.__print_indented(
-            text=printer.pformat(data),
-            indent=indent + 1
+        file_path : str
+            Path to the log file to write the standard out and standard error of the command to.
+        append : bool, optional
+            True to append to the log file.
+            False to overwrite the log file.
+
+        Returns
+        -------
+        TextIOPipeline
+            Pipeline whose `out` and `err` branches can be given to `sh` as the `_out` and
+            `_err` of the command.
+
+        Examples
+        --------
+        >>> with self.create_output_pipeline(mvn_output_file_path) as output_pipeline:
+        ...     run_command(sh.mvn, 'clean', 'install',
+        ...         _out=output_pipeline.out, _err=output_pipeline.err)
+        """
+        output_pipeline = TextIOPipeline(
+            out_streams=[sys.stdout],
+            err_streams=[sys.stderr],
+            file_paths=[file_path],
+            append=append
         )
-        print()
+        DecryptionUtils.register_obfuscation_stream(output_pipeline)
+        self.__output_pipelines.append(output_pipeline)
 
-    @staticmethod
-    def __print_indented(text, indent=0):
-        """Prints the given text indented by a given indent level.
+        return output_pipeline
 
-        Notes
-        -----
-        Indent levels are each are 4 spaces wide.
+    def __close_output_pipelines(self):
+        """Closes the output pipelines created for this step and stops obfuscating new
+        decrypted values on them.
+        """
+        for output_pipeline in self.__output_pipelines:
+            output_pipeline.close()
+            DecryptionUtils.unregister_obfuscation_stream(output_pipeline)
+        self.__output_pipelines = []
 
-        Parameters
-        ----------
-        text : str
-            Text to print indented.
-        indent : indent
-            amount to indent the given text by before printing.
-        """
-        print(textwrap.indent(
-            text=text,
-            prefix=" " * (4 * indent)
-        ))
+    def __print_config(self):
+        """Prints the configuration of this step from each of its configuration sources,
+        to the level of detail of the config dump verbosity, see `utils.printing.print_config`.
+        """
+        if self.config_dump_verbosity == ConfigDumpVerbosity.OFF:
+            return
+
+        print_config(
+            f"Configuration - {self.step_name}",
+            [
+                ("Step Implementer Configuration Defaults",
+                    self.step_implementer_config_defaults()),
+                ("Global Configuration Defaults", self.global_config_defaults),
+                ("Global Environment Configuration Defaults",
+                    self.global_environment_config_defaults),
+                ("Step Configuration", self.step_config),
+                ("Step Environment Configuration", self.step_environment_config),
+                ("Step Configuration Runtime Overrides", self.step_config_overrides),
+                ("Runtime Step Configuration", self.get_copy_of_runtime_step_config())
+            ],
+            keys_only=self.config_dump_verbosity == ConfigDumpVerbosity.KEYS
+        )
@@ -1,5 +1,13 @@
 """`StepImplementers` for the `container-image-static-compliance-scan` step.
 """
 
-from ploigos_step_runner.step_implementers.container_image_static_compliance_scan.\
-    openscap import OpenSCAP
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.container_image_static_compliance_scan.openscap import OpenSCAP # pylint: disable=line-too-long
+
+install_lazy_attributes(globals(), {
+    'OpenSCAP': '.openscap'
+})
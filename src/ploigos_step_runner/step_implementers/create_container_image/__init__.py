@@ -1,4 +1,13 @@
 """`StepImplementers` for the `create-container-image` step.
 """
 
-from ploigos_step_runner.step_implementers.create_container_image.buildah import Buildah
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.create_container_image.buildah import Buildah
+
+install_lazy_attributes(globals(), {
+    'Buildah': '.buildah'
+})
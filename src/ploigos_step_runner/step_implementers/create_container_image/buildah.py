@@ -35,6 +35,7 @@ from pathlib import Path
 
 import sh
 from ploigos_step_runner import StepImplementer, StepResult
+from ploigos_step_runner.utils.commands import run_command
 from ploigos_step_runner.utils.containers import container_registries_login
 
 DEFAULT_CONFIG = {
@@ -100,6 +101,24 @@ class Buildah(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'container-image-version',
+            'image-tar-file'
+        ]
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -153,7 +172,8 @@ class Buildah(StepImplementer):
             # NOTE: using --storage-driver=vfs so that container does not need escalated privileges
             #       vfs is less efficient then fuse (which would require host mounts),
             #       but such is the price we pay for security.
-            sh.buildah.bud(  # pylint: disable=no-member
+            run_command(
+                sh.buildah.bud, # pylint: disable=no-member
                 '--storage-driver=vfs',
                 '--format=' + self.get_value('format'),
                 '--tls-verify=' + str(tls_verify).lower(),
@@ -188,7 +208,8 @@ class Buildah(StepImplementer):
             #       but such is the price we pay for security.
             if os.path.exists(image_tar_path):
                 os.remove(image_tar_path)
-            sh.buildah.push(  # pylint: disable=no-member
+            run_command(
+                sh.buildah.push, # pylint: disable=no-member
                 '--storage-driver=vfs',
                 tag,
                 "docker-archive:" + image_tar_path,
@@ -1,4 +1,13 @@
 """`StepImplementers` for the `deploy` step.
 """
 
-from ploigos_step_runner.step_implementers.deploy.argocd import ArgoCD
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.deploy.argocd import ArgoCD
+
+install_lazy_attributes(globals(), {
+    'ArgoCD': '.argocd'
+})
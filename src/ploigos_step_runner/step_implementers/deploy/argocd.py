@@ -1,6 +1,18 @@
 # pylint: disable=too-many-lines
 """`StepImplementer` for the `deploy` step using ArgoCD.
 
+The ArgoCD CLI session is persisted in the `argocd` directory of the working directory, per
+`argocd-api` and `argocd-username`, and reused by later deploys with the same `argocd-password`
+until its auth token expires. If ArgoCD rejects a reused auth token, ex: because it was revoked,
+the deploy signs into ArgoCD again once.
+The target cluster is only added to ArgoCD if it is not already registered.
+Rather than blocking on `argocd app wait`, the status of the ArgoCD Application is polled, with
+exponential backoff and jitter, through either the ArgoCD CLI or the ArgoCD API, until it is
+synced and healthy, and the time spent in each phase of the sync is reported.
+The manifest rendered by ArgoCD is cached in the `argocd-manifests` directory of the working
+directory, keyed by a hash of the Helm chart directory tree, values files and container image tag,
+and reused rather than rendered again when redeploying unchanged deployment configuration.
+
 Step Configuration
 ------------------
 Step configuration expected as input to this step.
@@ -25,6 +37,23 @@ Configuration Key         | Required? | Default  | Description
 `argocd-sync-timeout-seconds` \
                           | Yes       | 60       | Number of seconds to wait for argocd to \
                                                    sync updates
+`argocd-app-client`       | Yes       | cli      | How to sync and poll the status of the \
+                                                   ArgoCD Application. `cli` to use the ArgoCD \
+                                                   CLI. `api` to use the ArgoCD API directly, \
+                                                   with the auth token of the ArgoCD CLI \
+                                                   session, so no process is started per poll.
+`argocd-sync-poll-initial-seconds` \
+                          | Yes       | 1        | Number of seconds between the first polls \
+                                                   of the ArgoCD Application status in each \
+                                                   phase of the sync. Doubled after every poll.
+`argocd-sync-poll-max-seconds` \
+                          | Yes       | 10       | Maximum number of seconds between polls of \
+                                                   the ArgoCD Application status.
+`argocd-cache-manifests`  | Yes       | True     | `True` to reuse the manifest rendered for \
+                                                   a previous deploy of the same Helm chart \
+                                                   directory tree, values files and container \
+                                                   image tag rather than render it again. \
+                                                   `False` to always render the manifest.
 `deployment-config-repo`  | Yes       |          | The repo containing the helm chart definition
 `deployment-config-helm-chart-path` \
                           | Yes       | ./       | Directory containing the helm chart definition
@@ -101,19 +130,38 @@ Result Key                 | Description
 `deployed-host-urls`       | The host URLs deployed by ArgoCD (Ingress/Route resources)
 `config-repo-git-tag`      | The git tag applied to the configuration repo for deployment
 `argocd-deployed-manifest` | The generated yml file used for deployment.
+`argocd-app-sync-seconds`  | Seconds spent waiting for the ArgoCD Application sync operation
+`argocd-app-progressing-seconds` \
+                           | Seconds spent waiting for the ArgoCD Application to be healthy \
+                             once synced
+`argocd-app-healthy-seconds` \
+                           | Total seconds until the ArgoCD Application was synced and healthy
 """ # pylint: disable=line-too-long
+import hashlib
 import os
 import re
+import shutil
 import sys
 
 import sh
-import yaml
 from ploigos_step_runner import StepImplementer
 from ploigos_step_runner.exceptions import StepRunnerException
 from ploigos_step_runner.step_result import StepResult
+from ploigos_step_runner.utils.argocd import (ArgoCDAPIAppClient,
+                                              ArgoCDAppSyncWaiter,
+                                              ArgoCDCLIAppClient, ArgoCDSession)
+from ploigos_step_runner.utils.hashing import get_tree_fingerprint
+from ploigos_step_runner.utils.commands import run_command
+from ploigos_step_runner.utils.file import create_parent_dir, file_lock
+from ploigos_step_runner.utils.git import GitRepo
+from ploigos_step_runner.utils.yaml import yaml_safe_load_all
 
 DEFAULT_CONFIG = {
     'argocd-sync-timeout-seconds': 60,
+    'argocd-app-client': 'cli',
+    'argocd-sync-poll-initial-seconds': 1,
+    'argocd-sync-poll-max-seconds': 10,
+    'argocd-cache-manifests': True,
     'argocd-auto-sync': True,
     'argocd-skip-tls' : False,
     'deployment-config-helm-chart-path': './',
@@ -143,6 +191,8 @@ GIT_AUTHENTICATION_CONFIG = {
     'git-password': None
 }
 
+ARGOCD_APP_CLIENTS = ('cli', 'api')
+
 KUBE_LABEL_NOT_SAFE_CHARS_REGEX = r"[^a-zA-Z0-9\-_\.]"
 KUBE_LABEL_NOT_SAFE_BEGINING_END_CHARS_REGEX = r"^[^a-zA-Z0-9]*|[^a-zA-Z0-9]*$"
 KUBE_LABEL_MAX_LENGTH = 52
@@ -187,6 +237,29 @@ class ArgoCD(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'argocd-app-name',
+            'config-repo-git-tag',
+            'argocd-app-sync-seconds',
+            'argocd-app-progressing-seconds',
+            'argocd-app-healthy-seconds',
+            'argocd-deployed-manifest',
+            'deployed-host-urls'
+        ]
+
     def _validate_required_config_or_previous_step_result_artifact_keys(self):
         """Validates that the required configuration keys or previous step result artifacts
         are set and have valid values.
@@ -194,6 +267,7 @@ class ArgoCD(StepImplementer):
         Validates that:
         * required configuration is given
         * either both git-username and git-password are set or neither.
+        * argocd-app-client is a known ArgoCD Application client.
 
         Raises
         ------
@@ -224,6 +298,13 @@ class ArgoCD(StepImplementer):
                 f" http/https protical both 'git-username' and 'git-password' must be provided."
             )
 
+        argocd_app_client = self.get_value('argocd-app-client')
+        if argocd_app_client not in ARGOCD_APP_CLIENTS:
+            raise StepRunnerException(
+                f"Given 'argocd-app-client' ({argocd_app_client}) must be one of:"
+                f" {', '.join(ARGOCD_APP_CLIENTS)}"
+            )
+
     def _run_step(self):  # pylint: disable=too-many-locals
         """Runs the step implemented by this StepImplementer.
 
@@ -236,10 +317,9 @@ class ArgoCD(StepImplementer):
 
         # get input
         deployment_config_repo = self.get_value('deployment-config-repo')
-        deployment_config_repo_branch = ArgoCD.__get_repo_branch()
+        deployment_config_repo_branch = self.__get_repo_branch()
         deployment_config_helm_chart_path = self.get_value('deployment-config-helm-chart-path')
         deployment_config_destination_cluster_uri = self.get_value('kube-api-uri')
-        deployment_config_destination_cluster_token = self.get_value('kube-api-token')
         deployment_config_helm_chart_environment_values_file = \
             self.__get_deployment_config_helm_chart_environment_values_file()
         deployment_config_helm_chart_values_file_image_tag_yq_path = \
@@ -256,108 +336,111 @@ class ArgoCD(StepImplementer):
                 value=argocd_app_name
             )
 
-            # clone the configuration repository
-            print("Clone the configuration repository")
-            clone_repo_dir_name = 'deployment-config-repo'
-            deployment_config_repo_dir = ArgoCD.__clone_repo(
-                repo_dir=self.create_working_dir_sub_dir(clone_repo_dir_name),
-                repo_url=deployment_config_repo,
-                repo_branch=deployment_config_repo_branch,
-                user_email=self.get_value('git-email'),
-                user_name=self.get_value('git-name')
-            )
+            # NOTE: when deploying to multiple environments concurrently the clones of the
+            #       configuration repository are pushed to the same branch, so serialize
+            #       cloning through pushing to avoid rejected pushes
+            with self.__deployment_config_repo_lock(deployment_config_repo):
+                # clone the configuration repository
+                print("Clone the configuration repository")
+                clone_repo_dir_name = 'deployment-config-repo'
+                deployment_config_repo_dir = self.__clone_repo(
+                    repo_dir=self.create_working_dir_sub_dir(clone_repo_dir_name),
+                    repo_url=deployment_config_repo,
+                    repo_branch=deployment_config_repo_branch,
+                    user_email=self.get_value('git-email'),
+                    user_name=self.get_value('git-name')
+                )
 
-            # update values file, commit it, push it, and tag it
-            print("Update the environment values file")
-            deployment_config_helm_chart_environment_values_file_path = os.path.join(
-                deployment_config_repo_dir,
-                deployment_config_helm_chart_path,
-                deployment_config_helm_chart_environment_values_file
-            )
-            self.__update_yaml_file_value(
-                file=deployment_config_helm_chart_environment_values_file_path,
-                yq_path=deployment_config_helm_chart_values_file_image_tag_yq_path,
-                value=container_image_tag
-            )
-            print("Commit the updated environment values file")
-            ArgoCD.__git_commit_file(
-                git_commit_message=f'Updating values for deployment to {self.environment}',
-                file_path=os.path.join(
+                # update values file, commit it, push it, and tag it
+                print("Update the environment values file")
+                deployment_config_helm_chart_environment_values_file_path = os.path.join(
+                    deployment_config_repo_dir,
                     deployment_config_helm_chart_path,
                     deployment_config_helm_chart_environment_values_file
-                ),
-                repo_dir=deployment_config_repo_dir
-            )
-            print("Tag and push the updated environment values file")
-            deployment_config_repo_tag = self.__get_deployment_config_repo_tag()
-            self.__git_tag_and_push_deployment_config_repo(
-                deployment_config_repo=deployment_config_repo,
-                deployment_config_repo_dir=deployment_config_repo_dir,
-                deployment_config_repo_tag=deployment_config_repo_tag,
-                force_push_tags=force_push_tags
-            )
-            step_result.add_artifact(
-                name='config-repo-git-tag',
-                value=deployment_config_repo_tag
-            )
+                )
+                self.__update_yaml_file_value(
+                    file=deployment_config_helm_chart_environment_values_file_path,
+                    yq_path=deployment_config_helm_chart_values_file_image_tag_yq_path,
+                    value=container_image_tag
+                )
+                print("Commit the updated environment values file")
+                self.__git_commit_file(
+                    git_commit_message=f'Updating values for deployment to {self.environment}',
+                    file_path=os.path.join(
+                        deployment_config_helm_chart_path,
+                        deployment_config_helm_chart_environment_values_file
+                    ),
+                    repo_dir=deployment_config_repo_dir
+                )
+                print("Tag and push the updated environment values file")
+                deployment_config_repo_tag = self.__get_deployment_config_repo_tag()
+                self.__git_tag_and_push_deployment_config_repo(
+                    deployment_config_repo=deployment_config_repo,
+                    deployment_config_repo_dir=deployment_config_repo_dir,
+                    deployment_config_repo_tag=deployment_config_repo_tag,
+                    force_push_tags=force_push_tags
+                )
+                step_result.add_artifact(
+                    name='config-repo-git-tag',
+                    value=deployment_config_repo_tag
+                )
 
-            # create/update argocd app and sync it
+                argocd_app_manifest_cache_key = None
+                if self.get_value('argocd-cache-manifests'):
+                    argocd_app_manifest_cache_key = self.__get_argocd_app_manifest_cache_key(
+                        argocd_app_name=argocd_app_name,
+                        helm_chart_dir=os.path.join(
+                            deployment_config_repo_dir,
+                            deployment_config_helm_chart_path
+                        ),
+                        values_files=deployment_config_helm_chart_additional_value_files + [
+                            deployment_config_helm_chart_environment_values_file
+                        ],
+                        container_image_tag=container_image_tag,
+                        dest_server=deployment_config_destination_cluster_uri
+                    )
+
+            # create/update argocd app, sync it, and get its synced manifest
+            argocd_values_files = []
+            argocd_values_files += deployment_config_helm_chart_additional_value_files
+            argocd_values_files += [deployment_config_helm_chart_environment_values_file]
             print("Sign into ArgoCD")
-            ArgoCD.__argocd_sign_in(
+            argocd_session = self.__argocd_sign_in(
                 argocd_api=self.get_value('argocd-api'),
                 username=self.get_value('argocd-username'),
                 password=self.get_value('argocd-password'),
                 insecure=self.get_value('argocd-skip-tls')
             )
-            print("Add target cluster to ArgoCD")
-            self.__argocd_add_target_cluster(
-                kube_api=deployment_config_destination_cluster_uri,
-                kube_api_token=deployment_config_destination_cluster_token,
-                kube_api_skip_tls=self.get_value('kube-api-skip-tls')
-            )
-            print(f"Create or update ArgoCD Application ({argocd_app_name})")
-            argocd_values_files = []
-            argocd_values_files += deployment_config_helm_chart_additional_value_files
-            argocd_values_files += [deployment_config_helm_chart_environment_values_file]
-            ArgoCD.__argocd_app_create_or_update(
-                argocd_app_name=argocd_app_name,
-                repo=deployment_config_repo,
-                revision=deployment_config_repo_branch,
-                path=deployment_config_helm_chart_path,
-                dest_server=deployment_config_destination_cluster_uri,
-                auto_sync=self.get_value('argocd-auto-sync'),
-                values_files=argocd_values_files
-            )
-
-            # sync and wait for the sync of the ArgoCD app
-            print(f"Sync (and wait for) ArgoCD Application ({argocd_app_name})")
-            ArgoCD.__argocd_app_sync(
-                argocd_app_name=argocd_app_name,
-                argocd_sync_timeout_seconds=self.get_value('argocd-sync-timeout-seconds')
-            )
-
-            # get the ArgoCD app manifest that was synced
-            print(f"Get ArgoCD Application ({argocd_app_name}) synced manifest")
-            arogcd_app_manifest_file = self.__argocd_get_app_manifest(
-                argocd_app_name=argocd_app_name
-            )
-            step_result.add_artifact(
-                name='argocd-deployed-manifest',
-                value=arogcd_app_manifest_file
-            )
-
-            # determine the deployed host URLs
-            print(
-                "Determine the deployed host URLs for the synced"
-                f" ArgoCD Application (({argocd_app_name})"
-            )
-            deployed_host_urls = ArgoCD.__get_deployed_host_urls(
-                manifest_path=arogcd_app_manifest_file
-            )
-            step_result.add_artifact(
-                name='deployed-host-urls',
-                value=deployed_host_urls
-            )
+            try:
+                self.__argocd_deploy(
+                    step_result=step_result,
+                    argocd_session=argocd_session,
+                    argocd_app_name=argocd_app_name,
+                    deployment_config_repo_branch=deployment_config_repo_branch,
+                    argocd_values_files=argocd_values_files,
+                    argocd_app_manifest_cache_key=argocd_app_manifest_cache_key
+                )
+            except StepRunnerException as error:
+                # a reused auth token can be revoked before it expires
+                if not ArgoCDSession.is_auth_error(error):
+                    raise
+
+                print("ArgoCD rejected the ArgoCD session, sign into ArgoCD again")
+                argocd_session = self.__argocd_sign_in(
+                    argocd_api=self.get_value('argocd-api'),
+                    username=self.get_value('argocd-username'),
+                    password=self.get_value('argocd-password'),
+                    insecure=self.get_value('argocd-skip-tls'),
+                    force=True
+                )
+                self.__argocd_deploy(
+                    step_result=step_result,
+                    argocd_session=argocd_session,
+                    argocd_app_name=argocd_app_name,
+                    deployment_config_repo_branch=deployment_config_repo_branch,
+                    argocd_values_files=argocd_values_files,
+                    argocd_app_manifest_cache_key=argocd_app_manifest_cache_key
+                )
         except StepRunnerException as error:
             step_result.success = False
             step_result.message = f"Error deploying to environment ({self.environment}):" \
@@ -365,6 +448,119 @@ class ArgoCD(StepImplementer):
 
         return step_result
 
+    def __argocd_deploy( # pylint: disable=too-many-arguments
+        self,
+        step_result,
+        argocd_session,
+        argocd_app_name,
+        deployment_config_repo_branch,
+        argocd_values_files,
+        argocd_app_manifest_cache_key
+    ):
+        """Creates or updates the ArgoCD Application, syncs it, and gets its synced manifest
+        and deployed host URLs, adding them as artifacts to the given step result.
+
+        Parameters
+        ----------
+        step_result : StepResult
+            Step result to add the artifacts to.
+        argocd_session : ArgoCDSession
+            Signed in ArgoCD CLI session.
+        argocd_app_name : str
+            Name of the ArgoCD Application.
+        deployment_config_repo_branch : str
+            Branch of the deployment configuration repository to deploy from.
+        argocd_values_files : list of str
+            Helm values files, relative to the Helm chart, to deploy with.
+        argocd_app_manifest_cache_key : str or None
+            Key to cache the synced manifest with or None to not cache it.
+
+        Raises
+        ------
+        StepRunnerException
+            If error deploying with ArgoCD.
+        """
+        deployment_config_destination_cluster_uri = self.get_value('kube-api-uri')
+        print("Add target cluster to ArgoCD")
+        self.__argocd_add_target_cluster(
+            kube_api=deployment_config_destination_cluster_uri,
+            kube_api_token=self.get_value('kube-api-token'),
+            kube_api_skip_tls=self.get_value('kube-api-skip-tls'),
+            argocd_session=argocd_session
+        )
+        print(f"Create or update ArgoCD Application ({argocd_app_name})")
+        ArgoCD.__argocd_app_create_or_update(
+            argocd_app_name=argocd_app_name,
+            repo=self.get_value('deployment-config-repo'),
+            revision=deployment_config_repo_branch,
+            path=self.get_value('deployment-config-helm-chart-path'),
+            dest_server=deployment_config_destination_cluster_uri,
+            auto_sync=self.get_value('argocd-auto-sync'),
+            values_files=argocd_values_files,
+            argocd_session=argocd_session
+        )
+
+        # sync and wait for the sync of the ArgoCD app
+        print(f"Sync (and wait for) ArgoCD Application ({argocd_app_name})")
+        argocd_app_sync_phase_seconds = ArgoCD.__argocd_app_sync(
+            argocd_app_name=argocd_app_name,
+            argocd_sync_timeout_seconds=self.get_value('argocd-sync-timeout-seconds'),
+            argocd_app_client=self.__create_argocd_app_client(argocd_session),
+            poll_initial_seconds=self.get_value('argocd-sync-poll-initial-seconds'),
+            poll_max_seconds=self.get_value('argocd-sync-poll-max-seconds')
+        )
+        for phase, seconds in argocd_app_sync_phase_seconds.items():
+            step_result.add_artifact(
+                name=f'argocd-app-{phase}-seconds',
+                value=seconds
+            )
+
+        # get the ArgoCD app manifest that was synced
+        print(f"Get ArgoCD Application ({argocd_app_name}) synced manifest")
+        arogcd_app_manifest_file = self.__argocd_get_app_manifest(
+            argocd_app_name=argocd_app_name,
+            argocd_session=argocd_session,
+            cache_key=argocd_app_manifest_cache_key
+        )
+        step_result.add_artifact(
+            name='argocd-deployed-manifest',
+            value=arogcd_app_manifest_file
+        )
+
+        # determine the deployed host URLs
+        print(
+            "Determine the deployed host URLs for the synced"
+            f" ArgoCD Application (({argocd_app_name})"
+        )
+        deployed_host_urls = ArgoCD.__get_deployed_host_urls(
+            manifest_path=arogcd_app_manifest_file
+        )
+        step_result.add_artifact(
+            name='deployed-host-urls',
+            value=deployed_host_urls
+        )
+
+    def __deployment_config_repo_lock(self, deployment_config_repo):
+        """Gets a lock on the given deployment configuration repository, shared by all
+        environments deployed to with the same working directory.
+
+        Parameters
+        ----------
+        deployment_config_repo : str
+            URL of the deployment configuration repository.
+
+        Returns
+        -------
+        contextmanager
+            Context manager holding the lock for the code run within it.
+        """
+        repo_hash = hashlib.sha256(deployment_config_repo.encode('utf-8')).hexdigest()
+        return file_lock(os.path.join(
+            self.work_dir_path,
+            'locks',
+            f'deployment-config-repo-{repo_hash[:16]}.lock'
+        ))
+
     def __get_container_image_version(self):
         image_version = self.get_value('container-image-version')
         if image_version is None:
@@ -428,7 +624,8 @@ class ArgoCD(StepImplementer):
 
         # inplace update the file
         try:
-            sh.yq.write( # pylint: disable=no-member
+            run_command(
+                sh.yq.write, # pylint: disable=no-member
                 file,
                 f'--script={yq_script_file}',
                 '--inplace'
@@ -464,21 +661,21 @@ class ArgoCD(StepImplementer):
             deployment_config_repo_with_user_pass = \
                 f"{deployment_config_repo_protocol}{username}:{password}" \
                 f"@{deployment_config_repo_address}"
-            ArgoCD.__git_tag_and_push(
+            self.__git_tag_and_push(
                 repo_dir=deployment_config_repo_dir,
                 tag=deployment_config_repo_tag,
                 url=deployment_config_repo_with_user_pass,
                 force_push_tags=force_push_tags
             )
         else:
-            ArgoCD.__git_tag_and_push(
+            self.__git_tag_and_push(
                 repo_dir=deployment_config_repo_dir,
                 tag=deployment_config_repo_tag,
                 force_push_tags=force_push_tags
             )
 
     def __get_app_name(self):
-        repo_branch = ArgoCD.__get_repo_branch()
+        repo_branch = self.__get_repo_branch()
         organization = self.get_value('organization')
         application = self.get_value('application-name')
         service = self.get_value('service-name')
@@ -563,7 +760,7 @@ class ArgoCD(StepImplementer):
         manifest_resources = {}
         # load the manifest
         with open(manifest_path) as file:
-            manifest_resources = yaml.load_all(file, Loader=yaml.FullLoader)
+            manifest_resources = yaml_safe_load_all(file)
 
             # for each resource in the manfest,
             # determine if its a known type and then attempt to get host and TLS config from it
@@ -625,8 +822,8 @@ class ArgoCD(StepImplementer):
 
         return host_urls
 
-    @staticmethod
     def __clone_repo(
+        self,
         repo_dir,
         repo_url,
         repo_branch,
@@ -657,14 +854,18 @@ class ArgoCD(StepImplementer):
         StepRunnerException
         * if error cloning repository
         * if error checking out branch of repository
-        * if error configuring repo user
         """
+        # NOTE: the repo user is configured as part of cloning rather than with separate
+        #       git config commands
         try:
-            sh.git.clone( # pylint: disable=no-member
-                repo_url,
-                repo_dir,
-                _out=sys.stdout,
-                _err=sys.stderr
+            git_repo = GitRepo.clone(
+                repo_url=repo_url,
+                repo_dir=repo_dir,
+                config={
+                    'user.email': user_email,
+                    'user.name': user_name
+                },
+                phase_metrics=self.operation_metrics
             )
         except sh.ErrorReturnCode as error:
             raise StepRunnerException(
@@ -672,23 +873,7 @@ class ArgoCD(StepImplementer):
             ) from error
 
         try:
-            # no atomic way in git to checkout out new or existing branch,
-            # so first try to check out existing, if that doesn't work try new
-            try:
-                sh.git.checkout(  # pylint: disable=no-member
-                    repo_branch,
-                    _cwd=repo_dir,
-                    _out=sys.stdout,
-                    _err=sys.stderr
-                )
-            except sh.ErrorReturnCode:
-                sh.git.checkout(
-                    '-b',
-                    repo_branch,
-                    _cwd=repo_dir,
-                    _out=sys.stdout,
-                    _err=sys.stderr
-                )
+            git_repo.checkout_branch(repo_branch)
         except sh.ErrorReturnCode as error:
             # NOTE: this should never happen
             raise StepRunnerException(
@@ -696,39 +881,11 @@ class ArgoCD(StepImplementer):
                 f" from repository ({repo_url}): {error}"
             ) from error
 
-        try:
-            sh.git.config( # pylint: disable=no-member
-                'user.email',
-                user_email,
-                _cwd=repo_dir,
-                _out=sys.stdout,
-                _err=sys.stderr
-            )
-            sh.git.config( # pylint: disable=no-member
-                'user.name',
-                user_name,
-                _cwd=repo_dir,
-                _out=sys.stdout,
-                _err=sys.stderr
-            )
-        except sh.ErrorReturnCode as error:
-            # NOTE: this should never happen
-            raise StepRunnerException(
-                f"Unexpected error configuring git user.email ({user_email})"
-                f" and user.name ({user_name}) for repository ({repo_url})"
-                f" in directory ({repo_dir}): {error}"
-            ) from error
-
         return repo_dir
 
-    @staticmethod
-    def __get_repo_branch():
+    def __get_repo_branch(self):
         try:
-            return sh.git( # pylint: disable=no-member,too-many-function-args
-                'rev-parse',
-                '--abbrev-ref',
-                'HEAD'
-            ).rstrip()
+            return GitRepo(phase_metrics=self.operation_metrics).get_branch()
         except sh.ErrorReturnCode as error:
             # NOTE: this should never happen
             raise StepRunnerException(
@@ -736,30 +893,16 @@ class ArgoCD(StepImplementer):
                 f" of the working directory: {error}"
             ) from error
 
-    @staticmethod
-    def __git_tag_and_push(repo_dir, tag, url=None, force_push_tags=False):
-        """
+    def __git_tag_and_push(self, repo_dir, tag, url=None, force_push_tags=False):
+        """Tags the checked out commit and pushes it, and the tag, with one git push.
+
         Raises
         ------
         StepRunnerException
-        * if error pushing commits
         * if error tagging repository
-        * if error pushing tags
+        * if error pushing commits and tag
         """
-
-        git_push = sh.git.push.bake(url) if url else sh.git.push
-
-        # push commits
-        try:
-            git_push(
-                _cwd=repo_dir,
-                _out=sys.stdout
-            )
-        except sh.ErrorReturnCode as error:
-            raise StepRunnerException(
-                f"Error pushing commits from repository directory ({repo_dir}) to"
-                f" repository ({url}): {error}"
-            ) from error
+        git_repo = GitRepo(repo_dir=repo_dir, phase_metrics=self.operation_metrics)
 
         # tag
         try:
@@ -769,45 +912,28 @@ class ArgoCD(StepImplementer):
             # making this an acceptable work around to the issue since on the off chance
             # actually overwriting a tag with a different comment, the push will fail
             # because the tag will be attached to a different git hash.
-            sh.git.tag(  # pylint: disable=no-member
-                tag,
-                '-f',
-                _cwd=repo_dir,
-                _out=sys.stdout,
-                _err=sys.stderr
-            )
+            git_repo.tag([tag], force=True)
         except sh.ErrorReturnCode as error:
             raise StepRunnerException(
                 f"Error tagging repository ({repo_dir}) with tag ({tag}): {error}"
             ) from error
 
-        git_push_additional_arguments = []
-        if force_push_tags:
-            git_push_additional_arguments += ["--force"]
-
-        # push tag
+        # push commits and tag
+        # NOTE: only the tag is forced when force pushing tags, never the commits
+        tag_refspec = f"{'+' if force_push_tags else ''}refs/tags/{tag}"
         try:
-            git_push(
-                '--tag',
-                *git_push_additional_arguments,
-                _cwd=repo_dir,
-                _out=sys.stdout
-            )
+            git_repo.push(remote=url, refspecs=['HEAD', tag_refspec])
         except sh.ErrorReturnCode as error:
             raise StepRunnerException(
-                f"Error pushing tags from repository directory ({repo_dir}) to"
+                f"Error pushing commits and tag ({tag}) from repository directory ({repo_dir}) to"
                 f" repository ({url}): {error}"
             ) from error
 
-    @staticmethod
-    def __git_commit_file(git_commit_message, file_path, repo_dir):
+    def __git_commit_file(self, git_commit_message, file_path, repo_dir):
+        git_repo = GitRepo(repo_dir=repo_dir, phase_metrics=self.operation_metrics)
+
         try:
-            sh.git.add( # pylint: disable=no-member
-                file_path,
-                _cwd=repo_dir,
-                _out=sys.stdout,
-                _err=sys.stderr
-            )
+            git_repo.add(file_path)
         except sh.ErrorReturnCode as error:
             # NOTE: this should never happen
             raise StepRunnerException(
@@ -816,14 +942,7 @@ class ArgoCD(StepImplementer):
             ) from error
 
         try:
-            sh.git.commit( # pylint: disable=no-member
-                '--allow-empty',
-                '--all',
-                '--message', git_commit_message,
-                _cwd=repo_dir,
-                _out=sys.stdout,
-                _err=sys.stderr
-            )
+            git_repo.commit(git_commit_message, all_changes=True, allow_empty=True)
         except sh.ErrorReturnCode as error:
             # NOTE: this should never happen
             raise StepRunnerException(
@@ -831,43 +950,70 @@ class ArgoCD(StepImplementer):
                 f" in git repository ({repo_dir}): {error}"
             ) from error
 
-    @staticmethod
-    def __argocd_sign_in(
+    def __argocd_sign_in( # pylint: disable=too-many-arguments
+        self,
         argocd_api,
         username,
         password,
-        insecure=False
+        insecure=False,
+        force=False
     ):
-        """Signs into ArgoCD CLI.
+        """Signs into ArgoCD CLI, reusing the session persisted in the working directory for
+        the given ArgoCD API and user if it was signed into with the given password and its
+        auth token has not expired, unless forced to sign in again.
+
+        Returns
+        -------
+        ArgoCDSession
+            Signed in ArgoCD CLI session.
 
         Raises
         ------
         StepRunnerException
             If error signing into ArgoCD CLI.
         """
+        argocd_session = ArgoCDSession(
+            sessions_dir=os.path.join(self.work_dir_path, 'argocd'),
+            argocd_api=argocd_api,
+            username=username,
+            insecure=insecure
+        )
         try:
-            insecure_flag = None
-            if insecure:
-                insecure_flag = '--insecure'
-
-            sh.argocd.login(  # pylint: disable=no-member
-                argocd_api,
-                f'--username={username}',
-                f'--password={password}',
-                insecure_flag,
-                _out=sys.stdout,
-                _err=sys.stderr
-            )
+            argocd_session.sign_in(password=password, force=force)
         except sh.ErrorReturnCode as error:
             raise StepRunnerException(f"Error logging in to ArgoCD: {error}") from error
 
+        return argocd_session
+
+    @staticmethod
+    def __get_argocd_config_args(argocd_session):
+        """Gets the arguments to run `argocd` commands in the given session with.
+
+        Parameters
+        ----------
+        argocd_session : ArgoCDSession or None
+            ArgoCD CLI session to run commands in or
+            None to run commands in the default ArgoCD CLI session.
+
+        Returns
+        -------
+        list of str
+            Arguments to run `argocd` commands in the given session with.
+        """
+        if argocd_session is None:
+            return []
+
+        return argocd_session.config_args
+
     def __argocd_add_target_cluster(
         self,
         kube_api,
         kube_api_token=None,
-        kube_api_skip_tls=False
+        kube_api_skip_tls=False,
+        argocd_session=None
     ):
-        """If the target cluster is not the default cluster then add that cluster to ArgoCD.
+        """If the target cluster is not the default cluster, and is not already registered with
+        ArgoCD in the given session, then add that cluster to ArgoCD.
 
         **WARNING:*** have not re-integration tested this since refactor. Have a feeling that
         it does not work as expected. I have a feeling there is issues with the context names.
@@ -880,6 +1026,10 @@ class ArgoCD(StepImplementer):
         # If the cluster is an external cluster and an api token was provided,
         # add the cluster to ArgoCD
         if kube_api != DEFAULT_CONFIG['kube-api-uri']:
+            if argocd_session is not None and argocd_session.is_cluster_registered(kube_api):
+                print(f"Cluster ({kube_api}) already registered with ArgoCD")
+                return
+
             context_name = f'{kube_api}-context'
             kubeconfig = f"""---
 apiVersion: v1
@@ -907,7 +1057,9 @@ users:
                 contents=bytes(kubeconfig, 'utf-8')
             )
             try:
-                sh.argocd.cluster.add(  # pylint: disable=no-member
+                run_command(
+                    sh.argocd.cluster.add, # pylint: disable=no-member
+                    *ArgoCD.__get_argocd_config_args(argocd_session),
                     '--kubeconfig', config_argocd_cluster_context_file,
                     context_name,
                     _out=sys.stdout,
@@ -926,7 +1078,8 @@ users:
         path,
         dest_server,
         auto_sync,
-        values_files
+        values_files,
+        argocd_session=None
     ):
         """Creates or updates an ArtoCD App.
 
@@ -947,7 +1100,9 @@ users:
                 for value_file in values_files:
                     values_params += [f'--values={value_file}']
 
-            sh.argocd.app.create(  # pylint: disable=no-member
+            run_command(
+                sh.argocd.app.create, # pylint: disable=no-member
+                *ArgoCD.__get_argocd_config_args(argocd_session),
                 argocd_app_name,
                 f'--repo={repo}',
                 f'--revision={revision}',
@@ -965,43 +1120,140 @@ users:
                 f"Error creating or updating ArgoCD app ({argocd_app_name}): {error}"
             ) from error
 
+    def __create_argocd_app_client(self, argocd_session=None):
+        """Creates the client to sync and poll the status of ArgoCD Applications with,
+        as configured by `argocd-app-client`.
+
+        Parameters
+        ----------
+        argocd_session : ArgoCDSession, optional
+            ArgoCD CLI session to run commands in, or to get the auth token for the
+            ArgoCD API from.
+
+        Returns
+        -------
+        ArgoCDAppClient
+            Client to sync and poll the status of ArgoCD Applications with.
+
+        Raises
+        ------
+        StepRunnerException
+            If using the ArgoCD API and there is no auth token for it.
+        """
+        if self.get_value('argocd-app-client') != 'api':
+            return ArgoCDCLIAppClient(
+                config_args=ArgoCD.__get_argocd_config_args(argocd_session)
+            )
+
+        auth_token = None
+        if argocd_session is not None:
+            auth_token = argocd_session.get_auth_token()
+        if auth_token is None:
+            raise StepRunnerException(
+                "Error creating ArgoCD API client: no ArgoCD auth token"
+            )
+
+        return ArgoCDAPIAppClient(
+            argocd_api=argocd_session.argocd_api,
+            auth_token=auth_token,
+            insecure=argocd_session.insecure
+        )
+
     @staticmethod
-    def __argocd_app_sync(
+    def __argocd_app_sync( # pylint: disable=too-many-arguments
         argocd_app_name,
-        argocd_sync_timeout_seconds
+        argocd_sync_timeout_seconds,
+        argocd_app_client,
+        poll_initial_seconds=1,
+        poll_max_seconds=10
     ):
+        """Syncs an ArgoCD Application and polls its status until it is synced and healthy.
+
+        Returns
+        -------
+        dict
+            Number of seconds spent in each phase of the sync, by phase.
+
+        Raises
+        ------
+        StepRunnerException
+            If error syncing the ArgoCD Application or waiting for it to be healthy.
+        """
         try:
-            sh.argocd.app.sync(  # pylint: disable=no-member
-                '--prune',
-                '--timeout', argocd_sync_timeout_seconds,
-                argocd_app_name,
-                _out=sys.stdout,
-                _err=sys.stderr
-            )
-        except sh.ErrorReturnCode as error:
+            argocd_app_client.sync(argocd_app_name)
+        except (sh.ErrorReturnCode, RuntimeError) as error:
             raise StepRunnerException(
                 f"Error synchronization ArgoCD Application ({argocd_app_name}): {error}"
             ) from error
 
         try:
-            sh.argocd.app.wait(  # pylint: disable=no-member
-                '--timeout', argocd_sync_timeout_seconds,
-                '--health',
-                argocd_app_name,
-                _out=sys.stdout,
-                _err=sys.stderr
+            return ArgoCDAppSyncWaiter(
+                app_client=argocd_app_client,
+                poll_initial_seconds=float(poll_initial_seconds),
+                poll_max_seconds=float(poll_max_seconds)
+            ).wait(
+                app_name=argocd_app_name,
+                timeout_seconds=float(argocd_sync_timeout_seconds)
             )
-        except sh.ErrorReturnCode as error:
+        except (sh.ErrorReturnCode, RuntimeError, TimeoutError, ValueError) as error:
             raise StepRunnerException(
                 f"Error waiting for ArgoCD Application ({argocd_app_name}) synchronization: {error}"
             ) from error
 
+    def __get_argocd_app_manifest_cache_key( # pylint: disable=too-many-arguments
+        self,
+        argocd_app_name,
+        helm_chart_dir,
+        values_files,
+        container_image_tag,
+        dest_server
+    ):
+        """Gets the key to cache the manifest rendered by ArgoCD for an ArgoCD Application with,
+        which changes if anything the manifest is rendered from changes.
+
+        Parameters
+        ----------
+        argocd_app_name : str
+            Name of the ArgoCD Application the manifest is rendered for.
+        helm_chart_dir : str
+            Path to the Helm chart directory the manifest is rendered from,
+            including its values files.
+        values_files : list of str
+            Values files, relative to the Helm chart directory, in the order they are given to
+            Helm.
+        container_image_tag : str
+            Tag of the container image being deployed.
+        dest_server : str
+            Cluster the ArgoCD Application is deployed to.
+
+        Returns
+        -------
+        str
+            Hex SHA-256 digest of everything the manifest is rendered from.
+        """
+        hasher = hashlib.sha256()
+        for value in [
+            self.get_value('argocd-api'),
+            argocd_app_name,
+            dest_server,
+            container_image_tag
+        ] + values_files:
+            hasher.update(f'{value}\0'.encode('utf-8'))
+        # ArgoCD renders the chart from the repository, so files ignored by git do not matter
+        if os.path.isdir(helm_chart_dir):
+            hasher.update(get_tree_fingerprint(helm_chart_dir).encode('utf-8'))
+
+        return hasher.hexdigest()
+
     def __argocd_get_app_manifest(
         self,
         argocd_app_name,
-        source='live'
+        source='live',
+        argocd_session=None,
+        cache_key=None
     ):
-        """Get ArgoCD Application manifest.
+        """Get ArgoCD Application manifest, reusing the manifest cached with the given key,
+        if any, rather than rendering it again.
 
         Parameters
         ----------
@@ -1009,6 +1261,11 @@ users:
             Name of the ArgoCD Application to get the manifest for.
         source : str (live,git)
             Get the manifest from the 'live' version of the 'git' version.
+        argocd_session : ArgoCDSession, optional
+            ArgoCD CLI session to get the manifest in.
+        cache_key : str, optional
+            Key to cache the manifest with, see `__get_argocd_app_manifest_cache_key`,
+            or None to not cache the manifest.
 
         Returns
         -------
@@ -1021,8 +1278,26 @@ users:
             If error getting ArogCD manifest.
         """
         arogcd_app_manifest_file = self.write_working_file('deploy_argocd_manifests.yml')
+
+        cached_manifest_file = None
+        if cache_key is not None:
+            cached_manifest_file = os.path.join(
+                self.work_dir_path,
+                'argocd-manifests',
+                f'{cache_key}-{source}.yml'
+            )
+            if os.path.isfile(cached_manifest_file):
+                print(
+                    f"Reusing cached ArgoCD Application ({argocd_app_name}) manifest"
+                    " rendered from unchanged deployment configuration"
+                )
+                shutil.copyfile(cached_manifest_file, arogcd_app_manifest_file)
+                return arogcd_app_manifest_file
+
         try:
-            sh.argocd.app.manifests(  # pylint: disable=no-member
+            run_command(
+                sh.argocd.app.manifests, # pylint: disable=no-member
+                *ArgoCD.__get_argocd_config_args(argocd_session),
                 f'--source={source}',
                 argocd_app_name,
                 _out=arogcd_app_manifest_file,
@@ -1033,4 +1308,11 @@ users:
                 f"Error reading ArgoCD Application ({argocd_app_name}) manifest: {error}"
             ) from error
 
+        if cached_manifest_file is not None:
+            # write to a temporary file and rename it so a partial manifest is never reused
+            create_parent_dir(cached_manifest_file)
+            cached_manifest_tmp_file = f'{cached_manifest_file}.{os.getpid()}.tmp'
+            shutil.copyfile(arogcd_app_manifest_file, cached_manifest_tmp_file)
+            os.replace(cached_manifest_tmp_file, cached_manifest_file)
+
         return arogcd_app_manifest_file
@@ -1,7 +1,21 @@
 """`StepImplementers` for the `generate-metadata` step.
 """
 
-from ploigos_step_runner.step_implementers.generate_metadata.git import Git
-from ploigos_step_runner.step_implementers.generate_metadata.maven import Maven
-from ploigos_step_runner.step_implementers.generate_metadata.npm import Npm
-from ploigos_step_runner.step_implementers.generate_metadata.semantic_version import SemanticVersion
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.generate_metadata.git import Git
+    from ploigos_step_runner.step_implementers.generate_metadata.maven import Maven
+    from ploigos_step_runner.step_implementers.generate_metadata.npm import Npm
+    from ploigos_step_runner.step_implementers.generate_metadata.semantic_version import (
+        SemanticVersion
+    )
+
+install_lazy_attributes(globals(), {
+    'Git': '.git',
+    'Maven': '.maven',
+    'Npm': '.npm',
+    'SemanticVersion': '.semantic_version'
+})
@@ -30,9 +30,8 @@ Result Artifact Key | Description
 
 import re
 
-from git import InvalidGitRepositoryError, Repo
-
 from ploigos_step_runner import StepImplementer, StepResult
+from ploigos_step_runner.utils.git import get_git_head
 
 DEFAULT_CONFIG = {
     'repo-root': './',
@@ -82,6 +81,24 @@ class Git(StepImplementer):  # pylint: disable=too-few-public-methods
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'pre-release',
+            'build'
+        ]
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -96,42 +113,39 @@ class Git(StepImplementer):  # pylint: disable=too-few-public-methods
         build_string_length = self.get_value('build-string-length')
 
         try:
-            repo = Repo(repo_root)
-        except InvalidGitRepositoryError:
+            git_head = get_git_head(repo_root)
+        except ValueError:
             step_result.success = False
             step_result.message = 'Given directory (repo_root) is not a Git repository'
             return step_result
 
-        if repo.bare:
+        if git_head.is_bare:
             step_result.success = False
             step_result.message = 'Given directory (repo_root) is a bare Git repository'
             return step_result
 
-        if repo.head.is_detached:
+        if git_head.is_detached:
             step_result.success = False
             step_result.message = 'Expected a Git branch in given directory (repo_root) but has' \
                                   ' a detached head'
             return step_result
 
-        git_branch = str(repo.head.reference)
         pre_release_regex = re.compile(r"/", re.IGNORECASE)
-        pre_release = re.sub(pre_release_regex, '_', git_branch)
+        pre_release = re.sub(pre_release_regex, '_', git_head.branch)
         step_result.add_artifact(
             name='pre-release',
             value=pre_release
         )
 
-        try:
-            git_branch_last_commit_hash = str(repo.head.reference.commit)[:build_string_length]
-
-            step_result.add_artifact(
-                name='build',
-                value=git_branch_last_commit_hash
-            )
-        except ValueError:
+        if git_head.commit is None:
             step_result.success = False
             step_result.message = 'Given directory (repo_root) is a git branch (git_branch) with' \
                                   ' no commit history'
             return step_result
 
+        step_result.add_artifact(
+            name='build',
+            value=git_head.commit[:build_string_length]
+        )
+
         return step_result
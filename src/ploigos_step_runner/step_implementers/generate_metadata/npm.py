@@ -74,6 +74,33 @@ class Npm(StepImplementer): # pylint: disable=too-few-public-methods
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'app-version'
+        ]
+
+    def _step_result_cache_input_paths(self):
+        """The app version is read only from the package file.
+
+        Returns
+        -------
+        list of str
+            The package file.
+        """
+        return [self.get_value('package-file')]
+
     def _validate_required_config_or_previous_step_result_artifact_keys(self):
         """Validates that the required configuration keys or previous step result artifacts
         are set and have valid values.
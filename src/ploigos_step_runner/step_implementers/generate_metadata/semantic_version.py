@@ -108,6 +108,34 @@ class SemanticVersion(StepImplementer):  # pylint: disable=too-few-public-method
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'version',
+            'container-image-version'
+        ]
+
+    def _step_result_cache_input_paths(self):
+        """The version is built only from the configuration and previous step results.
+
+        Returns
+        -------
+        list of str
+            No files or directories.
+        """
+        return []
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -1,4 +1,13 @@
 """`StepImplementers` for the `package` step.
 """
 
-from ploigos_step_runner.step_implementers.package.maven import Maven
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.package.maven import Maven
+
+install_lazy_attributes(globals(), {
+    'Maven': '.maven'
+})
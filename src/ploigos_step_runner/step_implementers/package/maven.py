@@ -33,6 +33,12 @@ Configuration Key     | Required? | Default                 | Description
                                                               `artifact-extensions`.
 `tls-verify`          | No        | True                    | Disables TLS Verification if set to \
                                                               False
+`maven-build-reuse`   | No        | False                   | Reuse the build of the previous \
+                                                              Maven step when the sources are \
+                                                              the same, skipping `clean`, and \
+                                                              the tests if they passed, or Maven \
+                                                              if the project was also packaged. \
+                                                              See `MavenGeneric`.
 
 Result Artifacts
 ----------------
@@ -41,6 +47,7 @@ Results artifacts output by this step.
 Result Artifact Key | Description
 --------------------|------------
 `package-artifacts` | An array of dictionaries with information on the built artifacts.
+`maven-build`       | Build for following Maven steps to reuse, if `maven-build-reuse` is True.
 
 
 ## package-artifacts
@@ -90,19 +97,19 @@ Examples
 
 """
 import os
-import sys
 
 import sh
 from ploigos_step_runner import StepResult
 from ploigos_step_runner.step_implementers.shared.maven_generic import MavenGeneric
-from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
+from ploigos_step_runner.utils.commands import run_command
 from ploigos_step_runner.utils.xml import get_xml_element
 
 DEFAULT_CONFIG = {
     'tls-verify': True,
     'pom-file': 'pom.xml',
     'artifact-extensions': ["jar", "war", "ear"],
-    'artifact-parent-dir': 'target'
+    'artifact-parent-dir': 'target',
+    'maven-build-reuse': False
 }
 
 REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS = [
@@ -147,6 +154,35 @@ class Maven(MavenGeneric):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'maven-output',
+            'package-artifacts',
+            MavenGeneric.MAVEN_BUILD_RESULT_ARTIFACT_KEY
+        ]
+
+    def _step_result_cache_input_paths(self):
+        """The packaged artifacts are built from the project directory of the pom file.
+
+        Returns
+        -------
+        list of str
+            The project directory of the pom file, see `_step_result_cache_ignore_patterns`.
+        """
+        return [os.path.dirname(os.path.abspath(self.get_value('pom-file')))]
+
     def _run_step(self): # pylint: disable=too-many-locals
         """Runs the step implemented by this StepImplementer.
 
@@ -175,49 +211,57 @@ class Maven(MavenGeneric):
                 '-Dmaven.wagon.http.ssl.ignore.validity.dates=true',
             ]
 
-        settings_file = self._generate_maven_settings()
-        mvn_output_file_path = self.write_working_file('mvn_test_output.txt')
-        try:
-            with open(mvn_output_file_path, 'w') as mvn_output_file:
-                out_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stdout,
-                    mvn_output_file
-                ])
-                err_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stderr,
-                    mvn_output_file
-                ])
-
-                sh.mvn(  # pylint: disable=no-member
-                    'clean',
-                    'install',
-                    '-f', pom_file,
-                    '-s', settings_file,
-                    *mvn_additional_options,
-                    _out=out_callback,
-                    _err=err_callback
-                )
-        except sh.ErrorReturnCode as error:
-            step_result.success = False
-            step_result.message = "Package failures. See 'maven-output' report artifacts " \
-                f"for details: {error}"
-            return step_result
-        finally:
+        # reuse the build of the previous maven step if the sources have not changed since
+        reusable_build, mvn_phases, mvn_reuse_options = self._get_maven_build_plan('install')
+        artifact_file_names = None
+        if reusable_build is not None:
+            artifact_file_names = Maven.__find_artifact_file_names(
+                pom_file=pom_file,
+                artifact_parent_dir=artifact_parent_dir,
+                artifact_extensions=artifact_extensions
+            )
+
+        if artifact_file_names:
+            print("Reusing artifacts packaged by the previous Maven step")
+            mvn_output_file_path = reusable_build['maven-output']
             step_result.add_artifact(
                 description="Standard out and standard error from 'mvn install'.",
                 name='maven-output',
                 value=mvn_output_file_path
             )
+        else:
+            mvn_additional_options += mvn_reuse_options
+            settings_file = self._generate_maven_settings()
+            mvn_output_file_path = self.write_working_file('mvn_test_output.txt')
+            try:
+                with self.create_output_pipeline(mvn_output_file_path) as output_pipeline:
+                    run_command(
+                        sh.mvn, # pylint: disable=no-member
+                        *mvn_phases,
+                        '-f', pom_file,
+                        '-s', settings_file,
+                        *mvn_additional_options,
+                        _out=output_pipeline.out,
+                        _err=output_pipeline.err
+                    )
+            except sh.ErrorReturnCode as error:
+                step_result.success = False
+                step_result.message = "Package failures. See 'maven-output' report artifacts " \
+                    f"for details: {error}"
+                return step_result
+            finally:
+                step_result.add_artifact(
+                    description="Standard out and standard error from 'mvn install'.",
+                    name='maven-output',
+                    value=mvn_output_file_path
+                )
 
-        # find the artifacts
-        artifact_file_names = []
-        artifact_parent_dir_full_path = \
-            os.listdir(os.path.join(
-                os.path.dirname(os.path.abspath(pom_file)),
-                artifact_parent_dir))
-        for filename in artifact_parent_dir_full_path:
-            if any(filename.endswith(ext) for ext in artifact_extensions):
-                artifact_file_names.append(filename)
+            # find the artifacts
+            artifact_file_names = Maven.__find_artifact_file_names(
+                pom_file=pom_file,
+                artifact_parent_dir=artifact_parent_dir,
+                artifact_extensions=artifact_extensions
+            )
 
         # error if we find more then one artifact
         # see https://projects.engineering.redhat.com/browse/NAPSSPO-546
@@ -258,5 +302,33 @@ class Maven(MavenGeneric):
            name='package-artifacts',
            value=[package_artifacts]
         )
+        self._add_maven_build_artifact(
+            step_result=step_result,
+            phase='install',
+            tested=True,
+            maven_output_path=mvn_output_file_path
+        )
 
         return step_result
+
+    @staticmethod
+    def __find_artifact_file_names(pom_file, artifact_parent_dir, artifact_extensions):
+        """Finds the names of the built artifacts.
+
+        Returns
+        -------
+        list of str
+            Names of the files in the `artifact-parent-dir` of the project of the given pom file
+            ending in any of the given extensions, or no names if it does not exist.
+        """
+        artifact_parent_dir_path = os.path.join(
+            os.path.dirname(os.path.abspath(pom_file)),
+            artifact_parent_dir
+        )
+        if not os.path.isdir(artifact_parent_dir_path):
+            return []
+
+        return [
+            filename for filename in os.listdir(artifact_parent_dir_path)
+            if any(filename.endswith(ext) for ext in artifact_extensions)
+        ]
@@ -66,12 +66,11 @@ Examples
       -DrepositoryId=maven-push-artifact-repo-id
       -s settings.xml
 """
-import sys
 
 import sh
 from ploigos_step_runner import StepResult
 from ploigos_step_runner.step_implementers.shared.maven_generic import MavenGeneric
-from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
+from ploigos_step_runner.utils.commands import run_command
 
 DEFAULT_CONFIG = {
     'tls-verify': True
@@ -120,6 +119,24 @@ class Maven(MavenGeneric):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'maven-output',
+            'push-artifacts'
+        ]
+
     def _run_step(self): # pylint: disable=too-many-locals
         """Runs the step implemented by this StepImplementer.
 
@@ -160,16 +177,12 @@ class Maven(MavenGeneric):
                 package_type = package['package-type']
 
                 # push the artifact
-                with open(mvn_output_file_path, 'a') as mvn_output_file:
-                    out_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                        sys.stdout,
-                        mvn_output_file
-                    ])
-                    err_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                        sys.stderr,
-                        mvn_output_file
-                    ])
-                    sh.mvn(  # pylint: disable=no-member
+                with self.create_output_pipeline(
+                    mvn_output_file_path,
+                    append=True
+                ) as output_pipeline:
+                    run_command(
+                        sh.mvn, # pylint: disable=no-member
                         'deploy:deploy-file',
                         '-Dversion=' + version,
                         '-Dfile=' + artifact_path,
@@ -180,8 +193,8 @@ class Maven(MavenGeneric):
                         '-DrepositoryId=' + maven_push_artifact_repo_id,
                         '-s' + settings_file,
                         *mvn_additional_options,
-                        _out=out_callback,
-                        _err=err_callback
+                        _out=output_pipeline.out,
+                        _err=output_pipeline.err
                     )
 
                 # record the pushed artifact
@@ -1,4 +1,13 @@
 """`StepImplementers` for the `push-container-image` step.
 """
 
-from ploigos_step_runner.step_implementers.push_container_image.skopeo import Skopeo
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.push_container_image.skopeo import Skopeo
+
+install_lazy_attributes(globals(), {
+    'Skopeo': '.skopeo'
+})
@@ -51,6 +51,7 @@ from pathlib import Path
 
 import sh
 from ploigos_step_runner import StepImplementer, StepResult
+from ploigos_step_runner.utils.commands import run_command
 from ploigos_step_runner.utils.containers import container_registries_login
 
 DEFAULT_CONFIG = {
@@ -107,6 +108,28 @@ class Skopeo(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'container-image-registry-uri',
+            'container-image-registry-organization',
+            'container-image-repository',
+            'container-image-name',
+            'container-image-version',
+            'container-image-tag'
+        ]
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -143,7 +166,8 @@ class Skopeo(StepImplementer):
             )
 
             # push image
-            sh.skopeo.copy( # pylint: disable=no-member
+            run_command(
+                sh.skopeo.copy, # pylint: disable=no-member
                 f"--src-tls-verify={str(self.get_value('src-tls-verify'))}",
                 f"--dest-tls-verify={str(self.get_value('dest-tls-verify'))}",
                 f"--authfile={containers_config_auth_file}",
@@ -1,5 +1,15 @@
 """StepImplementer parent classes that are shared accross multiple steps.
 """
 
-from ploigos_step_runner.step_implementers.shared.maven_generic import MavenGeneric
-from ploigos_step_runner.step_implementers.shared.openscap_generic import OpenSCAPGeneric
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.shared.maven_generic import MavenGeneric
+    from ploigos_step_runner.step_implementers.shared.openscap_generic import OpenSCAPGeneric
+
+install_lazy_attributes(globals(), {
+    'MavenGeneric': '.maven_generic',
+    'OpenSCAPGeneric': '.openscap_generic'
+})
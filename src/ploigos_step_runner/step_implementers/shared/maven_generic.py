@@ -1,24 +1,61 @@
 """Abstract parent class for StepImplementers that use Maven.
+
+Build Reuse
+-----------
+Every Maven step runs `mvn clean ...` by default, so every Maven step in a workflow recompiles
+the whole project. With `maven-build-reuse` set to True a Maven step records a `maven-build`
+result artifact with the fingerprint of the sources it built, and the following Maven steps
+of the workflow skip `clean` if the sources still have the same fingerprint,
+reusing what was already compiled into the build output directories.
+
+The `package` step, that runs after the `unit-test` step, also passes `-DskipTests` when
+reusing a build whose unit tests passed. If the `unit-test` step is configured to run the
+`install` phase (`unit-test-maven-phase`), then the project is tested and packaged with one
+Maven invocation and the `package` step does not run Maven at all.
 """
 
 import os
 
 from ploigos_step_runner.config.config_value import ConfigValue
 from ploigos_step_runner.step_implementer import StepImplementer
+from ploigos_step_runner.utils.hashing import get_tree_fingerprint
 from ploigos_step_runner.utils.maven import generate_maven_settings, write_effective_pom
 from ploigos_step_runner.utils.xml import get_xml_element_by_path
 
 
 class MavenGeneric(StepImplementer):
     """Abstract parent class for StepImplementers that use Maven.
+
+    Attributes
+    ----------
+    __maven_build_fingerprint : str or None
+        Fingerprint of the sources of the project of the pom file,
+        see `_get_maven_build_fingerprint`.
     """
 
+    MAVEN_BUILD_RESULT_ARTIFACT_KEY = 'maven-build'
+
     SUREFIRE_PLUGIN_XML_ELEMENT_PATH = \
         'mvn:build/mvn:plugins/mvn:plugin/[mvn:artifactId="maven-surefire-plugin"]'
     SUREFIRE_PLUGIN_REPORTS_DIR_XML_ELEMENT_PATH = \
         f'{SUREFIRE_PLUGIN_XML_ELEMENT_PATH}/mvn:configuration/mvn:reportsDirectory'
     DEFAULT_SUREFIRE_PLUGIN_REPORTS_DIR = 'target/surefire-reports'
 
+    def __init__(self, *args, **kwargs):
+        self.__maven_build_fingerprint = None
+        super().__init__(*args, **kwargs)
+
+    @staticmethod
+    def _step_result_cache_ignore_patterns():
+        """Maven build output directories are not inputs of Maven steps.
+
+        Returns
+        -------
+        list of str
+            Glob patterns of the names of files and directories to not hash.
+        """
+        return ['target']
+
     def _validate_required_config_or_previous_step_result_artifact_keys(self):
         """Validates that the required configuration keys or previous step result artifacts
         are set and have valid values.
@@ -83,3 +120,143 @@ class MavenGeneric(StepImplementer):
             element_path,
             default_namespace='mvn'
         )
+
+    def _get_maven_build_fingerprint(self):
+        """Gets the fingerprint of the sources of the project of the pom file, not including
+        the Maven build output directories, see `_step_result_cache_ignore_patterns`.
+
+        Returns
+        -------
+        str or None
+            Fingerprint of the sources of the project of the pom file,
+            or None if they could not be read.
+        """
+        if self.__maven_build_fingerprint is None:
+            project_dir = os.path.dirname(os.path.abspath(self.get_value('pom-file')))
+            try:
+                with self.operation_metrics.measure('maven-build-fingerprint'):
+                    self.__maven_build_fingerprint = get_tree_fingerprint(
+                        project_dir,
+                        ignore_patterns=self._step_result_cache_ignore_patterns(),
+                        excluded_paths=[self.work_dir_path, self.results_dir_path]
+                    )
+            except OSError as error:
+                print(f"WARNING: Not reusing Maven builds, could not hash sources: {error}")
+
+        return self.__maven_build_fingerprint
+
+    def _get_reusable_maven_build(self):
+        """Gets the build of the last previous Maven step of the workflow if `maven-build-reuse`
+        is True and it built the same pom file from sources with the same fingerprint.
+
+        Returns
+        -------
+        dict or None
+            The `maven-build` result artifact of the last previous Maven step,
+            see `_add_maven_build_artifact`, or None if there is no build to reuse.
+        """
+        if not self.get_value('maven-build-reuse'):
+            return None
+
+        # NOTE: fingerprint the sources before running Maven,
+        #       so the build recorded for following steps is of the sources as they were built
+        fingerprint = self._get_maven_build_fingerprint()
+        if fingerprint is None:
+            return None
+
+        maven_build = None
+        for step_result in reversed(self.workflow_result.workflow_list):
+            maven_build = step_result.get_artifact_value(
+                name=MavenGeneric.MAVEN_BUILD_RESULT_ARTIFACT_KEY
+            )
+            if maven_build is not None:
+                break
+
+        if maven_build is None \
+                or maven_build['pom-file'] != os.path.abspath(self.get_value('pom-file')) \
+                or maven_build['fingerprint'] != fingerprint:
+            return None
+
+        print(
+            "Reusing Maven build of previous step with the same sources"
+            f" ({maven_build['fingerprint']})"
+        )
+        return maven_build
+
+    def _get_maven_build_plan(self, phase):
+        """Determines how to build the given Maven lifecycle phase, reusing the build of the
+        last previous Maven step if possible, see `_get_reusable_maven_build`.
+
+        Parameters
+        ----------
+        phase : str
+            Maven lifecycle phase to build, ex: `install`.
+
+        Returns
+        -------
+        tuple of (dict or None, list of str, list of str)
+            The reusable build if it already built the given phase and its unit tests passed,
+            so its outputs can be reused without running Maven, else None,
+            and the Maven phases and additional Maven options to build the given phase with
+            otherwise: without `clean` when reusing a build, and with `-DskipTests` when its
+            unit tests passed.
+        """
+        maven_build = self._get_reusable_maven_build()
+        if maven_build is None:
+            return None, ['clean', phase], []
+
+        reusable_build = None
+        mvn_options = []
+        if maven_build['tested']:
+            mvn_options.append('-DskipTests')
+            if maven_build['phase'] == phase:
+                reusable_build = maven_build
+
+        return reusable_build, [phase], mvn_options
+
+    def _get_maven_clean_phases(self):
+        """
+        Returns
+        -------
+        list of str
+            `['clean']`, or no phases if reusing the build of a previous Maven step,
+            see `_get_reusable_maven_build`.
+        """
+        if self._get_reusable_maven_build() is not None:
+            return []
+
+        return ['clean']
+
+    def _add_maven_build_artifact(self, step_result, phase, tested, maven_output_path):
+        """Adds the `maven-build` result artifact for following Maven steps to reuse this build,
+        if `maven-build-reuse` is True.
+
+        Parameters
+        ----------
+        step_result : StepResult
+            Result to add the artifact to.
+        phase : str
+            Maven lifecycle phase that was built, ex: `test` or `install`.
+        tested : bool
+            True if the unit tests of the built sources passed.
+        maven_output_path : str
+            Path to the standard out and standard error of the Maven invocation that built them.
+        """
+        if not self.get_value('maven-build-reuse'):
+            return
+
+        fingerprint = self._get_maven_build_fingerprint()
+        if fingerprint is None:
+            return
+
+        step_result.add_artifact(
+            description="Maven build for following Maven steps to reuse.",
+            name=MavenGeneric.MAVEN_BUILD_RESULT_ARTIFACT_KEY,
+            value={
+                'pom-file': os.path.abspath(self.get_value('pom-file')),
+                'fingerprint': fingerprint,
+                'phase': phase,
+                'tested': tested,
+                'maven-output': maven_output_path
+            }
+        )
@@ -59,6 +59,7 @@ from io import StringIO
 import sh
 from ploigos_step_runner import StepResult, StepRunnerException
 from ploigos_step_runner.step_implementer import StepImplementer
+from ploigos_step_runner.utils.commands import run_command
 from ploigos_step_runner.utils.file import download_and_decompress_source_to_destination
 from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
 
@@ -192,6 +193,25 @@ class OpenSCAPGeneric(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'html-report',
+            'xml-report',
+            'stdout-report'
+        ]
+
     def _validate_required_config_or_previous_step_result_artifact_keys(self):
         """Validates that the required configuration keys or previous step result artifacts
         are set and have valid values.
@@ -381,7 +401,8 @@ class OpenSCAPGeneric(StepImplementer):
         """
         # import image tar file to vfs file system
         try:
-            sh.buildah(  # pylint: disable=no-member
+            run_command(
+                sh.buildah, # pylint: disable=no-member
                 'from',
                 '--storage-driver', 'vfs',
                 '--name', container_name,
@@ -427,7 +448,8 @@ class OpenSCAPGeneric(StepImplementer):
                 buildah_mount_out_buff
             ])
             buildah_mount_command = buildah_unshare_command.bake("buildah", "mount")
-            buildah_mount_command(
+            run_command(
+                buildah_mount_command,
                 '--storage-driver', 'vfs',
                 container_id,
                 _out=buildah_mount_out_callback,
@@ -468,7 +490,8 @@ class OpenSCAPGeneric(StepImplementer):
         oscap_document_type = None
         try:
             oscap_info_out_buff = StringIO()
-            sh.oscap.info(  # pylint: disable=no-member
+            run_command(
+                sh.oscap.info, # pylint: disable=no-member
                 oscap_input_file,
                 _out=oscap_info_out_buff
             )
@@ -597,7 +620,8 @@ class OpenSCAPGeneric(StepImplementer):
                     oscap_eval_out_buff,
                     oscap_out_file
                 ])
-                oscap_chroot_command(
+                run_command(
+                    oscap_chroot_command,
                     container_mount_path,
                     oscap_eval_type,
                     'eval',
@@ -1,5 +1,15 @@
 """`StepImplementers` for the `sign-container-image` step.
 """
 
-from ploigos_step_runner.step_implementers.sign_container_image.curl_push import CurlPush
-from ploigos_step_runner.step_implementers.sign_container_image.podman_sign import PodmanSign
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.sign_container_image.curl_push import CurlPush
+    from ploigos_step_runner.step_implementers.sign_container_image.podman_sign import PodmanSign
+
+install_lazy_attributes(globals(), {
+    'CurlPush': '.curl_push',
+    'PodmanSign': '.podman_sign'
+})
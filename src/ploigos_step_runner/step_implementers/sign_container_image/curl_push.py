@@ -51,6 +51,7 @@ import sh
 from ploigos_step_runner import StepImplementer
 from ploigos_step_runner.exceptions import StepRunnerException
 from ploigos_step_runner.step_result import StepResult
+from ploigos_step_runner.utils.commands import run_command
 from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
 
 DEFAULT_CONFIG = {
@@ -102,6 +103,25 @@ class CurlPush(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'container-image-signature-url',
+            'container-image-signature-file-md5',
+            'container-image-signature-file-sha1'
+        ]
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -204,7 +224,8 @@ class CurlPush(StepImplementer):
             # -S: Show error
             # -f: Don't print out failure document
             # -v: Verbose
-            sh.curl(  # pylint: disable=no-member
+            run_command(
+                sh.curl, # pylint: disable=no-member
                 '-sSfv',
                 '-X', 'PUT',
                 '--user', f"{signature_server_username}:{signature_server_password}",
@@ -42,6 +42,7 @@ from io import StringIO
 import sh
 from ploigos_step_runner import StepImplementer
 from ploigos_step_runner.step_result import StepResult
+from ploigos_step_runner.utils.commands import run_command
 from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
 from ploigos_step_runner.exceptions import StepRunnerException
 
@@ -96,6 +97,25 @@ class PodmanSign(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'container-image-signature-private-key-fingerprint',
+            'container-image-signature-file-path',
+            'container-image-signature-name'
+        ]
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -164,7 +184,8 @@ class PodmanSign(StepImplementer):
                 sys.stdout,
                 gpg_import_stdout_result
             ])
-            sh.gpg( # pylint: disable=no-member
+            run_command(
+                sh.gpg, # pylint: disable=no-member
                 '--import',
                 '--fingerprint',
                 '--with-colons',
@@ -214,7 +235,8 @@ class PodmanSign(StepImplementer):
         try:
             # NOTE: for some reason the output from podman sign goes to stderr so....
             #       merge the two streams
-            sh.podman.image( # pylint: disable=no-member
+            run_command(
+                sh.podman.image, # pylint: disable=no-member
                 "sign",
                 f"--sign-by={pgp_private_key_fingerprint}",
                 f"--directory={image_signatures_directory}",
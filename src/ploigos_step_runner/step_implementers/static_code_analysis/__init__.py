@@ -1,4 +1,13 @@
 """`StepImplementers` for the `static-code-analysis` step.
 """
 
-from ploigos_step_runner.step_implementers.static_code_analysis.sonarqube import SonarQube
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.static_code_analysis.sonarqube import SonarQube
+
+install_lazy_attributes(globals(), {
+    'SonarQube': '.sonarqube'
+})
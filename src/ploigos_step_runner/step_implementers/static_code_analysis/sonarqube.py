@@ -90,6 +90,7 @@ import sh
 from ploigos_step_runner import StepImplementer
 from ploigos_step_runner.exceptions import StepRunnerException
 from ploigos_step_runner.step_result import StepResult
+from ploigos_step_runner.utils.commands import run_command
 
 DEFAULT_CONFIG = {
     'properties': './sonar-project.properties',
@@ -147,6 +148,33 @@ class SonarQube(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'sonarqube-result-set'
+        ]
+
+    def _step_result_cache_input_paths(self):
+        """The project analyzed is the directory of the properties file.
+
+        Returns
+        -------
+        list of str
+            The directory of the properties file.
+        """
+        return [os.path.dirname(os.path.abspath(self.get_value('properties')))]
+
     def _validate_required_config_or_previous_step_result_artifact_keys(self):
         """Validates that the required configuration keys or previous step result artifacts
         are set and have valid values.
@@ -213,7 +241,8 @@ class SonarQube(StepImplementer):
             #    https://amoffat.github.io/sh/sections/faq.html
             working_directory = self.work_dir_path
             if username:
-                sh.sonar_scanner(  # pylint: disable=no-member
+                run_command(
+                    sh.sonar_scanner, # pylint: disable=no-member
                     f'-Dproject.settings={properties_file}',
                     f'-Dsonar.host.url={url}',
                     f'-Dsonar.projectVersion={version}',
@@ -226,7 +255,8 @@ class SonarQube(StepImplementer):
                     _err=sys.stderr
                 )
             else:
-                sh.sonar_scanner(  # pylint: disable=no-member
+                run_command(
+                    sh.sonar_scanner, # pylint: disable=no-member
                     f'-Dproject.settings={properties_file}',
                     f'-Dsonar.host.url={url}',
                     f'-Dsonar.projectVersion={version}',
@@ -1,4 +1,13 @@
 """`StepImplementers` for the `tag-source` step.
 """
 
-from ploigos_step_runner.step_implementers.tag_source.git import Git
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.tag_source.git import Git
+
+install_lazy_attributes(globals(), {
+    'Git': '.git'
+})
@@ -39,13 +39,12 @@ Result Artifact Key | Description
 `tag`               | This is the value that was used to tag the source.
 """
 import re
-import sys
-from io import StringIO
 
 import sh
 from ploigos_step_runner import StepImplementer
 from ploigos_step_runner.exceptions import StepRunnerException
 from ploigos_step_runner.step_result import StepResult
+from ploigos_step_runner.utils.git import GitRepo
 
 DEFAULT_CONFIG = {}
 
@@ -98,6 +97,23 @@ class Git(StepImplementer):
         """
         return []
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'tag'
+        ]
+
     def _validate_required_config_or_previous_step_result_artifact_keys(self):
         """Validates that the required configuration keys or previous step result artifacts
         are set and have valid values.
@@ -193,17 +209,9 @@ class Git(StepImplementer):
             git_url = self.get_value('url')
         else:
             try:
-                out = StringIO()
-                sh.git.config(
-                    '--get',
-                    'remote.origin.url',
-                    _encoding='UTF-8',
-                    _decode_errors='ignore',
-                    _out=out,
-                    _err=sys.stderr,
-                    _tee='err'
+                git_url = GitRepo(phase_metrics=self.operation_metrics).get_config(
+                    'remote.origin.url'
                 )
-                git_url = out.getvalue().rstrip()
 
                 # remove ANYTHING@ from beginning of git_url since step will pass in its own
                 # username and password
@@ -222,8 +230,7 @@ class Git(StepImplementer):
                 ) from error
         return git_url
 
-    @staticmethod
-    def __git_tag(git_tag_value):
+    def __git_tag(self, git_tag_value):
         try:
             # NOTE:
             # this force is only needed locally in case of a re-run of the same pipeline
@@ -231,35 +238,14 @@ class Git(StepImplementer):
             # making this an acceptable work around to the issue since on the off chance
             # actually overwriting a tag with a different comment, the push will fail
             # because the tag will be attached to a different git hash.
-            sh.git.tag(  # pylint: disable=no-member
-                git_tag_value,
-                '-f',
-                _out=sys.stdout,
-                _err=sys.stderr,
-                _tee='err'
-            )
+            GitRepo(phase_metrics=self.operation_metrics).tag([git_tag_value], force=True)
         except sh.ErrorReturnCode as error:  # pylint: disable=undefined-variable
             raise StepRunnerException(
                 f"Error pushing git tag ({git_tag_value}): {error}"
             ) from error
 
-    @staticmethod
-    def __git_push(url=None):
+    def __git_push(self, url=None):
         try:
-            if url:
-                sh.git.push(
-                    url,
-                    '--tag',
-                    _out=sys.stdout,
-                    _err=sys.stderr,
-                    _tee='err'
-                )
-            else:
-                sh.git.push(
-                    '--tag',
-                    _out=sys.stdout,
-                    _err=sys.stderr,
-                    _tee='err'
-                )
+            GitRepo(phase_metrics=self.operation_metrics).push(remote=url, tags=True)
         except sh.ErrorReturnCode as error:  # pylint: disable=undefined-variable
             raise StepRunnerException(f"Error invoking git push: {error}") from error
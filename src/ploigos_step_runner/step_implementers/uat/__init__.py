@@ -1,4 +1,15 @@
 """`StepImplementers` for the `uat` (User Acceptance Tests) step.
 """
 
-from ploigos_step_runner.step_implementers.uat.maven_selenium_cucumber import MavenSeleniumCucumber
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.uat.maven_selenium_cucumber import (
+        MavenSeleniumCucumber
+    )
+
+install_lazy_attributes(globals(), {
+    'MavenSeleniumCucumber': '.maven_selenium_cucumber'
+})
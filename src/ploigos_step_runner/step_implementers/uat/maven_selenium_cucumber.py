@@ -26,6 +26,9 @@ Configuration Key    | Required? | Default            | Description
 `uat-maven-profile`  | Yes       | `integration-test` | Maven profile to use to invoke \
                                                         Selenium tests.
 `tls-verify`         | No        | True               | Disables TLS Verification if set to False
+`maven-build-reuse`  | No        | False              | Skip `clean` when the sources are the \
+                                                        same as the previous Maven step built. \
+                                                        See `MavenGeneric`.
 
 Result Artifacts
 ----------------
@@ -39,20 +42,20 @@ Result Artifact Key    | Description
 `cucumber-report-json` | Path to Cucumber JSON report generated by Maven.
 """
 import os
-import sys
 
 import sh
 from ploigos_step_runner.config.config_value import ConfigValue
 from ploigos_step_runner.exceptions import StepRunnerException
 from ploigos_step_runner.step_implementers.shared.maven_generic import MavenGeneric
 from ploigos_step_runner.step_result import StepResult
-from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
+from ploigos_step_runner.utils.commands import run_command
 
 DEFAULT_CONFIG = {
     'tls-verify': True,
     'fail-on-no-tests': True,
     'pom-file': 'pom.xml',
-    'uat-maven-profile': 'integration-test'
+    'uat-maven-profile': 'integration-test',
+    'maven-build-reuse': False
 }
 
 REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS = [
@@ -100,6 +103,26 @@ class MavenSeleniumCucumber(MavenGeneric):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'maven-output',
+            'surefire-reports',
+            'cucumber-report-html',
+            'cucumber-report-json'
+        ]
+
     def _validate_required_config_or_previous_step_result_artifact_keys(self):
         """Validates that the required configuration keys or previous step result artifacts
         are set and have valid values.
@@ -194,17 +217,10 @@ class MavenSeleniumCucumber(MavenGeneric):
         cucumber_json_report_path = os.path.join(self.work_dir_path, 'cucumber.json')
         mvn_output_file_path = self.write_working_file('mvn_test_output.txt')
         try:
-            with open(mvn_output_file_path, 'w') as mvn_output_file:
-                out_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stdout,
-                    mvn_output_file
-                ])
-                err_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stderr,
-                    mvn_output_file
-                ])
-                sh.mvn( # pylint: disable=no-member
-                    'clean',
+            with self.create_output_pipeline(mvn_output_file_path) as output_pipeline:
+                run_command(
+                    sh.mvn, # pylint: disable=no-member
+                    *self._get_maven_clean_phases(),
                     'test',
                     f'-P{uat_maven_profile}',
                     f'-Dselenium.hub.url={selenium_hub_url}',
@@ -215,8 +231,8 @@ class MavenSeleniumCucumber(MavenGeneric):
                     '-f', pom_file,
                     '-s', settings_file,
                     *mvn_additional_options,
-                    _out=out_callback,
-                    _err=err_callback
+                    _out=output_pipeline.out,
+                    _err=output_pipeline.err
                 )
 
             if not os.path.isdir(test_results_dir) or len(os.listdir(test_results_dir)) == 0:
@@ -1,3 +1,13 @@
 """`StepImplementers` for the `unit-test` step.
 """
-from ploigos_step_runner.step_implementers.unit_test.maven import Maven
+
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.unit_test.maven import Maven
+
+install_lazy_attributes(globals(), {
+    'Maven': '.maven'
+})
@@ -8,13 +8,21 @@ Could come from:
 * runtime configuration
 * previous step results
 
-Configuration Key  | Required? | Default     | Description
--------------------|-----------|-------------|-----------
-`fail-on-no-tests` | True      | True        | Value to specify whether unit-test \
-                                               step can succeed when no tests are defined
-`pom-file`         | True      | `'pom.xml'` | pom used to run tests and check \
-                                               for existence of custom reportsDirectory
-`tls-verify`       | No        | True        | Disables TLS Verification if set to False
+Configuration Key       | Required? | Default     | Description
+------------------------|-----------|-------------|-----------
+`fail-on-no-tests`      | True      | True        | Value to specify whether unit-test \
+                                                    step can succeed when no tests are defined
+`pom-file`              | True      | `'pom.xml'` | pom used to run tests and check \
+                                                    for existence of custom reportsDirectory
+`tls-verify`            | No        | True        | Disables TLS Verification if set to False
+`maven-build-reuse`     | No        | False       | Skip `clean` when the sources are the same \
+                                                    as the previous Maven step built, and let \
+                                                    following Maven steps reuse this build. \
+                                                    See `MavenGeneric`.
+`unit-test-maven-phase` | No        | `'test'`    | Maven lifecycle phase to run, `test`, \
+                                                    or `install` to also package the project \
+                                                    for the `package` step to reuse when \
+                                                    `maven-build-reuse` is True.
 
 Result Artifacts
 ----------------
@@ -24,21 +32,25 @@ Result Artifact Key | Description
 --------------------|------------
 `maven-output`      | Path to Stdout and Stderr from invoking Maven.
 `surefile-reports`  | Path to Surefire reports generated from invoking Maven.
+`maven-build`       | Build for following Maven steps to reuse, if `maven-build-reuse` is True.
 """
 import os
-import sys
 
 import sh
 from ploigos_step_runner import StepResult
 from ploigos_step_runner.step_implementers.shared.maven_generic import MavenGeneric
-from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
+from ploigos_step_runner.utils.commands import run_command
 
 DEFAULT_CONFIG = {
     'tls-verify': True,
     'fail-on-no-tests': True,
-    'pom-file': 'pom.xml'
+    'pom-file': 'pom.xml',
+    'maven-build-reuse': False,
+    'unit-test-maven-phase': 'test'
 }
 
+UNIT_TEST_MAVEN_PHASES = ['test', 'install']
+
 REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS = [
     'fail-on-no-tests',
     'pom-file'
@@ -82,6 +94,55 @@ class Maven(MavenGeneric):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'maven-output',
+            'surefire-reports',
+            MavenGeneric.MAVEN_BUILD_RESULT_ARTIFACT_KEY
+        ]
+
+    def _validate_required_config_or_previous_step_result_artifact_keys(self):
+        """Validates that the required configuration keys or previous step result artifacts
+        are set and have valid values.
+
+        Validates that:
+        * required configuration is given
+        * given 'unit-test-maven-phase' is one of `UNIT_TEST_MAVEN_PHASES`
+
+        Raises
+        ------
+        AssertionError
+            If step configuration or previous step result artifacts have invalid required values
+        """
+        super()._validate_required_config_or_previous_step_result_artifact_keys()
+
+        unit_test_maven_phase = self.get_value('unit-test-maven-phase')
+        assert unit_test_maven_phase in UNIT_TEST_MAVEN_PHASES, \
+            f"Given Maven phase (unit-test-maven-phase) must be one of" \
+            f" {UNIT_TEST_MAVEN_PHASES}: {unit_test_maven_phase}"
+
+    def _step_result_cache_input_paths(self):
+        """The tests are built and run from the project directory of the pom file.
+
+        Returns
+        -------
+        list of str
+            The project directory of the pom file, see `_step_result_cache_ignore_patterns`.
+        """
+        return [os.path.dirname(os.path.abspath(self.get_value('pom-file')))]
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -95,6 +156,7 @@ class Maven(MavenGeneric):
         tls_verify = self.get_value('tls-verify')
         pom_file = self.get_value('pom-file')
         fail_on_no_tests = self.get_value('fail-on-no-tests')
+        maven_phase = self.get_value('unit-test-maven-phase')
 
         # ensure surefire plugin enabled
         maven_surefire_plugin = self._get_effective_pom_element(
@@ -129,24 +191,16 @@ class Maven(MavenGeneric):
         settings_file = self._generate_maven_settings()
         mvn_output_file_path = self.write_working_file('mvn_test_output.txt')
         try:
-            with open(mvn_output_file_path, 'w') as mvn_output_file:
-                out_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stdout,
-                    mvn_output_file
-                ])
-                err_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stderr,
-                    mvn_output_file
-                ])
-
-                sh.mvn( # pylint: disable=no-member
-                    'clean',
-                    'test',
+            with self.create_output_pipeline(mvn_output_file_path) as output_pipeline:
+                run_command(
+                    sh.mvn, # pylint: disable=no-member
+                    *self._get_maven_clean_phases(),
+                    maven_phase,
                     '-f', pom_file,
                     '-s', settings_file,
                     *mvn_additional_options,
-                    _out=out_callback,
-                    _err=err_callback
+                    _out=output_pipeline.out,
+                    _err=output_pipeline.err
                 )
 
             if not os.path.isdir(test_results_dir) or len(os.listdir(test_results_dir)) == 0:
@@ -155,18 +209,26 @@ class Maven(MavenGeneric):
                     step_result.success = False
                 else:
                     step_result.message = "No unit tests defined, but 'fail-on-no-tests' is False."
+
+            if step_result.success:
+                self._add_maven_build_artifact(
+                    step_result=step_result,
+                    phase=maven_phase,
+                    tested=True,
+                    maven_output_path=mvn_output_file_path
+                )
         except sh.ErrorReturnCode as error:
             step_result.message = "Unit test failures. See 'maven-output'" \
                 f" and 'surefire-reports' report artifacts for details: {error}"
             step_result.success = False
         finally:
             step_result.add_artifact(
-                description="Standard out and standard error from 'mvn test'.",
+                description=f"Standard out and standard error from 'mvn {maven_phase}'.",
                 name='maven-output',
                 value=mvn_output_file_path
             )
             step_result.add_artifact(
-                description="Surefire reports generated from 'mvn test'.",
+                description=f"Surefire reports generated from 'mvn {maven_phase}'.",
                 name='surefire-reports',
                 value=test_results_dir
             )
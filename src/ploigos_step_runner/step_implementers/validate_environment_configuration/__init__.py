@@ -1,6 +1,15 @@
 """`StepImplementers` for the `validate-environment-configuration` step.
 """
-from ploigos_step_runner.step_implementers.validate_environment_configuration.\
-    configlint import Configlint
-from ploigos_step_runner.step_implementers.validate_environment_configuration.\
-    configlint_from_argocd import ConfiglintFromArgocd
+
+from typing import TYPE_CHECKING
+
+from ploigos_step_runner.utils.reflection import install_lazy_attributes
+
+if TYPE_CHECKING:
+    from ploigos_step_runner.step_implementers.validate_environment_configuration.configlint import Configlint # pylint: disable=line-too-long
+    from ploigos_step_runner.step_implementers.validate_environment_configuration.configlint_from_argocd import ConfiglintFromArgocd # pylint: disable=line-too-long
+
+install_lazy_attributes(globals(), {
+    'Configlint': '.configlint',
+    'ConfiglintFromArgocd': '.configlint_from_argocd'
+})
@@ -69,12 +69,11 @@ provide the configlint-yml-path.
 """
 
 import os
-import sys
 
 import sh
 from ploigos_step_runner import StepImplementer
 from ploigos_step_runner.step_result import StepResult
-from ploigos_step_runner.utils.io import create_sh_redirect_to_multiple_streams_fn_callback
+from ploigos_step_runner.utils.commands import run_command
 
 DEFAULT_CONFIG = {
     'rules': './config-lint.rules'
@@ -122,6 +121,24 @@ class Configlint(StepImplementer):
         """
         return REQUIRED_CONFIG_OR_PREVIOUS_STEP_RESULT_ARTIFACT_KEYS
 
+    @staticmethod
+    def result_artifact_keys():
+        """Getter for the keys of the artifacts this StepImplementer adds to its step results.
+
+        See Also
+        --------
+        StepRunner.preflight
+
+        Returns
+        -------
+        list of str
+            Keys of the artifacts this StepImplementer adds to its step results.
+        """
+        return [
+            'configlint-result-set',
+            'configlint-yml-path'
+        ]
+
     def _run_step(self):
         """Runs the step implemented by this StepImplementer.
 
@@ -152,25 +169,17 @@ class Configlint(StepImplementer):
         try:
             # run config-lint writing stdout and stderr to the standard streams
             # as well as to a results file.
-            with open(configlint_results_file_path, 'w') as configlint_results_file:
-                out_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stdout,
-                    configlint_results_file
-                ])
-                err_callback = create_sh_redirect_to_multiple_streams_fn_callback([
-                    sys.stderr,
-                    configlint_results_file
-                ])
-
-                sh.config_lint(  # pylint: disable=no-member
+            with self.create_output_pipeline(configlint_results_file_path) as output_pipeline:
+                run_command(
+                    sh.config_lint, # pylint: disable=no-member
                     "-verbose",
                     "-debug",
                     "-rules",
                     rules_file,
                     configlint_yml_path,
                     _encoding='UTF-8',
-                    _out=out_callback,
-                    _err=err_callback,
+                    _out=output_pipeline.out,
+                    _err=output_pipeline.err,
                     _tee='err'
                 )
         except sh.ErrorReturnCode_255:  # pylint: disable=no-member
@@ -2,9 +2,8 @@
 """
 import json
 
-import yaml
-
 from ploigos_step_runner.exceptions import StepRunnerException
+from ploigos_step_runner.utils.yaml import yaml_dump
 
 
 class StepResult: # pylint: disable=too-many-instance-attributes
@@ -32,6 +31,7 @@ class StepResult: # pylint: disable=too-many-instance-attributes
         self.__success = True
         self.__message = ''
         self.__artifacts = {}
+        self.__metrics = {}
 
     @classmethod
     def from_step_implementer(cls, step_implementer):
@@ -214,18 +214,58 @@ class StepResult: # pylint: disable=too-many-instance-attributes
         """
         self.__message = message
 
+    @property
+    def metrics(self):
+        """
+        Returns
+        -------
+        dict
+            Performance metrics about running the step, as opposed to artifacts produced by it.
+            For example:
+            {
+                'run-step': {
+                    'wall-time-seconds': 1.5,
+                    'cpu-time-seconds': 0.2,
+                    'child-cpu-time-seconds': 1.1,
+                    'peak-rss-bytes': 52428800
+                },
+                'git-push': {
+                    'wall-time-seconds': 0.8,
+                    'cpu-time-seconds': 0.0,
+                    'child-cpu-time-seconds': 0.1,
+                    'peak-rss-bytes': 52428800
+                }
+            }
+            Operations within running the step, ex: `git-push`,
+            are included in `run-step` as well as recorded on their own.
+
+        See Also
+        --------
+        ploigos_step_runner.utils.metrics.PhaseMetrics
+        """
+        return self.__metrics
+
+    @metrics.setter
+    def metrics(self, metrics):
+        """
+        Setter for metrics
+        """
+        self.__metrics = metrics
+
     def get_sub_step_result(self):
         """
         Returns
         -------
         dict
             Dictionary with the details for the sub-step.
+            Metrics are only included if there are any.
             For example:
             {
                 'sub-step-implementer-name': 'value',
                 'success': Boolean,
                 'message': 'value',
-                'artifacts': {}
+                'artifacts': {},
+                'metrics': {}
             }
         """
         result = {
@@ -234,6 +274,8 @@ class StepResult: # pylint: disable=too-many-instance-attributes
             'message': self.message,
             'artifacts': self.artifacts
         }
+        if self.metrics:
+            result['metrics'] = self.metrics
         return result
 
     def get_step_result_dict(self):
@@ -290,4 +332,4 @@ class StepResult: # pylint: disable=too-many-instance-attributes
         str
             YAML formatted step result
         """
-        return yaml.dump(self.get_step_result_dict())
+        return yaml_dump(self.get_step_result_dict())
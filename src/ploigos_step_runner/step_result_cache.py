@@ -0,0 +1,336 @@
+"""Cache of StepResults to reuse across workflow runs instead of running steps again.
+
+Notes
+-----
+A StepResult is cached with a key that changes whenever anything the StepImplementer declares
+its results are determined by changes, see `StepImplementer._step_result_cache_input_paths`.
+Each cache entry is a directory, named by its key, containing the pickled StepResult and
+copies of every file and directory its artifacts point to, which are restored to where they
+were when the StepResult is reused.
+
+Only successful StepResults are cached. Caching is only an optimization, so errors reading or
+writing the cache are printed and then ignored.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+
+from ploigos_step_runner.config.config_value import ConfigValue
+from ploigos_step_runner.step_result import StepResult
+from ploigos_step_runner.utils.file import create_parent_dir
+from ploigos_step_runner.utils.hashing import get_tree_fingerprint
+
+STEP_RESULT_CACHE_FORMAT_VERSION = 2
+
+
+class StepResultCache:
+    """Cache of StepResults, keyed by everything they are determined by.
+
+    Parameters
+    ----------
+    cache_dir_path : str
+        Path to the directory to cache the StepResults in.
+    """
+
+    __ENTRY_FILE_NAME = 'step-result.pkl'
+    __FILES_DIR_NAME = 'files'
+
+    def __init__(self, cache_dir_path):
+        self.__cache_dir_path = cache_dir_path
+
+    @property
+    def cache_dir_path(self):
+        """
+        Returns
+        -------
+        str
+            Path to the directory the StepResults are cached in.
+        """
+        return self.__cache_dir_path
+
+    def get_key( # pylint: disable=too-many-arguments
+        self,
+        values,
+        input_paths,
+        ignore_patterns=None,
+        excluded_paths=None
+    ):
+        """Gets the key to cache a StepResult with.
+
+        Parameters
+        ----------
+        values : dict
+            JSON serializable values the StepResult is determined by, such as the StepImplementer
+            name, its runtime configuration, and the values of previous step result artifacts.
+        input_paths : list of str
+            Files and directories whose contents the StepResult is determined by.
+            Paths that do not exist are hashed as missing.
+        ignore_patterns : list of str, optional
+            Glob patterns of the names, or relative paths, of files and directories under the
+            given input paths to not hash. `.git` directories, and files ignored by git in
+            git work trees, are never hashed.
+        excluded_paths : list of str, optional
+            Files and directories under the given input paths to not hash, such as
+            the working directory of the step runner. The cache directory is always excluded.
+
+        Returns
+        -------
+        str
+            Hex SHA-256 digest of the given values and the contents of the given input paths.
+        """
+        excluded_paths = list(excluded_paths or []) + [self.cache_dir_path]
+
+        hasher = hashlib.sha256()
+        hasher.update(json.dumps(
+            {'format-version': STEP_RESULT_CACHE_FORMAT_VERSION, 'values': values},
+            sort_keys=True,
+            default=repr
+        ).encode('utf-8'))
+        for input_path in input_paths:
+            if os.path.exists(input_path):
+                fingerprint = get_tree_fingerprint(input_path, ignore_patterns, excluded_paths)
+            else:
+                fingerprint = 'missing'
+            hasher.update(f'\0{input_path}\0{fingerprint}'.encode('utf-8'))
+
+        return hasher.hexdigest()
+
+    def get_step_key(self, step_implementer, result_keys, input_paths, ignore_patterns):
+        """Gets the key to cache the result of running a step with, which changes whenever
+        the runtime step configuration, the values of the given previous step result artifacts,
+        or the contents of the given input paths change.
+
+        Notes
+        -----
+        Configuration values are hashed without being decrypted.
+        The working and results directories of the step runner are never hashed.
+
+        Parameters
+        ----------
+        step_implementer : StepImplementer
+            StepImplementer running the step.
+        result_keys : list of str
+            Keys of the previous step result artifacts whose values, if not configured,
+            the StepResult is determined by.
+        input_paths : list of str
+            Files and directories whose contents the StepResult is determined by.
+        ignore_patterns : list of str
+            Glob patterns of the names of files and directories under the given input paths
+            to not hash.
+
+        Returns
+        -------
+        str or None
+            Key to cache the result of running the step with, see `get_key`,
+            or None if the given input paths can not be hashed.
+        """
+        runtime_step_config = step_implementer.get_copy_of_runtime_step_config()
+        step_implementer_class = type(step_implementer)
+        try:
+            return self.get_key(
+                values={
+                    'step-name': step_implementer.step_name,
+                    'sub-step-name': step_implementer.sub_step_name,
+                    'implementer':
+                        f'{step_implementer_class.__module__}.{step_implementer_class.__name__}',
+                    'environment': step_implementer.environment,
+                    'config': ConfigValue.convert_leaves_to_raw_values(runtime_step_config),
+                    'results': {
+                        result_key: step_implementer.get_value(result_key)
+                        for result_key in result_keys
+                        if runtime_step_config.get(result_key) is None
+                    }
+                },
+                input_paths=input_paths,
+                ignore_patterns=ignore_patterns,
+                excluded_paths=[step_implementer.work_dir_path, step_implementer.results_dir_path]
+            )
+        except OSError as error:
+            print(f"WARNING: Not caching step result, could not hash its inputs: {error}")
+            return None
+
+    def load(self, key, work_dir_path=None):
+        """Loads the StepResult cached with the given key, restoring the files and directories
+        its artifacts point to.
+
+        Parameters
+        ----------
+        key : str
+            Key the StepResult was cached with, see `get_key`.
+        work_dir_path : str, optional
+            Path to the current working directory of the step runner. Artifacts that pointed
+            into the working directory the StepResult was cached from are restored into,
+            and point into, this one instead.
+
+        Returns
+        -------
+        StepResult or None
+            StepResult cached with the given key or None if there is not one.
+        """
+        entry_dir_path = self.__get_entry_dir_path(key)
+        entry_file_path = os.path.join(entry_dir_path, StepResultCache.__ENTRY_FILE_NAME)
+        if not os.path.isfile(entry_file_path):
+            return None
+
+        try:
+            with open(entry_file_path, 'rb') as entry_file:
+                entry = pickle.load(entry_file)
+            if entry.get('format-version') != STEP_RESULT_CACHE_FORMAT_VERSION \
+                    or not isinstance(entry.get('step-result'), StepResult):
+                return None
+
+            step_result = entry['step-result']
+            cached_work_dir_path = entry.get('work-dir-path')
+            if work_dir_path and cached_work_dir_path and work_dir_path != cached_work_dir_path:
+                StepResultCache.__replace_path_prefix(
+                    step_result.artifacts,
+                    cached_work_dir_path,
+                    work_dir_path
+                )
+
+            for stored_name, path in entry['files']:
+                if work_dir_path and cached_work_dir_path:
+                    path = StepResultCache.__replace_path_prefix(
+                        path,
+                        cached_work_dir_path,
+                        work_dir_path
+                    )
+                StepResultCache.__restore_path(
+                    os.path.join(entry_dir_path, StepResultCache.__FILES_DIR_NAME, stored_name),
+                    path
+                )
+        except Exception as error: # pylint: disable=broad-except
+            print(f"WARNING: Ignoring unreadable cached step result ({key}): {error}")
+            return None
+
+        print(f"Reusing cached result of running step with the same inputs ({key})")
+        return step_result
+
+    def save(self, key, step_result, work_dir_path=None):
+        """Caches the given StepResult with the given key, with copies of the files and
+        directories its artifacts point to.
+
+        Parameters
+        ----------
+        key : str
+            Key to cache the StepResult with, see `get_key`.
+        step_result : StepResult
+            StepResult to cache.
+        work_dir_path : str, optional
+            Path to the current working directory of the step runner, see `load`.
+
+        Returns
+        -------
+        bool
+            True if the StepResult was cached.
+            False if it could not be.
+        """
+        entry_dir_path = self.__get_entry_dir_path(key)
+        tmp_entry_dir_path = f'{entry_dir_path}.{os.getpid()}.tmp'
+        try:
+            shutil.rmtree(tmp_entry_dir_path, ignore_errors=True)
+            files_dir_path = os.path.join(tmp_entry_dir_path, StepResultCache.__FILES_DIR_NAME)
+            os.makedirs(files_dir_path)
+
+            files = []
+            for path in StepResultCache.__get_artifact_paths(step_result.artifacts):
+                if StepResultCache.__is_same_or_parent_path(path, self.cache_dir_path):
+                    continue
+
+                stored_name = str(len(files))
+                if os.path.isdir(path):
+                    shutil.copytree(path, os.path.join(files_dir_path, stored_name), symlinks=True)
+                else:
+                    shutil.copy2(path, os.path.join(files_dir_path, stored_name))
+                files.append((stored_name, path))
+
+            with open(os.path.join(tmp_entry_dir_path, StepResultCache.__ENTRY_FILE_NAME), 'wb') \
+                    as entry_file:
+                pickle.dump(
+                    {
+                        'format-version': STEP_RESULT_CACHE_FORMAT_VERSION,
+                        'step-result': step_result,
+                        'work-dir-path': work_dir_path,
+                        'files': files
+                    },
+                    entry_file
+                )
+
+            # replace any existing entry as atomically as a directory can be
+            shutil.rmtree(entry_dir_path, ignore_errors=True)
+            os.replace(tmp_entry_dir_path, entry_dir_path)
+        except Exception as error: # pylint: disable=broad-except
+            shutil.rmtree(tmp_entry_dir_path, ignore_errors=True)
+            print(f"WARNING: Could not cache step result ({key}): {error}")
+            return False
+
+        return True
+
+    def __get_entry_dir_path(self, key):
+        return os.path.join(self.cache_dir_path, key[:2], key)
+
+    @staticmethod
+    def __get_artifact_paths(value):
+        """Gets the paths of the existing files and directories the given artifacts,
+        or artifact value, point to.
+        """
+        paths = []
+        if isinstance(value, dict):
+            for child_value in value.values():
+                paths += StepResultCache.__get_artifact_paths(child_value)
+        elif isinstance(value, (list, tuple)):
+            for child_value in value:
+                paths += StepResultCache.__get_artifact_paths(child_value)
+        elif isinstance(value, str) and value not in ('', os.curdir, os.pardir) \
+                and (os.path.isfile(value) or os.path.isdir(value)) \
+                and not StepResultCache.__is_same_or_parent_path(value, os.getcwd()):
+            paths.append(value)
+
+        return list(dict.fromkeys(paths))
+
+    @staticmethod
+    def __is_same_or_parent_path(path, child_path):
+        path = os.path.abspath(path)
+        child_path = os.path.abspath(child_path)
+        return child_path == path or child_path.startswith(path.rstrip(os.sep) + os.sep)
+
+    @staticmethod
+    def __replace_path_prefix(value, old_prefix, new_prefix):
+        """Replaces the given prefix of every path in the given value, in place for dictionaries
+        and lists.
+        """
+        if isinstance(value, dict):
+            for child_key, child_value in value.items():
+                value[child_key] = StepResultCache.__replace_path_prefix(
+                    child_value,
+                    old_prefix,
+                    new_prefix
+                )
+        elif isinstance(value, list):
+            for index, child_value in enumerate(value):
+                value[index] = StepResultCache.__replace_path_prefix(
+                    child_value,
+                    old_prefix,
+                    new_prefix
+                )
+        elif isinstance(value, str):
+            if value == old_prefix:
+                value = new_prefix
+            elif value.startswith(old_prefix.rstrip(os.sep) + os.sep):
+                value = new_prefix.rstrip(os.sep) + value[len(old_prefix.rstrip(os.sep)):]
+
+        return value
+
+    @staticmethod
+    def __restore_path(stored_path, path):
+        if os.path.isdir(stored_path):
+            shutil.rmtree(path, ignore_errors=True)
+            shutil.copytree(stored_path, path, symlinks=True)
+        else:
+            create_parent_dir(path)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            shutil.copy2(stored_path, tmp_path)
+            os.replace(tmp_path, path)
@@ -1,12 +1,86 @@
 """Constructs a given named StepImplementer using a given configuration, and runs it.
 """
-from ploigos_step_runner.step_implementer import StepImplementer
+import multiprocessing
+import multiprocessing.connection
+import os
+import pkgutil
+import shutil
+import sys
+import traceback
+from contextlib import ExitStack, redirect_stderr, redirect_stdout
+
+from ploigos_step_runner.step_implementer import (ConfigDumpVerbosity,
+                                                  DefaultSteps, StepImplementer)
 from ploigos_step_runner.config.config import Config
+from ploigos_step_runner.decryption_utils import DecryptionUtils
 from ploigos_step_runner.exceptions import StepRunnerException
+from ploigos_step_runner.utils.file import create_parent_dir, file_lock
+from ploigos_step_runner.utils.io import TextIOSelectiveObfuscator
+from ploigos_step_runner.utils.plugins import (get_step_implementer_plugins,
+                                               load_entry_point_reference)
 from ploigos_step_runner.utils.reflection import import_and_get_class
+from ploigos_step_runner.utils.tracing import (STATUS_CODE_ERROR,
+                                               STATUS_CODE_OK, Tracer,
+                                               get_active_tracer, start_span)
+
+
+class EnvironmentsSuccessPolicy:  # pylint: disable=too-few-public-methods
+    """Constants for when a step run in multiple environments is successful.
+
+    ALL_ENVIRONMENTS
+        The step is successful if it is successful in every environment.
+    ANY_ENVIRONMENT
+        The step is successful if it is successful in at least one environment.
+    """
+    ALL_ENVIRONMENTS = 'all'
+    ANY_ENVIRONMENT = 'any'
 
+    ALL = (ALL_ENVIRONMENTS, ANY_ENVIRONMENT)
 
-class StepRunner:
+
+class PreflightProblem:  # pylint: disable=too-few-public-methods
+    """A problem with the configuration of a sub step found by `StepRunner.preflight`.
+
+    Parameters
+    ----------
+    step_name : str
+        Name of the step the problem is with.
+    sub_step_name : str or None
+        Name of the sub step the problem is with, or None if it is with the step.
+    environment : str or None
+        Environment the problem is in, or None if not checked in a specific environment.
+    message : str
+        Description of the problem.
+    is_error : bool, optional
+        True if the step will fail because of the problem.
+        False if the step may fail because of the problem but it can not be determined
+        without running the steps before it.
+    """
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        step_name,
+        sub_step_name,
+        environment,
+        message,
+        is_error=True
+    ):
+        self.step_name = step_name
+        self.sub_step_name = sub_step_name
+        self.environment = environment
+        self.message = message
+        self.is_error = is_error
+
+    def __str__(self):
+        location = self.step_name
+        if self.sub_step_name:
+            location += f" {self.sub_step_name}"
+        if self.environment:
+            location += f" ({self.environment})"
+        return f"{location}: {self.message}"
+
+
+class StepRunner:  # pylint: disable=too-many-instance-attributes
     """Enables the running of arbitrary Ploigos steps via StepImplementers.
 
     Parameters
@@ -29,11 +103,33 @@ class StepRunner:
     work_dir_path : str, optional
         Path to the working folder for step_implementers for runtime files
         Default: step-runner-working
+    trace_file_path : str, optional
+        Path to the OTLP JSON lines file to append spans for each step run to.
+        If not given tracing is disabled.
+        See `ploigos_step_runner.utils.tracing`.
+    config_dump_verbosity : str, optional
+        How much of the step configuration each StepImplementer prints before running.
+        One of `ConfigDumpVerbosity.ALL`.
+        Default: ConfigDumpVerbosity.FULL
+    environments_success_policy : str, optional
+        When a step run in multiple environments is successful.
+        One of `EnvironmentsSuccessPolicy.ALL`.
+        Default: EnvironmentsSuccessPolicy.ALL_ENVIRONMENTS
+    max_concurrent_environments : int, optional
+        Maximum number of environments to run a step in at the same time when running it
+        in multiple environments.
+        Default: all of the environments.
+    step_result_cache_dir_path : str, optional
+        Path to the directory for StepImplementers that support it to cache the results of
+        running steps in, to reuse instead of running them again with the same inputs.
+        See `StepResultCache`.
+        Default: results are not cached.
 
     Raises
     ------
     ValueError
         If given config is not of expected type.
+        If given environments_success_policy is not one of `EnvironmentsSuccessPolicy.ALL`.
     AssertionError
         If given config contains any invalid configurations.
 
@@ -45,13 +141,27 @@ class StepRunner:
     """
 
     __DEFAULT_MODULE = 'ploigos_step_runner.step_implementers'
+    __NON_STEP_MODULES = ['shared']
+
+    __step_implementer_classes = {}
 
-    def __init__(
+    def __init__( # pylint: disable=too-many-arguments
             self,
             config,
             results_dir_path='step-runner-results',
             results_file_name='step-runner-results.yml',
-            work_dir_path='step-runner-working'):
+            work_dir_path='step-runner-working',
+            trace_file_path=None,
+            config_dump_verbosity=ConfigDumpVerbosity.FULL,
+            environments_success_policy=EnvironmentsSuccessPolicy.ALL_ENVIRONMENTS,
+            max_concurrent_environments=None,
+            step_result_cache_dir_path=None):
+
+        if environments_success_policy not in EnvironmentsSuccessPolicy.ALL:
+            raise ValueError(
+                f"Environments success policy ({environments_success_policy}) must be one of:"
+                f" {', '.join(EnvironmentsSuccessPolicy.ALL)}"
+            )
 
         if isinstance(config, Config):
             self.__config = config
@@ -61,6 +171,11 @@ class StepRunner:
         self.results_dir_path = results_dir_path
         self.results_file_name = results_file_name
         self.work_dir_path = work_dir_path
+        self.trace_file_path = trace_file_path
+        self.config_dump_verbosity = config_dump_verbosity
+        self.environments_success_policy = environments_success_policy
+        self.max_concurrent_environments = max_concurrent_environments
+        self.step_result_cache_dir_path = step_result_cache_dir_path
 
     @property
     def config(self):
@@ -80,9 +195,12 @@ class StepRunner:
         ----------
         step_name : str
             Ploigos step to run.
-        environment : str, optional
+        environment : str or list of str, optional
             Name of the environment the step is being run in. Used to determine environment
             specific global defaults and step configuration.
+            If a list of environment names, or a comma separated string of environment names,
+            the step is run in each of the environments concurrently, each in its own process,
+            and is successful according to the `environments_success_policy`.
 
         Raises
         ------
@@ -99,6 +217,53 @@ class StepRunner:
            False if step returned an error message
         """
 
+        environments = StepRunner.__get_environments(environment)
+
+        with ExitStack() as exit_stack:
+            if self.trace_file_path:
+                tracer = exit_stack.enter_context(Tracer.from_context(self.results_dir_path))
+                exit_stack.callback(tracer.write, self.trace_file_path)
+
+            with start_span(
+                step_name,
+                attributes={
+                    'psr.step.name': step_name,
+                    'psr.environment': ','.join(environments) if environments else None
+                }
+            ) as span:
+                if len(environments) > 1:
+                    success = self.__run_sub_steps_in_environments(step_name, environments)
+                else:
+                    success = self.__run_sub_steps(
+                        step_name,
+                        environments[0] if environments else None
+                    )
+
+                if span is not None:
+                    span.set_attribute('psr.step.success', success)
+                    if success:
+                        span.set_status(STATUS_CODE_OK)
+                    else:
+                        span.set_status(STATUS_CODE_ERROR, f"Step {step_name} not successful")
+
+        return success
+
+    def __run_sub_steps(self, step_name, environment):
+        """Runs each of the sub steps of the given step, stopping at the first failure.
+
+        Parameters
+        ----------
+        step_name : str
+            Ploigos step to run the sub steps of.
+        environment : str
+            Name of the environment the step is being run in.
+
+        Returns
+        -------
+        Bool
+           True if all sub steps completed successfully
+           False if a sub step returned an error message
+        """
         sub_step_configs = self.config.get_sub_step_configs(step_name)
         assert len(sub_step_configs) != 0, \
             f"Can not run step ({step_name}) because no step configuration provided."
@@ -117,7 +282,9 @@ class StepRunner:
                 results_file_name=self.results_file_name,
                 work_dir_path=self.work_dir_path,
                 config=sub_step_config,
-                environment=environment
+                environment=environment,
+                config_dump_verbosity=self.config_dump_verbosity,
+                step_result_cache_dir_path=self.step_result_cache_dir_path
             )
 
             # run the step
@@ -126,10 +293,386 @@ class StepRunner:
 
         return True
 
+    def __run_sub_steps_in_environments(self, step_name, environments):
+        """Runs the sub steps of the given step in each of the given environments concurrently,
+        each in its own process.
+
+        Notes
+        -----
+        The output of each environment is written, obfuscated, to a log file in the working
+        directory of the step for that environment, and printed once the step finishes
+        running in that environment so that the output of the environments is not interleaved.
+
+        Parameters
+        ----------
+        step_name : str
+            Ploigos step to run the sub steps of.
+        environments : list of str
+            Names of the environments to run the step in.
+
+        Returns
+        -------
+        Bool
+           True if the step is successful in the environments according to the
+               `environments_success_policy`.
+           False otherwise.
+        """
+        # fail fast, before starting any environments, if the step can not be run
+        sub_step_configs = self.config.get_sub_step_configs(step_name)
+        assert len(sub_step_configs) != 0, \
+            f"Can not run step ({step_name}) because no step configuration provided."
+        for sub_step_config in sub_step_configs:
+            StepRunner.__get_step_implementer_class(
+                step_name,
+                sub_step_config.sub_step_implementer_name
+            )
+
+        print(f"Run step ({step_name}) in environments ({', '.join(environments)})")
+
+        # NOTE: fork so the processes inherit the loaded configuration and decryptors
+        process_context = multiprocessing.get_context('fork')
+        max_concurrent_environments = self.max_concurrent_environments or len(environments)
+        pending_environments = list(environments)
+        running_processes = {}
+        environment_successes = {}
+        while pending_environments or running_processes:
+            while pending_environments and len(running_processes) < max_concurrent_environments:
+                environment = pending_environments.pop(0)
+                log_file_path = self.get_environment_log_file_path(step_name, environment)
+
+                # flush so buffered output is not also written by the forked process
+                sys.stdout.flush()
+                sys.stderr.flush()
+                process = process_context.Process(
+                    target=self.__run_sub_steps_in_environment_process,
+                    args=(step_name, environment, log_file_path),
+                    name=f"psr-{step_name}-{environment}"
+                )
+                process.start()
+                running_processes[process.sentinel] = (environment, process, log_file_path)
+
+            for sentinel in multiprocessing.connection.wait(list(running_processes)):
+                environment, process, log_file_path = running_processes.pop(sentinel)
+                process.join()
+                environment_successes[environment] = process.exitcode == 0
+
+                print(
+                    f"Step ({step_name}) in environment ({environment})"
+                    f" {'succeeded' if environment_successes[environment] else 'failed'}:"
+                )
+                with open(log_file_path) as log_file:
+                    shutil.copyfileobj(log_file, sys.stdout)
+                sys.stdout.flush()
+
+        print(f"Step ({step_name}) results by environment:")
+        for environment in environments:
+            print(
+                f"  {environment}: "
+                f"{'succeeded' if environment_successes[environment] else 'failed'}"
+            )
+
+        if self.environments_success_policy == EnvironmentsSuccessPolicy.ANY_ENVIRONMENT:
+            return any(environment_successes.values())
+
+        return all(environment_successes.values())
+
+    def __run_sub_steps_in_environment_process(self, step_name, environment, log_file_path):
+        """Runs the sub steps of the given step in the given environment, as the target of a
+        forked process, with the output written, obfuscated, to the given log file.
+
+        Exits the process with 0 if all sub steps completed successfully, 1 otherwise.
+        """
+        success = False
+        create_parent_dir(log_file_path)
+        with open(log_file_path, 'w') as log_file:
+            obfuscated_log = TextIOSelectiveObfuscator(log_file)
+            DecryptionUtils.register_obfuscation_stream(obfuscated_log)
+
+            with redirect_stdout(obfuscated_log), redirect_stderr(obfuscated_log):
+                try:
+                    with start_span(
+                        f"{step_name} {environment}",
+                        attributes={
+                            'psr.step.name': step_name,
+                            'psr.environment': environment
+                        }
+                    ) as span:
+                        success = self.__run_sub_steps(step_name, environment)
+
+                        if span is not None:
+                            span.set_attribute('psr.step.success', success)
+                            span.set_status(STATUS_CODE_OK if success else STATUS_CODE_ERROR)
+                except Exception as error: # pylint: disable=broad-except
+                    print(f"Fatal error calling step ({step_name}): {str(error)}")
+                    traceback.print_exc(file=sys.stdout)
+
+        # the spans of this process are written by this process, the parent writes its own
+        tracer = get_active_tracer()
+        if tracer is not None and self.trace_file_path:
+            with file_lock(f'{self.trace_file_path}.lock'):
+                tracer.write(self.trace_file_path)
+
+        sys.exit(0 if success else 1)
+
+    def preflight(self, step_names=None, environment=None):
+        """Statically checks, in one pass and without running any steps or tools, that every
+        configured sub step can be loaded and that each of its required configuration or
+        previous step result artifact keys is either configured or declared as a result
+        artifact by a sub step that runs before it.
+
+        Notes
+        -----
+        No configuration values are decrypted and no step results are read, so required keys
+        given by the results of steps run before this configuration was loaded are reported.
+
+        Sub steps are checked in the given order of the steps, and in configuration order
+        within each step. Keys that may only be given by a previous sub step that does not
+        declare its result artifacts (see `StepImplementer.result_artifact_keys`) are reported
+        as problems that are not errors.
+
+        Parameters
+        ----------
+        step_names : list of str, optional
+            Names of the steps to check, in the order they run.
+            Default: the configured steps in the order of `DefaultSteps.ALL`, followed by any
+            other configured steps in configuration order.
+        environment : str or list of str, optional
+            Environment, list of environments, or comma separated string of environments to
+            check the steps in.
+            Default: every environment in the configuration, or no environment if there are none.
+
+        Returns
+        -------
+        list of PreflightProblem
+            Problems found with the configuration of the steps, in every environment checked.
+        """
+        if not step_names:
+            step_names = self.__get_workflow_step_names()
+        environments = StepRunner.__get_environments(environment) or \
+            self.__get_config_environments() or [None]
+
+        problems = []
+        for env in environments:
+            problems += self.__preflight_environment(step_names, env)
+
+        return problems
+
+    def __preflight_environment(self, step_names, environment):
+        """Statically checks the given steps in the given environment.
+
+        See Also
+        --------
+        preflight
+
+        Returns
+        -------
+        list of PreflightProblem
+            Problems found with the configuration of the steps in the given environment.
+        """
+        problems = []
+        previous_step_result_artifact_keys = set()
+        undeclared_sub_steps = []
+        for step_name in step_names:
+            sub_step_configs = self.config.get_sub_step_configs(step_name)
+            if not sub_step_configs:
+                problems.append(PreflightProblem(
+                    step_name,
+                    None,
+                    environment,
+                    "no step configuration provided"
+                ))
+                continue
+
+            for sub_step_config in sub_step_configs:
+                sub_step_name = sub_step_config.sub_step_name
+                try:
+                    step_implementer_class = StepRunner.__get_step_implementer_class(
+                        step_name,
+                        sub_step_config.sub_step_implementer_name
+                    )
+                    sub_step = step_implementer_class(
+                        results_dir_path=self.results_dir_path,
+                        results_file_name=self.results_file_name,
+                        work_dir_path=self.work_dir_path,
+                        config=sub_step_config,
+                        environment=environment,
+                        config_dump_verbosity=self.config_dump_verbosity
+                    )
+                    missing_keys = sub_step.get_preflight_missing_keys(
+                        previous_step_result_artifact_keys
+                    )
+                    result_artifact_keys = step_implementer_class.result_artifact_keys()
+                except Exception as error: # pylint: disable=broad-except
+                    problems.append(PreflightProblem(
+                        step_name,
+                        sub_step_name,
+                        environment,
+                        f"can not load step implementer: {error}"
+                    ))
+                    undeclared_sub_steps.append(f"{step_name} {sub_step_name}")
+                    continue
+
+                if missing_keys and undeclared_sub_steps:
+                    problems.append(PreflightProblem(
+                        step_name,
+                        sub_step_name,
+                        environment,
+                        "required step configuration or previous step result artifact keys"
+                        f" that are not configured, unless given by a sub step that does not"
+                        f" declare its result artifacts ({', '.join(undeclared_sub_steps)}):"
+                        f" {missing_keys}",
+                        is_error=False
+                    ))
+                elif missing_keys:
+                    problems.append(PreflightProblem(
+                        step_name,
+                        sub_step_name,
+                        environment,
+                        "missing required step configuration or previous step result artifact"
+                        f" keys: {missing_keys}"
+                    ))
+
+                if result_artifact_keys is None:
+                    undeclared_sub_steps.append(f"{step_name} {sub_step_name}")
+                else:
+                    previous_step_result_artifact_keys.update(result_artifact_keys)
+
+        return problems
+
+    def __get_workflow_step_names(self):
+        """
+        Returns
+        -------
+        list of str
+            Names of the configured steps in the order of `DefaultSteps.ALL`, followed by any
+            other configured steps in configuration order.
+        """
+        configured_step_names = list(self.config.step_configs)
+        return [
+            step_name for step_name in DefaultSteps.ALL if step_name in configured_step_names
+        ] + [
+            step_name for step_name in configured_step_names if step_name not in DefaultSteps.ALL
+        ]
+
+    def __get_config_environments(self):
+        """
+        Returns
+        -------
+        list of str
+            Names of every environment given global environment defaults or
+            sub step environment configuration.
+        """
+        environments = list(self.config.global_environment_defaults)
+        for step_config in self.config.step_configs.values():
+            for sub_step_config in step_config.sub_steps:
+                for environment in sub_step_config.sub_step_env_config:
+                    if environment not in environments:
+                        environments.append(environment)
+
+        return environments
+
+    def get_environment_log_file_path(self, step_name, environment):
+        """Gets the path to the file the output of running the given step in the given
+        environment is written to when running the step in multiple environments.
+
+        Parameters
+        ----------
+        step_name : str
+            Ploigos step.
+        environment : str
+            Name of the environment.
+
+        Returns
+        -------
+        str
+            Path to the log file, in the working directory of the step for the environment.
+            EG: step-runner-working/deploy/PROD/deploy.log
+        """
+        return os.path.join(self.work_dir_path, step_name, environment, f'{step_name}.log')
+
+    @staticmethod
+    def __get_environments(environment):
+        """Gets the list of environments to run a step in.
+
+        Parameters
+        ----------
+        environment : str, list of str, or None
+            Name of the environment, list of environment names,
+            or comma separated string of environment names.
+
+        Returns
+        -------
+        list of str
+            Unique environment names, in the given order,
+            or an empty list if no environment given.
+        """
+        if not environment:
+            return []
+
+        if isinstance(environment, str):
+            environment = environment.split(',')
+
+        environments = []
+        for name in environment:
+            name = name.strip()
+            if name and name not in environments:
+                environments.append(name)
+
+        return environments
+
+    @staticmethod
+    def get_step_implementers():
+        """Gets the names of the built in and plugin StepImplementers of every step without
+        importing any of them.
+
+        Returns
+        -------
+        dict
+            Step name to dictionary of StepImplementer name to the module and class name of
+            built in StepImplementers or the entry point reference (`module:Class`)
+            of plugin StepImplementers.
+
+        See Also
+        --------
+        ploigos_step_runner.utils.plugins
+        """
+        step_implementers = {}
+
+        default_module = __import__(StepRunner.__DEFAULT_MODULE, fromlist=['__path__'])
+        for module_info in pkgutil.iter_modules(default_module.__path__):
+            if module_info.name in StepRunner.__NON_STEP_MODULES:
+                continue
+
+            # NOTE: step implementer packages only import their StepImplementers on first use
+            module_name = f"{StepRunner.__DEFAULT_MODULE}.{module_info.name}"
+            step_module = __import__(module_name, fromlist=['__all__'])
+            step_implementers[module_info.name.replace('_', '-')] = {
+                step_implementer_name: f"{module_name}.{step_implementer_name}"
+                for step_implementer_name in getattr(step_module, '__all__', [])
+            }
+
+        for step_name, plugins in get_step_implementer_plugins().items():
+            for step_implementer_name, reference in plugins.items():
+                step_implementers.setdefault(step_name, {}).setdefault(
+                    step_implementer_name,
+                    reference
+                )
+
+        return step_implementers
+
     @staticmethod
     def __get_step_implementer_class(step_name, step_implementer_name):
         """Given a step name and a step implementer name dynamically loads the Class.
 
+        Notes
+        -----
+        Loaded classes are cached for the life of the process.
+
+        If the given step implementer name is a short name that is not a built in
+        StepImplementer of the given step then it is loaded from the StepImplementer plugin
+        registered for the step with that name, if there is one.
+        See `ploigos_step_runner.utils.plugins`.
+
         Parameters
         ----------
         step_name : str
@@ -153,15 +696,29 @@ class StepRunner:
             If could not find class to load
             If loaded class is not a subclass of StepImplementer
         """
+        clazz = StepRunner.__step_implementer_classes.get((step_name, step_implementer_name))
+        if clazz is not None:
+            return clazz
+
         parts = step_implementer_name.split('.')
         class_name = parts.pop()
         module_name = '.'.join(parts)
 
-        if not module_name:
+        if module_name:
+            clazz = import_and_get_class(module_name, class_name)
+        else:
             step_module_part = step_name.replace('-', '_')
             module_name = f"{StepRunner.__DEFAULT_MODULE}.{step_module_part}"
+            clazz = import_and_get_class(module_name, class_name)
+
+            if not clazz:
+                plugin_reference = get_step_implementer_plugins().get(step_name, {}).get(
+                    class_name
+                )
+                if plugin_reference:
+                    module_name = plugin_reference.partition(':')[0]
+                    clazz = load_entry_point_reference(plugin_reference)
 
-        clazz = import_and_get_class(module_name, class_name)
         if not clazz:
             raise StepRunnerException(
                 f"Could not dynamically load step ({step_name}) step implementer" +
@@ -175,4 +732,5 @@ class StepRunner:
                 f" class name ({class_name}), and dynamically loads as class ({clazz})" +
                 f" which is not a subclass of required parent class ({StepImplementer}).")
 
+        StepRunner.__step_implementer_classes[(step_name, step_implementer_name)] = clazz
         return clazz
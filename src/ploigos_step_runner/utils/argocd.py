@@ -0,0 +1,754 @@
+"""Shared utils for using ArgoCD.
+
+Signing into ArgoCD, and checking if a cluster is registered with it, are round trips to the
+ArgoCD API, so a signed in ArgoCD CLI session is persisted to an ArgoCD CLI config file per
+ArgoCD API and user and reused, by passing the `config_args` of the session to every `argocd`
+command, until its auth token expires or it is signed into with a different password.
+An auth token can also be revoked before it expires, so callers should sign in again if
+ArgoCD rejects it, see `ArgoCDSession.is_auth_error`.
+
+Rather than blocking on `argocd app wait` the `ArgoCDAppSyncWaiter` polls the status of an
+ArgoCD Application, through either the ArgoCD CLI (`ArgoCDCLIAppClient`) or the ArgoCD API
+(`ArgoCDAPIAppClient`), with exponential backoff and jitter, and reports the time spent in each
+phase of the sync.
+
+Examples
+--------
+>>> argocd_session = ArgoCDSession(
+...     sessions_dir='/tmp/step-runner-working/argocd',
+...     argocd_api='argocd.example.xyz',
+...     username='admin'
+... )
+>>> argocd_session.sign_in(password='nope')
+>>> run_command(sh.argocd.app.list, *argocd_session.config_args, _out=sys.stdout)
+>>> argocd_app_client = ArgoCDCLIAppClient(config_args=argocd_session.config_args)
+>>> argocd_app_client.sync('fruit-app')
+>>> ArgoCDAppSyncWaiter(argocd_app_client).wait('fruit-app', timeout_seconds=60)
+{'sync': 4.2, 'progressing': 10.9, 'healthy': 15.1}
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import io
+import json
+import os
+import random
+import ssl
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from abc import ABC, abstractmethod
+
+import sh
+from ploigos_step_runner.utils.commands import run_command
+from ploigos_step_runner.utils.file import file_lock
+from ploigos_step_runner.utils.tracing import SPAN_KIND_CLIENT, start_span
+from ploigos_step_runner.utils.yaml import yaml_safe_load
+
+# Minimum number of seconds an auth token must still be valid for to be reused, so that it
+# does not expire part way through a deploy.
+SESSION_EXPIRATION_MARGIN_SECONDS = 300
+
+# ArgoCD Application sync phases, in the order an Application goes through them.
+SYNC_PHASE = 'sync'
+PROGRESSING_PHASE = 'progressing'
+HEALTHY_PHASE = 'healthy'
+
+# ArgoCD operation phases that mean the operation is still running or has failed.
+OPERATION_RUNNING_PHASES = ('Running', 'Terminating')
+OPERATION_FAILED_PHASES = ('Failed', 'Error')
+
+class ArgoCDSession:
+    """ArgoCD CLI session for a given ArgoCD API and user, persisted to an ArgoCD CLI config
+    file so it can be reused by later deploys, that sign in with the same password,
+    until its auth token expires.
+
+    Parameters
+    ----------
+    sessions_dir : str
+        Directory to persist the ArgoCD CLI config files of the sessions in.
+    argocd_api : str
+        The ArgoCD API endpoint.
+    username : str
+        Username for accessing the ArgoCD API.
+    insecure : bool, optional
+        `True` to ignore TLS issues when signing in to ArgoCD.
+
+    Attributes
+    ----------
+    __config_file : str
+        Path to the ArgoCD CLI config file of this session.
+    __password_hash_file : str
+        Path to the file the salted hash of the password this session was signed into with
+        is persisted to, so that the session is not reused with a different password.
+    """
+
+    # Messages of ArgoCD errors for rejected auth tokens, ex:
+    # rpc error: code = Unauthenticated desc = invalid session: token has invalid claims
+    __AUTH_ERROR_MESSAGES = ('code = Unauthenticated', 'invalid session')
+
+    def __init__(self, sessions_dir, argocd_api, username, insecure=False):
+        self.__argocd_api = argocd_api
+        self.__username = username
+        self.__insecure = insecure
+
+        session_key = hashlib.sha256(f"{argocd_api}\n{username}".encode('utf-8')).hexdigest()
+        self.__config_file = os.path.join(sessions_dir, session_key, 'config')
+        self.__password_hash_file = os.path.join(sessions_dir, session_key, 'password-hash')
+
+    @property
+    def config_file(self):
+        """
+        Returns
+        -------
+        str
+            Path to the ArgoCD CLI config file of this session.
+        """
+        return self.__config_file
+
+    @property
+    def config_args(self):
+        """
+        Returns
+        -------
+        list of str
+            Arguments to pass to `argocd` commands to run them in this session.
+        """
+        return ['--config', self.__config_file]
+
+    @property
+    def argocd_api(self):
+        """
+        Returns
+        -------
+        str
+            The ArgoCD API endpoint of this session.
+        """
+        return self.__argocd_api
+
+    @property
+    def insecure(self):
+        """
+        Returns
+        -------
+        bool
+            `True` if TLS issues are ignored when connecting to the ArgoCD API.
+        """
+        return self.__insecure
+
+    def get_auth_token(self):
+        """Gets the auth token of this session, without contacting ArgoCD.
+
+        Returns
+        -------
+        str or None
+            The auth token of this session or
+            None if there is no readable auth token for this session.
+        """
+        try:
+            with open(self.__config_file) as config_file:
+                config = yaml_safe_load(config_file)
+
+            contexts = {context['name']: context for context in config['contexts']}
+            users = {user['name']: user for user in config['users']}
+            auth_token = users[contexts[config['current-context']]['user']]['auth-token']
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return None
+
+        if not isinstance(auth_token, str):
+            return None
+
+        return auth_token
+
+    def get_auth_token_expiration(self):
+        """Gets when the auth token of this session expires, without contacting ArgoCD.
+
+        Returns
+        -------
+        float or None
+            Time, in seconds since the epoch, that the auth token of this session expires,
+            `float('inf')` if the auth token does not expire, or
+            None if there is no readable auth token for this session.
+        """
+        auth_token = self.get_auth_token()
+        if auth_token is None:
+            return None
+
+        try:
+            # the auth token is a JWT, its payload is the second segment
+            payload = auth_token.split('.')[1]
+            claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        except (ValueError, IndexError, binascii.Error):
+            return None
+
+        if not isinstance(claims, dict):
+            return None
+
+        return float(claims.get('exp', float('inf')))
+
+    def is_signed_in(self, margin_seconds=SESSION_EXPIRATION_MARGIN_SECONDS):
+        """Determine if this session has an auth token that is valid for at least the given
+        number of seconds, without contacting ArgoCD.
+
+        Parameters
+        ----------
+        margin_seconds : int, optional
+            Minimum number of seconds the auth token must still be valid for.
+
+        Returns
+        -------
+        bool
+            True if this session has an auth token valid for at least `margin_seconds`.
+            False otherwise.
+        """
+        expiration = self.get_auth_token_expiration()
+        return expiration is not None and expiration - time.time() >= margin_seconds
+
+    def sign_in(self, password, force=False):
+        """Signs into ArgoCD with the ArgoCD CLI, unless this session is already signed in
+        with the given password.
+
+        Parameters
+        ----------
+        password : str
+            Password for accessing the ArgoCD API.
+        force : bool, optional
+            `True` to sign in even if this session is already signed in,
+            ex: because ArgoCD rejected its auth token.
+
+        Returns
+        -------
+        bool
+            True if signed into ArgoCD.
+            False if reusing the existing auth token of this session.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If error signing into ArgoCD.
+        """
+        os.makedirs(os.path.dirname(self.__config_file), mode=0o700, exist_ok=True)
+
+        # serialize signing in, ex: when deploying to multiple environments concurrently
+        with file_lock(f'{self.__config_file}.lock'):
+            if not force and self.is_signed_in() and self.__is_password_hash(password):
+                print(
+                    f"Reusing ArgoCD session for user ({self.__username})"
+                    f" to ({self.__argocd_api})"
+                )
+                return False
+
+            insecure_flag = None
+            if self.__insecure:
+                insecure_flag = '--insecure'
+
+            run_command(
+                sh.argocd.login, # pylint: disable=no-member
+                *self.config_args,
+                self.__argocd_api,
+                f'--username={self.__username}',
+                f'--password={password}',
+                insecure_flag,
+                _out=sys.stdout,
+                _err=sys.stderr
+            )
+            self.__write_password_hash(password)
+
+        return True
+
+    @staticmethod
+    def is_auth_error(error):
+        """Determine if an error, or any error it was raised from, is ArgoCD rejecting the
+        auth token of a session, ex: because it was revoked before it expired.
+
+        Parameters
+        ----------
+        error : BaseException
+            Error to check.
+
+        Returns
+        -------
+        bool
+            True if the error is ArgoCD rejecting an auth token.
+            False otherwise.
+        """
+        while error is not None:
+            if isinstance(error, urllib.error.HTTPError) and error.code == 401:
+                return True
+
+            if isinstance(error, sh.ErrorReturnCode):
+                stderr = error.stderr.decode('utf-8', errors='replace')
+                if any(message in stderr for message in ArgoCDSession.__AUTH_ERROR_MESSAGES):
+                    return True
+
+            error = error.__cause__
+
+        return False
+
+    def is_cluster_registered(self, server):
+        """Determine if a cluster is registered with ArgoCD.
+
+        Parameters
+        ----------
+        server : str
+            API server URL of the cluster.
+
+        Returns
+        -------
+        bool
+            True if the cluster is registered with ArgoCD.
+            False otherwise.
+        """
+        try:
+            run_command(
+                sh.argocd.cluster.get, # pylint: disable=no-member
+                *self.config_args,
+                server,
+                '--output', 'server'
+            )
+        except sh.ErrorReturnCode:
+            return False
+
+        return True
+
+    def __get_password_hash(self, password, salt):
+        return hashlib.sha256(
+            f"{salt}\n{self.__username}\n{password}".encode('utf-8')
+        ).hexdigest()
+
+    def __is_password_hash(self, password):
+        """Determine if the given password is the one this session was signed into with.
+        """
+        try:
+            with open(self.__password_hash_file, encoding='utf-8') as password_hash_file:
+                salt, password_hash = password_hash_file.read().strip().split(':')
+        except (OSError, ValueError):
+            return False
+
+        return hmac.compare_digest(self.__get_password_hash(password, salt), password_hash)
+
+    def __write_password_hash(self, password):
+        """Persists a salted hash of the password this session was signed into with,
+        readable only by the current user.
+        """
+        salt = os.urandom(16).hex()
+        password_hash_fd = os.open(
+            self.__password_hash_file,
+            os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+            0o600
+        )
+        with os.fdopen(password_hash_fd, 'w', encoding='utf-8') as password_hash_file:
+            password_hash_file.write(f"{salt}:{self.__get_password_hash(password, salt)}")
+
+class ArgoCDAppStatus:
+    """Status of an ArgoCD Application.
+
+    Parameters
+    ----------
+    sync_status : str or None
+        Sync status of the Application, ex: 'Synced', 'OutOfSync'.
+    health_status : str or None
+        Health status of the Application, ex: 'Healthy', 'Progressing', 'Degraded'.
+    operation_phase : str or None
+        Phase of the last operation on the Application, ex: 'Running', 'Succeeded', 'Failed'.
+    operation_message : str or None
+        Message of the last operation on the Application.
+    operation_pending : bool
+        `True` if an operation has been requested on the Application and not yet completed.
+    """
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        sync_status,
+        health_status,
+        operation_phase=None,
+        operation_message=None,
+        operation_pending=False
+    ):
+        self.sync_status = sync_status
+        self.health_status = health_status
+        self.operation_phase = operation_phase
+        self.operation_message = operation_message
+        self.operation_pending = operation_pending
+
+    @staticmethod
+    def from_app(app):
+        """Gets the status of an ArgoCD Application from its resource.
+
+        Parameters
+        ----------
+        app : dict
+            ArgoCD Application resource, as returned by `argocd app get --output json`
+            or the ArgoCD API.
+
+        Returns
+        -------
+        ArgoCDAppStatus
+            Status of the given ArgoCD Application.
+        """
+        status = app.get('status') or {}
+        operation_state = status.get('operationState') or {}
+        return ArgoCDAppStatus(
+            sync_status=(status.get('sync') or {}).get('status'),
+            health_status=(status.get('health') or {}).get('status'),
+            operation_phase=operation_state.get('phase'),
+            operation_message=operation_state.get('message'),
+            operation_pending=bool(app.get('operation'))
+        )
+
+    @property
+    def phase(self):
+        """
+        Returns
+        -------
+        str
+            `SYNC_PHASE` while a sync operation is pending or running,
+            `PROGRESSING_PHASE` once synced while the Application is not healthy, or
+            `HEALTHY_PHASE` once synced and the Application is healthy.
+        """
+        if self.operation_pending or self.operation_phase in OPERATION_RUNNING_PHASES:
+            return SYNC_PHASE
+
+        if self.health_status != 'Healthy':
+            return PROGRESSING_PHASE
+
+        return HEALTHY_PHASE
+
+    @property
+    def is_failed(self):
+        """
+        Returns
+        -------
+        bool
+            True if the last operation on the Application failed and none are pending.
+            False otherwise.
+        """
+        return not self.operation_pending and self.operation_phase in OPERATION_FAILED_PHASES
+
+    def __str__(self):
+        return f"sync status ({self.sync_status}), health status ({self.health_status})," \
+            f" operation phase ({self.operation_phase})"
+
+class ArgoCDAppClient(ABC):
+    """Client for syncing ArgoCD Applications and getting their status.
+    """
+
+    @abstractmethod
+    def sync(self, app_name):
+        """Requests a sync of an ArgoCD Application, pruning resources no longer defined,
+        without waiting for the sync.
+
+        Parameters
+        ----------
+        app_name : str
+            Name of the ArgoCD Application to sync.
+        """
+
+    @abstractmethod
+    def get_app(self, app_name):
+        """Gets an ArgoCD Application.
+
+        Parameters
+        ----------
+        app_name : str
+            Name of the ArgoCD Application to get.
+
+        Returns
+        -------
+        dict
+            ArgoCD Application resource.
+        """
+
+    def get_status(self, app_name):
+        """Gets the status of an ArgoCD Application.
+
+        Parameters
+        ----------
+        app_name : str
+            Name of the ArgoCD Application to get the status of.
+
+        Returns
+        -------
+        ArgoCDAppStatus
+            Status of the ArgoCD Application.
+        """
+        return ArgoCDAppStatus.from_app(self.get_app(app_name))
+
+class ArgoCDCLIAppClient(ArgoCDAppClient):
+    """`ArgoCDAppClient` using the ArgoCD CLI.
+
+    Parameters
+    ----------
+    config_args : list of str, optional
+        Arguments to run `argocd` commands in a session with,
+        ex: `ArgoCDSession.config_args`.
+
+    Raises
+    ------
+    sh.ErrorReturnCode
+        If an `argocd` command fails.
+    RuntimeError
+        If the output of `argocd app get` is not an ArgoCD Application.
+    """
+
+    def __init__(self, config_args=None):
+        self.__config_args = config_args if config_args else []
+
+    def sync(self, app_name):
+        run_command(
+            sh.argocd.app.sync, # pylint: disable=no-member
+            *self.__config_args,
+            '--prune',
+            '--async',
+            app_name,
+            _out=sys.stdout,
+            _err=sys.stderr
+        )
+
+    def get_app(self, app_name):
+        out = io.StringIO()
+        run_command(
+            sh.argocd.app.get, # pylint: disable=no-member
+            *self.__config_args,
+            app_name,
+            '--output', 'json',
+            _out=out,
+            _err=sys.stderr
+        )
+
+        try:
+            app = json.loads(out.getvalue())
+        except ValueError as error:
+            raise RuntimeError(
+                f"Error parsing ArgoCD Application ({app_name}): {error}"
+            ) from error
+
+        if not isinstance(app, dict):
+            raise RuntimeError(f"Error parsing ArgoCD Application ({app_name}): not an object")
+
+        return app
+
+class ArgoCDAPIAppClient(ArgoCDAppClient):
+    """`ArgoCDAppClient` using the ArgoCD API directly, so that polling the status of an
+    ArgoCD Application does not start an `argocd` process per poll.
+
+    Parameters
+    ----------
+    argocd_api : str
+        The ArgoCD API endpoint, with or without a scheme, ex: 'argocd.example.xyz'.
+        Defaults to https if no scheme is given.
+    auth_token : str
+        Auth token to access the ArgoCD API with, ex: `ArgoCDSession.get_auth_token()`.
+    insecure : bool, optional
+        `True` to ignore TLS issues when connecting to the ArgoCD API.
+    timeout_seconds : float, optional
+        Number of seconds to wait for each response from the ArgoCD API.
+
+    Raises
+    ------
+    RuntimeError
+        If a request to the ArgoCD API fails.
+    """
+
+    def __init__(self, argocd_api, auth_token, insecure=False, timeout_seconds=30):
+        if '://' not in argocd_api:
+            argocd_api = f'https://{argocd_api}'
+        self.__argocd_api_url = argocd_api.rstrip('/')
+        self.__auth_token = auth_token
+        self.__timeout_seconds = timeout_seconds
+
+        self.__ssl_context = None
+        if insecure:
+            self.__ssl_context = ssl.create_default_context()
+            self.__ssl_context.check_hostname = False
+            self.__ssl_context.verify_mode = ssl.CERT_NONE
+
+    def sync(self, app_name):
+        self.__request('POST', f'{self.__get_app_path(app_name)}/sync', {'prune': True})
+
+    def get_app(self, app_name):
+        return self.__request('GET', self.__get_app_path(app_name))
+
+    @staticmethod
+    def __get_app_path(app_name):
+        return f"/api/v1/applications/{urllib.parse.quote(app_name, safe='')}"
+
+    def __request(self, method, path, body=None):
+        url = f'{self.__argocd_api_url}{path}'
+        data = None
+        headers = {
+            'Accept': 'application/json',
+            'Authorization': f'Bearer {self.__auth_token}'
+        }
+        if body is not None:
+            data = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        request = urllib.request.Request(url, data=data, headers=headers, method=method)
+        with start_span(
+            f'ArgoCD API {method}',
+            kind=SPAN_KIND_CLIENT,
+            attributes={'http.method': method, 'http.url': url}
+        ):
+            try:
+                with urllib.request.urlopen(
+                    request,
+                    timeout=self.__timeout_seconds,
+                    context=self.__ssl_context
+                ) as response:
+                    response_body = response.read()
+            except urllib.error.HTTPError as error:
+                raise RuntimeError(
+                    f"Error requesting ArgoCD API ({method} {url}): {error.code} {error.reason}:"
+                    f" {error.read().decode('utf-8', errors='replace')}"
+                ) from error
+            except (urllib.error.URLError, OSError) as error:
+                raise RuntimeError(
+                    f"Error requesting ArgoCD API ({method} {url}): {error}"
+                ) from error
+
+        try:
+            return json.loads(response_body) if response_body else {}
+        except ValueError as error:
+            raise RuntimeError(
+                f"Error parsing ArgoCD API response ({method} {url}): {error}"
+            ) from error
+
+class ArgoCDAppSyncWaiter:
+    """Waits for an ArgoCD Application to be synced and healthy by polling its status,
+    rather than blocking on `argocd app wait`, and reports the time spent in each phase.
+
+    The time between polls starts at `poll_initial_seconds` and is multiplied by
+    `poll_backoff_factor` after every poll, up to `poll_max_seconds`, so that fast syncs are
+    noticed quickly without polling slow ones often. It is reset whenever the Application
+    moves to the next phase, and every wait is jittered between half and all of it so that
+    concurrent deploys do not poll ArgoCD in lock step.
+
+    Parameters
+    ----------
+    app_client : ArgoCDAppClient
+        Client to get the status of ArgoCD Applications with.
+    poll_initial_seconds : float, optional
+        Number of seconds to wait between the first polls of each phase.
+    poll_max_seconds : float, optional
+        Maximum number of seconds to wait between polls.
+    poll_backoff_factor : float, optional
+        Factor to multiply the number of seconds between polls by after every poll.
+    clock : callable, optional
+        Function returning the current time in seconds, for testing.
+    sleep : callable, optional
+        Function to wait the given number of seconds with, for testing.
+    rng : random.Random, optional
+        Random number generator to jitter the wait between polls with, for testing.
+    """
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        app_client,
+        poll_initial_seconds=1.0,
+        poll_max_seconds=10.0,
+        poll_backoff_factor=2.0,
+        clock=time.monotonic,
+        sleep=time.sleep,
+        rng=None
+    ):
+        if poll_initial_seconds <= 0 or poll_max_seconds < poll_initial_seconds:
+            raise ValueError(
+                f"Poll initial seconds ({poll_initial_seconds}) must be greater than 0"
+                f" and not greater than poll max seconds ({poll_max_seconds})"
+            )
+        if poll_backoff_factor < 1:
+            raise ValueError(
+                f"Poll backoff factor ({poll_backoff_factor}) must be at least 1"
+            )
+
+        self.__app_client = app_client
+        self.__poll_initial_seconds = poll_initial_seconds
+        self.__poll_max_seconds = poll_max_seconds
+        self.__poll_backoff_factor = poll_backoff_factor
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__rng = rng if rng is not None else random.Random()
+
+    def wait(self, app_name, timeout_seconds):
+        """Waits for a sync of an ArgoCD Application, that has already been requested,
+        to complete and for the Application to be healthy.
+
+        Parameters
+        ----------
+        app_name : str
+            Name of the ArgoCD Application to wait for.
+        timeout_seconds : float
+            Maximum number of seconds to wait for.
+
+        Returns
+        -------
+        dict
+            Number of seconds spent in the `SYNC_PHASE` and `PROGRESSING_PHASE` phases, and
+            the total number of seconds until the `HEALTHY_PHASE`.
+
+        Raises
+        ------
+        RuntimeError
+            If the sync operation failed.
+        TimeoutError
+            If the Application is not synced and healthy within the given timeout.
+        """
+        phase_seconds = {SYNC_PHASE: 0.0, PROGRESSING_PHASE: 0.0}
+        start_time = self.__clock()
+        previous_time = start_time
+        phase = SYNC_PHASE
+        poll_seconds = self.__poll_initial_seconds
+
+        with start_span('argocd app wait', attributes={'argocd.app.name': app_name}) as span:
+            while True:
+                status = self.__app_client.get_status(app_name)
+                now = self.__clock()
+
+                # the time since the previous poll is attributed to the phase seen then
+                phase_seconds[phase] += now - previous_time
+                previous_time = now
+
+                if status.is_failed:
+                    raise RuntimeError(
+                        f"ArgoCD Application ({app_name}) sync {status.operation_phase}:"
+                        f" {status.operation_message}"
+                    )
+
+                if status.phase != phase:
+                    print(
+                        f"ArgoCD Application ({app_name}) {status.phase}"
+                        f" after {now - start_time:.1f}s: {status}"
+                    )
+                    poll_seconds = self.__poll_initial_seconds
+                    phase = status.phase
+
+                if phase == HEALTHY_PHASE:
+                    phase_seconds[HEALTHY_PHASE] = now - start_time
+                    phase_seconds = {
+                        name: round(seconds, 3) for name, seconds in phase_seconds.items()
+                    }
+                    if span is not None:
+                        for name, seconds in phase_seconds.items():
+                            span.set_attribute(f'argocd.app.{name}.seconds', seconds)
+                    return phase_seconds
+
+                remaining_seconds = timeout_seconds - (now - start_time)
+                if remaining_seconds <= 0:
+                    raise TimeoutError(
+                        f"Timed out after {timeout_seconds} seconds waiting for"
+                        f" ArgoCD Application ({app_name}) in phase ({phase}): {status}"
+                    )
+
+                self.__sleep(min(
+                    remaining_seconds,
+                    self.__rng.uniform(poll_seconds / 2, poll_seconds)
+                ))
+                poll_seconds = min(
+                    self.__poll_max_seconds,
+                    poll_seconds * self.__poll_backoff_factor
+                )
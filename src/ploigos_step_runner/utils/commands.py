@@ -0,0 +1,514 @@
+"""Shared utils for running external commands.
+
+All external commands (ex: `sh.mvn`, `sh.git.commit`, `sh.argocd.app.sync`) should be run with
+`run_command` so that every command run is recorded, with its arguments, timings, exit code, and
+amount of output, in the `CommandTrace` (if any) active for the current thread,
+and as a span by the active `Tracer` (if any).
+
+Examples
+--------
+>>> with CommandTrace() as command_trace:
+...     run_command(sh.git, 'status', _out=sys.stdout)
+>>> command_trace.write('/tmp/command-trace.json')
+>>> command_trace.close()
+"""
+
+import io
+import json
+import os
+import re
+import threading
+import time
+
+from ploigos_step_runner.decryption_utils import DecryptionUtils
+from ploigos_step_runner.utils.file import create_parent_dir
+from ploigos_step_runner.utils.io import TextIOSelectiveObfuscator
+from ploigos_step_runner.utils.tracing import (SPAN_KIND_CLIENT,
+                                               TRACEPARENT_ENV_VAR,
+                                               get_active_tracer, start_span)
+
+# Command flags whose values are obfuscated when recording command arguments.
+# Values given as decrypted configuration values are always obfuscated regardless of flag.
+SENSITIVE_FLAG_REGEX = re.compile(
+    r'^-.*(pass|secret|token|cred|login|auth|api-?key)',
+    re.IGNORECASE
+)
+OBFUSCATED_VALUE = '********'
+
+_ACTIVE_COMMAND_TRACES = threading.local()
+
+class CommandExecution: # pylint: disable=too-many-instance-attributes
+    """Record of running an external command.
+
+    Parameters
+    ----------
+    name : str
+        Name of the command, ex: 'git commit'.
+    args : list of str
+        Arguments the command was run with, with any sensitive values obfuscated.
+    start_time : float
+        Time, in seconds since the epoch, that the command started.
+    duration : float
+        Time, in seconds, that the command ran for.
+    exit_code : int or None
+        Exit code of the command or None if the command did not run to completion.
+    stdout_bytes : int or None
+        Number of bytes written to stdout by the command or None if not known.
+    stderr_bytes : int or None
+        Number of bytes written to stderr by the command or None if not known.
+    thread_id : int
+        Id of the thread that ran the command.
+    """
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        name,
+        args,
+        start_time,
+        duration,
+        exit_code,
+        stdout_bytes,
+        stderr_bytes,
+        thread_id
+    ):
+        self.name = name
+        self.args = args
+        self.start_time = start_time
+        self.duration = duration
+        self.exit_code = exit_code
+        self.stdout_bytes = stdout_bytes
+        self.stderr_bytes = stderr_bytes
+        self.thread_id = thread_id
+
+    def to_trace_event(self):
+        """
+        Returns
+        -------
+        dict
+            This command execution as a complete event ('ph': 'X') in the
+            Chrome trace event format.
+
+        See Also
+        --------
+        https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU
+        """
+        return {
+            'name': self.name,
+            'cat': 'command',
+            'ph': 'X',
+            'ts': int(self.start_time * 1000000),
+            'dur': int(self.duration * 1000000),
+            'pid': os.getpid(),
+            'tid': self.thread_id,
+            'args': {
+                'args': self.args,
+                'exit-code': self.exit_code,
+                'stdout-bytes': self.stdout_bytes,
+                'stderr-bytes': self.stderr_bytes
+            }
+        }
+
+class CommandTrace:
+    """Context manager that records every command run with `run_command`, by the thread
+    that entered it, while it is active.
+
+    Notes
+    -----
+    Can be entered multiple times to record commands run during separate blocks of code.
+    Any values decrypted after this trace is created, and before it is closed,
+    are obfuscated in the recorded command names and arguments.
+
+    Parameters
+    ----------
+    metadata : dict, optional
+        Metadata about what the commands were run for, ex: step name,
+        to include in the written trace file.
+
+    Attributes
+    ----------
+    __metadata : dict
+    __command_executions : list of CommandExecution
+    __obfuscator : TextIOSelectiveObfuscator
+    __obfuscator_buffer : io.StringIO
+    __lock : threading.Lock
+    """
+
+    def __init__(self, metadata=None):
+        self.__metadata = metadata if metadata else {}
+        self.__command_executions = []
+        self.__obfuscator_buffer = io.StringIO()
+        self.__obfuscator = TextIOSelectiveObfuscator(
+            parent_stream=self.__obfuscator_buffer,
+            randomize_replacment_length=False
+        )
+        self.__lock = threading.Lock()
+
+        DecryptionUtils.register_obfuscation_stream(self.__obfuscator)
+
+    def __enter__(self):
+        if not hasattr(_ACTIVE_COMMAND_TRACES, 'stack'):
+            _ACTIVE_COMMAND_TRACES.stack = []
+        _ACTIVE_COMMAND_TRACES.stack.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _ACTIVE_COMMAND_TRACES.stack.remove(self)
+
+    def close(self):
+        """Stops obfuscating values decrypted from now on in this trace,
+        once no more commands will be recorded in it.
+        """
+        DecryptionUtils.unregister_obfuscation_stream(self.__obfuscator)
+
+    @property
+    def command_executions(self):
+        """
+        Returns
+        -------
+        list of CommandExecution
+            Commands run while this trace was active, in the order they finished.
+        """
+        return self.__command_executions
+
+    def add_command_execution(self, command_execution):
+        """Adds a record of running a command to this trace,
+        obfuscating any decrypted values in the command name and arguments.
+
+        Parameters
+        ----------
+        command_execution : CommandExecution
+            Record of running a command to add.
+        """
+        with self.__lock:
+            command_execution.name = self.__obfuscate(command_execution.name)
+            command_execution.args = [
+                self.__obfuscate(arg) for arg in command_execution.args
+            ]
+            self.__command_executions.append(command_execution)
+
+    def get_trace(self):
+        """
+        Returns
+        -------
+        dict
+            All of the commands run while this trace was active in the Chrome trace event
+            JSON object format, which can be loaded by chrome://tracing, Perfetto, and others.
+        """
+        return {
+            'traceEvents': [
+                command_execution.to_trace_event()
+                for command_execution in self.__command_executions
+            ],
+            'displayTimeUnit': 'ms',
+            'otherData': self.__metadata
+        }
+
+    def write(self, trace_file_path):
+        """Writes all of the commands run while this trace was active to a file
+        in the Chrome trace event JSON object format.
+
+        Parameters
+        ----------
+        trace_file_path : str
+            Path to write the trace file to.
+        """
+        create_parent_dir(trace_file_path)
+        with open(trace_file_path, 'w') as trace_file:
+            json.dump(self.get_trace(), trace_file, indent=2)
+
+    def __obfuscate(self, value):
+        """
+        Returns
+        -------
+        str
+            Given value with any decrypted values obfuscated.
+        """
+        self.__obfuscator.write(value)
+        obfuscated = self.__obfuscator_buffer.getvalue()
+        self.__obfuscator_buffer.seek(0)
+        self.__obfuscator_buffer.truncate()
+        return obfuscated
+
+def run_command(command, *args, **kwargs):
+    """Runs an external command and records it in the `CommandTrace` active for this thread,
+    if there is one, and as a span by the active `Tracer`, if there is one.
+
+    Notes
+    -----
+    Any `_out` or `_err` callback or stream is wrapped in a callback or stream that counts the
+    bytes written to it before passing them on, other `sh` output targets (file paths and file
+    descriptors) are passed as is and their bytes are not counted.
+    Callbacks must only take the output data as a parameter.
+
+    When recording a span the command is run with the `TRACEPARENT` environment variable
+    set to the span so that traced commands can continue the trace.
+
+    Parameters
+    ----------
+    command : sh.Command
+        Command to run, ex: `sh.mvn`, `sh.git.commit`.
+    args
+        Arguments to run the command with.
+    kwargs
+        Keyword arguments to run the command with, including `sh` special keyword arguments.
+
+    Returns
+    -------
+    sh.RunningCommand
+        Result of running the command.
+
+    Raises
+    ------
+    sh.ErrorReturnCode
+        If the command exits with an unexpected exit code.
+    """
+    command_traces = getattr(_ACTIVE_COMMAND_TRACES, 'stack', None)
+    if not command_traces and get_active_tracer() is None:
+        return command(*args, **kwargs)
+
+    # imported here to keep sh off the import path of every step implementer
+    import sh # pylint: disable=import-outside-toplevel
+
+    command_name = _get_command_name(command)
+    command_args = _get_command_args(args, kwargs)
+    output_counters = (
+        _OutputCounter.wrap_sh_kwarg(kwargs, '_out'),
+        _OutputCounter.wrap_sh_kwarg(kwargs, '_err')
+    )
+
+    with start_span(
+        command_name,
+        kind=SPAN_KIND_CLIENT,
+        attributes={
+            'process.executable.name': command_name,
+            'process.command_args': command_args
+        }
+    ) as span:
+        if span is not None:
+            kwargs['_env'] = dict(
+                kwargs.get('_env', os.environ),
+                **{TRACEPARENT_ENV_VAR: span.traceparent}
+            )
+
+        command_execution = CommandExecution(
+            name=command_name,
+            args=command_args,
+            start_time=time.time(),
+            duration=None,
+            exit_code=None,
+            stdout_bytes=None,
+            stderr_bytes=None,
+            thread_id=threading.get_ident()
+        )
+        start_counter = time.perf_counter()
+        result = None
+        try:
+            result = command(*args, **kwargs)
+            command_execution.exit_code = getattr(result, 'exit_code', 0)
+            return result
+        except sh.ErrorReturnCode as error:
+            command_execution.exit_code = getattr(error, 'exit_code', None)
+            result = error
+            raise
+        finally:
+            command_execution.duration = time.perf_counter() - start_counter
+            _record_command_execution(
+                command_execution=command_execution,
+                result=result,
+                output_counters=output_counters,
+                command_traces=command_traces,
+                span=span
+            )
+
+def _record_command_execution(command_execution, result, output_counters, command_traces, span):
+    """Records a finished command in the given command traces and span,
+    filling in the amount of output it wrote.
+
+    Parameters
+    ----------
+    command_execution : CommandExecution
+        Record of running the command, with its exit code, if any, already set.
+    result : sh.RunningCommand or sh.ErrorReturnCode or None
+        Result of running the command, used to count any output captured by `sh`,
+        or None if the command did not run to completion.
+    output_counters : tuple of (_OutputCounter or None, _OutputCounter or None)
+        Counters, if any, wrapping the stdout and stderr the command was run with.
+    command_traces : list of CommandTrace or None
+        Command traces to add the record of running the command to.
+    span : Span or None
+        Span to record the exit code and amount of output of the command on.
+    """
+    if not isinstance(command_execution.exit_code, int):
+        command_execution.exit_code = None
+    stdout_counter, stderr_counter = output_counters
+    command_execution.stdout_bytes = _get_output_bytes(stdout_counter, result, 'stdout')
+    command_execution.stderr_bytes = _get_output_bytes(stderr_counter, result, 'stderr')
+
+    for command_trace in command_traces or []:
+        command_trace.add_command_execution(command_execution)
+
+    if span is not None:
+        span.set_attribute('process.exit_code', command_execution.exit_code)
+        span.set_attribute('process.stdout_bytes', command_execution.stdout_bytes)
+        span.set_attribute('process.stderr_bytes', command_execution.stderr_bytes)
+
+def _get_command_name(command):
+    """
+    Returns
+    -------
+    str
+        Name of the given command, without the path to the executable,
+        including any baked in sub commands, ex: 'git commit'.
+    """
+    command_name = str(command)
+    executable, separator, sub_commands = command_name.partition(' ')
+    if os.path.isabs(executable):
+        command_name = os.path.basename(executable) + separator + sub_commands
+
+    return command_name
+
+def _get_command_args(args, kwargs):
+    """
+    Returns
+    -------
+    list of str
+        The given command arguments and non `sh` special keyword arguments as strings,
+        with the values of any sensitive flags obfuscated.
+    """
+    flat_args = []
+    pending_args = list(args)
+    while pending_args:
+        arg = pending_args.pop(0)
+        if isinstance(arg, (list, tuple)):
+            pending_args = list(arg) + pending_args
+        elif arg is not None:
+            flat_args.append(str(arg))
+
+    for key, value in kwargs.items():
+        if not key.startswith('_'):
+            flat_args.append(f"--{key.replace('_', '-')}={value}")
+
+    command_args = []
+    obfuscate_next = False
+    for arg in flat_args:
+        if obfuscate_next:
+            arg = OBFUSCATED_VALUE
+            obfuscate_next = False
+        elif SENSITIVE_FLAG_REGEX.match(arg):
+            flag, separator, _ = arg.partition('=')
+            if separator:
+                arg = f'{flag}={OBFUSCATED_VALUE}'
+            elif not flag.endswith('-stdin'):
+                obfuscate_next = True
+        command_args.append(arg)
+
+    return command_args
+
+def _get_output_bytes(output_counter, result, output_name):
+    """
+    Returns
+    -------
+    int or None
+        Number of bytes counted by the given counter if there is one,
+        else number of bytes of output captured in the given result,
+        else None if not known.
+    """
+    if output_counter is not None:
+        return output_counter.bytes_written
+
+    captured_output = getattr(result, output_name, None)
+    if isinstance(captured_output, bytes):
+        return len(captured_output)
+
+    return None
+
+class _OutputCounter:
+    """`sh` output callback or stream that counts the bytes written to a given callback or stream.
+
+    Parameters
+    ----------
+    target : function or IOBase
+        Callback or stream to pass output on to.
+
+    Attributes
+    ----------
+    bytes_written : int
+    """
+
+    def __init__(self, target):
+        self.__target = target
+        self.bytes_written = 0
+
+    @staticmethod
+    def wrap_sh_kwarg(kwargs, key):
+        """Wraps the given `sh` output keyword argument in a counter if it is a callback or stream.
+
+        Parameters
+        ----------
+        kwargs : dict
+            `sh` keyword arguments to update.
+        key : str
+            `sh` output keyword argument to wrap.
+
+        Returns
+        -------
+        _OutputCounter or None
+            Counter wrapping the given output keyword argument,
+            or None if not given or not a callback or stream.
+        """
+        target = kwargs.get(key)
+        if target is None:
+            return None
+
+        output_counter = _OutputCounter(target)
+        if callable(target):
+            kwargs[key] = output_counter.write
+        elif hasattr(target, 'write'):
+            kwargs[key] = output_counter
+        else:
+            return None
+
+        return output_counter
+
+    @property
+    def encoding(self):
+        """
+        Returns
+        -------
+        str or None
+            Encoding of the target stream, so that `sh` decodes output the same as it would
+            when writing to the target stream directly.
+        """
+        return getattr(self.__target, 'encoding', None)
+
+    def write(self, data):
+        """Counts the given output and passes it on to the target.
+
+        Parameters
+        ----------
+        data : str or bytes
+            Output to pass on.
+
+        Returns
+        -------
+        obj
+            Return value of the target callback or stream write.
+        """
+        if isinstance(data, str):
+            self.bytes_written += len(data.encode('utf-8'))
+        else:
+            self.bytes_written += len(data)
+
+        if callable(self.__target):
+            return self.__target(data)
+
+        if isinstance(data, bytes) and isinstance(self.__target, io.TextIOBase):
+            data = data.decode('utf-8', 'replace')
+
+        return self.__target.write(data)
+
+    def flush(self):
+        """Flushes the target stream, if it can be flushed.
+        """
+        if hasattr(self.__target, 'flush'):
+            self.__target.flush()
@@ -5,6 +5,7 @@ import sys
 
 import sh
 from ploigos_step_runner.config.config_value import ConfigValue
+from ploigos_step_runner.utils.commands import run_command
 
 
 def container_registries_login(  #pylint: disable=too-many-branches
@@ -242,7 +243,8 @@ def container_registry_login(
         #       required ordering by the login command and how sh handles
         #       escaping and ordering parameters
         login_comnmand = container_command.login.bake(**login_command_named_flags)
-        login_comnmand(
+        run_command(
+            login_comnmand,
             container_registry_uri,
             _in=container_registry_password,
             _out=sys.stdout,
@@ -1,7 +1,7 @@
 """Shared utils for dealing with dictionaries.
 """
 
-def deep_merge(dest, source, overwrite_duplicate_keys=False, _path=None):
+def deep_merge(dest, source, overwrite_duplicate_keys=False, copy_on_write=False):
     """"deep merges source dictionary into destination dictionary.
 
     Parameters
@@ -13,6 +13,16 @@ def deep_merge(dest, source, overwrite_duplicate_keys=False, _path=None):
     overwrite_duplicate_keys : bool
         True to overwite duplicate leaf keys in destination with source dictionary values.
         False to raise ValueError if any duplicate leaf values.
+    copy_on_write : bool
+        False to modify destination in place.
+        True to leave destination unmodified and return a new dictionary, only shallow copying
+        the nested dictionaries of destination that source is merged into.
+
+    Returns
+    -------
+    dict
+        Destination with source merged into it if copy_on_write is False,
+        else new dictionary with the result of the merge.
 
     Examples
     --------
@@ -49,33 +59,128 @@ def deep_merge(dest, source, overwrite_duplicate_keys=False, _path=None):
     Raises
     ------
     ValueError
-        If source and destination contain a duplicate leaf key and overwrite_duplicate_keys is True
+        If source and destination contain a duplicate leaf key and overwrite_duplicate_keys is False
 
     Notes
     ------
-    Modifies destination.
+    Modifies destination unless copy_on_write is True.
+
+    Source is never modified, but the result may share nested dictionaries with source,
+    and with destination when copy_on_write is True, so the result should not be modified in
+    place unless it is deep copied first or only ever updated with copy_on_write merges.
+
+    Source was originally https://stackoverflow.com/questions/7204805/how-to-merge-dictionaries-of-dictionaries/7205107#7205107 # pylint: disable=line-too-long
+    """
+    if copy_on_write:
+        dest = dict(dest)
+        owned_dicts = {id(dest)}
+    else:
+        owned_dicts = None
+
+    _deep_merge_into(dest, source, overwrite_duplicate_keys, owned_dicts)
+    return dest
+
+def deep_merge_many(sources, overwrite_duplicate_keys=False):
+    """Deep merges many source dictionaries, in order, into a new dictionary.
+
+    Parameters
+    ----------
+    sources : iterable of dict
+        Source dictionaries to deep merge, later sources are merged into earlier sources.
+    overwrite_duplicate_keys : bool
+        True to overwite duplicate leaf keys from earlier sources with values from later sources.
+        False to raise ValueError if any duplicate leaf values.
+
+    Returns
+    -------
+    dict
+        New dictionary with the result of merging all of the given sources.
+
+    Raises
+    ------
+    ValueError
+        If any sources contain a duplicate leaf key and overwrite_duplicate_keys is False.
+
+    Notes
+    -----
+    None of the given sources are modified, nested dictionaries are only copied when a later
+    source is merged into them, see `deep_merge` copy_on_write.
+    """
+    result = {}
+    owned_dicts = {id(result)}
+    for source in sources:
+        _deep_merge_into(result, source, overwrite_duplicate_keys, owned_dicts)
+
+    return result
+
+def _deep_merge_into(dest, source, overwrite_duplicate_keys, owned_dicts):
+    """Iteratively deep merges source dictionary into destination dictionary.
+
+    Parameters
+    ----------
+    dest : dict
+        Destination dictionary to deep merge source into.
+    source : dict
+        Source dictionary to deep merge into dest.
+    overwrite_duplicate_keys : bool
+        True to overwite duplicate leaf keys in destination with source dictionary values.
+        False to raise ValueError if any duplicate leaf values.
+    owned_dicts : set of int or None
+        None to modify all nested dictionaries of destination in place.
+        Else ids of the dictionaries that are safe to modify in place, any other nested
+        dictionary is shallow copied, and its id added to this set, before being modified.
 
-    Source is https://stackoverflow.com/questions/7204805/how-to-merge-dictionaries-of-dictionaries/7205107#7205107 # pylint: disable=line-too-long
+    Raises
+    ------
+    ValueError
+        If source and destination contain a duplicate leaf key and overwrite_duplicate_keys is False
     """
-    if _path is None:
-        _path = []
-
-    for key in source:
-        if key in dest:
-            if isinstance(dest[key], dict) and isinstance(source[key], dict):
-                deep_merge(
-                    dest=dest[key],
-                    source=source[key],
-                    overwrite_duplicate_keys=overwrite_duplicate_keys,
-                    _path=_path + [str(key)]
-                )
-            elif dest[key] == source[key]:
+    # stack of (dest, source items iterator, path) where path is only built into a
+    # list of keys if there is a conflict to report, see `_path_to_str`
+    pending = [(dest, iter(source.items()), None)]
+    while pending:
+        dest, source_items, path = pending[-1]
+        for key, source_value in source_items:
+            if key not in dest:
+                dest[key] = source_value
+                continue
+
+            dest_value = dest[key]
+            if isinstance(dest_value, dict) and isinstance(source_value, dict):
+                if owned_dicts is not None and id(dest_value) not in owned_dicts:
+                    dest_value = dict(dest_value)
+                    dest[key] = dest_value
+                    owned_dicts.add(id(dest_value))
+
+                # depth first so conflicts are found in the same order as a recursive merge
+                pending.append((dest_value, iter(source_value.items()), (key, path)))
+                break
+
+            if dest_value == source_value:
                 pass # same leaf value
+            elif overwrite_duplicate_keys:
+                dest[key] = source_value
             else:
-                if overwrite_duplicate_keys:
-                    dest[key] = source[key]
-                else:
-                    raise ValueError('Conflict at %s' % '.'.join(_path + [str(key)]))
+                raise ValueError(f"Conflict at {_path_to_str((key, path))}")
         else:
-            dest[key] = source[key]
-    return dest
+            pending.pop()
+
+def _path_to_str(path):
+    """Converts a path of nested keys to a string.
+
+    Parameters
+    ----------
+    path : tuple
+        Linked list of (key, parent path) tuples, with None as the root path.
+
+    Returns
+    -------
+    str
+        Keys from the root to the given path separated by '.'.
+    """
+    keys = []
+    while path is not None:
+        key, path = path
+        keys.append(str(key))
+
+    return '.'.join(reversed(keys))
@@ -2,22 +2,35 @@
 """
 
 import bz2
+import fcntl
 import json
 import os
 import re
 import shutil
-import urllib.request
+
+from contextlib import contextmanager
 
 import yaml
+from ploigos_step_runner.utils.yaml import yaml_safe_load
+
+JSON_FILE_EXTENSIONS = ('.json',)
+YAML_FILE_EXTENSIONS = ('.yml', '.yaml')
 
 def parse_yaml_or_json_file(yaml_or_json_file):
     """
     Parse YAML or JSON config files.
 
+    Notes
+    -----
+    The format is determined by the file extension, or if the extension is not a known
+    YAML or JSON extension, by sniffing the file content. Files are only parsed as JSON if they
+    look like JSON and are only re-parsed as YAML if they fail to parse as JSON,
+    since YAML is a super set of JSON.
+
     Parameters
     ----------
-    yaml_or_json_files : string
-        List of paths to YAML or JSON files to load as a dictionary.
+    yaml_or_json_file : string
+        Path to YAML or JSON file to load as a dictionary.
 
     Returns
     -------
@@ -29,31 +42,133 @@ def parse_yaml_or_json_file(yaml_or_json_file):
     ValueError
         If the given file can not be parsed as YAML or JSON.
     """
-    parsed_file = None
-    json_parse_error = None
-    yaml_parse_error = None
-
     with open(yaml_or_json_file, 'r') as open_yaml_or_json_file:
         file_contents = open_yaml_or_json_file.read()
 
+    parse_errors = []
+    if _is_json_file(yaml_or_json_file, file_contents):
+        try:
+            return json.loads(file_contents)
+        except ValueError as err:
+            parse_errors.append(f"JSON error: {str(err)}")
+
     try:
-        parsed_file = json.loads(file_contents)
-    except ValueError as err:
-        json_parse_error = err
+        return yaml_safe_load(file_contents)
+    except (yaml.YAMLError, ValueError) as err:
+        parse_errors.append(f"YAML error: {str(err)}")
 
-    if not parsed_file:
+    raise ValueError(
+        f"Error parsing file ({yaml_or_json_file}) as YAML or JSON: " +
+        ''.join([f"\n  {parse_error}" for parse_error in parse_errors]))
+
+def parse_yaml_or_json_files(yaml_or_json_files, max_workers=None):
+    """Parse many YAML or JSON config files concurrently.
+
+    Parameters
+    ----------
+    yaml_or_json_files : list of str
+        Paths to YAML or JSON files to load as dictionaries.
+    max_workers : int, optional
+        Maximum number of files to read and parse at the same time.
+        Defaults to the number of CPUs plus 4, up to 32.
+
+    Returns
+    -------
+    list of dict
+        Dictionaries parsed from the given YAML or JSON files,
+        in the same order as the given files.
+
+    Raises
+    ------
+    ValueError
+        If any of the given files can not be read or parsed as YAML or JSON.
+        The error includes the errors for every file that could not be read or parsed,
+        not just the first.
+
+    See Also
+    --------
+    parse_yaml_or_json_file
+    """
+    if len(yaml_or_json_files) <= 1:
+        return [_read_and_parse_yaml_or_json_file(file) for file in yaml_or_json_files]
+
+    # imported here since only needed when parsing multiple files
+    from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_read_and_parse_yaml_or_json_file, file)
+            for file in yaml_or_json_files
+        ]
+
+    parsed_files = []
+    parse_errors = []
+    for future in futures:
         try:
-            parsed_file = yaml.safe_load(file_contents)
-        except (yaml.scanner.ScannerError, yaml.parser.ParserError, ValueError) as err:
-            yaml_parse_error = err
+            parsed_files.append(future.result())
+        except ValueError as err:
+            parse_errors.append(err)
 
-    if json_parse_error and yaml_parse_error:
+    if parse_errors:
         raise ValueError(
-            f"Error parsing file ({yaml_or_json_file}) as YAML or JSON: " +
-            f"\n  JSON error: {str(json_parse_error)}" +
-            f"\n  YAML error: {str(yaml_parse_error)}")
+            f"Error parsing {len(parse_errors)} of {len(yaml_or_json_files)} files" +
+            " as YAML or JSON:" +
+            ''.join([f"\n{str(parse_error)}" for parse_error in parse_errors])
+        )
 
-    return parsed_file
+    return parsed_files
+
+def _read_and_parse_yaml_or_json_file(yaml_or_json_file):
+    """Parse a YAML or JSON config file, raising the same error if it can not be read
+    as if it can not be parsed.
+
+    Parameters
+    ----------
+    yaml_or_json_file : str
+        Path to YAML or JSON file to load as a dictionary.
+
+    Returns
+    -------
+    dict
+        Dictionary parsed from given YAML or JSON file
+
+    Raises
+    ------
+    ValueError
+        If the given file can not be read or parsed as YAML or JSON.
+    """
+    try:
+        return parse_yaml_or_json_file(yaml_or_json_file)
+    except OSError as err:
+        raise ValueError(f"Error reading file ({yaml_or_json_file}): {err}") from err
+
+def _is_json_file(file_path, file_contents):
+    """Determines if a file should be parsed as JSON before falling back to YAML.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+    file_contents : str
+        Contents of the file.
+
+    Returns
+    -------
+    bool
+        True if the file has a JSON extension,
+        or has an unknown extension and its content starts like a JSON object or array.
+        False otherwise.
+    """
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension in JSON_FILE_EXTENSIONS:
+        return True
+    if file_extension in YAML_FILE_EXTENSIONS:
+        return False
+
+    return file_contents.lstrip()[:1] in ('{', '[')
 
 def download_and_decompress_source_to_destination(
     source_url,
@@ -112,6 +227,9 @@ def download_and_decompress_source_to_destination(
         source_file_name = os.path.basename(source_url)
         destination_path = os.path.join(destination_dir, source_file_name)
 
+        # imported here since slow to import and only needed when downloading
+        import urllib.request # pylint: disable=import-outside-toplevel
+
         try:
             urllib.request.urlretrieve(
                 url=source_url,
@@ -156,3 +274,21 @@ def create_parent_dir(file_path):
     parent_dir_path = os.path.dirname(file_path)
     if parent_dir_path:
         os.makedirs(parent_dir_path, exist_ok=True)
+
+@contextmanager
+def file_lock(lock_file_path):
+    """Context manager that holds an exclusive lock on the given lock file for the code run
+    within it, serializing that code across threads and processes that lock the same file.
+
+    Parameters
+    ----------
+    lock_file_path : str
+        Path to the lock file, created if it does not exist.
+    """
+    create_parent_dir(lock_file_path)
+    with open(lock_file_path, 'a') as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
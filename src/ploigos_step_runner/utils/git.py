@@ -0,0 +1,584 @@
+"""Shared utils for git operations.
+
+Notes
+-----
+The branch and commit checked out in a git work tree are read directly from its git directory
+(`HEAD`, loose refs, and `packed-refs`) since that takes well under a millisecond, while
+importing GitPython and creating a `Repo` takes far longer. GitPython is only used for
+repositories this reader does not support, such as bare repositories or the reftable ref storage.
+
+Git operations that change repositories are run by `GitRepo`, which batches them into as few
+git processes as git allows and records how long each operation takes.
+"""
+
+import os
+import re
+import sys
+from io import StringIO
+
+from ploigos_step_runner.utils.commands import run_command
+from ploigos_step_runner.utils.metrics import PhaseMetrics
+
+_OBJECT_ID_REGEX = re.compile(r'^(?:[0-9a-f]{40}|[0-9a-f]{64})$')
+_SYMBOLIC_REF_PREFIX = 'ref: '
+_BRANCH_REF_PREFIX = 'refs/heads/'
+_MAX_SYMBOLIC_REF_DEPTH = 5
+
+
+class GitHead:
+    """What is checked out in a git repository.
+
+    Parameters
+    ----------
+    is_bare : bool
+        True if the repository is bare.
+    branch : str or None
+        Name of the checked out branch, without the `refs/heads/` prefix,
+        or None if the repository is bare or has a detached head.
+    commit : str or None
+        Hex object id of the checked out commit,
+        or None if the repository is bare or the checked out branch has no commits yet.
+    """
+
+    def __init__(self, is_bare, branch, commit):
+        self.__is_bare = is_bare
+        self.__branch = branch
+        self.__commit = commit
+
+    @property
+    def is_bare(self):
+        """
+        Returns
+        -------
+        bool
+            True if the repository is bare.
+        """
+        return self.__is_bare
+
+    @property
+    def branch(self):
+        """
+        Returns
+        -------
+        str or None
+            Name of the checked out branch, or None if bare or detached.
+        """
+        return self.__branch
+
+    @property
+    def commit(self):
+        """
+        Returns
+        -------
+        str or None
+            Hex object id of the checked out commit, or None if bare or there are no commits yet.
+        """
+        return self.__commit
+
+    @property
+    def is_detached(self):
+        """
+        Returns
+        -------
+        bool
+            True if a commit, rather than a branch, is checked out.
+        """
+        return not self.__is_bare and self.__branch is None
+
+    def __eq__(self, other):
+        return isinstance(other, GitHead) \
+            and (self.is_bare, self.branch, self.commit) \
+                == (other.is_bare, other.branch, other.commit)
+
+    def __repr__(self):
+        return f"GitHead(is_bare={self.is_bare}, branch={self.branch}, commit={self.commit})"
+
+
+def get_git_head(repo_root):
+    """Gets what is checked out in the given git repository, reading it directly from the git
+    directory when possible and using GitPython otherwise.
+
+    Parameters
+    ----------
+    repo_root : str
+        Path to the root of the git work tree, or to a bare git repository.
+
+    Returns
+    -------
+    GitHead
+        What is checked out in the given git repository.
+
+    Raises
+    ------
+    ValueError
+        If the given directory is not a git repository.
+    """
+    git_head = read_git_head(repo_root)
+    if git_head is None:
+        git_head = _get_git_head_with_git_python(repo_root)
+
+    return git_head
+
+
+def read_git_head(repo_root):
+    """Reads what is checked out in the given git work tree directly from its git directory,
+    following `.git` files to the git directories of linked work trees and submodules.
+
+    Parameters
+    ----------
+    repo_root : str
+        Path to the root of the git work tree.
+
+    Returns
+    -------
+    GitHead or None
+        What is checked out in the given git work tree, or None if it can not be read directly,
+        such as if the given directory is not the root of a git work tree, or the repository
+        uses a layout this reader does not support.
+    """
+    git_dirs = _get_git_dirs(repo_root)
+    if git_dirs is None:
+        return None
+    git_dir, common_dir = git_dirs
+
+    head = _read_file(os.path.join(git_dir, 'HEAD'))
+    if head is None:
+        return None
+    head = head.strip()
+
+    if _OBJECT_ID_REGEX.match(head):
+        return GitHead(is_bare=False, branch=None, commit=head)
+
+    if not head.startswith(_SYMBOLIC_REF_PREFIX + _BRANCH_REF_PREFIX):
+        return None
+    ref_name = head[len(_SYMBOLIC_REF_PREFIX):]
+
+    commit = _read_ref(common_dir, ref_name)
+    if commit is False:
+        return None
+
+    # a branch with no commits yet has no ref
+    return GitHead(is_bare=False, branch=ref_name[len(_BRANCH_REF_PREFIX):], commit=commit)
+
+
+class GitRepo:
+    """Runs git operations in a git work tree, batching them into as few git processes as git
+    allows, and records how long each operation takes.
+
+    Notes
+    -----
+    * Configuration given when cloning is written by `git clone` rather than by separate
+      `git config` processes.
+    * The checked out branch, and whether a branch exists, are read directly from the git
+      directory when possible, see `read_git_head`.
+    * Any number of tags are created with one git process, and can be pushed along with the
+      checked out branch with one `git push` with multiple refspecs.
+
+    Each operation is recorded as a `git-<operation>` phase, ex: `git-push`, of the given
+    PhaseMetrics, including operations that fail.
+
+    Git errors are raised as `sh.ErrorReturnCode`, with the standard error of git,
+    for callers to report in the context of what they were doing.
+
+    Parameters
+    ----------
+    repo_dir : str, optional
+        Path to the root of the git work tree. Defaults to the current working directory.
+    phase_metrics : PhaseMetrics, optional
+        Metrics to record the time of each git operation in.
+    """
+
+    def __init__(self, repo_dir=None, phase_metrics=None):
+        self.__repo_dir = repo_dir
+        self.__phase_metrics = phase_metrics if phase_metrics is not None else PhaseMetrics()
+
+    @property
+    def repo_dir(self):
+        """
+        Returns
+        -------
+        str or None
+            Path to the root of the git work tree, or None for the current working directory.
+        """
+        return self.__repo_dir
+
+    @property
+    def phase_metrics(self):
+        """
+        Returns
+        -------
+        PhaseMetrics
+            Metrics the time of each git operation is recorded in.
+        """
+        return self.__phase_metrics
+
+    @staticmethod
+    def clone(repo_url, repo_dir, config=None, phase_metrics=None):
+        """Clones the given repository.
+
+        Parameters
+        ----------
+        repo_url : str
+            URL of the repository to clone.
+        repo_dir : str
+            Path to clone the repository to.
+        config : dict, optional
+            Git configuration to write to the cloned repository,
+            ex: `{'user.name': 'Ploigos'}`.
+        phase_metrics : PhaseMetrics, optional
+            Metrics to record the time of each git operation in.
+
+        Returns
+        -------
+        GitRepo
+            The cloned repository.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If the repository can not be cloned.
+        """
+        git_repo = GitRepo(repo_dir=repo_dir, phase_metrics=phase_metrics)
+
+        config_args = []
+        for key, value in (config or {}).items():
+            config_args += ['--config', f'{key}={value}']
+
+        with git_repo.phase_metrics.measure('git-clone'):
+            _run_git('clone', *config_args, repo_url, repo_dir)
+
+        return git_repo
+
+    def checkout_branch(self, branch):
+        """Checks out the given branch, creating it from the checked out commit if it does not
+        exist locally or on the `origin` remote.
+
+        Parameters
+        ----------
+        branch : str
+            Name of the branch to check out.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If the branch can not be checked out.
+        """
+        # imported here to keep sh off the import path of reading git metadata
+        import sh # pylint: disable=import-outside-toplevel
+
+        with self.phase_metrics.measure('git-checkout'):
+            branch_exists = self.__has_ref(
+                f'{_BRANCH_REF_PREFIX}{branch}',
+                f'refs/remotes/origin/{branch}'
+            )
+            if branch_exists is None:
+                # no atomic way in git to checkout out new or existing branch,
+                # so first try to check out existing, if that doesn't work try new
+                try:
+                    self.__run('checkout', branch)
+                except sh.ErrorReturnCode:
+                    self.__run('checkout', '-b', branch)
+            elif branch_exists:
+                self.__run('checkout', branch)
+            else:
+                self.__run('checkout', '-b', branch)
+
+    def get_branch(self):
+        """Gets the name of the checked out branch.
+
+        Returns
+        -------
+        str
+            Name of the checked out branch, or `HEAD` if a commit is checked out,
+            the same as `git rev-parse --abbrev-ref HEAD`.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If the branch can not be read from the git directory and git can not get it.
+        """
+        with self.phase_metrics.measure('git-rev-parse'):
+            git_head = read_git_head(self.__repo_dir or os.getcwd())
+            if git_head is not None:
+                return 'HEAD' if git_head.is_detached else git_head.branch
+
+            return str(self.__run('rev-parse', '--abbrev-ref', 'HEAD', _out=None)).rstrip()
+
+    def get_config(self, key):
+        """Gets the value of the given git configuration.
+
+        Parameters
+        ----------
+        key : str
+            Git configuration key, ex: `remote.origin.url`.
+
+        Returns
+        -------
+        str
+            Value of the given git configuration.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If the given git configuration is not set.
+        """
+        out = StringIO()
+        with self.phase_metrics.measure('git-config'):
+            self.__run('config', '--get', key, _encoding='UTF-8', _decode_errors='ignore', _out=out)
+
+        return out.getvalue().rstrip()
+
+    def add(self, *paths):
+        """Stages the given paths to be committed.
+
+        Parameters
+        ----------
+        paths : str
+            Paths, relative to the root of the work tree, to stage.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If the paths can not be staged.
+        """
+        with self.phase_metrics.measure('git-add'):
+            self.__run('add', *paths)
+
+    def commit(self, message, all_changes=False, allow_empty=False):
+        """Commits the staged changes.
+
+        Parameters
+        ----------
+        message : str
+            Commit message.
+        all_changes : bool, optional
+            True to also commit changes to tracked files that have not been staged.
+        allow_empty : bool, optional
+            True to commit even if nothing has changed.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If the changes can not be committed.
+        """
+        commit_args = []
+        if allow_empty:
+            commit_args.append('--allow-empty')
+        if all_changes:
+            commit_args.append('--all')
+
+        with self.phase_metrics.measure('git-commit'):
+            self.__run('commit', *commit_args, '--message', message)
+
+    def tag(self, tags, force=False):
+        """Tags the checked out commit with all of the given tags with one git process.
+
+        Parameters
+        ----------
+        tags : list of str
+            Tags to create.
+        force : bool, optional
+            True to move any of the given tags that already exist to the checked out commit.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If any of the tags can not be created, in which case none of them are.
+        """
+        with self.phase_metrics.measure('git-tag'):
+            if len(tags) == 1:
+                self.__run('tag', *(['--force'] if force else []), tags[0])
+            else:
+                # create or update every tag in one transaction
+                self.__run('update-ref', '--stdin', _in=''.join(
+                    f"{'update' if force else 'create'} refs/tags/{tag} HEAD\n" for tag in tags
+                ))
+
+    def push(self, remote=None, refspecs=None, tags=False, force=False):
+        """Pushes to the given remote with one `git push`.
+
+        Parameters
+        ----------
+        remote : str, optional
+            Name or URL of the remote to push to.
+            Defaults to the upstream of the checked out branch if there are no refspecs,
+            or to `origin` if there are.
+        refspecs : list of str, optional
+            Refspecs to push, ex: `['HEAD', 'refs/tags/v1.0.0']`. Prefix a refspec with `+` to
+            force only it to be pushed. Defaults to pushing the checked out branch.
+        tags : bool, optional
+            True to also push all tags.
+        force : bool, optional
+            True to force every ref to be pushed.
+
+        Raises
+        ------
+        sh.ErrorReturnCode
+            If the push fails.
+        """
+        push_args = []
+        if remote or refspecs:
+            push_args.append(remote or 'origin')
+        if tags:
+            push_args.append('--tags')
+        if force:
+            push_args.append('--force')
+
+        with self.phase_metrics.measure('git-push'):
+            self.__run('push', *push_args, *(refspecs or []))
+
+    def __has_ref(self, *ref_names):
+        """
+        Returns
+        -------
+        bool or None
+            True if any of the given refs exist, False if none of them do,
+            or None if the refs can not be read directly.
+        """
+        git_dirs = _get_git_dirs(self.__repo_dir or os.getcwd())
+        if git_dirs is None:
+            return None
+
+        for ref_name in ref_names:
+            object_id = _read_ref(git_dirs[1], ref_name)
+            if object_id is False:
+                return None
+            if object_id is not None:
+                return True
+
+        return False
+
+    def __run(self, *args, **kwargs):
+        if self.__repo_dir is not None:
+            kwargs.setdefault('_cwd', self.__repo_dir)
+        return _run_git(*args, **kwargs)
+
+
+def _run_git(*args, **kwargs):
+    """Runs git with the given arguments and `sh` options, writing its output to standard out
+    and standard error unless `_out` is given, or is None to only return it.
+    """
+    # imported here to keep sh off the import path of reading git metadata
+    import sh # pylint: disable=import-outside-toplevel
+
+    kwargs.setdefault('_out', sys.stdout)
+    if kwargs['_out'] is None:
+        del kwargs['_out']
+    kwargs.setdefault('_err', sys.stderr)
+    kwargs.setdefault('_tee', 'err')
+
+    return run_command(
+        sh.git, # pylint: disable=no-member
+        *args,
+        **kwargs
+    )
+
+
+def _get_git_dirs(repo_root):
+    """Gets the git directory of the given work tree, following `.git` files, and the common
+    git directory, shared by linked work trees, that has the refs.
+
+    Returns
+    -------
+    tuple of str or None
+        Paths to the git directory and the common git directory, or None if the given directory
+        has no `.git` or uses the reftable ref storage, which keeps refs in binary tables.
+    """
+    git_dir = os.path.join(repo_root, '.git')
+    if not os.path.isdir(git_dir):
+        dot_git_file_contents = _read_file(git_dir)
+        if dot_git_file_contents is None or not dot_git_file_contents.startswith('gitdir:'):
+            return None
+
+        git_dir = os.path.join(repo_root, dot_git_file_contents[len('gitdir:'):].strip())
+        if not os.path.isdir(git_dir):
+            return None
+
+    common_dir = git_dir
+    commondir_file_contents = _read_file(os.path.join(git_dir, 'commondir'))
+    if commondir_file_contents:
+        common_dir = os.path.join(git_dir, commondir_file_contents.strip())
+
+    if os.path.isdir(os.path.join(common_dir, 'reftable')):
+        return None
+
+    return git_dir, common_dir
+
+
+def _read_ref(common_dir, ref_name):
+    """Reads the object id the given ref points to, from its loose ref file or `packed-refs`,
+    following symbolic refs.
+
+    Returns
+    -------
+    str or None or bool
+        Hex object id the given ref points to, None if the ref does not exist,
+        or False if the ref can not be read directly.
+    """
+    packed_refs = None
+    for _ in range(_MAX_SYMBOLIC_REF_DEPTH):
+        ref = _read_file(os.path.join(common_dir, *ref_name.split('/')))
+        if ref is None:
+            if packed_refs is None:
+                packed_refs = _read_file(os.path.join(common_dir, 'packed-refs')) or ''
+            return _find_packed_ref(packed_refs, ref_name)
+
+        ref = ref.strip()
+        if _OBJECT_ID_REGEX.match(ref):
+            return ref
+        if not ref.startswith(_SYMBOLIC_REF_PREFIX):
+            return False
+        ref_name = ref[len(_SYMBOLIC_REF_PREFIX):]
+
+    return False
+
+
+def _find_packed_ref(packed_refs, ref_name):
+    """Finds the given ref in the given contents of a `packed-refs` file, without parsing all of
+    the other refs since there can be many thousands of tags.
+
+    Returns
+    -------
+    str or None
+        Hex object id of the given ref, or None if it is not packed.
+    """
+    packed_refs = '\n' + packed_refs + '\n'
+    ref_index = packed_refs.find(f' {ref_name}\n')
+    while ref_index != -1:
+        object_id = packed_refs[packed_refs.rfind('\n', 0, ref_index) + 1:ref_index]
+        if _OBJECT_ID_REGEX.match(object_id):
+            return object_id
+        ref_index = packed_refs.find(f' {ref_name}\n', ref_index + 1)
+
+    return None
+
+
+def _read_file(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return file.read()
+    except (FileNotFoundError, NotADirectoryError, IsADirectoryError, UnicodeDecodeError):
+        return None
+
+
+def _get_git_head_with_git_python(repo_root):
+    # imported here since GitPython is slow to import and only needed for uncommon repositories
+    from git import InvalidGitRepositoryError, Repo # pylint: disable=import-outside-toplevel
+
+    try:
+        repo = Repo(repo_root)
+    except InvalidGitRepositoryError as error:
+        raise ValueError(f"Given directory ({repo_root}) is not a Git repository") from error
+
+    if repo.bare:
+        return GitHead(is_bare=True, branch=None, commit=None)
+
+    if repo.head.is_detached:
+        return GitHead(is_bare=False, branch=None, commit=repo.head.commit.hexsha)
+
+    try:
+        commit = repo.head.reference.commit.hexsha
+    except ValueError:
+        commit = None
+
+    return GitHead(is_bare=False, branch=str(repo.head.reference), commit=commit)
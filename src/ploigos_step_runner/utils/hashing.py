@@ -0,0 +1,417 @@
+"""Fast content hashing of files and directory trees, for cache keys.
+
+Notes
+-----
+Files are identified by their git blob ids (the SHA-1 of `blob <size>\\0<contents>`) and modes,
+so that in a git work tree the ids git already keeps in its index for files that have not
+changed since they were staged can be reused instead of reading the files. Git refreshes the
+stat data in its index when checking for changes, so only files git reports as changed or
+untracked are read and hashed. Directories that are not in a git work tree, or when git is not
+available, are walked instead, hashing their files in parallel.
+
+Either way the fingerprint of a tree depends only on the relative paths, modes, and contents
+of its files, so a git work tree with no changed, untracked, or ignored files has the same
+fingerprint as a copy of it that is not in a git work tree.
+
+In a git work tree, files ignored by git are not part of the fingerprint, since they are not
+part of the source. Walking does not read `.gitignore` files, so files that git would ignore
+are part of the fingerprint of a walked directory, ex: when git is not available or `use_git`
+is False; give their patterns as `ignore_patterns` to leave them out either way.
+`.git` directories are never part of the fingerprint.
+"""
+
+import fnmatch
+import hashlib
+import os
+import re
+import stat
+
+GIT_FILE_MODE = '100644'
+GIT_EXECUTABLE_FILE_MODE = '100755'
+GIT_SYMLINK_MODE = '120000'
+GIT_SUBMODULE_MODE = '160000'
+
+_CHUNK_SIZE = 65536
+_BATCH_SIZE = 256
+
+
+def get_file_blob_id(path, path_stat=None):
+    """Gets the git blob id of the given file, or of the target of the given symbolic link,
+    the same id `git hash-object` would give it.
+
+    Parameters
+    ----------
+    path : str
+        Path to the file to get the blob id of.
+    path_stat : os.stat_result, optional
+        Result of `os.lstat` of the given path, if already known.
+
+    Returns
+    -------
+    str
+        Hex SHA-1 git blob id of the given file.
+    """
+    if path_stat is None:
+        path_stat = os.lstat(path)
+
+    if stat.S_ISLNK(path_stat.st_mode):
+        contents = os.fsencode(os.readlink(path))
+        return hashlib.sha1(b'blob %d\0' % len(contents) + contents).hexdigest()
+
+    with open(path, 'rb') as file:
+        contents = file.read(_CHUNK_SIZE)
+        if len(contents) < _CHUNK_SIZE:
+            return hashlib.sha1(b'blob %d\0' % len(contents) + contents).hexdigest()
+
+        hasher = hashlib.sha1(b'blob %d\0' % os.fstat(file.fileno()).st_size)
+        while contents:
+            hasher.update(contents)
+            contents = file.read(_CHUNK_SIZE)
+
+    return hasher.hexdigest()
+
+
+def get_tree_fingerprint( # pylint: disable=too-many-arguments
+    path,
+    ignore_patterns=None,
+    excluded_paths=None,
+    use_git=True,
+    max_workers=None
+):
+    """Gets a fingerprint of the contents of the given directory, or file, that changes
+    whenever any of the paths, modes, or contents of the files in it change.
+
+    Parameters
+    ----------
+    path : str
+        Directory, or file, to get the fingerprint of.
+    ignore_patterns : list of str, optional
+        Glob patterns of files and directories to leave out of the fingerprint, matched against
+        both their names and their paths relative to the given directory,
+        ex: `target`, `*.log`, or `docs/*`.
+    excluded_paths : list of str, optional
+        Files and directories to leave out of the fingerprint, such as working directories
+        inside of the given directory.
+    use_git : bool, optional
+        True to reuse the blob ids in the git index, and leave out files ignored by git,
+        if the given directory is in a git work tree.
+        False to always read and hash every file, including files ignored by git.
+    max_workers : int, optional
+        Maximum number of files to hash at the same time.
+        Defaults to the number of CPUs plus 4, up to 32.
+
+    Returns
+    -------
+    str
+        Hex SHA-256 fingerprint of the given directory or file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the given path does not exist.
+    """
+    if not os.path.isdir(path):
+        path_stat = os.lstat(path)
+        entries = {
+            os.path.basename(path): (_get_git_mode(path_stat), get_file_blob_id(path, path_stat))
+        }
+    else:
+        is_ignored = _create_is_ignored(path, ignore_patterns, excluded_paths)
+        entries = None
+        if use_git:
+            entries = _get_git_tree_entries(path, is_ignored, max_workers)
+        if entries is None:
+            entries = _get_walked_tree_entries(path, is_ignored, max_workers)
+
+    hasher = hashlib.sha256()
+    for relative_path in sorted(entries):
+        mode, blob_id = entries[relative_path]
+        hasher.update(f'{mode} {blob_id} {relative_path}\0'.encode('utf-8', 'surrogateescape'))
+
+    return hasher.hexdigest()
+
+
+def _get_git_mode(path_stat):
+    if stat.S_ISLNK(path_stat.st_mode):
+        return GIT_SYMLINK_MODE
+    if path_stat.st_mode & stat.S_IXUSR:
+        return GIT_EXECUTABLE_FILE_MODE
+    return GIT_FILE_MODE
+
+
+def _create_is_ignored(path, ignore_patterns, excluded_paths):
+    """Creates a function that determines if a path, relative to the given directory and using
+    `/` separators, is left out of its fingerprint, remembering the results for directories
+    since many paths share them.
+    """
+    patterns_regex = None
+    if ignore_patterns:
+        patterns_regex = re.compile('|'.join(
+            fnmatch.translate(pattern) for pattern in ignore_patterns
+        ))
+
+    root_path = os.path.abspath(path)
+    excluded_relative_paths = set()
+    for excluded_path in excluded_paths or []:
+        excluded_relative_path = os.path.relpath(os.path.abspath(excluded_path), root_path)
+        if not excluded_relative_path.startswith(os.pardir):
+            excluded_relative_paths.add(excluded_relative_path.replace(os.sep, '/'))
+
+    ignored_dirs = {'': False}
+
+    def is_ignored(relative_path, is_dir=False):
+        if is_dir and relative_path in ignored_dirs:
+            return ignored_dirs[relative_path]
+
+        parent_dir, _, name = relative_path.rpartition('/')
+        ignored = is_ignored(parent_dir, is_dir=True) \
+            or name == '.git' \
+            or relative_path in excluded_relative_paths \
+            or (patterns_regex is not None and (
+                patterns_regex.match(name) is not None
+                or patterns_regex.match(relative_path) is not None
+            ))
+        if is_dir:
+            ignored_dirs[relative_path] = ignored
+        return ignored
+
+    return is_ignored
+
+
+def _hash_file(file_path, is_symlink=None):
+    """Gets the git mode and blob id of the given file.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file to hash.
+    is_symlink : bool, optional
+        False if the given file is known to be a regular file, so that it only needs to be
+        opened and not looked up separately. None if not known.
+
+    Returns
+    -------
+    tuple of str or None
+        Git mode and git blob id of the given file, or None if it does not exist.
+    """
+    if is_symlink is False:
+        try:
+            with open(file_path, 'rb') as file:
+                path_stat = os.fstat(file.fileno())
+                contents = file.read(_CHUNK_SIZE)
+                if len(contents) < _CHUNK_SIZE:
+                    return (
+                        _get_git_mode(path_stat),
+                        hashlib.sha1(b'blob %d\0' % len(contents) + contents).hexdigest()
+                    )
+
+                hasher = hashlib.sha1(b'blob %d\0' % path_stat.st_size)
+                while contents:
+                    hasher.update(contents)
+                    contents = file.read(_CHUNK_SIZE)
+                return (_get_git_mode(path_stat), hasher.hexdigest())
+        except FileNotFoundError:
+            return None
+
+    try:
+        path_stat = os.lstat(file_path)
+    except FileNotFoundError:
+        return None
+    if stat.S_ISDIR(path_stat.st_mode):
+        # a submodule, or a directory that replaced a file
+        return (GIT_SUBMODULE_MODE, get_tree_fingerprint(file_path))
+    return (_get_git_mode(path_stat), get_file_blob_id(file_path, path_stat))
+
+
+def _hash_files(path, relative_paths, max_workers, are_symlinks=None):
+    """Hashes the given files under the given directory, in parallel batches.
+
+    Parameters
+    ----------
+    are_symlinks : list of bool, optional
+        If each of the given files is a symbolic link, when known.
+
+    Returns
+    -------
+    dict
+        Relative path to (git mode, git blob id) of each of the given files that exists.
+    """
+    # imported here since only needed when hashing files
+    from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+
+    if are_symlinks is None:
+        are_symlinks = [None] * len(relative_paths)
+
+    def hash_batch(start_index):
+        return [
+            _hash_file(os.path.join(path, relative_path), is_symlink)
+            for relative_path, is_symlink in zip(
+                relative_paths[start_index:start_index + _BATCH_SIZE],
+                are_symlinks[start_index:start_index + _BATCH_SIZE]
+            )
+        ]
+
+    if len(relative_paths) <= _BATCH_SIZE:
+        hashes = hash_batch(0)
+    else:
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            hashes = [
+                file_hash
+                for batch_hashes in executor.map(
+                    hash_batch,
+                    range(0, len(relative_paths), _BATCH_SIZE)
+                )
+                for file_hash in batch_hashes
+            ]
+
+    return {
+        relative_path: file_hash
+        for relative_path, file_hash in zip(relative_paths, hashes)
+        if file_hash is not None
+    }
+
+
+def _get_git_tree_entries(path, is_ignored, max_workers):
+    """Gets the entries of the given directory from the git index, hashing only the files git
+    reports as changed or untracked.
+
+    Returns
+    -------
+    dict or None
+        Relative path to (git mode, git blob id) of every file in the given directory that is
+        not ignored, or None if the given directory is not in a git work tree, is ignored by git,
+        or git can not be run.
+    """
+    # imported here since only needed when hashing directories in git work trees
+    import subprocess # pylint: disable=import-outside-toplevel
+
+    def git(*args):
+        return subprocess.run(
+            ['git', '--no-optional-locks', *args],
+            cwd=path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            check=True
+        ).stdout
+
+    try:
+        prefix = os.fsdecode(git('rev-parse', '--show-prefix').rstrip(b'\n'))
+        if prefix and subprocess.run(
+            ['git', 'check-ignore', '--quiet', '--', '.'],
+            cwd=path,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False
+        ).returncode == 0:
+            return None
+
+        ls_files = git('ls-files', '-z', '--stage', '--', '.')
+        status = git(
+            'status', '--porcelain', '-z', '--untracked-files=all', '--no-renames', '--', '.'
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    entries, changed_paths = _parse_git_ls_files(ls_files)
+    changed_paths.update(_parse_git_status(status, prefix))
+
+    changed_paths = [
+        relative_path for relative_path in changed_paths
+        if not is_ignored(relative_path)
+    ]
+    for relative_path in changed_paths:
+        entries.pop(relative_path, None)
+    entries = {
+        relative_path: entry for relative_path, entry in entries.items()
+        if not is_ignored(relative_path)
+    }
+    entries.update(_hash_files(path, changed_paths, max_workers))
+
+    return entries
+
+
+def _parse_git_ls_files(ls_files):
+    """Parses the output of `git ls-files -z --stage`.
+
+    Returns
+    -------
+    tuple of (dict, set)
+        Relative path to (git mode, git blob id) of every merged file in the index,
+        and the relative paths of the files with merge conflicts.
+    """
+    entries = {}
+    unmerged_paths = set()
+    for record in ls_files.split(b'\0'):
+        if not record:
+            continue
+        info, _, relative_path = record.partition(b'\t')
+        mode, blob_id, stage = info.split(b' ')
+        relative_path = os.fsdecode(relative_path)
+        if stage != b'0':
+            unmerged_paths.add(relative_path)
+        else:
+            entries[relative_path] = (mode.decode('ascii'), blob_id.decode('ascii'))
+
+    return entries, unmerged_paths
+
+
+def _parse_git_status(status, prefix):
+    """Parses the output of `git status --porcelain -z --no-renames`.
+
+    Parameters
+    ----------
+    status : bytes
+        Output of git status.
+    prefix : str
+        Path of the directory git status was run for, relative to the top level of the
+        work tree, see `git rev-parse --show-prefix`.
+
+    Returns
+    -------
+    set of str
+        Paths, relative to the given directory, of the files changed in the work tree or
+        untracked.
+    """
+    changed_paths = set()
+    # status paths are relative to the top level of the work tree
+    for record in status.split(b'\0'):
+        if len(record) < 4:
+            continue
+        status_code = record[:2]
+        # untracked git repositories are listed as directories, ending with `/`
+        relative_path = os.fsdecode(record[3:])[len(prefix):].rstrip('/')
+        # the index is current for files only changed in the index
+        if status_code[1:2] != b' ':
+            changed_paths.add(relative_path)
+
+    return changed_paths
+
+def _get_walked_tree_entries(path, is_ignored, max_workers):
+    """Gets the entries of the given directory by walking it and hashing every file in it.
+
+    Returns
+    -------
+    dict
+        Relative path to (git mode, git blob id) of every file in the given directory that is
+        not ignored.
+    """
+    relative_paths = []
+    are_symlinks = []
+    relative_dir_paths = ['']
+    while relative_dir_paths:
+        relative_dir_path = relative_dir_paths.pop()
+        with os.scandir(os.path.join(path, relative_dir_path)) as dir_entries:
+            for dir_entry in dir_entries:
+                relative_path = relative_dir_path + dir_entry.name
+                # symbolic links to directories are not followed, but hashed as links
+                if dir_entry.is_dir(follow_symlinks=False):
+                    if not is_ignored(relative_path, is_dir=True):
+                        relative_dir_paths.append(relative_path + '/')
+                elif dir_entry.is_symlink() or dir_entry.is_file(follow_symlinks=False):
+                    if not is_ignored(relative_path):
+                        relative_paths.append(relative_path)
+                        are_symlinks.append(dir_entry.is_symlink())
+
+    return _hash_files(path, relative_paths, max_workers, are_symlinks)
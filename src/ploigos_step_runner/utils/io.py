@@ -4,6 +4,8 @@
 import io
 import random
 import re
+import sys
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
 
 
 def create_sh_redirect_to_multiple_streams_fn_callback(streams):
@@ -45,6 +47,34 @@ def create_sh_redirect_to_multiple_streams_fn_callback(streams):
     return sh_redirect_to_multiple_streams
 
 
+@contextmanager
+def indented_output(indent_level):
+    """Context manager that indents, line buffered, the standard out and standard error
+    written within it.
+
+    Parameters
+    ----------
+    indent_level : int
+        Level to indent to, see `TextIOIndenter`.
+    """
+    indented_stdout = TextIOIndenter(
+        parent_stream=sys.stdout,
+        indent_level=indent_level,
+        line_buffered=True
+    )
+    indented_stderr = TextIOIndenter(
+        parent_stream=sys.stderr,
+        indent_level=indent_level,
+        line_buffered=True
+    )
+    try:
+        with redirect_stdout(indented_stdout), redirect_stderr(indented_stderr):
+            yield
+    finally:
+        indented_stdout.flush()
+        indented_stderr.flush()
+
+
 class TextIOSelectiveObfuscator(io.TextIOBase):
     """Extends the base class for text streams to allow the obfuscation of given patterns.
 
@@ -63,7 +93,9 @@ class TextIOSelectiveObfuscator(io.TextIOBase):
     Attributes
     ----------
     __parent_stream : IOBase
-    __obfuscation_patterns : list
+    __obfuscation_patterns : list of (str, re.Pattern)
+        Pattern to obfuscate for each target, with a literal part of the target that any
+        match contains, so the pattern only needs to be searched for if the literal is present.
     __replacement_char : char
     __randomize_replacement_length : bool
     __random_replacement_length_min : int
@@ -161,8 +193,11 @@ class TextIOSelectiveObfuscator(io.TextIOBase):
             # compile the pattern for re-use and make sure that .* matches accross lines
             target_compiled_pattern = re.compile(target_pattern, re.DOTALL)
 
+            # any match contains the first word of the target, so it is a cheap pre check
+            target_literal = target.split(None, 1)[0] if target.strip() else ''
+
             # add the pattern
-            self.__obfuscation_patterns.append(target_compiled_pattern)
+            self.__obfuscation_patterns.append((target_literal, target_compiled_pattern))
 
     def __obfuscator(self, match):
         """Given a regex match returns a corresponding obfuscated string.
@@ -210,15 +245,31 @@ class TextIOSelectiveObfuscator(io.TextIOBase):
         io.TextIOBase.write
         """
 
+        return self.parent_stream.write(self.obfuscate(given))
+
+    def obfuscate(self, given):
+        """Obfuscates all of the obfuscation targets in the given text.
+
+        Parameters
+        ----------
+        given : str or bytes (utf-8)
+            Text to obfuscate.
+
+        Returns
+        -------
+        str
+            Given text with all of the obfuscation targets obfuscated.
+        """
         if isinstance(given, bytes):
             obfuscated = given.decode('utf-8')
         else:
             obfuscated = given
 
-        for obfuscation_pattern in self.__obfuscation_patterns:
-            obfuscated = obfuscation_pattern.sub(self.__obfuscator, obfuscated)
+        for target_literal, obfuscation_pattern in self.__obfuscation_patterns:
+            if target_literal in obfuscated:
+                obfuscated = obfuscation_pattern.sub(self.__obfuscator, obfuscated)
 
-        return self.parent_stream.write(obfuscated)
+        return obfuscated
 
     def flush(self):
         """Flush the parent stream.
@@ -253,14 +304,36 @@ class TextIOIndenter(io.TextIOBase):
         Character to use for indent.
         Will be multiplied by the indent_size and the ident_level and prepended before
         each line written to this stream.
+    line_buffered : bool, optional
+        True to buffer what is written to this stream and only write complete lines to the
+        parent stream, batching many small writes into fewer parent stream writes.
+        Anything left in the buffer is written to the parent stream on flush or close.
+        False to write to the parent stream on every write.
+
+    Attributes
+    ----------
+    __indent : str
+        Indent prepended to each line, computed once from the indent level, size, and char.
+    __buffer : list of str or None
+        Indented text not yet written to the parent stream if line buffered,
+        else None if not line buffered.
     """
 
-    def __init__(self, parent_stream, indent_level=0, indent_size=4, indent_char=' '):
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        parent_stream,
+        indent_level=0,
+        indent_size=4,
+        indent_char=' ',
+        line_buffered=False
+    ):
         self.__parent_stream = parent_stream
         self.__indent_level = indent_level
         self.__indent_size = indent_size
         self.__indent_char = indent_char
+        self.__indent = indent_char * (indent_size * indent_level)
         self.__unwritten_to = True
+        self.__buffer = [] if line_buffered else None
         super().__init__()
 
     @property
@@ -310,6 +383,17 @@ class TextIOIndenter(io.TextIOBase):
         """
         return self.__indent_char
 
+    @property
+    def line_buffered(self):
+        """Whether this stream only writes complete lines to its parent stream.
+
+        Returns
+        -------
+        bool
+            True if this stream buffers partial lines until they are complete.
+        """
+        return self.__buffer is not None
+
     def write(self, given):
         """Indents the begining of the given text as well as every new line in the given text
         and then writes it to this steams parent_stream.
@@ -401,28 +485,287 @@ class TextIOIndenter(io.TextIOBase):
         io.TextIOBase.write
         """
         if isinstance(given, bytes):
-            indented = given.decode('utf-8')
+            text = given.decode('utf-8')
         else:
-            indented = given
-
-        # create the indent to insert at begining of given text and every new line in that text
-        indent_chars = self.indent_char * (self.indent_size * self.indent_level)
+            text = given
 
+        indented = self.__indent_new_lines(text)
         if self.__unwritten_to:
             self.__unwritten_to = False
-            indented = f"{indent_chars}{indented}"
+            indented = self.__indent + indented
+
+        if self.__buffer is None:
+            return self.parent_stream.write(indented)
+
+        # only write up to and including the last new line, keep the rest of the line buffered
+        end_of_last_line = max(indented.rfind('\n'), indented.rfind('\r')) + 1
+        if not end_of_last_line:
+            self.__buffer.append(indented)
+            return len(text)
+
+        if self.__buffer:
+            self.__buffer.append(indented[:end_of_last_line])
+            self.parent_stream.write(''.join(self.__buffer))
+            self.__buffer.clear()
+        else:
+            self.parent_stream.write(indented[:end_of_last_line])
+
+        if end_of_last_line < len(indented):
+            self.__buffer.append(indented[end_of_last_line:])
+
+        return len(text)
+
+    def __indent_new_lines(self, text):
+        """Adds the indent after every new line (\\r\\n, \\r, or \\n) in the given text.
+
+        Parameters
+        ----------
+        text : str
+            Text to indent the new lines of.
 
-        # add indent after every new line
-        # NOTE: \1 is capture group one and contains the original new line character
-        indented = re.sub(r"(\r\n|\r|\n)", r"\1" + indent_chars, indented)
+        Returns
+        -------
+        str
+            Given text with the indent after every new line.
+        """
+        indent = self.__indent
+        if not indent:
+            return text
+
+        if '\r' not in text:
+            return text.replace('\n', '\n' + indent)
 
-        return self.parent_stream.write(indented)
+        # split on \r\n first so it is indented as a single new line rather than as \r and \n
+        return ('\r\n' + indent).join(
+            line.replace('\r', '\r' + indent).replace('\n', '\n' + indent)
+            for line in text.split('\r\n')
+        )
 
     def flush(self):
-        """Flush the parent stream.
+        """Write anything buffered to, and then flush, the parent stream.
 
         See Also
         --------
         io.TextIOBase.flush
         """
+        if self.__buffer:
+            self.parent_stream.write(''.join(self.__buffer))
+            self.__buffer.clear()
         self.parent_stream.flush()
+
+
+class TextIOPipeline(TextIOSelectiveObfuscator):
+    """Tees the standard out and standard error of a command to the given streams and to log
+    files, obfuscating each chunk of output once for all of them.
+
+    Notes
+    -----
+    The `out` and `err` branches of the pipeline are callable, so they can be given to `sh`
+    as the `_out` and `_err` callbacks, which `sh` calls with each decoded chunk of output
+    without flushing after every chunk as it does for file objects.
+
+    The log files are opened with a large write buffer and are only guaranteed to be
+    written once the pipeline is flushed or closed, so the pipeline should be closed,
+    or used as a context manager, before reading them.
+
+    Parameters
+    ----------
+    out_streams : list of IOBase, optional
+        Streams to write the standard out of the command to, ex: sys.stdout.
+    err_streams : list of IOBase, optional
+        Streams to write the standard error of the command to, ex: sys.stderr.
+    file_paths : list of str, optional
+        Paths to the log files to write both the standard out and standard error of the
+        command to.
+    append : bool, optional
+        True to append to the log files.
+        False to overwrite the log files.
+    indent_level : int, optional
+        Level to indent what is written to the out and err streams to.
+        What is written to the log files is never indented.
+    randomize_replacment_length : bool, optional
+        True to randomize the length of the text being obfuscated.
+        False to use the same length replacement for any obfuscated text.
+    replacement_char : char, optional
+        Character to replace the target strings to obfuscate with.
+
+    Attributes
+    ----------
+    __files : list of io.TextIOWrapper
+    __out : TextIOPipelineBranch
+    __err : TextIOPipelineBranch
+    """
+
+    FILE_BUFFER_SIZE = 256 * 1024
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        out_streams=None,
+        err_streams=None,
+        file_paths=None,
+        append=False,
+        indent_level=0,
+        randomize_replacment_length=True,
+        replacement_char='*'
+    ):
+        super().__init__(
+            parent_stream=None,
+            randomize_replacment_length=randomize_replacment_length,
+            replacement_char=replacement_char
+        )
+
+        self.__files = [
+            open( # pylint: disable=consider-using-with
+                file_path,
+                'a' if append else 'w',
+                buffering=TextIOPipeline.FILE_BUFFER_SIZE
+            ) for file_path in (file_paths or [])
+        ]
+        self.__out = TextIOPipelineBranch(
+            pipeline=self,
+            sinks=TextIOPipeline.__indent_streams(out_streams, indent_level) + self.__files
+        )
+        self.__err = TextIOPipelineBranch(
+            pipeline=self,
+            sinks=TextIOPipeline.__indent_streams(err_streams, indent_level) + self.__files
+        )
+
+    @property
+    def out(self):
+        """
+        Returns
+        -------
+        TextIOPipelineBranch
+            Branch of this pipeline to write the standard out of the command to.
+        """
+        return self.__out
+
+    @property
+    def err(self):
+        """
+        Returns
+        -------
+        TextIOPipelineBranch
+            Branch of this pipeline to write the standard error of the command to.
+        """
+        return self.__err
+
+    def write(self, given):
+        """Writes to the `out` branch of this pipeline.
+
+        Parameters
+        ----------
+        given : str or bytes (utf-8)
+            Text to obfuscate and then write to the out streams and log files.
+
+        Returns
+        -------
+        int
+            Number of characters written.
+
+        See Also
+        --------
+        io.TextIOBase.write
+        """
+        return self.__out.write(given)
+
+    def flush(self):
+        """Flush the out and err streams and write the buffered output to the log files.
+
+        See Also
+        --------
+        io.TextIOBase.flush
+        """
+        self.__out.flush()
+        self.__err.flush()
+
+    def close(self):
+        """Flush and then close the log files. The out and err streams are not closed.
+
+        See Also
+        --------
+        io.TextIOBase.close
+        """
+        if self.closed:
+            return
+
+        try:
+            self.flush()
+        finally:
+            for file in self.__files:
+                file.close()
+            super().close()
+
+    @staticmethod
+    def __indent_streams(streams, indent_level):
+        if not indent_level:
+            return list(streams or [])
+
+        return [
+            TextIOIndenter(parent_stream=stream, indent_level=indent_level)
+            for stream in (streams or [])
+        ]
+
+
+class TextIOPipelineBranch(io.TextIOBase):
+    """Branch of a TextIOPipeline that obfuscates what is written to it with the obfuscation
+    targets of the pipeline and then writes it to each of its sinks.
+
+    Parameters
+    ----------
+    pipeline : TextIOPipeline
+        Pipeline to obfuscate what is written to this branch with.
+    sinks : list of IOBase
+        Streams and files to write to after obfuscating.
+    """
+
+    def __init__(self, pipeline, sinks):
+        self.__pipeline = pipeline
+        self.__sinks = sinks
+        super().__init__()
+
+    def __call__(self, given):
+        """Writes the given chunk of output, so this branch can be used as an `sh` callback.
+
+        Notes
+        -----
+        Returns None because `sh` stops calling a callback that returns a truthy value.
+        """
+        self.write(given)
+
+    def write(self, given):
+        """Obfuscates the given text once and then writes it to each sink.
+
+        Parameters
+        ----------
+        given : str or bytes (utf-8)
+            Text to obfuscate and then write to each sink.
+
+        Returns
+        -------
+        int
+            Number of characters written.
+
+        See Also
+        --------
+        io.TextIOBase.write
+        """
+        if isinstance(given, bytes):
+            given = given.decode('utf-8', errors='replace')
+
+        obfuscated = self.__pipeline.obfuscate(given)
+        for sink in self.__sinks:
+            sink.write(obfuscated)
+
+        return len(given)
+
+    def flush(self):
+        """Flush each sink.
+
+        See Also
+        --------
+        io.TextIOBase.flush
+        """
+        for sink in self.__sinks:
+            if not getattr(sink, 'closed', False):
+                sink.flush()
@@ -5,6 +5,7 @@ import xml.etree.ElementTree as ET
 
 import sh
 from ploigos_step_runner.exceptions import StepRunnerException
+from ploigos_step_runner.utils.commands import run_command
 
 
 def generate_maven_settings(working_dir, maven_servers, maven_repositories, maven_mirrors):
@@ -421,7 +422,8 @@ def write_effective_pom(
     """
 
     try:
-        sh.mvn( # pylint: disable=no-member
+        run_command(
+            sh.mvn, # pylint: disable=no-member
             'help:effective-pom',
             f'-f={pom_file_path}',
             f'-Doutput={output_path}'
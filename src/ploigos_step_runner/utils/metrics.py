@@ -0,0 +1,146 @@
+"""Shared utils for recording performance metrics about running steps.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError: # pragma: no cover
+    # resource is not available on all platforms, ex: Windows
+    resource = None
+
+class PhaseMetrics:
+    """Records wall time, CPU time, child process CPU time, and peak RSS for named phases.
+
+    Notes
+    -----
+    CPU time is for this process only, child process CPU time is for all child processes
+    (ex: external commands run with sh) that were waited for during the phase.
+
+    Peak RSS is the high water mark of this process's resident set size at the end of the phase,
+    so the phase where it increases is the phase that used the most memory so far.
+    Peak RSS is not recorded on platforms without the `resource` module.
+
+    Attributes
+    ----------
+    __phases : dict of str to dict
+    """
+
+    WALL_TIME_KEY = 'wall-time-seconds'
+    CPU_TIME_KEY = 'cpu-time-seconds'
+    CHILD_CPU_TIME_KEY = 'child-cpu-time-seconds'
+    PEAK_RSS_KEY = 'peak-rss-bytes'
+
+    def __init__(self):
+        self.__phases = {}
+
+    @property
+    def phases(self):
+        """
+        Returns
+        -------
+        dict of str to dict
+            Metrics for each phase, in the order the phases were recorded.
+            For example:
+            {
+                'validate': {
+                    'wall-time-seconds': 0.001234,
+                    'cpu-time-seconds': 0.001201,
+                    'child-cpu-time-seconds': 0.0,
+                    'peak-rss-bytes': 52428800
+                }
+            }
+        """
+        return self.__phases
+
+    @contextmanager
+    def measure(self, phase_name):
+        """Context manager that records the metrics for the code run within it
+        as the given phase.
+
+        If the phase raises an error the metrics are still recorded.
+        If a phase with the same name was already recorded the metrics are added together,
+        other than peak RSS which is the latest high water mark.
+
+        Parameters
+        ----------
+        phase_name : str
+            Name of the phase to record the metrics as.
+        """
+        start_wall_time = time.perf_counter()
+        start_cpu_time = time.process_time()
+        start_child_cpu_time = PhaseMetrics.__get_child_cpu_time()
+        try:
+            yield
+        finally:
+            phase = {
+                PhaseMetrics.WALL_TIME_KEY: time.perf_counter() - start_wall_time,
+                PhaseMetrics.CPU_TIME_KEY: time.process_time() - start_cpu_time,
+                PhaseMetrics.CHILD_CPU_TIME_KEY:
+                    PhaseMetrics.__get_child_cpu_time() - start_child_cpu_time
+            }
+
+            previous_phase = self.__phases.get(phase_name, {})
+            for key, value in phase.items():
+                phase[key] = round(previous_phase.get(key, 0.0) + value, 6)
+
+            peak_rss = PhaseMetrics.__get_peak_rss()
+            if peak_rss is not None:
+                phase[PhaseMetrics.PEAK_RSS_KEY] = peak_rss
+
+            self.__phases[phase_name] = phase
+
+    def add_phases(self, phases):
+        """Adds the given phases, recorded by another PhaseMetrics, to these metrics.
+
+        If a phase with the same name was already recorded the metrics are added together,
+        other than peak RSS which is the latest high water mark, the same as `measure`.
+
+        Parameters
+        ----------
+        phases : dict of str to dict
+            Metrics for each phase, see `phases`.
+        """
+        for phase_name, added_phase in phases.items():
+            phase = dict(self.__phases.get(phase_name, {}))
+            for key, value in added_phase.items():
+                if key == PhaseMetrics.PEAK_RSS_KEY:
+                    phase[key] = value
+                else:
+                    phase[key] = round(phase.get(key, 0.0) + value, 6)
+
+            self.__phases[phase_name] = phase
+
+    @staticmethod
+    def __get_child_cpu_time():
+        """
+        Returns
+        -------
+        float
+            User plus system CPU time, in seconds, of all child processes waited for so far.
+        """
+        times = os.times()
+        return times.children_user + times.children_system
+
+    @staticmethod
+    def __get_peak_rss():
+        """
+        Returns
+        -------
+        int or None
+            Peak resident set size of this process so far in bytes,
+            or None if not available on this platform.
+        """
+        if resource is None:
+            return None
+
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # macOS reports bytes where as every other platform reports kilobytes
+        if sys.platform == 'darwin': # pragma: no cover
+            return max_rss
+
+        return max_rss * 1024
@@ -0,0 +1,190 @@
+"""Discovery of third party StepImplementers (plugins).
+
+Plugins register their StepImplementers as entry points in the
+`ploigos_step_runner.step_implementers` group, named `<step-name>.<ImplementerName>`.
+
+Examples
+--------
+setup.cfg of a plugin distribution providing a `Helm` step implementer for the `deploy` step:
+
+    [options.entry_points]
+    ploigos_step_runner.step_implementers =
+        deploy.Helm = my_ploigos_plugin.deploy.helm:Helm
+
+Notes
+-----
+Scanning the installed distributions for entry points is slow, so the scanned plugins are
+cached to disk, keyed by the Python version and the modification times of the directories on
+`sys.path` (installing, upgrading, or removing a distribution modifies the directory it is
+installed in). No plugin module is imported until its StepImplementer is used.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+from ploigos_step_runner.utils.file import create_parent_dir
+
+STEP_IMPLEMENTERS_ENTRY_POINT_GROUP = 'ploigos_step_runner.step_implementers'
+CACHE_FILE_NAME = 'step-implementer-plugins.json'
+
+_STEP_IMPLEMENTER_PLUGINS = None
+
+
+def get_step_implementer_plugins(cache_file_path=None):
+    """Gets the StepImplementer plugins of all installed distributions, scanning for them
+    at most once per process and only if the disk cache is stale.
+
+    Parameters
+    ----------
+    cache_file_path : str, optional
+        Path to the file to cache the scanned plugins in.
+        Default: `step-implementer-plugins.json` in the `ploigos-step-runner` directory of
+        `$XDG_CACHE_HOME`, or of `~/.cache` if not set.
+
+    Returns
+    -------
+    dict
+        Step name to dictionary of StepImplementer name to entry point reference
+        (`module:Class`) of the StepImplementer.
+    """
+    global _STEP_IMPLEMENTER_PLUGINS # pylint: disable=global-statement
+    if _STEP_IMPLEMENTER_PLUGINS is not None:
+        return _STEP_IMPLEMENTER_PLUGINS
+
+    if cache_file_path is None:
+        cache_file_path = os.path.join(
+            os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+            'ploigos-step-runner',
+            CACHE_FILE_NAME
+        )
+
+    cache_key = get_installed_distributions_key()
+    try:
+        with open(cache_file_path) as cache_file:
+            cache = json.load(cache_file)
+        if cache['key'] == cache_key:
+            _STEP_IMPLEMENTER_PLUGINS = cache['step-implementers']
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if _STEP_IMPLEMENTER_PLUGINS is None:
+        _STEP_IMPLEMENTER_PLUGINS = scan_step_implementer_plugins()
+        try:
+            create_parent_dir(cache_file_path)
+            with open(cache_file_path, 'w') as cache_file:
+                json.dump(
+                    {'key': cache_key, 'step-implementers': _STEP_IMPLEMENTER_PLUGINS},
+                    cache_file
+                )
+        except OSError:
+            # caching is only an optimization, so it is fine if the cache can not be written
+            pass
+
+    return _STEP_IMPLEMENTER_PLUGINS
+
+
+def clear_step_implementer_plugins():
+    """Clears the StepImplementer plugins scanned by this process, so the next call to
+    `get_step_implementer_plugins` reads the disk cache, or scans, again.
+    """
+    global _STEP_IMPLEMENTER_PLUGINS # pylint: disable=global-statement
+    _STEP_IMPLEMENTER_PLUGINS = None
+
+
+def scan_step_implementer_plugins():
+    """Scans the installed distributions for StepImplementer plugin entry points.
+
+    Returns
+    -------
+    dict
+        Step name to dictionary of StepImplementer name to entry point reference
+        (`module:Class`) of the StepImplementer.
+
+    See Also
+    --------
+    get_step_implementer_plugins
+    """
+    step_implementer_plugins = {}
+    for name, reference in _iter_entry_points(STEP_IMPLEMENTERS_ENTRY_POINT_GROUP):
+        step_name, _, step_implementer_name = name.partition('.')
+        if step_implementer_name:
+            step_implementer_plugins.setdefault(step_name, {})[step_implementer_name] = reference
+
+    return step_implementer_plugins
+
+
+def get_installed_distributions_key():
+    """Gets a key that changes when a distribution is installed, upgraded, or removed.
+
+    Returns
+    -------
+    str
+        Hash of the Python version and the paths and modification times of the
+        directories on `sys.path`, other than the current working directory.
+    """
+    current_working_dir = os.getcwd()
+    path_mtimes = []
+    for path in sys.path:
+        if not path or os.path.abspath(path) == current_working_dir:
+            continue
+        try:
+            path_mtimes.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            continue
+
+    return hashlib.sha256(
+        json.dumps([sys.version, path_mtimes]).encode('utf-8')
+    ).hexdigest()
+
+
+def load_entry_point_reference(reference):
+    """Imports the object an entry point reference refers to.
+
+    Parameters
+    ----------
+    reference : str
+        Entry point reference in the form `module:attribute.path`.
+
+    Returns
+    -------
+    object or None
+        Object the reference refers to or None if the module or attribute does not exist.
+    """
+    module_name, _, attribute_path = reference.partition(':')
+    try:
+        value = __import__(module_name, fromlist=['__name__'])
+        for attribute in attribute_path.split('.') if attribute_path else []:
+            value = getattr(value, attribute)
+    except (AttributeError, ModuleNotFoundError):
+        value = None
+
+    return value
+
+
+def _iter_entry_points(group):
+    """Yields the name and reference (`module:attribute`) of every entry point in the given
+    group of all installed distributions.
+    """
+    try:
+        from importlib import metadata # pylint: disable=import-outside-toplevel
+    except ImportError: # pragma: no cover
+        # Python < 3.8
+        try:
+            import pkg_resources # pylint: disable=import-outside-toplevel
+        except ImportError:
+            return
+        for entry_point in pkg_resources.iter_entry_points(group):
+            yield entry_point.name, f"{entry_point.module_name}:{'.'.join(entry_point.attrs)}"
+        return
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, 'select'):
+        selected_entry_points = entry_points.select(group=group)
+    else:
+        # Python < 3.10
+        selected_entry_points = entry_points.get(group, [])
+
+    for entry_point in selected_entry_points:
+        yield entry_point.name, entry_point.value
@@ -0,0 +1,108 @@
+"""Shared utils for pretty printing the sections of a step run.
+"""
+
+import io
+import pprint
+import sys
+import textwrap
+
+from ploigos_step_runner.config.config_value import ConfigValue
+
+SECTION_TITLE_LENGTH = 80
+
+def print_config(title, config_sources, keys_only=False):
+    """Prints configuration from each of its sources.
+
+    Notes
+    -----
+    Values are rendered without being decrypted, so that printing the configuration never
+    decrypts values that are not used.
+
+    The configuration is rendered into a buffer first and then written to stdout in a
+    single write, rather than in many small writes through the stdout wrappers.
+
+    Parameters
+    ----------
+    title : str
+        Section title to print the configuration under.
+    config_sources : list of (str, dict)
+        Title and configuration of each configuration source.
+    keys_only : bool, optional
+        True to print only the configuration keys of each configuration source.
+        False to print the configuration keys and values of each configuration source.
+    """
+    buffer = io.StringIO()
+    print_section_title(title, div_char="-", indent=1, file=buffer)
+    for source_title, config_source in config_sources:
+        if keys_only:
+            data = sorted(config_source.keys()) if config_source else []
+        else:
+            data = ConfigValue.convert_leaves_to_display_values(config_source)
+        print_data(source_title, data, file=buffer)
+
+    sys.stdout.write(buffer.getvalue())
+
+def print_section_title(title, div_char="=", indent=0, file=None):
+    """
+    Utility function for pretty printing section title.
+
+    Parameters
+    ----------
+    title : str
+        Section title to print
+    div_char : str, optional
+        Character to print the lines above and below the title with.
+    indent : int, optional
+        Amount to indent the section title by.
+    file : file-like object, optional
+        Stream to print to. Default: sys.stdout
+    """
+    print(file=file)
+    print(file=file)
+    print_indented(text=div_char * SECTION_TITLE_LENGTH, indent=indent, file=file)
+    print_indented(text=title.center(SECTION_TITLE_LENGTH), indent=indent, file=file)
+    print_indented(text=div_char * SECTION_TITLE_LENGTH, indent=indent, file=file)
+
+def print_data(title, data, indent=2, file=None):
+    """Utility function for pretty printing data.
+
+    Notes
+    -----
+    Indent levels are each are 4 spaces wide.
+
+    Parameters
+    ----------
+    title : str
+        Title of the data to print.
+    data
+        Data to print
+    indent : int
+        Amount to indent the title by and then the content by this +1
+    file : file-like object, optional
+        Stream to print to. Default: sys.stdout
+    """
+    printer = pprint.PrettyPrinter()
+    print_indented(text=title, indent=indent, file=file)
+    print_indented(text=printer.pformat(data), indent=indent + 1, file=file)
+    print(file=file)
+
+def print_indented(text, indent=0, file=None):
+    """Prints the given text indented by a given indent level.
+
+    Notes
+    -----
+    Indent levels are each are 4 spaces wide.
+
+    Parameters
+    ----------
+    text : str
+        Text to print indented.
+    indent : indent
+        amount to indent the given text by before printing.
+    file : file-like object, optional
+        Stream to print to. Default: sys.stdout
+    """
+    print(textwrap.indent(
+        text=text,
+        prefix=" " * (4 * indent)
+    ), file=file)
@@ -1,6 +1,7 @@
 """
 Shared utilities for dealing with Python reflection.
 """
+import sys
 
 def import_and_get_class(module_name, class_name):
     """Dynamically loads a class from a given module.
@@ -25,3 +26,63 @@ def import_and_get_class(module_name, class_name):
         clazz = None
 
     return clazz
+
+
+def install_lazy_attributes(module_globals, attribute_modules):
+    """Makes the given attributes of a module, typically the classes a package `__init__`
+    re-exports from its sub modules, be imported from their defining module on first access
+    rather than when the module is imported.
+
+    Uses a module level `__getattr__` (PEP 562). On Python versions without support for module
+    level `__getattr__` the attributes are imported immediately instead.
+
+    The given attributes are the module's `__all__`, unless it already defines one, so that
+    they can be listed without being imported.
+
+    Static analysis can not see module level `__getattr__` attributes, so the module should
+    also import them under `if TYPE_CHECKING:`, which is never true at runtime.
+
+    Parameters
+    ----------
+    module_globals : dict
+        `globals()` of the module to install the lazy attributes in.
+    attribute_modules : dict
+        Attribute name to name of the module to import the attribute from.
+        Module names starting with a `.` are relative to the package installing the lazy
+        attributes.
+
+    Examples
+    --------
+    >>> if TYPE_CHECKING:
+    ...     from ploigos_step_runner.step_implementers.shared.maven import Maven
+    ...     from ploigos_step_runner.step_implementers.shared.git import Git
+    >>> install_lazy_attributes(globals(), {
+    ...     'Maven': '.maven',
+    ...     'Git': '.git'
+    ... })
+    """
+    module_name = module_globals['__name__']
+
+    def __getattr__(name):
+        if name not in attribute_modules:
+            raise AttributeError(f"module '{module_name}' has no attribute '{name}'")
+
+        attribute_module_name = attribute_modules[name]
+        if attribute_module_name.startswith('.'):
+            attribute_module_name = module_name + attribute_module_name
+
+        value = getattr(__import__(attribute_module_name, fromlist=[name]), name)
+        module_globals[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(module_globals) | set(attribute_modules))
+
+    module_globals.setdefault('__all__', list(attribute_modules))
+
+    if sys.version_info < (3, 7): # pragma: no cover
+        for name in attribute_modules:
+            __getattr__(name)
+    else:
+        module_globals['__getattr__'] = __getattr__
+        module_globals['__dir__'] = __dir__
@@ -0,0 +1,518 @@
+"""Shared utils for tracing workflow runs as OpenTelemetry style spans.
+
+A `Tracer` records a span for each step, sub step, and external command run while it is active
+and writes them to a file in the OpenTelemetry Protocol (OTLP) JSON format,
+one `ExportTraceServiceRequest` per line, the same format written by the OpenTelemetry Collector
+file exporter and read by its `otlpjsonfile` receiver.
+
+Trace context is propagated across separate `psr` invocations either by the `TRACEPARENT`
+environment variable, in the W3C Trace Context format, or if that is not set, by a trace context
+file in the results directory, so that every step of a workflow is in the same trace.
+The `TRACEPARENT` environment variable is also set for every external command run while
+a span is active, so that traced tools can continue the trace.
+
+Examples
+--------
+>>> with Tracer.from_context('step-runner-results') as tracer:
+...     with start_span('package') as span:
+...         run_command(sh.mvn, 'install')
+>>> tracer.write('step-runner-traces.jsonl')
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from io import StringIO
+
+from ploigos_step_runner.decryption_utils import DecryptionUtils
+from ploigos_step_runner.utils.file import create_parent_dir
+from ploigos_step_runner.utils.io import TextIOSelectiveObfuscator
+
+TRACEPARENT_ENV_VAR = 'TRACEPARENT'
+TRACE_CONTEXT_FILE_NAME = 'step-runner-trace-context.json'
+INSTRUMENTATION_SCOPE_NAME = 'ploigos_step_runner'
+SERVICE_NAME = 'ploigos-step-runner'
+
+# see opentelemetry.proto.trace.v1.Span.SpanKind
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+
+# see opentelemetry.proto.trace.v1.Status.StatusCode
+STATUS_CODE_UNSET = 0
+STATUS_CODE_OK = 1
+STATUS_CODE_ERROR = 2
+
+_TRACEPARENT_REGEX = re.compile(r'^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$')
+
+_ACTIVE_TRACER = None
+
+def get_active_tracer():
+    """
+    Returns
+    -------
+    Tracer or None
+        The active tracer, or None if tracing is not enabled.
+    """
+    return _ACTIVE_TRACER
+
+@contextmanager
+def start_span(name, kind=SPAN_KIND_INTERNAL, attributes=None):
+    """Context manager that records a span, as a child of the current span,
+    for the code run within it if there is an active tracer.
+
+    Parameters
+    ----------
+    name : str
+        Name of the span.
+    kind : int, optional
+        OTLP span kind.
+    attributes : dict, optional
+        Attributes of the span.
+
+    Yields
+    ------
+    Span or None
+        The started span, or None if there is no active tracer.
+    """
+    tracer = get_active_tracer()
+    if tracer is None:
+        yield None
+    else:
+        with tracer.start_span(name, kind, attributes) as span:
+            yield span
+
+class Span: # pylint: disable=too-many-instance-attributes
+    """An OpenTelemetry style span.
+
+    Parameters
+    ----------
+    name : str
+        Name of the span.
+    trace_id : str
+        32 hex character id of the trace this span is in.
+    span_id : str
+        16 hex character id of this span.
+    parent_span_id : str or None
+        16 hex character id of the parent span, or None if this is a root span.
+    kind : int
+        OTLP span kind.
+    attributes : dict, optional
+        Attributes of the span.
+
+    Attributes
+    ----------
+    name : str
+    trace_id : str
+    span_id : str
+    parent_span_id : str or None
+    kind : int
+    attributes : dict
+    start_time_unix_nano : int
+    end_time_unix_nano : int or None
+    status_code : int
+    status_message : str
+    """
+
+    def __init__( # pylint: disable=too-many-arguments
+        self,
+        name,
+        trace_id,
+        span_id,
+        parent_span_id,
+        kind,
+        attributes=None
+    ):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = dict(attributes) if attributes else {}
+        self.start_time_unix_nano = _time_unix_nano()
+        self.end_time_unix_nano = None
+        self.status_code = STATUS_CODE_UNSET
+        self.status_message = ''
+
+    @property
+    def traceparent(self):
+        """
+        Returns
+        -------
+        str
+            This span as a W3C Trace Context `traceparent` value.
+        """
+        return f'00-{self.trace_id}-{self.span_id}-01'
+
+    def set_attribute(self, key, value):
+        """Sets an attribute of this span.
+
+        Parameters
+        ----------
+        key : str
+            Attribute key.
+        value : str, bool, int, float, or list
+            Attribute value. None values are not exported.
+        """
+        self.attributes[key] = value
+
+    def set_status(self, status_code, status_message=''):
+        """Sets the status of this span.
+
+        Parameters
+        ----------
+        status_code : int
+            OTLP status code.
+        status_message : str, optional
+            Description of the status.
+        """
+        self.status_code = status_code
+        self.status_message = status_message
+
+    def end(self):
+        """Ends this span, if not already ended.
+        """
+        if self.end_time_unix_nano is None:
+            self.end_time_unix_nano = _time_unix_nano()
+
+    def to_otlp(self, obfuscate=str):
+        """
+        Parameters
+        ----------
+        obfuscate : function, optional
+            Function to obfuscate the name, string attribute values, and status message with.
+
+        Returns
+        -------
+        dict
+            This span in the OTLP JSON format.
+        """
+        otlp_span = {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'name': obfuscate(self.name),
+            'kind': self.kind,
+            'startTimeUnixNano': str(self.start_time_unix_nano),
+            'endTimeUnixNano': str(self.end_time_unix_nano),
+            'attributes': _to_otlp_attributes(self.attributes, obfuscate),
+            'status': {'code': self.status_code}
+        }
+        if self.parent_span_id:
+            otlp_span['parentSpanId'] = self.parent_span_id
+        if self.status_message:
+            otlp_span['status']['message'] = obfuscate(self.status_message)
+
+        return otlp_span
+
+class Tracer: # pylint: disable=too-many-instance-attributes
+    """Records OpenTelemetry style spans while it is active.
+
+    Notes
+    -----
+    Only one tracer can be active at a time, it is active for all threads while entered.
+    Each thread has its own current span, spans started by threads without a current span
+    are children of the given parent span, if any.
+    Any values decrypted after this tracer is created, and before it is exited,
+    are obfuscated in the written spans.
+
+    Parameters
+    ----------
+    trace_id : str, optional
+        32 hex character id of the trace to record spans in. If not given a new trace is started.
+    parent_span_id : str, optional
+        16 hex character id of the span, from another process, to parent root spans to.
+    resource_attributes : dict, optional
+        Attributes of the resource, in addition to the service name, that spans are recorded for.
+
+    Attributes
+    ----------
+    __trace_id : str
+    __parent_span_id : str or None
+    __resource_attributes : dict
+    __finished_spans : list of Span
+    __current_spans : threading.local
+    __lock : threading.Lock
+    __obfuscator : TextIOSelectiveObfuscator
+    __obfuscator_buffer : StringIO
+    __previous_tracer : Tracer or None
+    """
+
+    def __init__(self, trace_id=None, parent_span_id=None, resource_attributes=None):
+        self.__trace_id = trace_id if trace_id else _generate_id(16)
+        self.__parent_span_id = parent_span_id
+        self.__resource_attributes = {'service.name': SERVICE_NAME}
+        if resource_attributes:
+            self.__resource_attributes.update(resource_attributes)
+        self.__finished_spans = []
+        self.__current_spans = threading.local()
+        self.__lock = threading.Lock()
+        self.__obfuscator_buffer = StringIO()
+        self.__obfuscator = TextIOSelectiveObfuscator(
+            parent_stream=self.__obfuscator_buffer,
+            randomize_replacment_length=False
+        )
+        self.__previous_tracer = None
+
+        DecryptionUtils.register_obfuscation_stream(self.__obfuscator)
+
+    @staticmethod
+    def from_context(results_dir_path, resource_attributes=None):
+        """Creates a tracer that continues the trace of the workflow being run.
+
+        The trace context is taken from the `TRACEPARENT` environment variable if set to a
+        valid value, else from the trace context file in the given results directory if it exists,
+        else a new trace is started and written to the trace context file so that later steps
+        of the workflow continue it.
+
+        Parameters
+        ----------
+        results_dir_path : str
+            Path to the workflow results directory.
+        resource_attributes : dict, optional
+            Attributes of the resource, in addition to the service name,
+            that spans are recorded for.
+
+        Returns
+        -------
+        Tracer
+            Tracer for the trace of the workflow being run.
+        """
+        traceparent_match = _TRACEPARENT_REGEX.match(os.environ.get(TRACEPARENT_ENV_VAR, ''))
+        if traceparent_match:
+            return Tracer(
+                trace_id=traceparent_match.group(1),
+                parent_span_id=traceparent_match.group(2),
+                resource_attributes=resource_attributes
+            )
+
+        trace_context_file_path = os.path.join(results_dir_path, TRACE_CONTEXT_FILE_NAME)
+        try:
+            with open(trace_context_file_path, 'r') as trace_context_file:
+                trace_context = json.load(trace_context_file)
+            return Tracer(
+                trace_id=trace_context['trace-id'],
+                resource_attributes=resource_attributes
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        tracer = Tracer(resource_attributes=resource_attributes)
+        create_parent_dir(trace_context_file_path)
+        with open(trace_context_file_path, 'w') as trace_context_file:
+            json.dump({'trace-id': tracer.trace_id}, trace_context_file)
+
+        return tracer
+
+    def __enter__(self):
+        global _ACTIVE_TRACER # pylint: disable=global-statement
+        self.__previous_tracer = _ACTIVE_TRACER
+        _ACTIVE_TRACER = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global _ACTIVE_TRACER # pylint: disable=global-statement
+        _ACTIVE_TRACER = self.__previous_tracer
+        self.__previous_tracer = None
+
+        # no more spans are recorded so no more values need to be obfuscated in them
+        DecryptionUtils.unregister_obfuscation_stream(self.__obfuscator)
+
+    @property
+    def trace_id(self):
+        """
+        Returns
+        -------
+        str
+            32 hex character id of the trace this tracer records spans in.
+        """
+        return self.__trace_id
+
+    @property
+    def finished_spans(self):
+        """
+        Returns
+        -------
+        list of Span
+            Spans recorded by this tracer, in the order they ended.
+        """
+        return self.__finished_spans
+
+    @property
+    def current_span(self):
+        """
+        Returns
+        -------
+        Span or None
+            The innermost span started, and not yet ended, by the current thread.
+        """
+        span_stack = getattr(self.__current_spans, 'stack', None)
+        return span_stack[-1] if span_stack else None
+
+    @contextmanager
+    def start_span(self, name, kind=SPAN_KIND_INTERNAL, attributes=None):
+        """Context manager that records a span, as a child of the current span,
+        for the code run within it.
+
+        If the code raises an error the span status is set to error,
+        otherwise it is left as is for the code to set.
+
+        Parameters
+        ----------
+        name : str
+            Name of the span.
+        kind : int, optional
+            OTLP span kind.
+        attributes : dict, optional
+            Attributes of the span.
+
+        Yields
+        ------
+        Span
+            The started span.
+        """
+        parent_span = self.current_span
+        span = Span(
+            name=name,
+            trace_id=self.__trace_id,
+            span_id=_generate_id(8),
+            parent_span_id=parent_span.span_id if parent_span else self.__parent_span_id,
+            kind=kind,
+            attributes=attributes
+        )
+
+        if not hasattr(self.__current_spans, 'stack'):
+            self.__current_spans.stack = []
+        self.__current_spans.stack.append(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.set_status(STATUS_CODE_ERROR, f"{type(error).__name__}: {error}")
+            raise
+        finally:
+            self.__current_spans.stack.pop()
+            span.end()
+            with self.__lock:
+                self.__finished_spans.append(span)
+
+    def get_otlp(self):
+        """
+        Notes
+        -----
+        Decrypted values are obfuscated in each string value before it is serialized,
+        so that they are obfuscated no matter how serializing escapes them.
+
+        Returns
+        -------
+        dict
+            All of the spans recorded by this tracer, with any decrypted values obfuscated,
+            as an OTLP JSON `ExportTraceServiceRequest`.
+        """
+        with self.__lock:
+            return {
+                'resourceSpans': [{
+                    'resource': {
+                        'attributes': _to_otlp_attributes(
+                            self.__resource_attributes,
+                            self.__obfuscate
+                        )
+                    },
+                    'scopeSpans': [{
+                        'scope': {'name': INSTRUMENTATION_SCOPE_NAME},
+                        'spans': [
+                            span.to_otlp(self.__obfuscate) for span in self.__finished_spans
+                        ]
+                    }]
+                }]
+            }
+
+    def write(self, trace_file_path):
+        """Appends all of the spans recorded by this tracer, with any decrypted values obfuscated,
+        to the given file as a single line OTLP JSON `ExportTraceServiceRequest`.
+
+        Does nothing if no spans were recorded.
+
+        Parameters
+        ----------
+        trace_file_path : str
+            Path to the OTLP JSON lines file to append the spans to.
+        """
+        if not self.__finished_spans:
+            return
+
+        otlp_line = json.dumps(self.get_otlp(), ensure_ascii=False)
+
+        create_parent_dir(trace_file_path)
+        with open(trace_file_path, 'a', encoding='utf-8') as trace_file:
+            trace_file.write(otlp_line + '\n')
+
+    def __obfuscate(self, value):
+        """
+        Returns
+        -------
+        str
+            Given value as a string with any decrypted values obfuscated.
+        """
+        self.__obfuscator.write(str(value))
+        obfuscated = self.__obfuscator_buffer.getvalue()
+        self.__obfuscator_buffer.seek(0)
+        self.__obfuscator_buffer.truncate()
+        return obfuscated
+
+def _generate_id(num_bytes):
+    """
+    Returns
+    -------
+    str
+        Random, non zero, id of the given number of bytes as lower case hex.
+    """
+    generated_id = 0
+    while not generated_id:
+        generated_id = int.from_bytes(os.urandom(num_bytes), 'big')
+
+    return f'{generated_id:0{num_bytes * 2}x}'
+
+def _time_unix_nano():
+    """
+    Returns
+    -------
+    int
+        Current time in nanoseconds since the epoch.
+    """
+    return int(time.time() * 1000000000)
+
+def _to_otlp_attributes(attributes, obfuscate=str):
+    """
+    Returns
+    -------
+    list of dict
+        Given attributes as OTLP JSON key values, skipping any None values,
+        with string values obfuscated with the given function.
+    """
+    return [
+        {'key': key, 'value': _to_otlp_any_value(value, obfuscate)}
+        for key, value in attributes.items()
+        if value is not None
+    ]
+
+def _to_otlp_any_value(value, obfuscate=str):
+    """
+    Returns
+    -------
+    dict
+        Given value as an OTLP JSON `AnyValue`, with string values obfuscated with the
+        given function.
+    """
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    if isinstance(value, (list, tuple)):
+        return {'arrayValue': {'values': [
+            _to_otlp_any_value(item, obfuscate) for item in value
+        ]}}
+
+    return {'stringValue': obfuscate(value)}
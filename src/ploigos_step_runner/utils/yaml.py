@@ -0,0 +1,151 @@
+"""
+Shared utils for dealing with YAML.
+
+Notes
+-----
+All YAML loading and dumping in this project should go through this module so that the libyaml
+based C loader and dumper are used whenever PyYAML was built with libyaml, falling back to the
+pure Python implementations when it was not.
+"""
+
+import re
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+    from yaml import CDumper as Dumper
+    LIBYAML_AVAILABLE = True
+except ImportError: # pragma: no cover
+    from yaml import SafeLoader
+    from yaml import Dumper
+    LIBYAML_AVAILABLE = False
+
+# Characters (or character combinations) that force the emitter to write a string as a double
+# quoted scalar. The libyaml emitter and the pure Python emitter fold long double quoted scalars
+# differently (the pure Python emitter also folds them where there is no space, ex: after an
+# escaped character), everything else they emit byte for byte the same.
+#
+# SEE: yaml.emitter.Emitter.analyze_scalar
+_DOUBLE_QUOTED_SCALAR_REGEX = re.compile(r'[^\n\x20-\x7e]| \n|\n ')
+
+def yaml_safe_load(stream):
+    """Parses the first YAML document in a stream into python objects,
+    only resolving basic YAML tags.
+
+    Parameters
+    ----------
+    stream : str, bytes, or file
+        YAML to parse.
+
+    Returns
+    -------
+    obj
+        Python object parsed from the given YAML.
+
+    Raises
+    ------
+    yaml.YAMLError
+        If given stream is not valid YAML.
+
+    See Also
+    --------
+    yaml.safe_load
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+def yaml_safe_load_all(stream):
+    """Parses all YAML documents in a stream into python objects,
+    only resolving basic YAML tags.
+
+    Parameters
+    ----------
+    stream : str, bytes, or file
+        YAML to parse.
+
+    Returns
+    -------
+    generator
+        Python objects parsed from each of the documents in the given YAML.
+
+    Raises
+    ------
+    yaml.YAMLError
+        If given stream is not valid YAML.
+
+    See Also
+    --------
+    yaml.safe_load_all
+    """
+    return yaml.load_all(stream, Loader=SafeLoader)
+
+def yaml_dump(data, stream=None, **kwargs):
+    """Serializes a python object into a YAML stream.
+
+    Notes
+    -----
+    Output is byte for byte the same as `yaml.dump` with the same arguments.
+    The libyaml dumper is used unless the given data contains a string that would be written
+    as a double quoted scalar, which the two emitters fold differently once it runs past the
+    line width.
+
+    Parameters
+    ----------
+    data : obj
+        Python object to serialize.
+    stream : file, optional
+        Stream to write the YAML to.
+        If not given the YAML is returned as a str.
+    kwargs
+        Additional arguments to pass to `yaml.dump`.
+
+    Returns
+    -------
+    str or None
+        The YAML if no stream given, else None.
+
+    See Also
+    --------
+    yaml.dump
+    """
+    if _has_double_quoted_scalar(data):
+        dumper = yaml.Dumper
+    else:
+        dumper = Dumper
+
+    return yaml.dump(data, stream, Dumper=dumper, **kwargs)
+
+def _has_double_quoted_scalar(data):
+    """Determines if the given data contains any string that the YAML emitter may write as a
+    double quoted scalar, and so may fold over multiple lines.
+
+    Notes
+    -----
+    Whether a double quoted scalar gets folded depends on the column it starts at, which depends
+    on how deeply it is nested, so any such string, however short, is treated as foldable.
+
+    Parameters
+    ----------
+    data : obj
+        Python object to check.
+
+    Returns
+    -------
+    bool
+        True if any string in the given data (keys or values) may be written as a
+        double quoted scalar.
+        False otherwise.
+    """
+    pending = [data]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, str):
+            if _DOUBLE_QUOTED_SCALAR_REGEX.search(value):
+                return True
+        elif isinstance(value, dict):
+            pending.extend(value.keys())
+            pending.extend(value.values())
+        elif isinstance(value, (list, tuple, set)):
+            pending.extend(value)
+
+    return False
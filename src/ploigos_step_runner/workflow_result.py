@@ -4,12 +4,11 @@ import json
 import os
 import pickle
 
-import yaml
-
 from ploigos_step_runner.exceptions import StepRunnerException
 from ploigos_step_runner.step_result import StepResult
-from ploigos_step_runner.utils.dict import deep_merge
-from ploigos_step_runner.utils.file import create_parent_dir
+from ploigos_step_runner.utils.dict import deep_merge_many
+from ploigos_step_runner.utils.file import create_parent_dir, file_lock
+from ploigos_step_runner.utils.yaml import yaml_dump
 
 
 class WorkflowResult:
@@ -131,7 +130,7 @@ class WorkflowResult:
             create_parent_dir(yml_filename)
             with open(yml_filename, 'w') as file:
                 results = self.__get_all_step_results_dict()
-                yaml.dump(results, file, indent=4)
+                yaml_dump(results, file, indent=4)
         except Exception as error:
             raise RuntimeError(f'error dumping {yml_filename}: {error}') from error
 
@@ -194,6 +193,85 @@ class WorkflowResult:
         except Exception as error:
             raise StepRunnerException(f'error loading {pickle_filename}: {error}') from error
 
+    @staticmethod
+    def get_pickle_file_version(pickle_filename):
+        """Gets the version of a pickle file, which changes whenever the file is written to.
+
+        Parameters
+        ----------
+        pickle_filename : str
+            Name of the pickle file to get the version of.
+
+        Returns
+        -------
+        tuple or None
+            Modification time, change time, and size of the pickle file or
+            None if it does not exist.
+        """
+        try:
+            pickle_file_stat = os.stat(pickle_filename)
+        except OSError:
+            return None
+
+        return (
+            pickle_file_stat.st_mtime_ns,
+            pickle_file_stat.st_ctime_ns,
+            pickle_file_stat.st_size
+        )
+
+    @staticmethod
+    def add_step_result_to_files( # pylint: disable=too-many-arguments
+        workflow_result,
+        workflow_result_version,
+        step_result,
+        pickle_filename,
+        yml_filename,
+        phase_metrics
+    ):
+        """Adds the given step result to the given workflow result and writes the workflow
+        result pickle and results files.
+
+        Notes
+        -----
+        The same step can be run in multiple environments concurrently, so if the pickle file
+        was written to since the given workflow result was loaded from it, the step result is
+        added to the workflow result loaded from it again instead.
+
+        Parameters
+        ----------
+        workflow_result : WorkflowResult
+            Workflow result loaded from the pickle file.
+        workflow_result_version : tuple or None
+            Version of the pickle file when the workflow result was loaded from it,
+            see `get_pickle_file_version`.
+        step_result : StepResult
+            Step result to add.
+        pickle_filename : str
+            Name of the pickle file to write the workflow result to.
+        yml_filename : str
+            Name of the results file to write the workflow result to.
+        phase_metrics : PhaseMetrics
+            Metrics to measure writing the files in.
+
+        Returns
+        -------
+        tuple of (WorkflowResult, tuple)
+            Workflow result the step result was added to and the version of the pickle file
+            it was written to.
+        """
+        with file_lock(f'{pickle_filename}.lock'):
+            if WorkflowResult.get_pickle_file_version(pickle_filename) != workflow_result_version:
+                workflow_result = WorkflowResult.load_from_pickle_file(pickle_filename)
+
+            workflow_result.add_step_result(step_result=step_result)
+            with phase_metrics.measure('workflow-result-pickle-write'):
+                workflow_result.write_to_pickle_file(pickle_filename=pickle_filename)
+            workflow_result_version = WorkflowResult.get_pickle_file_version(pickle_filename)
+            with phase_metrics.measure('results-file-write'):
+                workflow_result.write_results_to_yml_file(yml_filename=yml_filename)
+
+        return workflow_result, workflow_result_version
+
     def write_to_pickle_file(self, pickle_filename):
         """Write the workflow list in a pickle format to file
 
@@ -221,13 +299,10 @@ class WorkflowResult:
         results: dict
             results of all steps from list
         """
-        all_results = {}
-        for step_result in self.workflow_list:
-            all_results = deep_merge(
-                dest=all_results,
-                source=step_result.get_step_result_dict(),
-                overwrite_duplicate_keys=True
-            )
+        all_results = deep_merge_many(
+            sources=(step_result.get_step_result_dict() for step_result in self.workflow_list),
+            overwrite_duplicate_keys=True
+        )
         step_runner_results = {
             'step-runner-results': all_results
         }
@@ -1,4 +1,6 @@
 import os.path
+import pickle
+from unittest.mock import patch
 
 from testfixtures import TempDirectory
 
@@ -263,6 +265,130 @@ class TestConfig(BaseTestCase):
             ):
                 config.add_config(os.path.join(temp_dir.path, config_dir))
 
+    def test_add_config_dir_sorted_order(self):
+        with TempDirectory() as temp_dir:
+            config_dir = "test"
+
+            # written out of order on purpose
+            config_files = [
+                (os.path.join(config_dir, 'c.yml'), 'implementer-c'),
+                (os.path.join(config_dir, 'a.yml'), 'implementer-a'),
+                (os.path.join(config_dir, 'b', 'b2.json'), 'implementer-b2'),
+                (os.path.join(config_dir, 'b', 'b1.yml'), 'implementer-b1'),
+                (os.path.join(config_dir, 'd', 'e', 'e1.yml'), 'implementer-e1')
+            ]
+            for config_file_name, implementer in config_files:
+                config_file_contents = {
+                    Config.CONFIG_KEY: {
+                        'step-foo': [{
+                            'name': implementer,
+                            'implementer': implementer
+                        }]
+                    }
+                }
+                temp_dir.write(
+                    config_file_name,
+                    bytes(f"{config_file_contents}", 'utf-8')
+                )
+
+            config = Config()
+            config.add_config(os.path.join(temp_dir.path, config_dir))
+
+            self.assertEqual(
+                [
+                    sub_step_config.sub_step_implementer_name
+                    for sub_step_config in config.get_sub_step_configs('step-foo')
+                ],
+                [
+                    'implementer-a',
+                    'implementer-b1',
+                    'implementer-b2',
+                    'implementer-c',
+                    'implementer-e1'
+                ]
+            )
+
+    def test_add_config_dir_skips_hidden_files_and_dirs(self):
+        with TempDirectory() as temp_dir:
+            config_dir = "test"
+
+            temp_dir.write(
+                os.path.join(config_dir, 'foo.yml'),
+                bytes(f"{ {Config.CONFIG_KEY: {'step-foo': {'implementer': 'foo'}}} }", 'utf-8')
+            )
+            temp_dir.write(
+                os.path.join(config_dir, '.hidden.yml'),
+                b': blarg this: is {} bad syntax'
+            )
+            temp_dir.write(
+                os.path.join(config_dir, '.git', 'config'),
+                b': blarg this: is {} bad syntax'
+            )
+
+            config = Config()
+            config.add_config(os.path.join(temp_dir.path, config_dir))
+
+            self.assertEqual(len(config.step_configs), 1)
+            self.assertIn('step-foo', config.step_configs)
+
+    def test_add_config_dir_many_invalid_files(self):
+        with TempDirectory() as temp_dir:
+            config_dir = "test"
+
+            temp_dir.write(
+                os.path.join(config_dir, 'foo.yml'),
+                bytes(f"{ {Config.CONFIG_KEY: {}} }", 'utf-8')
+            )
+            temp_dir.write(
+                os.path.join(config_dir, 'bad1.yml'),
+                b': blarg this: is {} bad syntax'
+            )
+            temp_dir.write(
+                os.path.join(config_dir, 'bad2.yml'),
+                b': blarg this: is {} bad syntax'
+            )
+
+            config = Config()
+            with self.assertRaisesRegex(
+                ValueError,
+                r"(?s)Error parsing config files in \(.*test\) as json or yaml: "
+                r"Error parsing 2 of 3 files as YAML or JSON:"
+                r"\nError parsing file \([^)]+bad1.yml\).+"
+                r"\nError parsing file \([^)]+bad2.yml\).+"
+            ):
+                config.add_config(os.path.join(temp_dir.path, config_dir))
+
+    def test_add_config_dir_one_invalid_file(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write(os.path.join('test', 'bad.yml'), b': blarg this: is {} bad syntax')
+
+            config = Config()
+            with self.assertRaisesRegex(
+                ValueError,
+                r"Error parsing config file \(.*test/bad.yml\) as json or yaml"
+            ):
+                config.add_config(os.path.join(temp_dir.path, 'test'))
+
+    def test_add_config_dir_symlink_loop(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write(
+                os.path.join('test', 'sub', 'foo.yml'),
+                bytes(f"{ {Config.CONFIG_KEY: {'step-foo': {'implementer': 'foo'}}} }", 'utf-8')
+            )
+            os.symlink(
+                os.path.join(temp_dir.path, 'test'),
+                os.path.join(temp_dir.path, 'test', 'sub', 'loop')
+            )
+            os.symlink(
+                os.path.join(temp_dir.path, 'test', 'sub'),
+                os.path.join(temp_dir.path, 'test', 'linked-sub')
+            )
+
+            config = Config()
+            config.add_config(os.path.join(temp_dir.path, 'test'))
+
+            self.assertIn('step-foo', config.step_configs)
+
     def test_add_config_dir_one_valid_file_and_one_valid_dict(self):
         with TempDirectory() as temp_dir:
             config_dir = "test"
@@ -830,3 +956,216 @@ class TestConfig(BaseTestCase):
             sops_decryptor._SOPS__additional_sops_args,
             ['--aws-profile=foo']
         )
+
+class TestConfigSnapshot(BaseTestCase):
+    def __write_config_files(self, temp_dir):
+        temp_dir.write(
+            os.path.join('config', 'foo.yml'),
+            bytes(
+                "step-runner-config:\n"
+                "  config-decryptors:\n"
+                "  - implementer: SOPS\n"
+                "  global-defaults:\n"
+                "    organization: org1\n"
+                "  global-environment-defaults:\n"
+                "    DEV:\n"
+                "      kube-api: dev.ploigos.xyz\n"
+                "  step-test-foo:\n"
+                "    implementer: foo\n"
+                "    config:\n"
+                "      test1: foo\n"
+                "    environment-config:\n"
+                "      DEV:\n"
+                "        test2: dev-foo\n",
+                'utf-8'
+            )
+        )
+        temp_dir.write(
+            os.path.join('config', 'bar.yml'),
+            bytes(
+                "step-runner-config:\n"
+                "  step-test-bar:\n"
+                "  - name: bar1\n"
+                "    implementer: bar\n"
+                "  - name: bar2\n"
+                "    implementer: bar\n",
+                'utf-8'
+            )
+        )
+
+        return os.path.join(temp_dir.path, 'config')
+
+    def test_write_snapshot_and_load_snapshot(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            snapshot_path = os.path.join(temp_dir.path, 'working', 'config.snapshot')
+
+            Config(config_dir).write_snapshot(snapshot_path)
+            self.assertTrue(os.path.isfile(snapshot_path))
+
+            DecryptionUtils._DecryptionUtils__config_value_decryptors = []
+            with patch.object(Config, '_Config__add_parsed_config_file') as add_parsed_config_file_mock:
+                config = Config(config_dir, snapshot_path=snapshot_path)
+                add_parsed_config_file_mock.assert_not_called()
+
+            self.assertEqual(
+                ConfigValue.convert_leaves_to_values(config.global_defaults),
+                {'organization': 'org1'}
+            )
+            self.assertEqual(
+                ConfigValue.convert_leaves_to_values(
+                    config.get_global_environment_defaults_for_environment('DEV')
+                ),
+                {
+                    'environment-name': 'DEV',
+                    'kube-api': 'dev.ploigos.xyz'
+                }
+            )
+
+            foo_sub_step = config.get_step_config('step-test-foo').get_sub_step('foo')
+            self.assertEqual(foo_sub_step.parent_config, config)
+            self.assertEqual(foo_sub_step.get_config_value('test1'), 'foo')
+            self.assertEqual(foo_sub_step.get_config_value('test2', 'DEV'), 'dev-foo')
+            self.assertEqual(
+                [sub_step.sub_step_name for sub_step in config.get_sub_step_configs('step-test-bar')],
+                ['bar1', 'bar2']
+            )
+
+            sops_decryptor = DecryptionUtils._DecryptionUtils__config_value_decryptors[0]
+            self.assertEqual(type(sops_decryptor), SOPS)
+
+    def test_load_snapshot_config_file_changed(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            snapshot_path = os.path.join(temp_dir.path, 'config.snapshot')
+            Config(config_dir).write_snapshot(snapshot_path)
+
+            temp_dir.write(
+                os.path.join('config', 'bar.yml'),
+                bytes(
+                    "step-runner-config:\n"
+                    "  step-test-bar:\n"
+                    "    implementer: bar\n"
+                    "    config:\n"
+                    "      changed: true\n",
+                    'utf-8'
+                )
+            )
+
+            config = Config(config_dir, snapshot_path=snapshot_path)
+            bar_sub_step = config.get_step_config('step-test-bar').get_sub_step('bar')
+            self.assertTrue(bar_sub_step.get_config_value('changed'))
+
+    def test_load_snapshot_config_file_added(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            snapshot_path = os.path.join(temp_dir.path, 'config.snapshot')
+            Config(config_dir).write_snapshot(snapshot_path)
+
+            temp_dir.write(
+                os.path.join('config', 'baz.yml'),
+                bytes(
+                    "step-runner-config:\n"
+                    "  step-test-baz:\n"
+                    "    implementer: baz\n",
+                    'utf-8'
+                )
+            )
+
+            config = Config(config_dir, snapshot_path=snapshot_path)
+            self.assertIsNotNone(config.get_step_config('step-test-baz'))
+
+    def test_load_snapshot_does_not_exist(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+
+            config = Config(
+                config_dir,
+                snapshot_path=os.path.join(temp_dir.path, 'does-not-exist.snapshot')
+            )
+            self.assertIsNotNone(config.get_step_config('step-test-foo'))
+
+    def test_load_snapshot_invalid(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            temp_dir.write('config.snapshot', b'not a snapshot')
+
+            config = Config(
+                config_dir,
+                snapshot_path=os.path.join(temp_dir.path, 'config.snapshot')
+            )
+            self.assertIsNotNone(config.get_step_config('step-test-foo'))
+
+    def test_load_snapshot_not_dict(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            snapshot_path = os.path.join(temp_dir.path, 'config.snapshot')
+            Config(config_dir).write_snapshot(snapshot_path)
+            with open(snapshot_path, 'rb') as snapshot_file:
+                snapshot_header = snapshot_file.readline()
+            temp_dir.write('config.snapshot', snapshot_header + pickle.dumps(['not', 'a', 'dict']))
+
+            config = Config(config_dir, snapshot_path=snapshot_path)
+            self.assertIsNotNone(config.get_step_config('step-test-foo'))
+
+    def test_load_snapshot_config_file_changed_not_unpickled(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            snapshot_path = os.path.join(temp_dir.path, 'config.snapshot')
+            Config(config_dir).write_snapshot(snapshot_path)
+            temp_dir.write(
+                os.path.join('config', 'baz.yml'),
+                b"step-runner-config:\n  step-test-baz:\n    implementer: baz\n"
+            )
+
+            with patch('ploigos_step_runner.config.config.pickle.load') as pickle_load_mock:
+                config = Config(config_dir, snapshot_path=snapshot_path)
+
+            pickle_load_mock.assert_not_called()
+            self.assertIsNotNone(config.get_step_config('step-test-baz'))
+
+    def test_load_snapshot_without_header_not_unpickled(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            temp_dir.write('config.snapshot', pickle.dumps({'global-defaults': {}}))
+
+            with patch('ploigos_step_runner.config.config.pickle.load') as pickle_load_mock:
+                config = Config(
+                    config_dir,
+                    snapshot_path=os.path.join(temp_dir.path, 'config.snapshot')
+                )
+
+            pickle_load_mock.assert_not_called()
+            self.assertIsNotNone(config.get_step_config('step-test-foo'))
+
+    def test_load_snapshot_dict_config(self):
+        with TempDirectory() as temp_dir:
+            config_dir = self.__write_config_files(temp_dir)
+            snapshot_path = os.path.join(temp_dir.path, 'config.snapshot')
+            Config(config_dir).write_snapshot(snapshot_path)
+
+            config = Config(
+                {
+                    Config.CONFIG_KEY: {
+                        'step-test-dict': {
+                            'implementer': 'dict'
+                        }
+                    }
+                },
+                snapshot_path=snapshot_path
+            )
+            self.assertIsNotNone(config.get_step_config('step-test-dict'))
+            self.assertIsNone(config.get_step_config('step-test-foo'))
+
+    def test_write_snapshot_dict_config(self):
+        with TempDirectory() as temp_dir:
+            config = Config({
+                Config.CONFIG_KEY: {}
+            })
+
+            with self.assertRaisesRegex(
+                ValueError,
+                r"Can not write configuration snapshot for configuration that was given as a"
+                r" dictionary"
+            ):
+                config.write_snapshot(os.path.join(temp_dir.path, 'config.snapshot'))
@@ -326,3 +326,59 @@ class TestConfigValue(BaseTestCase):
             decrypted_value,
             'mock decrypted value'
         )
+
+    def test_convert_leaves_to_display_values(self):
+        encrypted_value = 'ENC[AES256_GCM,data:UGKfnzsSrciR7GXZ,iv:yuReqA+n,tag:jueP7/ZW,type:str]'
+        source_values = {
+            'key1': ConfigValue('value1'),
+            'key2': [ConfigValue('value2'), ConfigValue(encrypted_value)],
+            'key3': ConfigValue(encrypted_value),
+            'key4': 'value4'
+        }
+        DecryptionUtils.register_config_value_decryptor(SOPS())
+
+        with patch('sh.sops', create=True) as sops_mock:
+            display_values = ConfigValue.convert_leaves_to_display_values(source_values)
+            sops_mock.assert_not_called()
+
+        self.assertEqual(
+            display_values,
+            {
+                'key1': 'value1',
+                'key2': ['value2', '<encrypted>'],
+                'key3': '<encrypted>',
+                'key4': 'value4'
+            }
+        )
+        self.assertIsInstance(source_values['key1'], ConfigValue)
+
+    def test_convert_leaves_to_raw_values(self):
+        encrypted_value = 'ENC[AES256_GCM,data:UGKfnzsSrciR7GXZ,iv:yuReqA+n,tag:jueP7/ZW,type:str]'
+        source_values = {
+            'key1': ConfigValue('value1'),
+            'key2': [ConfigValue('value2'), ConfigValue(encrypted_value)],
+            'key3': ConfigValue(encrypted_value),
+            'key4': 'value4'
+        }
+        DecryptionUtils.register_config_value_decryptor(SOPS())
+
+        with patch('sh.sops', create=True) as sops_mock:
+            raw_values = ConfigValue.convert_leaves_to_raw_values(source_values)
+            sops_mock.assert_not_called()
+
+        self.assertEqual(
+            raw_values,
+            {
+                'key1': 'value1',
+                'key2': ['value2', encrypted_value],
+                'key3': encrypted_value,
+                'key4': 'value4'
+            }
+        )
+        self.assertIsInstance(source_values['key1'], ConfigValue)
+
+    def test_is_encrypted(self):
+        DecryptionUtils.register_config_value_decryptor(SOPS())
+
+        self.assertTrue(ConfigValue('ENC[AES256_GCM,data:UGKf,type:str]').is_encrypted)
+        self.assertFalse(ConfigValue('not encrypted').is_encrypted)
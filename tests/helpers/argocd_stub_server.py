@@ -0,0 +1,164 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+
+def create_app_status(
+    sync_status='Synced',
+    health_status='Healthy',
+    operation_phase='Succeeded',
+    operation_message=None,
+    operation_pending=False
+):
+    """Creates the status of a stub ArgoCD Application, to script with
+    `ArgoCDStubServer.add_app`."""
+    return {
+        'sync_status': sync_status,
+        'health_status': health_status,
+        'operation_phase': operation_phase,
+        'operation_message': operation_message,
+        'operation_pending': operation_pending
+    }
+
+
+class ArgoCDStubServer:
+    """Local stand in for the ArgoCD API, to test syncing and waiting for ArgoCD Applications
+    offline.
+
+    Each Application is scripted with the statuses it goes through after a sync is requested.
+    Every `GET /api/v1/applications/{name}` after a sync returns the next of those statuses,
+    staying on the last one, and a `POST /api/v1/applications/{name}/sync` starts them over.
+
+    Examples
+    --------
+    >>> with ArgoCDStubServer(auth_token='token') as server:
+    ...     server.add_app('fruit', [
+    ...         create_app_status('OutOfSync', 'Healthy', 'Running', operation_pending=True),
+    ...         create_app_status('Synced', 'Progressing'),
+    ...         create_app_status('Synced', 'Healthy')
+    ...     ])
+    ...     client = ArgoCDAPIAppClient(server.url, auth_token='token')
+    """
+
+    APP_PATH_REGEX = re.compile(r'^/api/v1/applications/(?P<name>[^/]+)(?P<sync>/sync)?$')
+
+    def __init__(self, auth_token=None):
+        self.auth_token = auth_token
+        self.requests = []
+        self.__apps = {}
+        self.__lock = threading.Lock()
+        self.__server = None
+        self.__thread = None
+
+    @property
+    def url(self):
+        host, port = self.__server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def add_app(self, name, statuses, initial_status=None):
+        """Adds an Application that goes through the given statuses after a sync."""
+        with self.__lock:
+            self.__apps[name] = {
+                'statuses': statuses,
+                'status': initial_status or create_app_status(),
+                'next_status': None
+            }
+
+    def start(self):
+        self.__server = HTTPServer(('127.0.0.1', 0), self.__create_handler())
+        self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__server.shutdown()
+        self.__server.server_close()
+        self.__thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def handle(self, method, path, headers, body):
+        """Handles a request, returning the response status and body."""
+        with self.__lock:
+            self.requests.append((method, path, body))
+
+            if self.auth_token is not None \
+                    and headers.get('Authorization') != f'Bearer {self.auth_token}':
+                return 401, {'error': 'invalid session', 'code': 16}
+
+            match = ArgoCDStubServer.APP_PATH_REGEX.match(path)
+            if not match or match.group('name') not in self.__apps:
+                return 404, {'error': f'{path} not found', 'code': 5}
+            name = match.group('name')
+            app = self.__apps[name]
+
+            if match.group('sync'):
+                if method != 'POST':
+                    return 405, {'error': 'method not allowed'}
+                app['status'] = create_app_status(
+                    sync_status=app['status']['sync_status'],
+                    health_status=app['status']['health_status'],
+                    operation_phase=app['status']['operation_phase'],
+                    operation_pending=True
+                )
+                app['next_status'] = 0
+                return 200, self.__get_app_resource(name, app['status'])
+
+            if method != 'GET':
+                return 405, {'error': 'method not allowed'}
+            if app['next_status'] is not None and app['statuses']:
+                app['status'] = app['statuses'][app['next_status']]
+                app['next_status'] = min(app['next_status'] + 1, len(app['statuses']) - 1)
+            return 200, self.__get_app_resource(name, app['status'])
+
+    @staticmethod
+    def __get_app_resource(name, status):
+        app = {
+            'metadata': {'name': name, 'namespace': 'argocd'},
+            'status': {
+                'sync': {'status': status['sync_status']},
+                'health': {'status': status['health_status']}
+            }
+        }
+        if status['operation_phase']:
+            app['status']['operationState'] = {
+                'phase': status['operation_phase'],
+                'message': status['operation_message'] or ''
+            }
+        if status['operation_pending']:
+            app['operation'] = {'sync': {'prune': True}}
+        return app
+
+    def __create_handler(self):
+        stub_server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def __respond(self, method):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                status, response = stub_server.handle(method, self.path, self.headers, body)
+                response_body = json.dumps(response).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(response_body)))
+                self.end_headers()
+                self.wfile.write(response_body)
+
+            def do_GET(self): # pylint: disable=invalid-name
+                self.__respond('GET')
+
+            def do_POST(self): # pylint: disable=invalid-name
+                self.__respond('POST')
+
+            def log_message(self, format, *args): # pylint: disable=redefined-builtin
+                pass
+
+        return Handler
@@ -2,6 +2,8 @@ import unittest
 import shutil
 
 from ploigos_step_runner.decryption_utils import DecryptionUtils
+from ploigos_step_runner.step_runner import StepRunner
+from ploigos_step_runner.utils.plugins import clear_step_implementer_plugins
 
 class BaseTestCase(unittest.TestCase):
     def setUp(self):
@@ -14,6 +16,10 @@ class BaseTestCase(unittest.TestCase):
     def tearDown(self):
         DecryptionUtils._DecryptionUtils__config_value_decryptors = []
         DecryptionUtils._DecryptionUtils__obfuscation_streams = []
+        DecryptionUtils._DecryptionUtils__obfuscation_targets = []
+        DecryptionUtils._DecryptionUtils__decryptor_classes = {}
+        StepRunner._StepRunner__step_implementer_classes = {}
+        clear_step_implementer_plugins()
 
         try:
             shutil.rmtree("./step-runner-working")
@@ -1,5 +1,9 @@
+import sys
+
+import sh
 from ploigos_step_runner import StepImplementer, StepResult
 from ploigos_step_runner.config.config_value import ConfigValue
+from ploigos_step_runner.utils.commands import run_command
 
 
 class FailStepImplementer(StepImplementer):
@@ -17,6 +21,22 @@ class FailStepImplementer(StepImplementer):
         return step_result
 
 
+class ConfigFailStepImplementer(StepImplementer):
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {'fail': False}
+
+    @staticmethod
+    def _required_config_or_result_keys():
+        return []
+
+    def _run_step(self):
+        print(f"running in {self.environment}")
+        step_result = StepResult.from_step_implementer(self)
+        step_result.success = not self.get_value('fail')
+        return step_result
+
+
 class FooStepImplementer(StepImplementer):
     @staticmethod
     def step_implementer_config_defaults():
@@ -31,6 +51,57 @@ class FooStepImplementer(StepImplementer):
         return step_result
 
 
+class RunCommandStepImplementer(StepImplementer):
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {}
+
+    @staticmethod
+    def _required_config_or_result_keys():
+        return []
+
+    def _run_step(self):
+        step_result = StepResult.from_step_implementer(self)
+        run_command(sh.Command(sys.executable), '-c', "print('hello')")
+        return step_result
+
+
+class OperationMetricsStepImplementer(StepImplementer):
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {}
+
+    @staticmethod
+    def _required_config_or_result_keys():
+        return []
+
+    def _run_step(self):
+        step_result = StepResult.from_step_implementer(self)
+        for _ in range(2):
+            with self.operation_metrics.measure('sample-operation'):
+                pass
+        return step_result
+
+
+class OutputPipelineStepImplementer(StepImplementer):
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {}
+
+    @staticmethod
+    def _required_config_or_result_keys():
+        return []
+
+    def _run_step(self):
+        step_result = StepResult.from_step_implementer(self)
+        output_file_path = self.write_working_file('output.txt')
+        output_pipeline = self.create_output_pipeline(output_file_path)
+        output_pipeline.out(f"logging in with {self.get_value('password')}\n")
+        output_pipeline.err('done\n')
+        step_result.add_artifact(name='output', value=output_file_path)
+        return step_result
+
+
 class RequiredStepConfigStepImplementer(StepImplementer):
     @staticmethod
     def step_implementer_config_defaults():
@@ -74,5 +145,59 @@ class WriteConfigAsResultsStepImplementer(StepImplementer):
         return step_result
 
 
+class DeclaredResultsStepImplementer(StepImplementer):
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {}
+
+    @staticmethod
+    def _required_config_or_result_keys():
+        return []
+
+    @staticmethod
+    def result_artifact_keys():
+        return [
+            'required-config-key'
+        ]
+
+    def _run_step(self):
+        step_result = StepResult.from_step_implementer(self)
+        step_result.add_artifact(name='required-config-key', value='declared')
+        return step_result
+
+
 class NotSubClassOfStepImplementer():
     pass
+
+
+class CachedStepImplementer(StepImplementer):
+    """Copies the contents of its `input-path` to a working file, counting how many times it
+    has been run in `runs`."""
+
+    runs = 0
+
+    @staticmethod
+    def step_implementer_config_defaults():
+        return {}
+
+    @staticmethod
+    def _required_config_or_result_keys():
+        return [
+            'input-path'
+        ]
+
+    def _step_result_cache_input_paths(self):
+        return [self.get_value('input-path')]
+
+    def _run_step(self):
+        CachedStepImplementer.runs += 1
+
+        step_result = StepResult.from_step_implementer(self)
+        with open(self.get_value('input-path'), 'rb') as input_file:
+            output_file_path = self.write_working_file('cached-output.txt', input_file.read())
+        step_result.add_artifact(name='output', value=output_file_path)
+        step_result.add_artifact(name='runs', value=CachedStepImplementer.runs)
+        if self.get_value('fail'):
+            step_result.success = False
+            step_result.message = 'failed'
+        return step_result
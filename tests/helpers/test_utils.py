@@ -76,3 +76,23 @@ def create_sops_side_effect(mock_stdout):
         kwargs['_out'].write(mock_stdout)
 
     return sops_side_effect
+
+def pop_sub_step_result_metrics(results):
+    """Removes the metrics from every sub step result in the given results dictionary,
+    since they are different on every run.
+
+    Returns
+    -------
+    list of dict
+        The removed metrics.
+    """
+    metrics = []
+    pending = [results]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, dict):
+            if 'sub-step-implementer-name' in value and 'metrics' in value:
+                metrics.append(value.pop('metrics'))
+            pending.extend(value.values())
+
+    return metrics
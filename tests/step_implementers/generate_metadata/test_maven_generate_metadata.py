@@ -42,6 +42,11 @@ class TestStepImplementerMavenGenerateMetadata(BaseStepImplementerTestCase):
         expected_required_keys = ['pom-file']
         self.assertEqual(required_keys, expected_required_keys)
 
+    def test__step_result_cache_input_paths(self):
+        step_implementer = self.create_step_implementer(step_config={'pom-file': 'app/pom.xml'})
+
+        self.assertEqual(step_implementer._step_result_cache_input_paths(), ['app/pom.xml'])
+
     def test__validate_required_config_or_previous_step_result_artifact_keys_valid(self):
         with TempDirectory() as temp_dir:
             results_dir_path = os.path.join(temp_dir.path, 'step-runner-results')
@@ -41,6 +41,13 @@ class TestStepImplementerGenerateMetadataNpm(BaseStepImplementerTestCase):
         ]
         self.assertEqual(required_keys, expected_required_keys)
 
+    def test__step_result_cache_input_paths(self):
+        step_implementer = self.create_step_implementer(
+            step_config={'package-file': 'app/package.json'}
+        )
+
+        self.assertEqual(step_implementer._step_result_cache_input_paths(), ['app/package.json'])
+
     def test__validate_required_config_or_previous_step_result_artifact_keys_valid(self):
         with TempDirectory() as temp_dir:
             results_dir_path = os.path.join(temp_dir.path, 'step-runner-results')
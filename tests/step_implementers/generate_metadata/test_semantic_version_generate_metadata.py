@@ -48,6 +48,15 @@ class TestStepImplementerSemanticVersionGenerateMetadata(BaseStepImplementerTest
         ]
         self.assertEqual(required_keys, expected_required_keys)
 
+    def test__step_result_cache_input_paths(self):
+        step_implementer = self.create_step_implementer()
+
+        self.assertEqual(step_implementer._step_result_cache_input_paths(), [])
+        self.assertEqual(
+            step_implementer._step_result_cache_result_keys(),
+            SemanticVersion._required_config_or_result_keys()
+        )
+
     def test_run_step_pass(self):
         with TempDirectory() as temp_dir:
             results_dir_path = os.path.join(temp_dir.path, 'step-runner-results')
@@ -10,8 +10,10 @@ import sh
 from testfixtures import TempDirectory
 from tests.helpers.base_step_implementer_test_case import \
     BaseStepImplementerTestCase
+from tests.helpers.test_utils import Any
 from ploigos_step_runner import StepResult
 from ploigos_step_runner.step_implementers.package import Maven
+from ploigos_step_runner.utils.hashing import get_tree_fingerprint
 
 
 class TestStepImplementerMavenPackageBase(BaseStepImplementerTestCase):
@@ -41,7 +43,8 @@ class TestStepImplementerMavenPackageBase(BaseStepImplementerTestCase):
             'tls-verify': True,
             'pom-file': 'pom.xml',
             'artifact-extensions': ["jar", "war", "ear"],
-            'artifact-parent-dir': 'target'
+            'artifact-parent-dir': 'target',
+            'maven-build-reuse': False
         }
         self.assertEqual(defaults, expected_defaults)
 
@@ -52,6 +55,14 @@ class TestStepImplementerMavenPackageBase(BaseStepImplementerTestCase):
         ]
         self.assertEqual(required_keys, expected_required_keys)
 
+    def test__step_result_cache_input_paths(self):
+        step_implementer = self.create_step_implementer(
+            step_config={'pom-file': '/projects/app/pom.xml'}
+        )
+
+        self.assertEqual(step_implementer._step_result_cache_input_paths(), ['/projects/app'])
+        self.assertEqual(step_implementer._step_result_cache_ignore_patterns(), ['target'])
+
     def create_mvn_side_effect(pom_file, artifact_parent_dir, artifact_names):
         """simulates what mvn does by touching files.
         Notes
@@ -466,3 +477,146 @@ class TestStepImplementerMavenPackageBase(BaseStepImplementerTestCase):
             )
 
             self.assertEqual(expected_step_result.get_step_result_dict(), result.get_step_result_dict())
+
+
+class TestStepImplementerMavenPackageBuildReuse(TestStepImplementerMavenPackageBase):
+    def setup_build_reuse_test(self, temp_dir, previous_maven_build):
+        results_dir_path = os.path.join(temp_dir.path, 'step-runner-results')
+        work_dir_path = os.path.join(temp_dir.path, 'working')
+        temp_dir.write('pom.xml', b'''<project>
+            <modelVersion>4.0.0</modelVersion>
+            <groupId>com.mycompany.app</groupId>
+            <artifactId>my-app</artifactId>
+            <version>1.0</version>
+            <package>war</package>
+        </project>''')
+        temp_dir.write('src/main/java/App.java', b'class App {}')
+        pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+
+        fingerprint = get_tree_fingerprint(
+            temp_dir.path,
+            ignore_patterns=['target'],
+            excluded_paths=[work_dir_path, results_dir_path]
+        )
+        self.setup_previous_result(work_dir_path, {
+            'maven-build': {
+                'value': dict(
+                    {
+                        'pom-file': pom_file_path,
+                        'fingerprint': fingerprint,
+                        'maven-output': '/does/not/matter/mvn_test_output.txt'
+                    },
+                    **previous_maven_build
+                )
+            }
+        })
+
+        step_implementer = self.create_step_implementer(
+            step_config={
+                'pom-file': pom_file_path,
+                'maven-build-reuse': True
+            },
+            step_name='package',
+            implementer='Maven',
+            results_dir_path=results_dir_path,
+            results_file_name='step-runner-results.yml',
+            work_dir_path=work_dir_path,
+        )
+
+        return step_implementer, pom_file_path, fingerprint
+
+    @patch('sh.mvn', create=True)
+    def test_run_step_tested_build_skips_clean_and_tests(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            step_implementer, pom_file_path, fingerprint = self.setup_build_reuse_test(
+                temp_dir,
+                {'phase': 'test', 'tested': True}
+            )
+            mvn_mock.side_effect = TestStepImplementerMavenPackageBase.create_mvn_side_effect(
+                pom_file_path,
+                'target',
+                ['my-app-1.0.war'])
+
+            result = step_implementer._run_step()
+
+            self.assertTrue(result.success, result.message)
+            mvn_mock.assert_called_once_with(
+                'install',
+                '-f', pom_file_path,
+                '-s', Any(str),
+                '-DskipTests',
+                _out=Any(object),
+                _err=Any(object)
+            )
+            maven_output_path = result.get_artifact_value('maven-output')
+            self.assertNotEqual(maven_output_path, '/does/not/matter/mvn_test_output.txt')
+            self.assertEqual(
+                result.get_artifact_value('maven-build'),
+                {
+                    'pom-file': pom_file_path,
+                    'fingerprint': fingerprint,
+                    'phase': 'install',
+                    'tested': True,
+                    'maven-output': maven_output_path
+                }
+            )
+
+    @patch('sh.mvn', create=True)
+    def test_run_step_installed_build_skips_maven(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            step_implementer, pom_file_path, _ = self.setup_build_reuse_test(
+                temp_dir,
+                {'phase': 'install', 'tested': True}
+            )
+            temp_dir.write('target/my-app-1.0.war', b'')
+
+            result = step_implementer._run_step()
+
+            self.assertTrue(result.success, result.message)
+            mvn_mock.assert_not_called()
+            self.assertEqual(
+                result.get_artifact_value('maven-output'),
+                '/does/not/matter/mvn_test_output.txt'
+            )
+            self.assertEqual(
+                result.get_artifact_value('package-artifacts')[0]['path'],
+                os.path.join(temp_dir.path, 'target', 'my-app-1.0.war')
+            )
+
+    @patch('sh.mvn', create=True)
+    def test_run_step_installed_build_missing_artifact_runs_maven(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            step_implementer, pom_file_path, _ = self.setup_build_reuse_test(
+                temp_dir,
+                {'phase': 'install', 'tested': True}
+            )
+            mvn_mock.side_effect = TestStepImplementerMavenPackageBase.create_mvn_side_effect(
+                pom_file_path,
+                'target',
+                ['my-app-1.0.war'])
+
+            result = step_implementer._run_step()
+
+            self.assertTrue(result.success, result.message)
+            mvn_mock.assert_called_once()
+            self.assertNotIn('clean', mvn_mock.call_args[0])
+            self.assertIn('-DskipTests', mvn_mock.call_args[0])
+
+    @patch('sh.mvn', create=True)
+    def test_run_step_sources_changed_cleans(self, mvn_mock):
+        with TempDirectory() as temp_dir:
+            step_implementer, pom_file_path, _ = self.setup_build_reuse_test(
+                temp_dir,
+                {'phase': 'test', 'tested': True}
+            )
+            temp_dir.write('src/main/java/App.java', b'class App { }')
+            mvn_mock.side_effect = TestStepImplementerMavenPackageBase.create_mvn_side_effect(
+                pom_file_path,
+                'target',
+                ['my-app-1.0.war'])
+
+            result = step_implementer._run_step()
+
+            self.assertTrue(result.success, result.message)
+            self.assertEqual(mvn_mock.call_args[0][:2], ('clean', 'install'))
+            self.assertNotIn('-DskipTests', mvn_mock.call_args[0])
@@ -1,3 +1,4 @@
+import io
 import os
 from pathlib import Path
 from shutil import copyfile
@@ -9,6 +10,7 @@ from tests.helpers.base_step_implementer_test_case import \
 from ploigos_step_runner.step_implementers.shared.maven_generic import MavenGeneric
 from ploigos_step_runner.step_result import StepResult
 from ploigos_step_runner.utils.file import create_parent_dir
+from ploigos_step_runner.workflow_result import WorkflowResult
 
 
 class SampleMavenStepImplementer(MavenGeneric):
@@ -257,3 +259,139 @@ class TestStepImplementerSharedMavenGeneric(BaseStepImplementerTestCase):
                 'foo',
                 default_namespace='mvn'
             )
+
+    def __setup_maven_builds(self, test_dir, maven_build_fingerprints, step_config=None):
+        results_dir_path = os.path.join(test_dir.path, 'step-runner-results')
+        work_dir_path = os.path.join(test_dir.path, 'working')
+        test_dir.write('pom.xml', b'<project/>')
+        pom_file_path = os.path.join(test_dir.path, 'pom.xml')
+
+        workflow_result = WorkflowResult()
+        for index, fingerprint in enumerate(maven_build_fingerprints):
+            step_result = StepResult(
+                step_name=f'maven-step-{index}',
+                sub_step_name='Maven',
+                sub_step_implementer_name='Maven'
+            )
+            step_result.add_artifact(
+                name='maven-build',
+                value={
+                    'pom-file': pom_file_path,
+                    'fingerprint': fingerprint,
+                    'phase': 'test',
+                    'tested': True,
+                    'maven-output': f'/does/not/matter/{index}/mvn_test_output.txt'
+                }
+            )
+            workflow_result.add_step_result(step_result=step_result)
+        workflow_result.write_to_pickle_file(
+            pickle_filename=os.path.join(work_dir_path, 'step-runner-results.pkl')
+        )
+
+        return self.create_step_implementer(
+            step_config=dict(
+                {'pom-file': pom_file_path, 'maven-build-reuse': True},
+                **(step_config or {})
+            ),
+            results_dir_path=results_dir_path,
+            results_file_name='step-runner-results.yml',
+            work_dir_path=work_dir_path
+        )
+
+    def test__get_reusable_maven_build_last_previous_build(self):
+        with TempDirectory() as test_dir:
+            step_implementer = self.__setup_maven_builds(test_dir, ['old'])
+            fingerprint = step_implementer._get_maven_build_fingerprint()
+            step_implementer = self.__setup_maven_builds(test_dir, ['old', fingerprint])
+
+            maven_build = step_implementer._get_reusable_maven_build()
+
+            self.assertEqual(maven_build['maven-output'], '/does/not/matter/1/mvn_test_output.txt')
+            self.assertEqual(step_implementer._get_maven_clean_phases(), [])
+            self.assertEqual(
+                step_implementer._get_maven_build_plan('test'),
+                (maven_build, ['test'], ['-DskipTests'])
+            )
+            self.assertEqual(
+                step_implementer._get_maven_build_plan('install'),
+                (None, ['install'], ['-DskipTests'])
+            )
+            self.assertIn('maven-build-fingerprint', step_implementer.operation_metrics.phases)
+
+    def test__get_reusable_maven_build_sources_changed(self):
+        with TempDirectory() as test_dir:
+            step_implementer = self.__setup_maven_builds(test_dir, [])
+            fingerprint = step_implementer._get_maven_build_fingerprint()
+            step_implementer = self.__setup_maven_builds(test_dir, [fingerprint, 'old'])
+
+            self.assertIsNone(step_implementer._get_reusable_maven_build())
+            self.assertEqual(step_implementer._get_maven_clean_phases(), ['clean'])
+            self.assertEqual(
+                step_implementer._get_maven_build_plan('install'),
+                (None, ['clean', 'install'], [])
+            )
+
+    def test__get_reusable_maven_build_ignores_build_output_and_working_dirs(self):
+        with TempDirectory() as test_dir:
+            step_implementer = self.__setup_maven_builds(test_dir, [])
+            fingerprint = step_implementer._get_maven_build_fingerprint()
+            test_dir.write('target/classes/App.class', b'compiled')
+            test_dir.write('working/unit-test/mvn_test_output.txt', b'output')
+            step_implementer = self.__setup_maven_builds(test_dir, [fingerprint])
+
+            self.assertIsNotNone(step_implementer._get_reusable_maven_build())
+
+    def test__get_reusable_maven_build_disabled(self):
+        with TempDirectory() as test_dir:
+            step_implementer = self.__setup_maven_builds(test_dir, [])
+            fingerprint = step_implementer._get_maven_build_fingerprint()
+            step_implementer = self.__setup_maven_builds(
+                test_dir,
+                [fingerprint],
+                step_config={'maven-build-reuse': False}
+            )
+
+            self.assertIsNone(step_implementer._get_reusable_maven_build())
+            self.assertEqual(step_implementer.operation_metrics.phases, {})
+
+    def test__add_maven_build_artifact_disabled(self):
+        with TempDirectory() as test_dir:
+            step_implementer = self.__setup_maven_builds(
+                test_dir,
+                [],
+                step_config={'maven-build-reuse': False}
+            )
+            step_result = StepResult.from_step_implementer(step_implementer)
+
+            step_implementer._add_maven_build_artifact(
+                step_result=step_result,
+                phase='test',
+                tested=True,
+                maven_output_path='/does/not/matter/mvn_test_output.txt'
+            )
+
+            self.assertEqual(step_result.artifacts, {})
+
+    @patch(
+        'ploigos_step_runner.step_implementers.shared.maven_generic.get_tree_fingerprint',
+        side_effect=OSError('mock permission denied')
+    )
+    def test__get_reusable_maven_build_sources_not_readable(self, get_tree_fingerprint_mock):
+        with TempDirectory() as test_dir:
+            step_implementer = self.__setup_maven_builds(test_dir, ['old'])
+            step_result = StepResult.from_step_implementer(step_implementer)
+
+            with patch('sys.stdout', new_callable=io.StringIO) as stdout_mock:
+                self.assertIsNone(step_implementer._get_reusable_maven_build())
+                step_implementer._add_maven_build_artifact(
+                    step_result=step_result,
+                    phase='test',
+                    tested=True,
+                    maven_output_path='/does/not/matter/mvn_test_output.txt'
+                )
+
+            self.assertEqual(step_result.artifacts, {})
+            self.assertIn(
+                "WARNING: Not reusing Maven builds, could not hash sources: mock permission denied",
+                stdout_mock.getvalue()
+            )
@@ -53,6 +53,13 @@ class TestStepImplementerSonarQubePackageBase(BaseStepImplementerTestCase):
         ]
         self.assertEqual(required_keys, expected_required_keys)
 
+    def test__step_result_cache_input_paths(self):
+        step_implementer = self.create_step_implementer(
+            step_config={'properties': '/projects/app/sonar-project.properties'}
+        )
+
+        self.assertEqual(step_implementer._step_result_cache_input_paths(), ['/projects/app'])
+
     def test__validate_required_config_or_previous_step_result_artifact_keys_valid(self):
         step_config = {
             'url' : 'https://sonarqube-sonarqube.apps.ploigos_step_runner.rht-set.com',
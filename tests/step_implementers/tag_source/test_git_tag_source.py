@@ -655,7 +655,7 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
 
     def create_git_config_side_effect(self, mock_remote_origin_url):
         def git_config_side_effect(*args, **kwargs):
-            if (args[0] == '--get' and args[1] == 'remote.origin.url'):
+            if args == ('config', '--get', 'remote.origin.url'):
                 kwargs['_out'].write(mock_remote_origin_url)
 
         return git_config_side_effect
@@ -684,12 +684,13 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
                 work_dir_path=work_dir_path,
             )
 
-            git_mock.config.side_effect = TestStepImplementerTagSourceGit.\
+            git_mock.side_effect = TestStepImplementerTagSourceGit.\
                 create_git_config_side_effect(self, remote_origin_url)
 
             url = step_implementer._Git__git_url()
 
             self.assertEqual(url, remote_origin_url)
+            self.assertIn('git-config', step_implementer.operation_metrics.phases)
 
     @patch('sh.git', create=True)
     def test__git_url_url_from_git_config_error(self, git_mock):
@@ -713,7 +714,7 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
                 work_dir_path=work_dir_path,
             )
 
-            git_mock.config.side_effect = sh.ErrorReturnCode('git', b'mock out', b'mock error')
+            git_mock.side_effect = sh.ErrorReturnCode('git', b'mock out', b'mock error')
 
             with self.assertRaisesRegex(
                 StepRunnerException,
@@ -781,9 +782,10 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
 
             step_implementer._Git__git_tag(git_tag_value)
 
-            git_mock.tag.assert_called_once_with(
+            git_mock.assert_called_once_with(
+                'tag',
+                '--force',
                 git_tag_value,
-                '-f',
                 _out=Any(IOBase),
                 _err=Any(IOBase),
                 _tee='err'
@@ -813,7 +815,7 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
                 work_dir_path=work_dir_path,
             )
 
-            git_mock.tag.side_effect = sh.ErrorReturnCode('git', b'mock out', b'mock error')
+            git_mock.side_effect = sh.ErrorReturnCode('git', b'mock out', b'mock error')
 
             with self.assertRaisesRegex(
                 StepRunnerException,
@@ -849,9 +851,10 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
 
             step_implementer._Git__git_push(url)
 
-            git_mock.push.assert_called_once_with(
+            git_mock.assert_called_once_with(
+                'push',
                 url,
-                '--tag',
+                '--tags',
                 _out=Any(IOBase),
                 _err=Any(IOBase),
                 _tee='err'
@@ -882,8 +885,9 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
 
             step_implementer._Git__git_push(None)
 
-            git_mock.push.assert_called_once_with(
-                '--tag',
+            git_mock.assert_called_once_with(
+                'push',
+                '--tags',
                 _out=Any(IOBase),
                 _err=Any(IOBase),
                 _tee='err'
@@ -913,7 +917,7 @@ class TestStepImplementerTagSourceGit(BaseStepImplementerTestCase):
                 work_dir_path=work_dir_path,
             )
 
-            git_mock.push.side_effect = sh.ErrorReturnCode('git', b'mock out', b'mock error')
+            git_mock.side_effect = sh.ErrorReturnCode('git', b'mock out', b'mock error')
 
             with self.assertRaisesRegex(
                 StepRunnerException,
@@ -12,6 +12,7 @@ from ploigos_step_runner.config.config import Config
 from ploigos_step_runner.step_implementers.unit_test import Maven
 from ploigos_step_runner.step_result import StepResult
 from ploigos_step_runner.utils.file import create_parent_dir
+from ploigos_step_runner.utils.hashing import get_tree_fingerprint
 from ploigos_step_runner.workflow_result import WorkflowResult
 
 
@@ -38,7 +39,9 @@ class TestStepImplementerMavenUnitTest(MaveStepImplementerTestCase):
         expected_defaults = {
             'fail-on-no-tests': True,
             'pom-file': 'pom.xml',
-            'tls-verify': True
+            'tls-verify': True,
+            'maven-build-reuse': False,
+            'unit-test-maven-phase': 'test'
         }
         self.assertEqual(defaults, expected_defaults)
 
@@ -50,6 +53,106 @@ class TestStepImplementerMavenUnitTest(MaveStepImplementerTestCase):
         ]
         self.assertEqual(required_keys, expected_required_keys)
 
+    def test__step_result_cache_input_paths(self):
+        step_implementer = self.create_step_implementer(
+            step_config={'pom-file': '/projects/app/pom.xml'}
+        )
+
+        self.assertEqual(step_implementer._step_result_cache_input_paths(), ['/projects/app'])
+        self.assertEqual(step_implementer._step_result_cache_ignore_patterns(), ['target'])
+
+    def test__validate_required_config_or_previous_step_result_artifact_keys_invalid_phase(self):
+        with TempDirectory() as test_dir:
+            test_dir.write('pom.xml', b'<project/>')
+            step_implementer = self.create_step_implementer(
+                step_config={
+                    'pom-file': os.path.join(test_dir.path, 'pom.xml'),
+                    'unit-test-maven-phase': 'package'
+                },
+                work_dir_path=os.path.join(test_dir.path, 'working')
+            )
+
+            with self.assertRaisesRegex(
+                AssertionError,
+                r"Given Maven phase \(unit-test-maven-phase\) must be one of"
+                r" \['test', 'install'\]: package"
+            ):
+                step_implementer._validate_required_config_or_previous_step_result_artifact_keys()
+
+    @patch.object(Maven, '_generate_maven_settings', return_value='/does/not/matter/settings.xml')
+    @patch('sh.mvn', create=True)
+    @patch('ploigos_step_runner.step_implementers.shared.maven_generic.write_effective_pom')
+    def test__run_step_install_phase_with_build_reuse(
+        self,
+        write_effective_pom_mock,
+        mvn_mock,
+        _generate_maven_settings_mock
+    ):
+        with TempDirectory() as test_dir:
+            results_dir_path = os.path.join(test_dir.path, 'step-runner-results')
+            work_dir_path = os.path.join(test_dir.path, 'working')
+            test_dir.write('pom.xml', b'''<project xmlns="http://maven.apache.org/POM/4.0.0">
+    <modelVersion>4.0.0</modelVersion>
+    <groupId>com.mycompany.app</groupId>
+    <artifactId>my-app</artifactId>
+    <version>1.0</version>
+    <build>
+        <plugins>
+            <plugin>
+                <artifactId>maven-surefire-plugin</artifactId>
+            </plugin>
+        </plugins>
+    </build>
+</project>''')
+            pom_file_path = os.path.join(test_dir.path, 'pom.xml')
+            write_effective_pom_mock.side_effect = \
+                lambda pom_file_path, output_path: copyfile(pom_file_path, output_path)
+            mvn_mock.side_effect = lambda *args, **kwargs: test_dir.write(
+                'target/surefire-reports/TEST-com.mycompany.app.my-app.ClassNameTest.xml',
+                b''
+            )
+            step_implementer = self.create_step_implementer(
+                step_config={
+                    'pom-file': pom_file_path,
+                    'maven-build-reuse': True,
+                    'unit-test-maven-phase': 'install'
+                },
+                results_dir_path=results_dir_path,
+                work_dir_path=work_dir_path
+            )
+            fingerprint = get_tree_fingerprint(
+                test_dir.path,
+                ignore_patterns=['target'],
+                excluded_paths=[work_dir_path, results_dir_path]
+            )
+
+            result = step_implementer._run_step()
+
+            self.assertTrue(result.success, result.message)
+            mvn_mock.assert_called_once_with(
+                'clean',
+                'install',
+                '-f', pom_file_path,
+                '-s', '/does/not/matter/settings.xml',
+                _out=Any(IOBase),
+                _err=Any(IOBase)
+            )
+            mvn_output_file_path = os.path.join(work_dir_path, 'unit-test', 'mvn_test_output.txt')
+            self.assertEqual(
+                result.artifacts['maven-output']['description'],
+                "Standard out and standard error from 'mvn install'."
+            )
+            self.assertEqual(
+                result.get_artifact_value('maven-build'),
+                {
+                    'pom-file': pom_file_path,
+                    'fingerprint': fingerprint,
+                    'phase': 'install',
+                    'tested': True,
+                    'maven-output': mvn_output_file_path
+                }
+            )
+
     def __run__run_step_test(
         self,
         test_dir,
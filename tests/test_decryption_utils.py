@@ -12,6 +12,7 @@ import io
 import unittest
 import re
 import sys
+from unittest.mock import patch
 
 from tests.helpers.base_test_case import BaseTestCase
 
@@ -93,6 +94,17 @@ class TestDecryptionUtils(BaseTestCase):
             secret_value
         )
 
+    def test_can_decrypt_no_decryptors(self):
+        self.assertFalse(DecryptionUtils.can_decrypt(ConfigValue('TEST_ENC[decrypt me]')))
+
+    def test_can_decrypt_sample_decryptor(self):
+        DecryptionUtils.register_config_value_decryptor(
+            SampleConfigValueDecryptor()
+        )
+
+        self.assertTrue(DecryptionUtils.can_decrypt(ConfigValue('TEST_ENC[decrypt me]')))
+        self.assertFalse(DecryptionUtils.can_decrypt(ConfigValue('decrypt me')))
+
     def test_register_obfuscation_stream(self):
         secret_value = "decrypt me"
         config_value = ConfigValue(
@@ -122,6 +134,46 @@ class TestDecryptionUtils(BaseTestCase):
                 new_stdout.close()
                 sys.stdout = old_stdout
 
+    def test_register_obfuscation_stream_after_decrypt(self):
+        DecryptionUtils.register_config_value_decryptor(
+            SampleConfigValueDecryptor()
+        )
+        DecryptionUtils.decrypt(ConfigValue('TEST_ENC[decrypt me]'))
+
+        out = io.StringIO()
+        obfuscator = TextIOSelectiveObfuscator(out, randomize_replacment_length=False)
+        DecryptionUtils.register_obfuscation_stream(obfuscator)
+        obfuscator.write('leak decrypt me')
+
+        self.assertEqual(out.getvalue(), 'leak **********')
+
+    def test_decrypt_same_value_adds_obfuscation_target_once(self):
+        DecryptionUtils.register_config_value_decryptor(
+            SampleConfigValueDecryptor()
+        )
+        obfuscator = TextIOSelectiveObfuscator(io.StringIO())
+        DecryptionUtils.register_obfuscation_stream(obfuscator)
+
+        with patch.object(obfuscator, 'add_obfuscation_targets') as add_obfuscation_targets_mock:
+            DecryptionUtils.decrypt(ConfigValue('TEST_ENC[decrypt me]'))
+            DecryptionUtils.decrypt(ConfigValue('TEST_ENC[decrypt me]'))
+
+        add_obfuscation_targets_mock.assert_called_once_with(['decrypt me'])
+
+    def test_unregister_obfuscation_stream(self):
+        DecryptionUtils.register_config_value_decryptor(
+            SampleConfigValueDecryptor()
+        )
+        out = io.StringIO()
+        obfuscator = TextIOSelectiveObfuscator(out, randomize_replacment_length=False)
+        DecryptionUtils.register_obfuscation_stream(obfuscator)
+        DecryptionUtils.unregister_obfuscation_stream(obfuscator)
+
+        DecryptionUtils.decrypt(ConfigValue('TEST_ENC[decrypt me]'))
+        obfuscator.write('decrypt me')
+
+        self.assertEqual(out.getvalue(), 'decrypt me')
+
     def test__get_decryption_class_sops_short_name(self):
         decryptor_class = DecryptionUtils._DecryptionUtils__get_decryption_class('SOPS')
         self.assertEqual(
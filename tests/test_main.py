@@ -5,14 +5,23 @@
 
 from unittest.mock import patch
 
+import io
+import json
 import os
+import shutil
+import subprocess
+import sys
 import yaml
 from testfixtures import TempDirectory
 
+import ploigos_step_runner
 from ploigos_step_runner.__main__ import main
+from ploigos_step_runner.config import Config
 
 from tests.helpers.base_test_case import BaseTestCase
-from tests.helpers.test_utils import create_sops_side_effect
+from tests.helpers.sample_step_implementers import CachedStepImplementer
+from tests.helpers.test_utils import (create_sops_side_effect,
+                                     pop_sub_step_result_metrics)
 
 
 class TestInit(BaseTestCase):
@@ -47,6 +56,7 @@ class TestInit(BaseTestCase):
                 if expected_results:
                     with open(os.path.join(results_dir_path, "step-runner-results.yml"), 'r') as step_results_file:
                         results = yaml.safe_load(step_results_file.read())
+                        pop_sub_step_result_metrics(results)
                         print(expected_results)
                         print(results)
                         self.assertEqual(results, expected_results)
@@ -70,6 +80,11 @@ class TestInit(BaseTestCase):
     def test_help(self):
         self._run_main_test(['--help'], 0)
 
+    def test_sys_argv(self):
+        with patch('sys.argv', ['psr', '--help']):
+            with self.assertRaisesRegex(SystemExit, '0'):
+                main()
+
     def test_bad_arg(self):
         self._run_main_test(['--bad-arg'], 2)
 
@@ -510,3 +525,502 @@ class TestInit(BaseTestCase):
             }]
                             )
 
+    def test_multiple_environments(self):
+        with patch('sys.stdout', io.StringIO()):
+            self._run_main_test(
+                ['--step', 'foo', '--environment', 'DEV,PROD'],
+                config_files=[{
+                    'name': 'step-runner-config.yaml',
+                    'contents': '''---
+                    step-runner-config:
+                        foo:
+                            implementer: 'tests.helpers.sample_step_implementers.FooStepImplementer'
+                    '''
+                }],
+                expected_results={
+                    'step-runner-results': {
+                        environment: {
+                            'foo': {
+                                'tests.helpers.sample_step_implementers.FooStepImplementer': {
+                                    'artifacts': {},
+                                    'message': '',
+                                    'sub-step-implementer-name':
+                                        'tests.helpers.sample_step_implementers.FooStepImplementer',
+                                    'success': True
+                                }
+                            }
+                        }
+                        for environment in ('DEV', 'PROD')
+                    }
+                }
+            )
+
+    def test_multiple_environments_fail_any(self):
+        with patch('sys.stdout', io.StringIO()):
+            self._run_main_test(
+                [
+                    '--step', 'foo',
+                    '--environment', 'DEV,PROD',
+                    '--environments-success-policy', 'any',
+                    '--max-concurrent-environments', '1'
+                ],
+                200,
+                [{
+                    'name': 'step-runner-config.yaml',
+                    'contents': '''---
+                    step-runner-config:
+                        foo:
+                            implementer: 'tests.helpers.sample_step_implementers.FailStepImplementer'
+                    '''
+                }]
+            )
+
+    def _run_main_trace_file_test(self, trace_file_env_var, env):
+        with TempDirectory() as temp_dir, patch.dict(os.environ, env, clear=True):
+            temp_dir.write('step-runner-config.yaml', b'''---
+step-runner-config:
+    foo:
+        implementer: 'tests.helpers.sample_step_implementers.FooStepImplementer'
+''')
+            trace_file_path = os.path.join(temp_dir.path, 'traces.jsonl')
+            argv = [
+                '--step', 'foo',
+                '--config', os.path.join(temp_dir.path, 'step-runner-config.yaml'),
+                '--results-dir', os.path.join(temp_dir.path, 'step-runner-results')
+            ]
+            if trace_file_env_var:
+                os.environ['PSR_TRACE_FILE'] = trace_file_path
+            else:
+                argv += ['--trace-file', trace_file_path]
+
+            main(argv)
+
+            with open(trace_file_path) as trace_file:
+                otlp = json.loads(trace_file.read())
+
+        spans = otlp['resourceSpans'][0]['scopeSpans'][0]['spans']
+        self.assertEqual(
+            [span['name'] for span in spans],
+            ['foo tests.helpers.sample_step_implementers.FooStepImplementer', 'foo']
+        )
+        return spans
+
+    def test_trace_file(self):
+        spans = self._run_main_trace_file_test(False, {})
+        self.assertNotIn('parentSpanId', spans[1])
+
+    def test_trace_file_env_vars(self):
+        spans = self._run_main_trace_file_test(
+            True,
+            {'TRACEPARENT': '00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01'}
+        )
+        self.assertEqual(spans[1]['traceId'], '0af7651916cd43dd8448eb211c80319c')
+        self.assertEqual(spans[1]['parentSpanId'], 'b7ad6b7169203331')
+
+
+class TestConfigCompile(BaseTestCase):
+    def _run_main_config_dump_test(self, argv, env):
+        with TempDirectory() as temp_dir, patch.dict(os.environ, env, clear=True):
+            temp_dir.write('step-runner-config.yaml', b'''---
+step-runner-config:
+    foo:
+        implementer: 'tests.helpers.sample_step_implementers.FooStepImplementer'
+        config:
+            step-key: step-value
+''')
+            stdout = io.StringIO()
+            with patch('sys.stdout', stdout):
+                main(argv + [
+                    '--step', 'foo',
+                    '--config', os.path.join(temp_dir.path, 'step-runner-config.yaml'),
+                    '--results-dir', os.path.join(temp_dir.path, 'step-runner-results')
+                ])
+
+        return stdout.getvalue()
+
+    def test_config_dump_default(self):
+        stdout = self._run_main_config_dump_test([], {})
+        self.assertIn("{'step-key': 'step-value'}", stdout)
+
+    def test_config_dump_keys(self):
+        stdout = self._run_main_config_dump_test(['--config-dump', 'keys'], {})
+        self.assertIn("['step-key']", stdout)
+        self.assertNotIn('step-value', stdout)
+
+    def test_config_dump_env_var(self):
+        stdout = self._run_main_config_dump_test([], {'PSR_CONFIG_DUMP': 'off'})
+        self.assertNotIn('Configuration - foo', stdout)
+        self.assertIn('Results - foo', stdout)
+
+    def test_config_compile_and_run_step_with_snapshot(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('step-runner-config.yaml', b'''---
+step-runner-config:
+    write-config-as-results:
+        implementer: 'tests.helpers.sample_step_implementers.WriteConfigAsResultsStepImplementer'
+        config:
+            required-config-key: 'value'
+''')
+            config_file_path = os.path.join(temp_dir.path, 'step-runner-config.yaml')
+            snapshot_path = os.path.join(temp_dir.path, 'step-runner-config.snapshot')
+            results_dir_path = os.path.join(temp_dir.path, 'step-runner-results')
+
+            main(['config', 'compile', '--config', config_file_path, '--output', snapshot_path])
+            self.assertTrue(os.path.isfile(snapshot_path))
+
+            with patch('ploigos_step_runner.__main__.Config', wraps=Config) as config_mock:
+                main([
+                    '--step', 'write-config-as-results',
+                    '--config', config_file_path,
+                    '--config-snapshot', snapshot_path,
+                    '--results-dir', results_dir_path
+                ])
+                config_mock.assert_called_once_with(
+                    [config_file_path],
+                    snapshot_path=snapshot_path
+                )
+
+            with open(os.path.join(results_dir_path, "step-runner-results.yml"), 'r') as results_file:
+                results = yaml.safe_load(results_file.read())
+            self.assertEqual(
+                results['step-runner-results']['write-config-as-results']
+                    ['tests.helpers.sample_step_implementers.WriteConfigAsResultsStepImplementer']
+                    ['artifacts']['required-config-key']['value'],
+                'value'
+            )
+
+    def test_config_compile_config_file_does_not_exist(self):
+        with self.assertRaisesRegex(SystemExit, "101"):
+            main([
+                'config', 'compile',
+                '--config', 'does-not-exist.yml',
+                '--output', 'does-not-matter.snapshot'
+            ])
+
+    def test_config_compile_invalid_config(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('step-runner-config.yaml', b'{}')
+
+            with self.assertRaisesRegex(SystemExit, "102"):
+                main([
+                    'config', 'compile',
+                    '--config', os.path.join(temp_dir.path, 'step-runner-config.yaml'),
+                    '--output', os.path.join(temp_dir.path, 'step-runner-config.snapshot')
+                ])
+
+    def test_config_compile_no_config(self):
+        with self.assertRaisesRegex(SystemExit, "2"):
+            main(['config', 'compile'])
+
+    def test_config_compile_no_output(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('step-runner-config.yaml', b'step-runner-config: {}')
+
+            with self.assertRaisesRegex(SystemExit, "2"):
+                main([
+                    'config', 'compile',
+                    '--config', os.path.join(temp_dir.path, 'step-runner-config.yaml')
+                ])
+
+    def test_run_step_without_config_snapshot(self):
+        with TempDirectory() as temp_dir, \
+                patch('ploigos_step_runner.__main__.StepRunner') as step_runner_mock, \
+                patch('ploigos_step_runner.__main__.Config', wraps=Config) as config_mock:
+            temp_dir.write('step-runner-config.yaml', b'''---
+step-runner-config:
+    foo:
+        implementer: 'tests.helpers.sample_step_implementers.FooStepImplementer'
+''')
+            config_file_path = os.path.join(temp_dir.path, 'step-runner-config.yaml')
+            step_runner_mock.return_value.run_step.return_value = True
+
+            main(['--step', 'foo', '--config', config_file_path])
+
+            config_mock.assert_called_once_with([config_file_path], snapshot_path=None)
+
+
+class TestStepResultCache(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        CachedStepImplementer.runs = 0
+
+    def _run_main_cached_step(self, temp_dir, argv):
+        # each run of the workflow starts without the results of previous runs
+        shutil.rmtree(os.path.join(temp_dir.path, 'step-runner-working'), ignore_errors=True)
+        stdout = io.StringIO()
+        cwd = os.getcwd()
+        try:
+            os.chdir(temp_dir.path)
+            with patch('sys.stdout', stdout):
+                main(argv + [
+                    '--step', 'cached',
+                    '--config', os.path.join(temp_dir.path, 'step-runner-config.yaml'),
+                    '--results-dir', os.path.join(temp_dir.path, 'step-runner-results')
+                ])
+        finally:
+            os.chdir(cwd)
+
+        return stdout.getvalue()
+
+    def test_step_result_cache_dir(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            temp_dir.write('step-runner-config.yaml', f'''---
+step-runner-config:
+    cached:
+        implementer: 'tests.helpers.sample_step_implementers.CachedStepImplementer'
+        config:
+            input-path: {os.path.join(temp_dir.path, 'input.txt')}
+'''.encode('utf-8'))
+            cache_dir_path = os.path.join(temp_dir.path, 'step-result-cache')
+
+            self._run_main_cached_step(temp_dir, ['--step-result-cache-dir', cache_dir_path])
+            stdout = self._run_main_cached_step(
+                temp_dir,
+                ['--step-result-cache-dir', cache_dir_path]
+            )
+            self.assertIn('Reusing cached result of running step with the same inputs', stdout)
+            self.assertEqual(CachedStepImplementer.runs, 1)
+
+            stdout = self._run_main_cached_step(
+                temp_dir,
+                ['--step-result-cache-dir', cache_dir_path, '--no-cache']
+            )
+            self.assertNotIn('Reusing cached result', stdout)
+            self.assertEqual(CachedStepImplementer.runs, 2)
+
+    def test_step_result_cache_dir_default_not_cached(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            temp_dir.write('step-runner-config.yaml', f'''---
+step-runner-config:
+    cached:
+        implementer: 'tests.helpers.sample_step_implementers.CachedStepImplementer'
+        config:
+            input-path: {os.path.join(temp_dir.path, 'input.txt')}
+'''.encode('utf-8'))
+
+            # caching is opt in, the same as for StepRunner
+            with patch.dict(os.environ, clear=True):
+                self._run_main_cached_step(temp_dir, [])
+                stdout = self._run_main_cached_step(temp_dir, [])
+
+            self.assertNotIn('Reusing cached result', stdout)
+            self.assertEqual(CachedStepImplementer.runs, 2)
+            self.assertFalse(os.path.exists(
+                os.path.join(temp_dir.path, 'step-runner-working', 'step-result-cache')
+            ))
+
+    def test_step_result_cache_dir_env_var(self):
+        with TempDirectory() as temp_dir, \
+                patch.dict(os.environ, {'PSR_STEP_RESULT_CACHE_DIR': temp_dir.path}), \
+                patch('ploigos_step_runner.__main__.StepRunner') as step_runner_mock:
+            temp_dir.write('step-runner-config.yaml', b'''---
+step-runner-config:
+    foo:
+        implementer: 'tests.helpers.sample_step_implementers.FooStepImplementer'
+''')
+            step_runner_mock.return_value.run_step.return_value = True
+
+            main([
+                '--step', 'foo',
+                '--config', os.path.join(temp_dir.path, 'step-runner-config.yaml'),
+                '--config-snapshot', os.path.join(temp_dir.path, 'step-runner-config.snapshot')
+            ])
+
+            self.assertEqual(
+                step_runner_mock.call_args[1]['step_result_cache_dir_path'],
+                temp_dir.path
+            )
+
+
+class TestPreflight(BaseTestCase):
+    def _run_main_preflight_test(self, config_contents, argv=None, expected_exit_code=None):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('step-runner-config.yaml', config_contents)
+            argv = ['preflight',
+                '--config', os.path.join(temp_dir.path, 'step-runner-config.yaml'),
+                '--config-snapshot', os.path.join(temp_dir.path, 'step-runner-config.snapshot')
+            ] + (argv or [])
+            stdout = io.StringIO()
+            stderr = io.StringIO()
+            with patch('sys.stdout', stdout), patch('sys.stderr', stderr):
+                if expected_exit_code is not None:
+                    with self.assertRaisesRegex(SystemExit, f"{expected_exit_code}"):
+                        main(argv)
+                else:
+                    main(argv)
+
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_preflight_success(self):
+        stdout, stderr = self._run_main_preflight_test(b'''---
+step-runner-config:
+    required-step:
+        implementer: 'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer'
+        config:
+            required-config-key: 'value'
+''')
+
+        self.assertEqual(stderr, '')
+        self.assertRegex(stdout, r'Preflight found 0 error\(s\) and 0 warning\(s\) in [0-9.]+ms')
+
+    def test_preflight_invalid_config(self):
+        _, stderr = self._run_main_preflight_test(b'''---
+step-runner-config:
+    required-step: {}
+''', expected_exit_code=102)
+
+        self.assertIn('specified -c/--config is invalid configuration', stderr)
+
+    def test_preflight_errors(self):
+        self._run_main_preflight_test(b'''---
+step-runner-config:
+    global-environment-defaults:
+        DEV: {}
+        PROD: {}
+    required-step:
+        implementer: 'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer'
+''', expected_exit_code=103)
+
+    def test_preflight_errors_reported_once_for_every_environment(self):
+        _, stderr = self._run_main_preflight_test(b'''---
+step-runner-config:
+    global-environment-defaults:
+        DEV: {}
+        PROD: {}
+    foo:
+        implementer: 'tests.helpers.sample_step_implementers.FooStepImplementer'
+    required-step:
+        implementer: 'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer'
+    other-required-step:
+        implementer: 'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer'
+        config:
+            required-config-key: 'value'
+''', ['--steps', 'required-step', 'foo', 'other-required-step'], expected_exit_code=103)
+
+        self.assertEqual(
+            stderr,
+            "ERROR: required-step tests.helpers.sample_step_implementers"
+            ".RequiredStepConfigStepImplementer (DEV, PROD): missing required step configuration"
+            " or previous step result artifact keys: ['required-config-key']\n"
+        )
+
+    def test_preflight_warnings(self):
+        stdout, stderr = self._run_main_preflight_test(b'''---
+step-runner-config:
+    foo:
+        implementer: 'tests.helpers.sample_step_implementers.FooStepImplementer'
+    required-step:
+        implementer: 'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer'
+''', ['--steps', 'foo', 'required-step'])
+
+        self.assertIn('WARNING: required-step', stderr)
+        self.assertIn('Preflight found 0 error(s) and 1 warning(s)', stdout)
+
+    def test_preflight_config_file_does_not_exist(self):
+        with self.assertRaisesRegex(SystemExit, "101"):
+            main(['preflight', '--config', 'does-not-exist.yml'])
+
+
+class TestListImplementers(BaseTestCase):
+    @patch('ploigos_step_runner.step_runner.get_step_implementer_plugins')
+    def test_list_implementers(self, get_step_implementer_plugins_mock):
+        get_step_implementer_plugins_mock.return_value = {
+            'deploy': {'Helm': 'my_plugin.deploy.helm:Helm'}
+        }
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout_mock:
+            main(['--list-implementers'])
+
+        stdout = stdout_mock.getvalue()
+        self.assertIn(
+            'deploy:\n'
+            '  ArgoCD: ploigos_step_runner.step_implementers.deploy.ArgoCD\n'
+            '  Helm: my_plugin.deploy.helm:Helm\n',
+            stdout
+        )
+        self.assertIn(
+            'package:\n'
+            '  Maven: ploigos_step_runner.step_implementers.package.Maven\n',
+            stdout
+        )
+
+    def test_list_implementers_does_not_import_step_implementers(self):
+        import_times = TestImportTime._import_times(
+            'from ploigos_step_runner.__main__ import main;'
+            'main(["--list-implementers"])'
+        )
+
+        self.assertEqual(
+            [
+                name for name in import_times
+                if name.startswith('ploigos_step_runner.step_implementers.') and name.count('.') > 2
+            ],
+            []
+        )
+
+
+class TestImportTime(BaseTestCase):
+    """Guards the start up time of `psr` by checking what importing it imports and how long
+    importing it takes, as reported by `python -X importtime`.
+    """
+
+    # generous so that only a gross regression (ex: eagerly importing all step implementers)
+    # on a slow machine fails
+    IMPORT_TIME_BUDGET_MICROSECONDS = 500000
+
+    SLOW_MODULES = ['git', 'sh', 'jinja2', 'urllib.request']
+
+    @staticmethod
+    def _import_times(statement):
+        src_dir = os.path.dirname(os.path.dirname(ploigos_step_runner.__file__))
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [src_dir, env.get('PYTHONPATH')]))
+
+        process = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', statement],
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            check=True,
+            universal_newlines=True
+        )
+
+        import_times = {}
+        for line in process.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            _, cumulative, module_name = line.split('|')
+            if cumulative.strip().isdigit():
+                import_times[module_name.strip()] = int(cumulative)
+
+        return import_times
+
+    def test_main_import(self):
+        import_times = self._import_times('import ploigos_step_runner.__main__')
+
+        for module_name in self.SLOW_MODULES:
+            self.assertNotIn(module_name, import_times)
+        self.assertEqual(
+            [name for name in import_times if name.startswith('ploigos_step_runner.step_implementers.')],
+            []
+        )
+        self.assertLess(
+            import_times['ploigos_step_runner.__main__'],
+            self.IMPORT_TIME_BUDGET_MICROSECONDS
+        )
+
+    def test_semantic_version_step_implementer_import(self):
+        import_times = self._import_times(
+            'import ploigos_step_runner.__main__;'
+            'from ploigos_step_runner.step_implementers.generate_metadata import SemanticVersion'
+        )
+
+        for module_name in self.SLOW_MODULES:
+            self.assertNotIn(module_name, import_times)
+        self.assertNotIn('ploigos_step_runner.step_implementers.generate_metadata.git', import_times)
+        self.assertIn(
+            'ploigos_step_runner.step_implementers.generate_metadata.semantic_version',
+            import_times
+        )
@@ -1,20 +1,31 @@
 # pylint: disable=missing-module-docstring
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
+import io
+import json
 import os
+import shutil
+from contextlib import redirect_stdout
+from unittest.mock import patch
 
 from testfixtures import TempDirectory
 from ploigos_step_runner import StepResult
 from ploigos_step_runner.config import Config
+from ploigos_step_runner.config.decryptors.sops import SOPS
+from ploigos_step_runner.decryption_utils import DecryptionUtils
 from ploigos_step_runner.exceptions import StepRunnerException
+from ploigos_step_runner.step_implementer import ConfigDumpVerbosity
 from ploigos_step_runner.step_runner import StepRunner
+from ploigos_step_runner.utils.yaml import yaml_safe_load
 from ploigos_step_runner.workflow_result import WorkflowResult
 
 from tests.helpers.base_step_implementer_test_case import \
     BaseStepImplementerTestCase
+from tests.helpers.test_utils import pop_sub_step_result_metrics
+from tests.test_decryption_utils import SampleConfigValueDecryptor
 from tests.helpers.sample_step_implementers import (
-    FailStepImplementer, FooStepImplementer,
-    WriteConfigAsResultsStepImplementer)
+    CachedStepImplementer, DeclaredResultsStepImplementer, FailStepImplementer,
+    FooStepImplementer, RequiredStepConfigStepImplementer, WriteConfigAsResultsStepImplementer)
 
 
 class TestStepImplementer(BaseStepImplementerTestCase):
@@ -39,7 +50,12 @@ class TestStepImplementer(BaseStepImplementerTestCase):
         step_result = workflow_results.get_step_result(
             step_name=step
         )
-        self.assertEqual(expected_step_results, step_result.get_step_result_dict())
+        step_result_dict = step_result.get_step_result_dict()
+        metrics = pop_sub_step_result_metrics(step_result_dict)
+        self.assertEqual(len(metrics), 1)
+        self.assertIn('config-print', metrics[0])
+        self.assertIn('validate', metrics[0])
+        self.assertEqual(expected_step_results, step_result_dict)
 
     def test_one_step_writes_to_empty_results_file(self):
         config1 = {
@@ -85,6 +101,173 @@ class TestStepImplementer(BaseStepImplementerTestCase):
                 test_dir
             )
 
+    def test_one_step_metrics_in_results_file(self):
+        config = {
+            'step-runner-config': {
+                'write-config-as-results': {
+                    'implementer': 'tests.helpers.sample_step_implementers.'
+                                   'WriteConfigAsResultsStepImplementer',
+                    'config': {
+                        'required-config-key': 'required'
+                    }
+                }
+            }
+        }
+
+        with TempDirectory() as test_dir:
+            working_dir_path = os.path.join(test_dir.path, 'step-runner-working')
+            results_dir_path = os.path.join(test_dir.path, 'step-runner-results')
+            factory = StepRunner(
+                config,
+                results_dir_path,
+                'step-runner-results.yml',
+                working_dir_path
+            )
+            factory.run_step(step_name='write-config-as-results')
+
+            with open(os.path.join(results_dir_path, 'step-runner-results.yml')) as results_file:
+                results = yaml_safe_load(results_file)
+
+            metrics = pop_sub_step_result_metrics(results)
+            self.assertEqual(len(metrics), 1)
+            # the results file write can not be in the results file it is timing
+            self.assertEqual(
+                set(metrics[0]),
+                {
+                    'workflow-result-load',
+                    'config-print',
+                    'validate',
+                    'run-step',
+                    'workflow-result-pickle-write'
+                }
+            )
+            for phase in metrics[0].values():
+                self.assertGreaterEqual(phase['wall-time-seconds'], 0.0)
+                self.assertGreaterEqual(phase['cpu-time-seconds'], 0.0)
+                self.assertGreaterEqual(phase['child-cpu-time-seconds'], 0.0)
+                self.assertGreater(phase['peak-rss-bytes'], 0)
+
+    def test_one_step_operation_metrics_in_results(self):
+        config = {
+            'step-runner-config': {
+                'operation-metrics': {
+                    'implementer': 'tests.helpers.sample_step_implementers.'
+                                   'OperationMetricsStepImplementer'
+                }
+            }
+        }
+
+        with TempDirectory() as test_dir:
+            results_dir_path = os.path.join(test_dir.path, 'step-runner-results')
+            factory = StepRunner(
+                config,
+                results_dir_path,
+                'step-runner-results.yml',
+                os.path.join(test_dir.path, 'step-runner-working')
+            )
+            factory.run_step(step_name='operation-metrics')
+
+            with open(os.path.join(results_dir_path, 'step-runner-results.yml')) as results_file:
+                results = yaml_safe_load(results_file)
+
+            metrics = pop_sub_step_result_metrics(results)
+            self.assertEqual(len(metrics), 1)
+            self.assertIn('run-step', metrics[0])
+            self.assertIn('sample-operation', metrics[0])
+            self.assertLessEqual(
+                metrics[0]['sample-operation']['wall-time-seconds'],
+                metrics[0]['run-step']['wall-time-seconds']
+            )
+
+    def test_one_step_command_trace_file(self):
+        config = {
+            'step-runner-config': {
+                'run-command': {
+                    'implementer': 'tests.helpers.sample_step_implementers.'
+                                   'RunCommandStepImplementer'
+                }
+            }
+        }
+
+        with TempDirectory() as test_dir:
+            working_dir_path = os.path.join(test_dir.path, 'step-runner-working')
+            results_dir_path = os.path.join(test_dir.path, 'step-runner-results')
+            factory = StepRunner(
+                config,
+                results_dir_path,
+                'step-runner-results.yml',
+                working_dir_path
+            )
+            factory.run_step(step_name='run-command')
+
+            trace_file_path = os.path.join(
+                working_dir_path,
+                'run-command',
+                'tests.helpers.sample_step_implementers.RunCommandStepImplementer'
+                '.command-trace.json'
+            )
+            with open(trace_file_path) as trace_file:
+                trace = json.load(trace_file)
+
+            self.assertEqual(len(trace['traceEvents']), 1)
+            self.assertEqual(trace['traceEvents'][0]['args']['args'], ['-c', "print('hello')"])
+            self.assertEqual(trace['traceEvents'][0]['args']['exit-code'], 0)
+            self.assertEqual(
+                trace['otherData'],
+                {
+                    'step-name': 'run-command',
+                    'sub-step-name':
+                        'tests.helpers.sample_step_implementers.RunCommandStepImplementer',
+                    'environment': None
+                }
+            )
+
+    def test_one_step_command_trace_closed(self):
+        config = {
+            'step-runner-config': {
+                'run-command': {
+                    'implementer': 'tests.helpers.sample_step_implementers.'
+                                   'RunCommandStepImplementer'
+                }
+            }
+        }
+
+        with TempDirectory() as test_dir:
+            factory = StepRunner(
+                config,
+                os.path.join(test_dir.path, 'step-runner-results'),
+                'step-runner-results.yml',
+                os.path.join(test_dir.path, 'step-runner-working')
+            )
+            factory.run_step(step_name='run-command')
+
+            self.assertEqual(DecryptionUtils._DecryptionUtils__obfuscation_streams, [])
+
+    def test_one_step_no_commands_no_command_trace_file(self):
+        config = {
+            'step-runner-config': {
+                'foo': {
+                    'implementer': 'tests.helpers.sample_step_implementers.FooStepImplementer'
+                }
+            }
+        }
+
+        with TempDirectory() as test_dir:
+            working_dir_path = os.path.join(test_dir.path, 'step-runner-working')
+            factory = StepRunner(
+                config,
+                os.path.join(test_dir.path, 'step-runner-results'),
+                'step-runner-results.yml',
+                working_dir_path
+            )
+            factory.run_step(step_name='foo')
+
+            self.assertFalse(os.path.exists(os.path.join(
+                working_dir_path,
+                'foo',
+                'tests.helpers.sample_step_implementers.FooStepImplementer.command-trace.json'
+            )))
+
     def test_one_step_existing_results_file_bad_pickle(self):
         config = {
             'step-runner-config': {
@@ -561,6 +744,53 @@ class TestStepImplementer(BaseStepImplementerTestCase):
                 test_dir
             )
 
+    def test_get_preflight_missing_keys(self):
+        config = Config({
+            'step-runner-config': {
+                'required-step-config-test': {
+                    'implementer':
+                        'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer',
+                    'environment-config': {
+                        'PROD': {
+                            'required-config-key':
+                                'ENC[AES256_GCM,data:UGKfnzsSrciR7GXZ,iv:yuReqA+n,tag:jueP7/ZW,type:str]'
+                        }
+                    }
+                }
+            }
+        })
+        sub_step = config.get_step_config('required-step-config-test').get_sub_step(
+            'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer'
+        )
+        DecryptionUtils.register_config_value_decryptor(SOPS())
+
+        with patch('sh.sops', create=True) as sops_mock:
+            for environment, previous_step_result_artifact_keys, expected_missing_keys in (
+                ('DEV', set(), ['required-config-key']),
+                ('DEV', {'required-config-key'}, []),
+                ('PROD', set(), [])
+            ):
+                step = RequiredStepConfigStepImplementer(
+                    results_dir_path='',
+                    results_file_name='',
+                    work_dir_path='',
+                    config=sub_step,
+                    environment=environment
+                )
+                self.assertEqual(
+                    step.get_preflight_missing_keys(previous_step_result_artifact_keys),
+                    expected_missing_keys
+                )
+
+            sops_mock.assert_not_called()
+
+    def test_result_artifact_keys(self):
+        self.assertIsNone(FooStepImplementer.result_artifact_keys())
+        self.assertEqual(
+            DeclaredResultsStepImplementer.result_artifact_keys(),
+            ['required-config-key']
+        )
+
     def test_write_working_file(self):
         config = Config({
             'step-runner-config': {
@@ -949,3 +1179,274 @@ class TestStepImplementer(BaseStepImplementerTestCase):
                 step.get_value('deployed-host-urls'),
                 'https://awesome-app.test.ploigos.xyz'
             )
+
+    def __run_config_dump_test(self, config_dump_verbosity):
+        encrypted_value = 'ENC[AES256_GCM,data:UGKfnzsSrciR7GXZ,iv:yuReqA+n,tag:jueP7/ZW,type:str]'
+        config = Config({
+            'step-runner-config': {
+                'global-defaults': {
+                    'global-key': 'global-value'
+                },
+                'foo': {
+                    'implementer': 'tests.helpers.sample_step_implementers.FooStepImplementer',
+                    'config': {
+                        'step-key': 'step-value',
+                        'secret-key': encrypted_value
+                    }
+                }
+            }
+        })
+        DecryptionUtils.register_config_value_decryptor(SOPS())
+
+        with TempDirectory() as test_dir, patch('sh.sops', create=True) as sops_mock:
+            step_runner = StepRunner(
+                config,
+                os.path.join(test_dir.path, 'step-runner-results'),
+                'step-runner-results.yml',
+                os.path.join(test_dir.path, 'step-runner-working'),
+                config_dump_verbosity=config_dump_verbosity
+            )
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                self.assertTrue(step_runner.run_step('foo'))
+
+            sops_mock.assert_not_called()
+
+        self.assertNotIn(encrypted_value, stdout.getvalue())
+        return stdout.getvalue()
+
+    def test_config_dump_full(self):
+        stdout = self.__run_config_dump_test(ConfigDumpVerbosity.FULL)
+
+        self.assertIn('Configuration - foo', stdout)
+        self.assertIn("            {'global-key': 'global-value'}", stdout)
+        self.assertIn(
+            "            {'secret-key': '<encrypted>', 'step-key': 'step-value'}",
+            stdout
+        )
+
+    def test_config_dump_keys(self):
+        stdout = self.__run_config_dump_test(ConfigDumpVerbosity.KEYS)
+
+        self.assertIn('Configuration - foo', stdout)
+        self.assertIn("            ['global-key']", stdout)
+        self.assertIn("            ['secret-key', 'step-key']", stdout)
+        self.assertNotIn('step-value', stdout)
+
+    def test_config_dump_off(self):
+        stdout = self.__run_config_dump_test(ConfigDumpVerbosity.OFF)
+
+        self.assertNotIn('Configuration - foo', stdout)
+        self.assertNotIn('step-key', stdout)
+        self.assertIn('Results - foo', stdout)
+
+    def test_config_dump_invalid_verbosity(self):
+        config = Config({
+            'step-runner-config': {
+                'foo': {
+                    'implementer': 'tests.helpers.sample_step_implementers.FooStepImplementer'
+                }
+            }
+        })
+        sub_step = config.get_step_config('foo').get_sub_step(
+            'tests.helpers.sample_step_implementers.FooStepImplementer'
+        )
+
+        with self.assertRaisesRegex(
+            ValueError,
+            r"Config dump verbosity \(loud\) must be one of: off, keys, full"
+        ):
+            FooStepImplementer(
+                results_dir_path='',
+                results_file_name='',
+                work_dir_path='',
+                config=sub_step,
+                config_dump_verbosity='loud'
+            )
+
+    def test_run_step_merges_results_written_since_loaded(self):
+        with TempDirectory() as test_dir:
+            step_implementers = [
+                self.create_given_step_implementer(
+                    step_implementer=FooStepImplementer,
+                    step_name='foo',
+                    implementer='FooStepImplementer',
+                    environment=environment,
+                    results_dir_path=os.path.join(test_dir.path, 'step-runner-results'),
+                    results_file_name='step-runner-results.yml',
+                    work_dir_path=os.path.join(test_dir.path, 'step-runner-working')
+                )
+                for environment in ('DEV', 'PROD')
+            ]
+
+            # both load the results before either writes, as when running concurrently
+            for step_implementer in step_implementers:
+                self.assertEqual(step_implementer.workflow_result.workflow_list, [])
+            with redirect_stdout(io.StringIO()):
+                for step_implementer in step_implementers:
+                    self.assertTrue(step_implementer.run_step())
+
+            workflow_result = WorkflowResult.load_from_pickle_file(
+                os.path.join(test_dir.path, 'step-runner-working', 'step-runner-results.pkl')
+            )
+            self.assertEqual(
+                [step_result.environment for step_result in workflow_result.workflow_list],
+                ['DEV', 'PROD']
+            )
+
+    def test_create_output_pipeline_obfuscated_and_closed_when_step_finishes(self):
+        config = Config({
+            'step-runner-config': {
+                'foo': {
+                    'implementer': 'tests.helpers.sample_step_implementers.'
+                                   'OutputPipelineStepImplementer',
+                    'config': {
+                        'password': 'TEST_ENC[secret-password]'
+                    }
+                }
+            }
+        })
+        DecryptionUtils.register_config_value_decryptor(SampleConfigValueDecryptor())
+
+        with TempDirectory() as test_dir:
+            working_dir_path = os.path.join(test_dir.path, 'step-runner-working')
+            step_runner = StepRunner(
+                config,
+                os.path.join(test_dir.path, 'step-runner-results'),
+                'step-runner-results.yml',
+                working_dir_path,
+                config_dump_verbosity=ConfigDumpVerbosity.OFF
+            )
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                self.assertTrue(step_runner.run_step('foo'))
+
+            with open(os.path.join(working_dir_path, 'foo', 'output.txt')) as output_file:
+                output = output_file.read()
+
+        self.assertRegex(output, r'^logging in with \*+\ndone\n$')
+        self.assertRegex(stdout.getvalue(), r'logging in with \*+\n')
+        self.assertNotIn('secret-password', stdout.getvalue())
+
+
+class TestStepImplementerStepResultCache(BaseStepImplementerTestCase):
+    def setUp(self):
+        super().setUp()
+        CachedStepImplementer.runs = 0
+
+    def _run_step(self, temp_dir, step_config=None, cache=True, step_config_overrides=None):
+        config = Config({
+            'step-runner-config': {
+                'cached': {
+                    'implementer': 'tests.helpers.sample_step_implementers.CachedStepImplementer',
+                    'config': dict(
+                        {'input-path': os.path.join(temp_dir.path, 'input.txt')},
+                        **(step_config or {})
+                    )
+                }
+            }
+        })
+        if step_config_overrides:
+            config.set_step_config_overrides('cached', step_config_overrides)
+
+        # each run of the workflow starts without the results of previous runs
+        shutil.rmtree(os.path.join(temp_dir.path, 'step-runner-working'), ignore_errors=True)
+        shutil.rmtree(os.path.join(temp_dir.path, 'step-runner-results'), ignore_errors=True)
+        step_runner = StepRunner(
+            config,
+            os.path.join(temp_dir.path, 'step-runner-results'),
+            work_dir_path=os.path.join(temp_dir.path, 'step-runner-working'),
+            step_result_cache_dir_path=os.path.join(temp_dir.path, 'cache') if cache else None
+        )
+
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            success = step_runner.run_step('cached')
+
+        workflow_result = WorkflowResult.load_from_pickle_file(
+            os.path.join(temp_dir.path, 'step-runner-working', 'step-runner-results.pkl')
+        )
+        step_result = workflow_result.get_step_result('cached')
+        return success, step_result, stdout.getvalue()
+
+    def test_reuses_cached_step_result(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            _, step_result, _ = self._run_step(temp_dir)
+            self.assertEqual(step_result.get_artifact_value('runs'), 1)
+            self.assertIn('run-step', step_result.metrics)
+            self.assertIn('step-result-cache-save', step_result.metrics)
+            output_file_path = step_result.get_artifact_value('output')
+
+            success, step_result, stdout = self._run_step(temp_dir)
+
+            self.assertTrue(success)
+            self.assertEqual(CachedStepImplementer.runs, 1)
+            self.assertEqual(step_result.get_artifact_value('runs'), 1)
+            self.assertIn('Reusing cached result of running step with the same inputs', stdout)
+            self.assertIn('step-result-cache-load', step_result.metrics)
+            self.assertNotIn('run-step', step_result.metrics)
+            with open(output_file_path, 'rb') as output_file:
+                self.assertEqual(output_file.read(), b'input')
+
+    def test_input_path_changed(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            self._run_step(temp_dir)
+
+            temp_dir.write('input.txt', b'changed input')
+            _, step_result, stdout = self._run_step(temp_dir)
+
+            self.assertEqual(CachedStepImplementer.runs, 2)
+            self.assertNotIn('Reusing cached result', stdout)
+            with open(step_result.get_artifact_value('output'), 'rb') as output_file:
+                self.assertEqual(output_file.read(), b'changed input')
+
+    def test_config_changed(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            self._run_step(temp_dir)
+            self._run_step(temp_dir, step_config_overrides={'other-key': 'value'})
+
+            self.assertEqual(CachedStepImplementer.runs, 2)
+
+    def test_failed_step_result_not_cached(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            success, _, _ = self._run_step(temp_dir, {'fail': True})
+            self.assertFalse(success)
+            self._run_step(temp_dir, {'fail': True})
+
+            self.assertEqual(CachedStepImplementer.runs, 2)
+
+    def test_step_result_cache_false(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            self._run_step(temp_dir, {'step-result-cache': False})
+            self._run_step(temp_dir, {'step-result-cache': False})
+
+            self.assertEqual(CachedStepImplementer.runs, 2)
+            self.assertFalse(os.path.exists(os.path.join(temp_dir.path, 'cache')))
+
+    def test_no_step_result_cache_dir(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('input.txt', b'input')
+            self._run_step(temp_dir, cache=False)
+            _, step_result, _ = self._run_step(temp_dir, cache=False)
+
+            self.assertEqual(CachedStepImplementer.runs, 2)
+            self.assertNotIn('step-result-cache-key', step_result.metrics)
+
+    def test_step_implementer_does_not_support_caching(self):
+        with TempDirectory() as temp_dir:
+            step_implementer = self.create_given_step_implementer(
+                step_implementer=FooStepImplementer,
+                step_name='foo',
+                implementer='FooStepImplementer',
+                results_dir_path=os.path.join(temp_dir.path, 'step-runner-results'),
+                results_file_name='step-runner-results.yml',
+                work_dir_path=os.path.join(temp_dir.path, 'step-runner-working')
+            )
+
+            self.assertIsNone(step_implementer._step_result_cache_input_paths())
+            self.assertEqual(step_implementer._step_result_cache_ignore_patterns(), [])
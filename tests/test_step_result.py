@@ -36,6 +36,27 @@ class TestStepResultTest(BaseTestCase):
         step_result.message = 'testing'
         self.assertEqual(step_result.message, 'testing')
 
+    def test_metrics(self):
+        step_result = StepResult('step1', 'sub1', 'implementer1')
+        self.assertEqual(step_result.metrics, {})
+
+        step_result.metrics = {'run-step': {'wall-time-seconds': 1.5}}
+        self.assertEqual(step_result.metrics, {'run-step': {'wall-time-seconds': 1.5}})
+
+    def test_get_sub_step_result_with_metrics(self):
+        step_result = StepResult('step1', 'sub1', 'implementer1')
+        step_result.metrics = {'run-step': {'wall-time-seconds': 1.5}}
+        self.assertEqual(
+            step_result.get_sub_step_result(),
+            {
+                'sub-step-implementer-name': 'implementer1',
+                'success': True,
+                'message': '',
+                'artifacts': {},
+                'metrics': {'run-step': {'wall-time-seconds': 1.5}}
+            }
+        )
+
     def test_add_artifact(self):
         step_result_expected = {
             'step1': {
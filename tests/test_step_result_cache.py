@@ -0,0 +1,312 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+import io
+import os
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock, patch
+
+from testfixtures import TempDirectory
+from ploigos_step_runner import StepResult
+from ploigos_step_runner.step_result_cache import StepResultCache
+
+from tests.helpers.base_test_case import BaseTestCase
+
+
+class TestStepResultCacheGetKey(BaseTestCase):
+    def _get_key(self, temp_dir, values=None, input_paths=None, **kwargs):
+        cache = StepResultCache(os.path.join(temp_dir.path, 'cache'))
+        return cache.get_key(
+            values or {'implementer': 'Foo'},
+            [os.path.join(temp_dir.path, input_path) for input_path in input_paths or []],
+            **kwargs
+        )
+
+    def test_same_inputs_same_key(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('project/pom.xml', b'<project/>')
+            temp_dir.write('project/src/Foo.java', b'class Foo {}')
+
+            self.assertEqual(
+                self._get_key(temp_dir, {'a': 1, 'b': [2]}, ['project']),
+                self._get_key(temp_dir, {'b': [2], 'a': 1}, ['project'])
+            )
+
+    def test_values_change_key(self):
+        with TempDirectory() as temp_dir:
+            self.assertNotEqual(
+                self._get_key(temp_dir, {'config': {'tls-verify': True}}),
+                self._get_key(temp_dir, {'config': {'tls-verify': False}})
+            )
+
+    def test_input_file_contents_change_key(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('project/src/Foo.java', b'class Foo {}')
+            key = self._get_key(temp_dir, input_paths=['project'])
+
+            temp_dir.write('project/src/Foo.java', b'class Foo { int bar; }')
+            self.assertNotEqual(self._get_key(temp_dir, input_paths=['project']), key)
+
+    def test_input_file_renamed_changes_key(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('project/src/Foo.java', b'class Foo {}')
+            key = self._get_key(temp_dir, input_paths=['project'])
+
+            os.rename(
+                os.path.join(temp_dir.path, 'project/src/Foo.java'),
+                os.path.join(temp_dir.path, 'project/src/Bar.java')
+            )
+            self.assertNotEqual(self._get_key(temp_dir, input_paths=['project']), key)
+
+    def test_missing_input_path(self):
+        with TempDirectory() as temp_dir:
+            key = self._get_key(temp_dir, input_paths=['pom.xml'])
+
+            temp_dir.write('pom.xml', b'')
+            self.assertNotEqual(self._get_key(temp_dir, input_paths=['pom.xml']), key)
+
+    def test_ignored_and_excluded_paths_do_not_change_key(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('project/pom.xml', b'<project/>')
+            kwargs = {
+                'ignore_patterns': ['target'],
+                'excluded_paths': [os.path.join(temp_dir.path, 'project', 'step-runner-working')]
+            }
+            key = self._get_key(temp_dir, input_paths=['project'], **kwargs)
+
+            temp_dir.write('project/target/foo.jar', b'jar')
+            temp_dir.write('project/module/target/bar.jar', b'jar')
+            temp_dir.write('project/.git/HEAD', b'ref: refs/heads/main')
+            temp_dir.write('project/step-runner-working/step-runner-results.pkl', b'pkl')
+            self.assertEqual(self._get_key(temp_dir, input_paths=['project'], **kwargs), key)
+
+            temp_dir.write('project/module/pom.xml', b'<project/>')
+            self.assertNotEqual(self._get_key(temp_dir, input_paths=['project'], **kwargs), key)
+
+
+class TestStepResultCacheGetStepKey(BaseTestCase):
+    @staticmethod
+    def _create_step_implementer(temp_dir):
+        step_implementer = MagicMock(
+            step_name='package',
+            sub_step_name='Maven',
+            environment=None,
+            work_dir_path=os.path.join(temp_dir.path, 'step-runner-working'),
+            results_dir_path=os.path.join(temp_dir.path, 'step-runner-results')
+        )
+        step_implementer.get_copy_of_runtime_step_config.return_value = {'pom-file': 'pom.xml'}
+        return step_implementer
+
+    def test_inputs_change_key(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('project/pom.xml', b'<project/>')
+            cache = StepResultCache(os.path.join(temp_dir.path, 'cache'))
+            step_implementer = self._create_step_implementer(temp_dir)
+            input_paths = [os.path.join(temp_dir.path, 'project')]
+            key = cache.get_step_key(step_implementer, [], input_paths, ['target'])
+
+            temp_dir.write('project/target/app.jar', b'jar')
+            self.assertEqual(cache.get_step_key(step_implementer, [], input_paths, ['target']), key)
+
+            temp_dir.write('project/pom.xml', b'<project></project>')
+            self.assertNotEqual(
+                cache.get_step_key(step_implementer, [], input_paths, ['target']),
+                key
+            )
+
+    @patch(
+        'ploigos_step_runner.step_result_cache.get_tree_fingerprint',
+        side_effect=PermissionError('mock permission denied')
+    )
+    def test_inputs_not_readable(self, get_tree_fingerprint_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('project/pom.xml', b'<project/>')
+            cache = StepResultCache(os.path.join(temp_dir.path, 'cache'))
+
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                self.assertIsNone(cache.get_step_key(
+                    self._create_step_implementer(temp_dir),
+                    [],
+                    [os.path.join(temp_dir.path, 'project')],
+                    []
+                ))
+
+            self.assertIn(
+                'WARNING: Not caching step result, could not hash its inputs:'
+                ' mock permission denied',
+                stdout.getvalue()
+            )
+
+
+class TestStepResultCacheSaveAndLoad(BaseTestCase):
+    @staticmethod
+    def _create_step_result(work_dir_path, project_dir_path):
+        step_result = StepResult('package', 'Maven', 'Maven', 'DEV')
+        step_result.add_artifact('maven-output', os.path.join(work_dir_path, 'package', 'out.txt'))
+        step_result.add_artifact('package-artifacts', [{
+            'path': os.path.join(project_dir_path, 'target', 'app.jar'),
+            'artifact-id': 'app'
+        }])
+        step_result.add_artifact(
+            'surefire-reports',
+            os.path.join(project_dir_path, 'target', 'surefire-reports')
+        )
+        step_result.add_artifact('version', '1.0.0')
+        return step_result
+
+    def test_load_not_cached(self):
+        with TempDirectory() as temp_dir:
+            cache = StepResultCache(temp_dir.path)
+
+            self.assertIsNone(cache.load('0123456789abcdef'))
+
+    def test_save_and_load_restores_artifact_files(self):
+        with TempDirectory() as temp_dir:
+            work_dir_path = os.path.join(temp_dir.path, 'step-runner-working')
+            project_dir_path = os.path.join(temp_dir.path, 'project')
+            temp_dir.write('step-runner-working/package/out.txt', b'BUILD SUCCESS')
+            temp_dir.write('project/target/app.jar', b'jar')
+            temp_dir.write('project/target/surefire-reports/TEST-Foo.xml', b'<testsuite/>')
+            cache = StepResultCache(os.path.join(work_dir_path, 'step-result-cache'))
+            step_result = self._create_step_result(work_dir_path, project_dir_path)
+
+            self.assertTrue(cache.save('0123456789abcdef', step_result, work_dir_path))
+            os.remove(os.path.join(work_dir_path, 'package', 'out.txt'))
+            os.remove(os.path.join(project_dir_path, 'target', 'app.jar'))
+            temp_dir.write('project/target/surefire-reports/TEST-Bar.xml', b'<testsuite/>')
+
+            cached_step_result = cache.load('0123456789abcdef', work_dir_path)
+
+            self.assertEqual(
+                cached_step_result.get_step_result_dict(),
+                step_result.get_step_result_dict()
+            )
+            self.assertEqual(
+                temp_dir.read('step-runner-working/package/out.txt'),
+                b'BUILD SUCCESS'
+            )
+            self.assertEqual(temp_dir.read('project/target/app.jar'), b'jar')
+            self.assertEqual(
+                sorted(os.listdir(os.path.join(project_dir_path, 'target', 'surefire-reports'))),
+                ['TEST-Foo.xml']
+            )
+
+    def test_load_into_other_work_dir(self):
+        with TempDirectory() as temp_dir:
+            old_work_dir_path = os.path.join(temp_dir.path, 'run-1', 'step-runner-working')
+            new_work_dir_path = os.path.join(temp_dir.path, 'run-2', 'step-runner-working')
+            project_dir_path = os.path.join(temp_dir.path, 'project')
+            temp_dir.write('run-1/step-runner-working/package/out.txt', b'BUILD SUCCESS')
+            temp_dir.write('project/target/app.jar', b'jar')
+            cache = StepResultCache(os.path.join(temp_dir.path, 'cache'))
+
+            cache.save(
+                '0123456789abcdef',
+                self._create_step_result(old_work_dir_path, project_dir_path),
+                old_work_dir_path
+            )
+            cached_step_result = cache.load('0123456789abcdef', new_work_dir_path)
+
+            self.assertEqual(
+                cached_step_result.get_artifact_value('maven-output'),
+                os.path.join(new_work_dir_path, 'package', 'out.txt')
+            )
+            self.assertEqual(
+                cached_step_result.get_artifact_value('package-artifacts')[0]['path'],
+                os.path.join(project_dir_path, 'target', 'app.jar')
+            )
+            self.assertEqual(
+                temp_dir.read('run-2/step-runner-working/package/out.txt'),
+                b'BUILD SUCCESS'
+            )
+
+    def test_load_unreadable_entry(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('01/0123456789abcdef/step-result.pkl', b'not a pickle')
+            cache = StepResultCache(temp_dir.path)
+
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                self.assertIsNone(cache.load('0123456789abcdef'))
+
+            self.assertIn('WARNING: Ignoring unreadable cached step result', stdout.getvalue())
+
+    def test_save_replaces_existing_entry(self):
+        with TempDirectory() as temp_dir:
+            cache = StepResultCache(temp_dir.path)
+            step_result = StepResult('package', 'Maven', 'Maven')
+            step_result.add_artifact('version', '1.0.0')
+            cache.save('0123456789abcdef', step_result)
+
+            step_result.add_artifact('version', '2.0.0')
+            cache.save('0123456789abcdef', step_result)
+
+            self.assertEqual(
+                cache.load('0123456789abcdef').get_artifact_value('version'),
+                '2.0.0'
+            )
+            self.assertEqual(os.listdir(os.path.join(temp_dir.path, '01')), ['0123456789abcdef'])
+
+    def test_load_other_format_version(self):
+        with TempDirectory() as temp_dir:
+            cache = StepResultCache(temp_dir.path)
+            cache.save('0123456789abcdef', StepResult('package', 'Maven', 'Maven'))
+
+            with patch(
+                'ploigos_step_runner.step_result_cache.STEP_RESULT_CACHE_FORMAT_VERSION',
+                'does-not-match'
+            ):
+                self.assertIsNone(cache.load('0123456789abcdef'))
+
+    def test_save_does_not_store_artifacts_in_cache_dir(self):
+        with TempDirectory() as temp_dir:
+            cache_dir_path = os.path.join(temp_dir.path, 'cache')
+            cache = StepResultCache(cache_dir_path)
+            step_result = StepResult('package', 'Maven', 'Maven')
+            step_result.add_artifact('cache', cache_dir_path)
+
+            self.assertTrue(cache.save('0123456789abcdef', step_result))
+
+            self.assertEqual(
+                os.listdir(os.path.join(cache_dir_path, '01', '0123456789abcdef', 'files')),
+                []
+            )
+
+    def test_save_error(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('project/target/app.jar', b'jar')
+            cache = StepResultCache(os.path.join(temp_dir.path, 'cache'))
+            step_result = StepResult('package', 'Maven', 'Maven')
+            step_result.add_artifact('jar', os.path.join(temp_dir.path, 'project/target/app.jar'))
+
+            stdout = io.StringIO()
+            with redirect_stdout(stdout), \
+                    patch('shutil.copy2', side_effect=OSError('mock no space left on device')):
+                self.assertFalse(cache.save('0123456789abcdef', step_result))
+
+            self.assertIn(
+                'WARNING: Could not cache step result (0123456789abcdef):'
+                ' mock no space left on device',
+                stdout.getvalue()
+            )
+            self.assertIsNone(cache.load('0123456789abcdef'))
+            self.assertEqual(os.listdir(os.path.join(temp_dir.path, 'cache', '01')), [])
+
+    def test_load_into_other_work_dir_work_dir_artifact(self):
+        with TempDirectory() as temp_dir:
+            old_work_dir_path = os.path.join(temp_dir.path, 'run-1', 'step-runner-working')
+            new_work_dir_path = os.path.join(temp_dir.path, 'run-2', 'step-runner-working')
+            temp_dir.write('run-1/step-runner-working/package/out.txt', b'BUILD SUCCESS')
+            cache = StepResultCache(os.path.join(temp_dir.path, 'cache'))
+            step_result = StepResult('package', 'Maven', 'Maven')
+            step_result.add_artifact('work-dir', old_work_dir_path)
+
+            cache.save('0123456789abcdef', step_result, old_work_dir_path)
+            cached_step_result = cache.load('0123456789abcdef', new_work_dir_path)
+
+            self.assertEqual(cached_step_result.get_artifact_value('work-dir'), new_work_dir_path)
+            self.assertEqual(
+                temp_dir.read('run-2/step-runner-working/package/out.txt'),
+                b'BUILD SUCCESS'
+            )
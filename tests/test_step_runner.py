@@ -3,11 +3,22 @@
 # pylint: disable=missing-class-docstring
 # pylint: disable=missing-function-docstring
 
+import io
+import json
+import os
 import re
+import sys
+from unittest.mock import patch
+
+import yaml
 
 from testfixtures import TempDirectory
 from ploigos_step_runner import StepRunner, StepRunnerException
+from ploigos_step_runner.step_runner import EnvironmentsSuccessPolicy, PreflightProblem
 from ploigos_step_runner.config import Config
+from ploigos_step_runner.utils.tracing import (STATUS_CODE_ERROR,
+                                               STATUS_CODE_OK,
+                                               TRACE_CONTEXT_FILE_NAME)
 
 from tests.helpers.base_test_case import BaseTestCase
 
@@ -174,3 +185,521 @@ class TestFactory(BaseTestCase):
                 'tests.helpers.sample_step_implementers.FooStepImplementer'
             )
         )
+
+    @patch('ploigos_step_runner.step_runner.get_step_implementer_plugins')
+    def test__get_step_implementer_class_plugin(self, get_step_implementer_plugins_mock):
+        from tests.helpers.sample_step_implementers import FooStepImplementer
+        get_step_implementer_plugins_mock.return_value = {
+            'plugin-step': {
+                'PluginFoo': 'tests.helpers.sample_step_implementers:FooStepImplementer'
+            }
+        }
+
+        self.assertIs(
+            StepRunner._StepRunner__get_step_implementer_class('plugin-step', 'PluginFoo'),
+            FooStepImplementer
+        )
+
+    @patch('ploigos_step_runner.step_runner.get_step_implementer_plugins')
+    def test__get_step_implementer_class_plugin_does_not_exist(self, get_step_implementer_plugins_mock):
+        get_step_implementer_plugins_mock.return_value = {
+            'plugin-step': {
+                'PluginFoo': 'tests.helpers.sample_step_implementers:DoesNotExist'
+            }
+        }
+
+        with self.assertRaisesRegex(
+                StepRunnerException,
+                r"Could not dynamically load step \(plugin-step\) step implementer \(PluginFoo\) "
+                r"from module \(tests.helpers.sample_step_implementers\) with class name \(PluginFoo\)"):
+            StepRunner._StepRunner__get_step_implementer_class('plugin-step', 'PluginFoo')
+
+    @patch('ploigos_step_runner.step_runner.get_step_implementer_plugins')
+    def test__get_step_implementer_class_built_in_takes_precedence_over_plugin(self, get_step_implementer_plugins_mock):
+        from ploigos_step_runner.step_implementers.package import Maven
+        get_step_implementer_plugins_mock.return_value = {
+            'package': {
+                'Maven': 'tests.helpers.sample_step_implementers:FooStepImplementer'
+            }
+        }
+
+        self.assertIs(
+            StepRunner._StepRunner__get_step_implementer_class('package', 'Maven'),
+            Maven
+        )
+        get_step_implementer_plugins_mock.assert_not_called()
+
+    @patch('ploigos_step_runner.step_runner.import_and_get_class')
+    def test__get_step_implementer_class_cached(self, import_and_get_class_mock):
+        from tests.helpers.sample_step_implementers import FooStepImplementer
+        import_and_get_class_mock.return_value = FooStepImplementer
+
+        for _ in range(2):
+            self.assertIs(
+                StepRunner._StepRunner__get_step_implementer_class('cached-step', 'CachedFoo'),
+                FooStepImplementer
+            )
+
+        import_and_get_class_mock.assert_called_once_with(
+            'ploigos_step_runner.step_implementers.cached_step',
+            'CachedFoo'
+        )
+
+    @patch('ploigos_step_runner.step_runner.get_step_implementer_plugins')
+    def test_get_step_implementers(self, get_step_implementer_plugins_mock):
+        get_step_implementer_plugins_mock.return_value = {
+            'package': {
+                'Maven': 'my_plugin:Maven',
+                'Gradle': 'my_plugin:Gradle'
+            },
+            'plugin-step': {
+                'PluginFoo': 'my_plugin:PluginFoo'
+            }
+        }
+
+        step_implementers = StepRunner.get_step_implementers()
+
+        self.assertEqual(
+            step_implementers['package'],
+            {
+                'Maven': 'ploigos_step_runner.step_implementers.package.Maven',
+                'Gradle': 'my_plugin:Gradle'
+            }
+        )
+        self.assertEqual(step_implementers['plugin-step'], {'PluginFoo': 'my_plugin:PluginFoo'})
+        self.assertEqual(
+            step_implementers['generate-metadata'],
+            {
+                'Git': 'ploigos_step_runner.step_implementers.generate_metadata.Git',
+                'Maven': 'ploigos_step_runner.step_implementers.generate_metadata.Maven',
+                'Npm': 'ploigos_step_runner.step_implementers.generate_metadata.Npm',
+                'SemanticVersion': 'ploigos_step_runner.step_implementers.generate_metadata.SemanticVersion'
+            }
+        )
+        self.assertNotIn('shared', step_implementers)
+
+    def test_run_step_trace_file(self):
+        config = {
+            'step-runner-config': {
+                'foo': [
+                    {'implementer': 'tests.helpers.sample_step_implementers.FooStepImplementer'},
+                    {'implementer': 'tests.helpers.sample_step_implementers.RunCommandStepImplementer'}
+                ],
+                'fail': {
+                    'implementer': 'tests.helpers.sample_step_implementers.FailStepImplementer'
+                }
+            }
+        }
+
+        with TempDirectory() as temp_dir, patch.dict(os.environ, clear=True):
+            trace_file_path = os.path.join(temp_dir.path, 'traces.jsonl')
+            factory = StepRunner(
+                config,
+                os.path.join(temp_dir.path, 'step-runner-results'),
+                work_dir_path=os.path.join(temp_dir.path, 'step-runner-working'),
+                trace_file_path=trace_file_path
+            )
+            self.assertTrue(factory.run_step('foo', 'DEV'))
+            self.assertFalse(factory.run_step('fail'))
+
+            with open(trace_file_path) as trace_file:
+                otlp_lines = [json.loads(line) for line in trace_file]
+
+        self.assertEqual(len(otlp_lines), 2)
+        foo_spans = otlp_lines[0]['resourceSpans'][0]['scopeSpans'][0]['spans']
+        fail_spans = otlp_lines[1]['resourceSpans'][0]['scopeSpans'][0]['spans']
+
+        self.assertEqual(
+            [span['name'] for span in foo_spans],
+            [
+                'foo tests.helpers.sample_step_implementers.FooStepImplementer',
+                os.path.basename(sys.executable),
+                'foo tests.helpers.sample_step_implementers.RunCommandStepImplementer',
+                'foo'
+            ]
+        )
+        step_span = foo_spans[3]
+        self.assertNotIn('parentSpanId', step_span)
+        self.assertEqual(step_span['status'], {'code': STATUS_CODE_OK})
+        self.assertIn({'key': 'psr.environment', 'value': {'stringValue': 'DEV'}}, step_span['attributes'])
+        self.assertEqual(foo_spans[0]['parentSpanId'], step_span['spanId'])
+        self.assertEqual(foo_spans[2]['parentSpanId'], step_span['spanId'])
+        self.assertEqual(foo_spans[1]['parentSpanId'], foo_spans[2]['spanId'])
+
+        # each run of a step continues the same trace
+        self.assertEqual(
+            {span['traceId'] for span in foo_spans + fail_spans},
+            {step_span['traceId']}
+        )
+        self.assertEqual(
+            [(span['name'], span['status']['code']) for span in fail_spans],
+            [
+                ('fail tests.helpers.sample_step_implementers.FailStepImplementer', STATUS_CODE_ERROR),
+                ('fail', STATUS_CODE_ERROR)
+            ]
+        )
+
+    def test_run_step_no_trace_file(self):
+        config = {
+            'step-runner-config': {
+                'foo': {
+                    'implementer': 'tests.helpers.sample_step_implementers.FooStepImplementer'
+                }
+            }
+        }
+
+        with TempDirectory() as temp_dir:
+            results_dir_path = os.path.join(temp_dir.path, 'step-runner-results')
+            factory = StepRunner(
+                config,
+                results_dir_path,
+                work_dir_path=os.path.join(temp_dir.path, 'step-runner-working')
+            )
+            self.assertTrue(factory.run_step('foo'))
+            self.assertFalse(os.path.exists(os.path.join(results_dir_path, TRACE_CONTEXT_FILE_NAME)))
+
+
+class TestStepRunnerMultipleEnvironments(BaseTestCase):
+    CONFIG = {
+        'step-runner-config': {
+            'foo': {
+                'implementer': 'tests.helpers.sample_step_implementers.ConfigFailStepImplementer',
+                'environment-config': {
+                    'TEST': {'fail': True}
+                }
+            }
+        }
+    }
+
+    def _run_step(self, environment, **kwargs):
+        with TempDirectory() as temp_dir:
+            results_dir_path = os.path.join(temp_dir.path, 'step-runner-results')
+            work_dir_path = os.path.join(temp_dir.path, 'step-runner-working')
+            step_runner = StepRunner(
+                self.CONFIG,
+                results_dir_path,
+                work_dir_path=work_dir_path,
+                **kwargs
+            )
+
+            stdout = io.StringIO()
+            with patch('sys.stdout', stdout):
+                success = step_runner.run_step('foo', environment)
+
+            with open(os.path.join(results_dir_path, 'step-runner-results.yml')) as results_file:
+                results = yaml.safe_load(results_file)['step-runner-results']
+
+            log_file_paths = {
+                env: step_runner.get_environment_log_file_path('foo', env)
+                for env in ('DEV', 'TEST', 'PROD')
+            }
+            log_files_exist = {
+                env: os.path.exists(log_file_path)
+                for env, log_file_path in log_file_paths.items()
+            }
+
+        return success, results, stdout.getvalue(), log_files_exist
+
+    def test_run_step_multiple_environments(self):
+        success, results, stdout, log_files_exist = self._run_step('DEV,PROD')
+
+        self.assertTrue(success)
+        self.assertEqual(sorted(results.keys()), ['DEV', 'PROD'])
+        self.assertEqual(log_files_exist, {'DEV': True, 'TEST': False, 'PROD': True})
+        self.assertIn('Step (foo) in environment (DEV) succeeded:', stdout)
+        self.assertIn('running in DEV', stdout)
+        self.assertIn('running in PROD', stdout)
+        self.assertIn('Step (foo) results by environment:\n  DEV: succeeded\n  PROD: succeeded', stdout)
+
+    def test_run_step_multiple_environments_list(self):
+        success, results, _, _ = self._run_step(['DEV', 'PROD', 'DEV'])
+
+        self.assertTrue(success)
+        self.assertEqual(sorted(results.keys()), ['DEV', 'PROD'])
+
+    def test_run_step_multiple_environments_one_fails_all_policy(self):
+        success, results, stdout, _ = self._run_step('DEV,TEST,PROD')
+
+        self.assertFalse(success)
+        implementer = 'tests.helpers.sample_step_implementers.ConfigFailStepImplementer'
+        self.assertEqual(sorted(results.keys()), ['DEV', 'PROD', 'TEST'])
+        self.assertFalse(results['TEST']['foo'][implementer]['success'])
+        self.assertTrue(results['PROD']['foo'][implementer]['success'])
+        self.assertIn('Step (foo) in environment (TEST) failed:', stdout)
+
+    def test_run_step_multiple_environments_one_fails_any_policy(self):
+        success, _, _, _ = self._run_step(
+            'DEV,TEST',
+            environments_success_policy=EnvironmentsSuccessPolicy.ANY_ENVIRONMENT
+        )
+
+        self.assertTrue(success)
+
+    def test_run_step_multiple_environments_max_concurrent_environments(self):
+        success, results, _, _ = self._run_step(
+            'DEV,PROD',
+            max_concurrent_environments=1
+        )
+
+        self.assertTrue(success)
+        self.assertEqual(sorted(results.keys()), ['DEV', 'PROD'])
+
+    def test_run_step_multiple_environments_fatal_error(self):
+        with TempDirectory() as temp_dir:
+            step_runner = StepRunner(
+                self.CONFIG,
+                os.path.join(temp_dir.path, 'step-runner-results'),
+                work_dir_path=os.path.join(temp_dir.path, 'step-runner-working')
+            )
+
+            stdout = io.StringIO()
+            with patch('sys.stdout', stdout), patch.object(
+                StepRunner,
+                '_StepRunner__run_sub_steps',
+                side_effect=RuntimeError('mock fatal error')
+            ):
+                success = step_runner.run_step('foo', 'DEV,PROD')
+
+        self.assertFalse(success)
+        self.assertIn('Step (foo) in environment (DEV) failed:', stdout.getvalue())
+        self.assertIn('Fatal error calling step (foo): mock fatal error', stdout.getvalue())
+
+    def test_run_step_multiple_environments_step_implementer_does_not_exist(self):
+        config = {
+            'step-runner-config': {
+                'foo': {'implementer': 'tests.helpers.sample_step_implementers.DoesNotExist'}
+            }
+        }
+
+        with TempDirectory() as temp_dir:
+            step_runner = StepRunner(
+                config,
+                os.path.join(temp_dir.path, 'step-runner-results'),
+                work_dir_path=os.path.join(temp_dir.path, 'step-runner-working')
+            )
+            with self.assertRaisesRegex(StepRunnerException, 'Could not dynamically load'):
+                step_runner.run_step('foo', 'DEV,PROD')
+
+    def test_run_step_multiple_environments_trace_file(self):
+        with TempDirectory() as temp_dir, patch.dict(os.environ, clear=True):
+            trace_file_path = os.path.join(temp_dir.path, 'traces.jsonl')
+            step_runner = StepRunner(
+                self.CONFIG,
+                os.path.join(temp_dir.path, 'step-runner-results'),
+                work_dir_path=os.path.join(temp_dir.path, 'step-runner-working'),
+                trace_file_path=trace_file_path
+            )
+            with patch('sys.stdout', io.StringIO()):
+                self.assertTrue(step_runner.run_step('foo', 'DEV,PROD'))
+
+            with open(trace_file_path) as trace_file:
+                spans = [
+                    span
+                    for line in trace_file
+                    for span in json.loads(line)['resourceSpans'][0]['scopeSpans'][0]['spans']
+                ]
+
+        spans_by_name = {span['name']: span for span in spans}
+        self.assertEqual(
+            sorted(spans_by_name),
+            [
+                'foo',
+                'foo DEV',
+                'foo PROD',
+                'foo tests.helpers.sample_step_implementers.ConfigFailStepImplementer'
+            ]
+        )
+        self.assertEqual(spans_by_name['foo DEV']['parentSpanId'], spans_by_name['foo']['spanId'])
+        self.assertEqual(spans_by_name['foo PROD']['parentSpanId'], spans_by_name['foo']['spanId'])
+
+    def test_invalid_environments_success_policy(self):
+        with self.assertRaisesRegex(ValueError, r'Environments success policy \(some\) must be one of: all, any'):
+            StepRunner(self.CONFIG, environments_success_policy='some')
+
+
+class TestStepRunnerPreflight(BaseTestCase):
+    REQUIRED = 'tests.helpers.sample_step_implementers.RequiredStepConfigStepImplementer'
+    DECLARED = 'tests.helpers.sample_step_implementers.DeclaredResultsStepImplementer'
+    UNDECLARED = 'tests.helpers.sample_step_implementers.FooStepImplementer'
+
+    def _preflight(self, config, step_names=None, environment=None):
+        with TempDirectory() as temp_dir:
+            work_dir_path = os.path.join(temp_dir.path, 'step-runner-working')
+            step_runner = StepRunner(
+                config,
+                os.path.join(temp_dir.path, 'step-runner-results'),
+                work_dir_path=work_dir_path
+            )
+            problems = step_runner.preflight(step_names, environment)
+            self.assertFalse(os.path.exists(work_dir_path))
+
+        return [
+            (problem.step_name, problem.sub_step_name, problem.environment, problem.is_error)
+            for problem in problems
+        ], problems
+
+    def test_preflight_no_problems(self):
+        problems, _ = self._preflight({
+            'step-runner-config': {
+                'required': {
+                    'implementer': self.REQUIRED,
+                    'config': {'required-config-key': 'value'}
+                }
+            }
+        })
+
+        self.assertEqual(problems, [])
+
+    def test_preflight_missing_required_key(self):
+        problems, problem_objects = self._preflight({
+            'step-runner-config': {
+                'required': {'implementer': self.REQUIRED}
+            }
+        })
+
+        self.assertEqual(problems, [('required', self.REQUIRED, None, True)])
+        self.assertEqual(
+            str(problem_objects[0]),
+            f"required {self.REQUIRED}: missing required step configuration or previous step"
+            " result artifact keys: ['required-config-key']"
+        )
+
+    def test_preflight_required_key_declared_by_previous_step(self):
+        config = {
+            'step-runner-config': {
+                'declared': {'implementer': self.DECLARED},
+                'required': {'implementer': self.REQUIRED}
+            }
+        }
+
+        problems, _ = self._preflight(config)
+        self.assertEqual(problems, [])
+
+        problems, _ = self._preflight(config, step_names=['required', 'declared'])
+        self.assertEqual(problems, [('required', self.REQUIRED, None, True)])
+
+    def test_preflight_required_key_maybe_given_by_undeclared_previous_step(self):
+        problems, problem_objects = self._preflight({
+            'step-runner-config': {
+                'foo': {'implementer': self.UNDECLARED},
+                'required': {'implementer': self.REQUIRED}
+            }
+        })
+
+        self.assertEqual(problems, [('required', self.REQUIRED, None, False)])
+        self.assertIn(f"foo {self.UNDECLARED}", problem_objects[0].message)
+
+    def test_preflight_every_configured_environment(self):
+        problems, _ = self._preflight({
+            'step-runner-config': {
+                'global-environment-defaults': {
+                    'DEV': {'required-config-key': 'dev-value'},
+                    'TEST': {}
+                },
+                'required': {
+                    'implementer': self.REQUIRED,
+                    'environment-config': {
+                        'PROD': {'required-config-key': 'prod-value'}
+                    }
+                }
+            }
+        })
+
+        self.assertEqual(problems, [('required', self.REQUIRED, 'TEST', True)])
+
+    def test_preflight_given_environments(self):
+        config = {
+            'step-runner-config': {
+                'required': {
+                    'implementer': self.REQUIRED,
+                    'environment-config': {
+                        'PROD': {'required-config-key': 'prod-value'}
+                    }
+                }
+            }
+        }
+
+        problems, _ = self._preflight(config, environment='DEV,PROD')
+        self.assertEqual(problems, [('required', self.REQUIRED, 'DEV', True)])
+
+        problems, _ = self._preflight(config, environment='PROD')
+        self.assertEqual(problems, [])
+
+    def test_preflight_step_implementer_does_not_exist(self):
+        problems, problem_objects = self._preflight({
+            'step-runner-config': {
+                'foo': {'implementer': 'DoesNotExist'},
+                'required': {'implementer': self.REQUIRED}
+            }
+        })
+
+        self.assertEqual(problems, [
+            ('foo', 'DoesNotExist', None, True),
+            ('required', self.REQUIRED, None, False)
+        ])
+        self.assertIn('can not load step implementer', problem_objects[0].message)
+
+    def test_preflight_step_not_configured(self):
+        problems, _ = self._preflight(
+            {'step-runner-config': {}},
+            step_names=['does-not-exist']
+        )
+
+        self.assertEqual(problems, [('does-not-exist', None, None, True)])
+
+    def test_preflight_default_step_order(self):
+        problems, _ = self._preflight({
+            'step-runner-config': {
+                'foo': {
+                    'implementer': self.REQUIRED,
+                },
+                'deploy': {
+                    'implementer': 'ArgoCD',
+                    'config': {
+                        'argocd-username': 'argo-username',
+                        'argocd-password': 'argo-password',
+                        'argocd-api': 'https://argo.ploigos.xyz',
+                        'deployment-config-repo': 'https://git.ploigos.xyz/config.git',
+                        'git-email': 'git@ploigos.xyz',
+                        'organization': 'org',
+                        'application-name': 'app',
+                        'service-name': 'svc',
+                        'required-config-key': 'value'
+                    }
+                },
+                'push-container-image': {
+                    'implementer': 'Skopeo',
+                    'config': {
+                        'destination-url': 'registry.ploigos.xyz',
+                        'container-image-version': '1.0.0',
+                        'organization': 'org',
+                        'application-name': 'app',
+                        'service-name': 'svc',
+                        'image-tar-file': 'image.tar'
+                    }
+                }
+            }
+        })
+
+        # push-container-image runs before deploy, and the non default step foo runs last
+        self.assertEqual(problems, [('foo', self.REQUIRED, None, True)])
+
+    def test_preflight_problem_str(self):
+        self.assertEqual(
+            str(PreflightProblem('foo', 'Bar', 'DEV', 'oops')),
+            'foo Bar (DEV): oops'
+        )
+        self.assertEqual(str(PreflightProblem('foo', None, None, 'oops')), 'foo: oops')
+
+    def test_built_in_step_implementers_declare_result_artifact_keys(self):
+        for step_name, step_implementers in StepRunner.get_step_implementers().items():
+            for step_implementer_name in step_implementers:
+                step_implementer_class = StepRunner._StepRunner__get_step_implementer_class(
+                    step_name,
+                    step_implementer_name
+                )
+                self.assertIsInstance(
+                    step_implementer_class.result_artifact_keys(),
+                    list,
+                    f"{step_name} {step_implementer_name}"
+                )
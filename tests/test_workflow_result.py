@@ -8,6 +8,7 @@ from testfixtures import TempDirectory
 from tests.helpers.base_test_case import BaseTestCase
 
 from ploigos_step_runner.step_result import StepResult
+from ploigos_step_runner.utils.metrics import PhaseMetrics
 from ploigos_step_runner.workflow_result import WorkflowResult
 from ploigos_step_runner.exceptions import StepRunnerException
 
@@ -516,3 +517,67 @@ class TestStepWorkflowResultTest(BaseTestCase):
         with self.assertRaises(
                 RuntimeError):
             wfr.write_to_pickle_file(None)
+
+    def test_get_pickle_file_version_no_file(self):
+        with TempDirectory() as temp_dir:
+            self.assertIsNone(WorkflowResult.get_pickle_file_version(temp_dir.path + '/test.pkl'))
+
+    def test_add_step_result_to_files(self):
+        with TempDirectory() as temp_dir:
+            pickle_file = temp_dir.path + '/test.pkl'
+            yml_file = temp_dir.path + '/test.yml'
+
+            workflow_result, workflow_result_version = WorkflowResult.add_step_result_to_files(
+                workflow_result=WorkflowResult(),
+                workflow_result_version=None,
+                step_result=StepResult('step1', 'sub1', 'implementer1'),
+                pickle_filename=pickle_file,
+                yml_filename=yml_file,
+                phase_metrics=PhaseMetrics()
+            )
+
+            self.assertEqual(
+                workflow_result_version,
+                WorkflowResult.get_pickle_file_version(pickle_file)
+            )
+            self.assertEqual(len(workflow_result.workflow_list), 1)
+            self.assertEqual(
+                len(WorkflowResult.load_from_pickle_file(pickle_file).workflow_list),
+                1
+            )
+            with open(yml_file, encoding='utf-8') as file:
+                self.assertIn('step1', file.read())
+
+    def test_add_step_result_to_files_written_since_loaded(self):
+        with TempDirectory() as temp_dir:
+            pickle_file = temp_dir.path + '/test.pkl'
+            yml_file = temp_dir.path + '/test.yml'
+            phase_metrics = PhaseMetrics()
+
+            # load before another environment of the same step writes its result
+            stale_workflow_result = WorkflowResult.load_from_pickle_file(pickle_file)
+            WorkflowResult.add_step_result_to_files(
+                workflow_result=WorkflowResult(),
+                workflow_result_version=None,
+                step_result=StepResult('deploy', 'sub1', 'implementer1', 'dev'),
+                pickle_filename=pickle_file,
+                yml_filename=yml_file,
+                phase_metrics=phase_metrics
+            )
+
+            workflow_result, _ = WorkflowResult.add_step_result_to_files(
+                workflow_result=stale_workflow_result,
+                workflow_result_version=None,
+                step_result=StepResult('deploy', 'sub1', 'implementer1', 'test'),
+                pickle_filename=pickle_file,
+                yml_filename=yml_file,
+                phase_metrics=phase_metrics
+            )
+
+            self.assertEqual(len(workflow_result.workflow_list), 2)
+            self.assertEqual(
+                len(WorkflowResult.load_from_pickle_file(pickle_file).workflow_list),
+                2
+            )
+            self.assertIn('workflow-result-pickle-write', phase_metrics.phases)
+            self.assertIn('results-file-write', phase_metrics.phases)
@@ -0,0 +1,400 @@
+import json
+import random
+import re
+from io import IOBase
+from unittest.mock import MagicMock, patch
+
+import sh
+from tests.helpers.argocd_stub_server import (ArgoCDStubServer,
+                                              create_app_status)
+from tests.helpers.base_test_case import BaseTestCase
+from tests.helpers.test_utils import Any, create_sh_side_effect
+
+from ploigos_step_runner.utils.argocd import (ArgoCDAPIAppClient,
+                                              ArgoCDAppClient,
+                                              ArgoCDAppStatus,
+                                              ArgoCDAppSyncWaiter,
+                                              ArgoCDCLIAppClient)
+from ploigos_step_runner.utils.tracing import Tracer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class ScriptedAppClient(ArgoCDAppClient):
+    """Returns the given statuses in order, taking the given number of seconds per poll."""
+
+    def __init__(self, statuses, fake_clock, poll_duration=0.0):
+        self.statuses = list(statuses)
+        self.fake_clock = fake_clock
+        self.poll_duration = poll_duration
+        self.polls = 0
+
+    def sync(self, app_name):
+        pass
+
+    def get_app(self, app_name):
+        raise NotImplementedError()
+
+    def get_status(self, app_name):
+        self.fake_clock.now += self.poll_duration
+        status = self.statuses[min(self.polls, len(self.statuses) - 1)]
+        self.polls += 1
+        return status
+
+
+SYNC_RUNNING = ArgoCDAppStatus('OutOfSync', 'Healthy', 'Running', operation_pending=True)
+SYNC_PENDING = ArgoCDAppStatus('Synced', 'Healthy', 'Succeeded', operation_pending=True)
+PROGRESSING = ArgoCDAppStatus('Synced', 'Progressing', 'Succeeded')
+HEALTHY = ArgoCDAppStatus('Synced', 'Healthy', 'Succeeded')
+FAILED = ArgoCDAppStatus('OutOfSync', 'Degraded', 'Failed', 'one or more objects failed')
+
+
+class TestArgoCDAppStatus(BaseTestCase):
+    def test_from_app(self):
+        status = ArgoCDAppStatus.from_app({
+            'metadata': {'name': 'test'},
+            'operation': {'sync': {'prune': True}},
+            'status': {
+                'sync': {'status': 'OutOfSync'},
+                'health': {'status': 'Progressing'},
+                'operationState': {'phase': 'Running', 'message': 'working'}
+            }
+        })
+
+        self.assertEqual(status.sync_status, 'OutOfSync')
+        self.assertEqual(status.health_status, 'Progressing')
+        self.assertEqual(status.operation_phase, 'Running')
+        self.assertEqual(status.operation_message, 'working')
+        self.assertTrue(status.operation_pending)
+
+    def test_from_app_no_status(self):
+        status = ArgoCDAppStatus.from_app({'metadata': {'name': 'test'}})
+
+        self.assertIsNone(status.sync_status)
+        self.assertIsNone(status.health_status)
+        self.assertIsNone(status.operation_phase)
+        self.assertFalse(status.operation_pending)
+        self.assertEqual(status.phase, 'progressing')
+
+    def test_phase(self):
+        self.assertEqual(SYNC_RUNNING.phase, 'sync')
+        self.assertEqual(ArgoCDAppStatus('OutOfSync', 'Healthy', 'Running').phase, 'sync')
+        self.assertEqual(PROGRESSING.phase, 'progressing')
+        self.assertEqual(HEALTHY.phase, 'healthy')
+
+    def test_phase_previous_sync_healthy_but_sync_pending(self):
+        # the status from before the requested sync must not be mistaken for its result
+        self.assertEqual(SYNC_PENDING.phase, 'sync')
+
+    def test_is_failed(self):
+        self.assertTrue(FAILED.is_failed)
+        self.assertTrue(ArgoCDAppStatus('OutOfSync', 'Healthy', 'Error').is_failed)
+        self.assertFalse(HEALTHY.is_failed)
+        self.assertFalse(
+            ArgoCDAppStatus('OutOfSync', 'Healthy', 'Failed', operation_pending=True).is_failed
+        )
+
+
+class TestArgoCDAppSyncWaiter(BaseTestCase):
+    def create_waiter(self, app_client, fake_clock, **kwargs):
+        return ArgoCDAppSyncWaiter(
+            app_client=app_client,
+            clock=fake_clock.clock,
+            sleep=fake_clock.sleep,
+            rng=random.Random(42),
+            **kwargs
+        )
+
+    def test_wait_already_healthy(self):
+        fake_clock = FakeClock()
+        app_client = ScriptedAppClient([HEALTHY], fake_clock, poll_duration=0.25)
+
+        phase_seconds = self.create_waiter(app_client, fake_clock).wait('test', 60)
+
+        self.assertEqual(app_client.polls, 1)
+        self.assertEqual(fake_clock.sleeps, [])
+        self.assertEqual(phase_seconds, {'sync': 0.25, 'progressing': 0.0, 'healthy': 0.25})
+
+    def test_wait_phase_seconds(self):
+        fake_clock = FakeClock()
+        app_client = ScriptedAppClient(
+            [SYNC_PENDING, SYNC_RUNNING, PROGRESSING, PROGRESSING, HEALTHY],
+            fake_clock
+        )
+
+        phase_seconds = self.create_waiter(app_client, fake_clock).wait('test', 60)
+
+        self.assertEqual(app_client.polls, 5)
+        self.assertEqual(len(fake_clock.sleeps), 4)
+        self.assertAlmostEqual(phase_seconds['sync'], round(sum(fake_clock.sleeps[:2]), 3))
+        self.assertAlmostEqual(phase_seconds['progressing'], round(sum(fake_clock.sleeps[2:]), 3))
+        self.assertAlmostEqual(phase_seconds['healthy'], round(sum(fake_clock.sleeps), 3))
+
+    def test_wait_records_phase_seconds_on_span(self):
+        fake_clock = FakeClock()
+        app_client = ScriptedAppClient([SYNC_RUNNING, PROGRESSING, HEALTHY], fake_clock)
+
+        with Tracer() as tracer:
+            phase_seconds = self.create_waiter(app_client, fake_clock).wait('test', 60)
+
+        span = tracer.finished_spans[0]
+        self.assertEqual(span.name, 'argocd app wait')
+        self.assertEqual(span.attributes['argocd.app.name'], 'test')
+        for name, seconds in phase_seconds.items():
+            self.assertEqual(span.attributes[f'argocd.app.{name}.seconds'], seconds)
+
+    def test_wait_exponential_backoff_with_jitter(self):
+        fake_clock = FakeClock()
+        app_client = ScriptedAppClient([SYNC_RUNNING] * 8 + [HEALTHY], fake_clock)
+
+        self.create_waiter(
+            app_client,
+            fake_clock,
+            poll_initial_seconds=1,
+            poll_max_seconds=8
+        ).wait('test', 600)
+
+        expected_poll_seconds = [1, 2, 4, 8, 8, 8, 8, 8]
+        self.assertEqual(len(fake_clock.sleeps), len(expected_poll_seconds))
+        for sleep, poll_seconds in zip(fake_clock.sleeps, expected_poll_seconds):
+            self.assertGreaterEqual(sleep, poll_seconds / 2)
+            self.assertLessEqual(sleep, poll_seconds)
+
+        # jittered, not in lock step
+        self.assertEqual(len(set(fake_clock.sleeps[3:])), 5)
+
+    def test_wait_backoff_reset_on_phase_change(self):
+        fake_clock = FakeClock()
+        app_client = ScriptedAppClient(
+            [SYNC_RUNNING, SYNC_RUNNING, SYNC_RUNNING, PROGRESSING, HEALTHY],
+            fake_clock
+        )
+
+        self.create_waiter(
+            app_client,
+            fake_clock,
+            poll_initial_seconds=1,
+            poll_max_seconds=8
+        ).wait('test', 600)
+
+        self.assertGreaterEqual(fake_clock.sleeps[2], 2)
+        self.assertLessEqual(fake_clock.sleeps[3], 1)
+
+    def test_wait_failed(self):
+        fake_clock = FakeClock()
+        app_client = ScriptedAppClient([SYNC_RUNNING, FAILED], fake_clock)
+
+        with self.assertRaisesRegex(
+            RuntimeError,
+            r"ArgoCD Application \(test\) sync Failed: one or more objects failed"
+        ):
+            self.create_waiter(app_client, fake_clock).wait('test', 60)
+
+        self.assertEqual(app_client.polls, 2)
+
+    def test_wait_timeout(self):
+        fake_clock = FakeClock()
+        app_client = ScriptedAppClient([PROGRESSING], fake_clock)
+
+        with self.assertRaisesRegex(
+            TimeoutError,
+            r"Timed out after 30 seconds waiting for ArgoCD Application \(test\)"
+            r" in phase \(progressing\)"
+        ):
+            self.create_waiter(app_client, fake_clock, poll_max_seconds=10).wait('test', 30)
+
+        self.assertEqual(fake_clock.now, 130.0)
+
+    def test_invalid_poll_seconds(self):
+        with self.assertRaisesRegex(ValueError, r"Poll initial seconds \(0\)"):
+            ArgoCDAppSyncWaiter(MagicMock(), poll_initial_seconds=0)
+
+        with self.assertRaisesRegex(ValueError, r"Poll initial seconds \(10\)"):
+            ArgoCDAppSyncWaiter(MagicMock(), poll_initial_seconds=10, poll_max_seconds=5)
+
+        with self.assertRaisesRegex(ValueError, r"Poll backoff factor \(0.5\)"):
+            ArgoCDAppSyncWaiter(MagicMock(), poll_backoff_factor=0.5)
+
+
+class TestArgoCDCLIAppClient(BaseTestCase):
+    @patch('sh.argocd', create=True)
+    def test_sync(self, argocd_mock):
+        ArgoCDCLIAppClient(config_args=['--config', '/tmp/config']).sync('test')
+
+        argocd_mock.app.sync.assert_called_once_with(
+            '--config', '/tmp/config',
+            '--prune',
+            '--async',
+            'test',
+            _out=Any(IOBase),
+            _err=Any(IOBase)
+        )
+
+    @patch('sh.argocd', create=True)
+    def test_get_status(self, argocd_mock):
+        argocd_mock.app.get.side_effect = create_sh_side_effect(
+            mock_stdout=json.dumps({
+                'status': {
+                    'sync': {'status': 'Synced'},
+                    'health': {'status': 'Healthy'},
+                    'operationState': {'phase': 'Succeeded'}
+                }
+            })
+        )
+
+        status = ArgoCDCLIAppClient().get_status('test')
+
+        self.assertEqual(status.phase, 'healthy')
+        argocd_mock.app.get.assert_called_once_with(
+            'test',
+            '--output', 'json',
+            _out=Any(IOBase),
+            _err=Any(IOBase)
+        )
+
+    @patch('sh.argocd', create=True)
+    def test_get_app_invalid_json(self, argocd_mock):
+        argocd_mock.app.get.side_effect = create_sh_side_effect(mock_stdout='not json')
+
+        with self.assertRaisesRegex(
+            RuntimeError,
+            r"Error parsing ArgoCD Application \(test\)"
+        ):
+            ArgoCDCLIAppClient().get_app('test')
+
+    @patch('sh.argocd', create=True)
+    def test_get_app_not_object(self, argocd_mock):
+        argocd_mock.app.get.side_effect = create_sh_side_effect(mock_stdout='[]')
+
+        with self.assertRaisesRegex(
+            RuntimeError,
+            r"Error parsing ArgoCD Application \(test\): not an object"
+        ):
+            ArgoCDCLIAppClient().get_app('test')
+
+    @patch('sh.argocd', create=True)
+    def test_get_app_error(self, argocd_mock):
+        argocd_mock.app.get.side_effect = create_sh_side_effect(
+            exception=sh.ErrorReturnCode('argocd', b'mock out', b'mock get error')
+        )
+
+        with self.assertRaises(sh.ErrorReturnCode):
+            ArgoCDCLIAppClient().get_app('test')
+
+
+class TestArgoCDAPIAppClient(BaseTestCase):
+    def test_sync_and_wait(self):
+        with ArgoCDStubServer(auth_token='test-token') as server:
+            server.add_app('test', [
+                create_app_status('OutOfSync', 'Healthy', 'Running', operation_pending=True),
+                create_app_status('Synced', 'Progressing'),
+                create_app_status('Synced', 'Healthy')
+            ])
+            app_client = ArgoCDAPIAppClient(server.url, auth_token='test-token')
+
+            app_client.sync('test')
+            phase_seconds = ArgoCDAppSyncWaiter(
+                app_client,
+                poll_initial_seconds=0.01,
+                poll_max_seconds=0.02
+            ).wait('test', 10)
+
+            self.assertEqual(
+                [(method, path) for method, path, _ in server.requests],
+                [
+                    ('POST', '/api/v1/applications/test/sync'),
+                    ('GET', '/api/v1/applications/test'),
+                    ('GET', '/api/v1/applications/test'),
+                    ('GET', '/api/v1/applications/test')
+                ]
+            )
+            self.assertEqual(server.requests[0][2], {'prune': True})
+            self.assertGreater(phase_seconds['sync'], 0)
+            self.assertGreater(phase_seconds['progressing'], 0)
+            self.assertGreaterEqual(
+                phase_seconds['healthy'],
+                phase_seconds['sync'] + phase_seconds['progressing'] - 0.002
+            )
+
+    def test_sync_and_wait_failed(self):
+        with ArgoCDStubServer() as server:
+            server.add_app('test', [
+                create_app_status('OutOfSync', 'Healthy', 'Running', operation_pending=True),
+                create_app_status('OutOfSync', 'Degraded', 'Failed', 'hook failed')
+            ])
+            app_client = ArgoCDAPIAppClient(server.url, auth_token='test-token')
+
+            app_client.sync('test')
+            with self.assertRaisesRegex(RuntimeError, r"sync Failed: hook failed"):
+                ArgoCDAppSyncWaiter(app_client, poll_initial_seconds=0.01).wait('test', 10)
+
+    def test_previous_status_until_synced(self):
+        with ArgoCDStubServer() as server:
+            server.add_app('test', [create_app_status('Synced', 'Healthy')])
+            app_client = ArgoCDAPIAppClient(server.url, auth_token='test-token')
+
+            self.assertEqual(app_client.get_status('test').phase, 'healthy')
+            self.assertEqual(len(server.requests), 1)
+
+    def test_unauthorized(self):
+        with ArgoCDStubServer(auth_token='test-token') as server:
+            server.add_app('test', [create_app_status()])
+            app_client = ArgoCDAPIAppClient(server.url, auth_token='wrong-token')
+
+            with self.assertRaisesRegex(
+                RuntimeError,
+                re.compile(
+                    r"Error requesting ArgoCD API \(GET http://.*/api/v1/applications/test\):"
+                    r" 401 .*invalid session",
+                    re.DOTALL
+                )
+            ):
+                app_client.get_app('test')
+
+    def test_app_not_found(self):
+        with ArgoCDStubServer() as server:
+            app_client = ArgoCDAPIAppClient(server.url, auth_token='test-token')
+
+            with self.assertRaisesRegex(RuntimeError, r"404"):
+                app_client.sync('does-not-exist')
+
+    def test_connection_error(self):
+        server = ArgoCDStubServer().start()
+        url = server.url
+        server.stop()
+
+        with self.assertRaisesRegex(RuntimeError, r"Error requesting ArgoCD API \(GET"):
+            ArgoCDAPIAppClient(url, auth_token='test-token', timeout_seconds=1).get_app('test')
+
+    def test_default_https_scheme(self):
+        with patch('urllib.request.urlopen') as urlopen_mock:
+            urlopen_mock.return_value.__enter__.return_value.read.return_value = b'{}'
+
+            ArgoCDAPIAppClient('argo.ploigos.xyz/', 'test-token', insecure=True).get_app('a b')
+
+            request = urlopen_mock.call_args[0][0]
+            self.assertEqual(request.full_url, 'https://argo.ploigos.xyz/api/v1/applications/a%20b')
+            self.assertEqual(request.get_header('Authorization'), 'Bearer test-token')
+            self.assertFalse(urlopen_mock.call_args[1]['context'].check_hostname)
+
+    def test_invalid_json_response(self):
+        with patch('urllib.request.urlopen') as urlopen_mock:
+            urlopen_mock.return_value.__enter__.return_value.read.return_value = b'not json'
+
+            with self.assertRaisesRegex(
+                RuntimeError,
+                r"Error parsing ArgoCD API response \(GET https://argo.ploigos.xyz/api/v1/"
+                r"applications/test\)"
+            ):
+                ArgoCDAPIAppClient('argo.ploigos.xyz', 'test-token').get_app('test')
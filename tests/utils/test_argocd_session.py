@@ -0,0 +1,294 @@
+import base64
+import json
+import os
+import time
+import urllib.error
+from io import IOBase
+from unittest.mock import patch
+
+import sh
+from testfixtures import TempDirectory
+from tests.helpers.base_test_case import BaseTestCase
+from tests.helpers.test_utils import Any, create_sh_side_effect
+
+from ploigos_step_runner.utils.argocd import ArgoCDSession
+
+
+def create_auth_token(claims):
+    payload = base64.urlsafe_b64encode(json.dumps(claims).encode('utf-8')).decode('utf-8')
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload.rstrip('=')}.c2lnbmF0dXJl"
+
+
+def write_argocd_config(argocd_session, auth_token):
+    os.makedirs(os.path.dirname(argocd_session.config_file), exist_ok=True)
+    with open(argocd_session.config_file, 'w') as config_file:
+        config_file.write(f"""contexts:
+- name: argo.dev.ploigos.xyz
+  server: argo.dev.ploigos.xyz
+  user: argo.dev.ploigos.xyz
+current-context: argo.dev.ploigos.xyz
+servers:
+- grpc-web-root-path: ""
+  server: argo.dev.ploigos.xyz
+users:
+- auth-token: {auth_token}
+  name: argo.dev.ploigos.xyz
+""")
+
+
+class TestArgoCDSession(BaseTestCase):
+    def create_argocd_session(self, temp_dir, username='test', insecure=False):
+        return ArgoCDSession(
+            sessions_dir=os.path.join(temp_dir.path, 'argocd'),
+            argocd_api='argo.dev.ploigos.xyz',
+            username=username,
+            insecure=insecure
+        )
+
+    def test_config_file_per_api_and_user(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+
+            self.assertEqual(
+                argocd_session.config_file,
+                self.create_argocd_session(temp_dir).config_file
+            )
+            self.assertNotEqual(
+                argocd_session.config_file,
+                self.create_argocd_session(temp_dir, username='other').config_file
+            )
+            self.assertEqual(argocd_session.config_args, ['--config', argocd_session.config_file])
+
+    def test_get_auth_token(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            auth_token = create_auth_token({'sub': 'test', 'exp': 42})
+            write_argocd_config(argocd_session, auth_token)
+
+            self.assertEqual(argocd_session.get_auth_token(), auth_token)
+            self.assertEqual(argocd_session.argocd_api, 'argo.dev.ploigos.xyz')
+            self.assertFalse(argocd_session.insecure)
+
+    def test_get_auth_token_no_config_file(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+
+            self.assertIsNone(argocd_session.get_auth_token())
+
+    def test_get_auth_token_not_str(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, 42)
+
+            self.assertIsNone(argocd_session.get_auth_token())
+
+    def test_get_auth_token_expiration(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token({'sub': 'test', 'exp': 42}))
+
+            self.assertEqual(argocd_session.get_auth_token_expiration(), 42)
+
+    def test_get_auth_token_expiration_no_exp(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token({'sub': 'test'}))
+
+            self.assertEqual(argocd_session.get_auth_token_expiration(), float('inf'))
+
+    def test_get_auth_token_expiration_no_config_file(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+
+            self.assertIsNone(argocd_session.get_auth_token_expiration())
+
+    def test_get_auth_token_expiration_invalid_auth_token(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, 'not-a-jwt')
+
+            self.assertIsNone(argocd_session.get_auth_token_expiration())
+
+    def test_get_auth_token_expiration_claims_not_object(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token(['test', 42]))
+
+            self.assertIsNone(argocd_session.get_auth_token_expiration())
+
+    def test_is_signed_in(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() + 3600}))
+
+            self.assertTrue(argocd_session.is_signed_in())
+
+    def test_is_signed_in_expired(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() - 1}))
+
+            self.assertFalse(argocd_session.is_signed_in())
+
+    def test_is_signed_in_expires_within_margin(self):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() + 60}))
+
+            self.assertFalse(argocd_session.is_signed_in())
+            self.assertTrue(argocd_session.is_signed_in(margin_seconds=0))
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir, insecure=True)
+
+            self.assertTrue(argocd_session.sign_in(password='secrettest'))
+
+            self.assertTrue(os.path.isdir(os.path.dirname(argocd_session.config_file)))
+            argocd_mock.login.assert_called_once_with(
+                '--config', argocd_session.config_file,
+                'argo.dev.ploigos.xyz',
+                '--username=test',
+                '--password=secrettest',
+                '--insecure',
+                _out=Any(IOBase),
+                _err=Any(IOBase)
+            )
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in_reuse_session(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            self.assertTrue(argocd_session.sign_in(password='secrettest'))
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() + 3600}))
+
+            self.assertFalse(self.create_argocd_session(temp_dir).sign_in(password='secrettest'))
+
+            argocd_mock.login.assert_called_once()
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in_no_password_hash(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() + 3600}))
+
+            self.assertTrue(argocd_session.sign_in(password='secrettest'))
+
+            argocd_mock.login.assert_called_once()
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in_different_password(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            self.assertTrue(argocd_session.sign_in(password='secrettest'))
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() + 3600}))
+
+            self.assertTrue(argocd_session.sign_in(password='othersecret'))
+            self.assertFalse(argocd_session.sign_in(password='othersecret'))
+
+            self.assertEqual(argocd_mock.login.call_count, 2)
+            argocd_mock.login.assert_called_with(
+                '--config', argocd_session.config_file,
+                'argo.dev.ploigos.xyz',
+                '--username=test',
+                '--password=othersecret',
+                None,
+                _out=Any(IOBase),
+                _err=Any(IOBase)
+            )
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in_password_hash_not_password(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            argocd_session.sign_in(password='secrettest')
+
+            session_dir = os.path.dirname(argocd_session.config_file)
+            for file_name in os.listdir(session_dir):
+                with open(os.path.join(session_dir, file_name)) as session_file:
+                    self.assertNotIn('secrettest', session_file.read())
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in_force(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            self.assertTrue(argocd_session.sign_in(password='secrettest'))
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() + 3600}))
+
+            self.assertTrue(argocd_session.sign_in(password='secrettest', force=True))
+
+            self.assertEqual(argocd_mock.login.call_count, 2)
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in_expired_session(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            write_argocd_config(argocd_session, create_auth_token({'exp': time.time() - 1}))
+
+            self.assertTrue(argocd_session.sign_in(password='secrettest'))
+
+            argocd_mock.login.assert_called_once()
+
+    @patch('sh.argocd', create=True)
+    def test_sign_in_fail(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            argocd_mock.login.side_effect = create_sh_side_effect(
+                exception=sh.ErrorReturnCode('argocd', b'mock out', b'mock login error')
+            )
+
+            with self.assertRaises(sh.ErrorReturnCode):
+                argocd_session.sign_in(password='secrettest')
+
+    @patch('sh.argocd', create=True)
+    def test_is_cluster_registered(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+
+            self.assertTrue(argocd_session.is_cluster_registered('https://api.dev.ploigos.xyz'))
+
+            argocd_mock.cluster.get.assert_called_once_with(
+                '--config', argocd_session.config_file,
+                'https://api.dev.ploigos.xyz',
+                '--output', 'server'
+            )
+
+    @patch('sh.argocd', create=True)
+    def test_is_cluster_registered_not_registered(self, argocd_mock):
+        with TempDirectory() as temp_dir:
+            argocd_session = self.create_argocd_session(temp_dir)
+            argocd_mock.cluster.get.side_effect = create_sh_side_effect(
+                exception=sh.ErrorReturnCode('argocd', b'', b'cluster not found')
+            )
+
+            self.assertFalse(argocd_session.is_cluster_registered('https://api.dev.ploigos.xyz'))
+
+    def test_is_auth_error_unauthenticated(self):
+        error = RuntimeError('Error waiting for ArgoCD Application')
+        error.__cause__ = sh.ErrorReturnCode(
+            'argocd',
+            b'',
+            b'rpc error: code = Unauthenticated desc = invalid session: token is expired'
+        )
+
+        self.assertTrue(ArgoCDSession.is_auth_error(error))
+
+    def test_is_auth_error_http_unauthorized(self):
+        error = RuntimeError('Error getting ArgoCD Application')
+        error.__cause__ = urllib.error.HTTPError(
+            'https://argo.dev.ploigos.xyz/api/v1/applications/fruit',
+            401,
+            'Unauthorized',
+            {},
+            None
+        )
+
+        self.assertTrue(ArgoCDSession.is_auth_error(error))
+
+    def test_is_auth_error_other_error(self):
+        error = RuntimeError('Error syncing ArgoCD Application')
+        error.__cause__ = sh.ErrorReturnCode('argocd', b'', b'application not found')
+
+        self.assertFalse(ArgoCDSession.is_auth_error(error))
+        self.assertFalse(ArgoCDSession.is_auth_error(RuntimeError('not an ArgoCD error')))
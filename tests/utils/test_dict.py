@@ -5,7 +5,7 @@ from testfixtures import TempDirectory
 
 from tests.helpers.base_test_case import BaseTestCase
 
-from ploigos_step_runner.utils.dict import deep_merge
+from ploigos_step_runner.utils.dict import deep_merge, deep_merge_many
 
 class TestDictUtils(BaseTestCase):
     def test_deep_merge_no_conflict(self):
@@ -126,3 +126,118 @@ class TestDictUtils(BaseTestCase):
                 }
             }
         })
+
+    def test_deep_merge_conflict_first_in_source_order(self):
+        dict1 = {
+            'a': {'b': {'c': 'foo'}},
+            'd': 'foo'
+        }
+        dict2 = {
+            'a': {'b': {'c': 'bar'}},
+            'd': 'bar'
+        }
+
+        with self.assertRaisesRegex(ValueError, r"^Conflict at a.b.c$"):
+            deep_merge(dict1, dict2)
+
+    def test_deep_merge_conflict_non_str_keys(self):
+        with self.assertRaisesRegex(ValueError, r"^Conflict at 1.2$"):
+            deep_merge({1: {2: 'foo'}}, {1: {2: 'bar'}})
+
+    def test_deep_merge_same_leaf_value(self):
+        result = deep_merge({'a': {'b': [1, 2]}}, {'a': {'b': [1, 2]}})
+        self.assertEqual(result, {'a': {'b': [1, 2]}})
+
+    def test_deep_merge_deeply_nested(self):
+        dict1 = {}
+        dict2 = {}
+        nested1 = dict1
+        nested2 = dict2
+        for _ in range(5000):
+            nested1['a'] = {}
+            nested2['a'] = {}
+            nested1 = nested1['a']
+            nested2 = nested2['a']
+        nested1['foo'] = 'foo'
+        nested2['bar'] = 'bar'
+
+        result = deep_merge(dict1, dict2)
+
+        nested = result
+        for _ in range(5000):
+            nested = nested['a']
+        self.assertEqual(nested, {'foo': 'foo', 'bar': 'bar'})
+
+    def test_deep_merge_copy_on_write(self):
+        dict1 = {
+            'a': {'b': 'foo'},
+            'c': {'d': 'foo'}
+        }
+        dict2 = {
+            'a': {'e': 'bar'},
+            'f': {'g': 'bar'}
+        }
+
+        result = deep_merge(dict1, dict2, copy_on_write=True)
+
+        self.assertEqual(result, {
+            'a': {'b': 'foo', 'e': 'bar'},
+            'c': {'d': 'foo'},
+            'f': {'g': 'bar'}
+        })
+
+        # assert neither input was modified
+        self.assertEqual(dict1, {
+            'a': {'b': 'foo'},
+            'c': {'d': 'foo'}
+        })
+        self.assertEqual(dict2, {
+            'a': {'e': 'bar'},
+            'f': {'g': 'bar'}
+        })
+
+        # assert only the merged into dictionaries were copied
+        self.assertIsNot(result['a'], dict1['a'])
+        self.assertIs(result['c'], dict1['c'])
+        self.assertIs(result['f'], dict2['f'])
+
+    def test_deep_merge_copy_on_write_conflict(self):
+        dict1 = {'a': {'b': 'foo', 'c': 'foo'}}
+        dict2 = {'a': {'b': 'bar', 'd': 'bar'}}
+
+        with self.assertRaisesRegex(ValueError, r"^Conflict at a.b$"):
+            deep_merge(dict1, dict2, copy_on_write=True)
+
+        self.assertEqual(dict1, {'a': {'b': 'foo', 'c': 'foo'}})
+
+    def test_deep_merge_many(self):
+        dict1 = {'a': {'b': 'foo'}}
+        dict2 = {'a': {'c': 'bar'}}
+        dict3 = {'a': {'d': 'baz'}, 'e': 'baz'}
+
+        result = deep_merge_many([dict1, dict2, dict3])
+
+        self.assertEqual(result, {
+            'a': {'b': 'foo', 'c': 'bar', 'd': 'baz'},
+            'e': 'baz'
+        })
+
+        # assert none of the sources were modified
+        self.assertEqual(dict1, {'a': {'b': 'foo'}})
+        self.assertEqual(dict2, {'a': {'c': 'bar'}})
+        self.assertEqual(dict3, {'a': {'d': 'baz'}, 'e': 'baz'})
+
+    def test_deep_merge_many_no_sources(self):
+        self.assertEqual(deep_merge_many([]), {})
+
+    def test_deep_merge_many_conflict_no_overwrite(self):
+        with self.assertRaisesRegex(ValueError, r"^Conflict at a.b$"):
+            deep_merge_many([{'a': {'b': 'foo'}}, {'a': {'c': 'bar'}}, {'a': {'b': 'baz'}}])
+
+    def test_deep_merge_many_conflict_overwrite_duplicate_keys(self):
+        result = deep_merge_many(
+            sources=iter([{'a': {'b': 'foo'}}, {'a': {'c': 'bar'}}, {'a': {'b': 'baz'}}]),
+            overwrite_duplicate_keys=True
+        )
+
+        self.assertEqual(result, {'a': {'b': 'baz', 'c': 'bar'}})
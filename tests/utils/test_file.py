@@ -1,11 +1,17 @@
 
 import os
+import threading
+import time
+from unittest.mock import patch
 
 from testfixtures import TempDirectory
 from tests.helpers.base_test_case import BaseTestCase
+from ploigos_step_runner.utils import file as file_utils
 from ploigos_step_runner.utils.file import (create_parent_dir,
                              download_and_decompress_source_to_destination,
-                             parse_yaml_or_json_file)
+                             file_lock,
+                             parse_yaml_or_json_file,
+                             parse_yaml_or_json_files)
 
 
 class TestParseYAMLOrJASONFile(BaseTestCase):
@@ -48,6 +54,135 @@ class TestParseYAMLOrJASONFile(BaseTestCase):
         ):
             parse_yaml_or_json_file(sample_file_path)
 
+    def test_import_yaml_not_parsed_as_json(self):
+        sample_file_path = os.path.join(
+            os.path.dirname(__file__),
+            'files',
+            'sample.yaml'
+        )
+        with patch.object(file_utils.json, 'loads') as json_loads_mock:
+            sample_dict = parse_yaml_or_json_file(sample_file_path)
+            json_loads_mock.assert_not_called()
+
+        self.assertEqual(sample_dict['step-runner-config']['global-defaults']['service-name'], 'fruit')
+
+    def test_import_json_not_parsed_as_yaml(self):
+        sample_file_path = os.path.join(
+            os.path.dirname(__file__),
+            'files',
+            'sample.json'
+        )
+        with patch.object(file_utils, 'yaml_safe_load') as yaml_safe_load_mock:
+            sample_dict = parse_yaml_or_json_file(sample_file_path)
+            yaml_safe_load_mock.assert_not_called()
+
+        self.assertEqual(sample_dict['step-runner-config']['global-defaults']['service-name'], 'fruit')
+
+    def test_import_json_falsy_not_parsed_as_yaml(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('empty.json', b'{}')
+            with patch.object(file_utils, 'yaml_safe_load') as yaml_safe_load_mock:
+                parsed = parse_yaml_or_json_file(os.path.join(temp_dir.path, 'empty.json'))
+                yaml_safe_load_mock.assert_not_called()
+
+            self.assertEqual(parsed, {})
+
+    def test_import_json_extension_yaml_content(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('config.json', b"{'foo': 'bar'}")
+            parsed = parse_yaml_or_json_file(os.path.join(temp_dir.path, 'config.json'))
+
+            self.assertEqual(parsed, {'foo': 'bar'})
+
+    def test_import_unknown_extension_json_content(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('config', b'{"foo": "bar"}')
+            with patch.object(file_utils, 'yaml_safe_load') as yaml_safe_load_mock:
+                parsed = parse_yaml_or_json_file(os.path.join(temp_dir.path, 'config'))
+                yaml_safe_load_mock.assert_not_called()
+
+            self.assertEqual(parsed, {'foo': 'bar'})
+
+    def test_import_unknown_extension_yaml_content(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('config', b'foo: bar')
+            with patch.object(file_utils.json, 'loads') as json_loads_mock:
+                parsed = parse_yaml_or_json_file(os.path.join(temp_dir.path, 'config'))
+                json_loads_mock.assert_not_called()
+
+            self.assertEqual(parsed, {'foo': 'bar'})
+
+    def test_import_bad_json(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('bad.json', b'{"foo": "bar"')
+
+            with self.assertRaisesRegex(
+                ValueError,
+                r"(?s)Error parsing file \(.+bad.json\) as YAML or JSON: "
+                r"\n  JSON error: .+"
+                r"\n  YAML error: .+"
+            ):
+                parse_yaml_or_json_file(os.path.join(temp_dir.path, 'bad.json'))
+
+class TestParseYAMLOrJSONFiles(BaseTestCase):
+    def __write_files(self, temp_dir, count):
+        file_paths = []
+        for index in range(count):
+            if index % 2:
+                file_name = f'config-{index}.yml'
+                temp_dir.write(file_name, bytes(f'index: {index}', 'utf-8'))
+            else:
+                file_name = f'config-{index}.json'
+                temp_dir.write(file_name, bytes(f'{{"index": {index}}}', 'utf-8'))
+            file_paths.append(os.path.join(temp_dir.path, file_name))
+
+        return file_paths
+
+    def test_no_files(self):
+        self.assertEqual(parse_yaml_or_json_files([]), [])
+
+    def test_one_file(self):
+        with TempDirectory() as temp_dir:
+            file_paths = self.__write_files(temp_dir, 1)
+            self.assertEqual(parse_yaml_or_json_files(file_paths), [{'index': 0}])
+
+    def test_one_file_does_not_exist(self):
+        with TempDirectory() as temp_dir:
+            with self.assertRaisesRegex(
+                ValueError,
+                r"Error reading file \(.+does-not-exist.yml\): .*No such file or directory"
+            ):
+                parse_yaml_or_json_files([os.path.join(temp_dir.path, 'does-not-exist.yml')])
+
+    def test_many_files_in_order(self):
+        with TempDirectory() as temp_dir:
+            file_paths = self.__write_files(temp_dir, 50)
+            self.assertEqual(
+                parse_yaml_or_json_files(file_paths, max_workers=4),
+                [{'index': index} for index in range(50)]
+            )
+
+    def test_many_files_errors_aggregated(self):
+        with TempDirectory() as temp_dir:
+            file_paths = self.__write_files(temp_dir, 4)
+            temp_dir.write('bad1.yml', b': blarg this: is {} bad syntax')
+            temp_dir.write('bad2.json', b'{"foo": ')
+            file_paths.insert(1, os.path.join(temp_dir.path, 'bad1.yml'))
+            file_paths.append(os.path.join(temp_dir.path, 'bad2.json'))
+            file_paths.append(os.path.join(temp_dir.path, 'does-not-exist.yml'))
+
+            with self.assertRaisesRegex(
+                ValueError,
+                r"(?s)Error parsing 3 of 7 files as YAML or JSON:"
+                r"\nError parsing file \([^)]+bad1.yml\) as YAML or JSON: "
+                r"\n  YAML error: .+"
+                r"\nError parsing file \([^)]+bad2.json\) as YAML or JSON: "
+                r"\n  JSON error: .+"
+                r"\n  YAML error: .+"
+                r"\n.*No such file or directory.+does-not-exist.yml"
+            ):
+                parse_yaml_or_json_files(file_paths)
+
 class TestDownloadAndDecompressSourceToDestination(BaseTestCase):
     def test_https_bz2(self):
         with TempDirectory() as test_dir:
@@ -129,3 +264,36 @@ class TestDownloadAndDecompressSourceToDestination(BaseTestCase):
             create_parent_dir(file_path)
             self.assertFalse(os.path.exists(file_path))
             self.assertTrue(os.path.exists(os.path.dirname(file_path)))
+
+
+class TestFileLock(BaseTestCase):
+    def test_file_lock_creates_lock_file(self):
+        with TempDirectory() as test_dir:
+            lock_file_path = os.path.join(test_dir.path, 'locks', 'test.lock')
+
+            with file_lock(lock_file_path):
+                self.assertTrue(os.path.exists(lock_file_path))
+
+    def test_file_lock_serializes_threads(self):
+        with TempDirectory() as test_dir:
+            lock_file_path = os.path.join(test_dir.path, 'test.lock')
+            events = []
+
+            def locked_work(name):
+                with file_lock(lock_file_path):
+                    events.append(f'{name}-start')
+                    time.sleep(0.05)
+                    events.append(f'{name}-end')
+
+            threads = [threading.Thread(target=locked_work, args=(name,)) for name in 'ab']
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            self.assertEqual(len(events), 4)
+            for index in (0, 2):
+                self.assertEqual(
+                    events[index].split('-')[0],
+                    events[index + 1].split('-')[0]
+                )
@@ -0,0 +1,363 @@
+import os
+from unittest.mock import patch
+
+import sh
+from git import Repo
+from testfixtures import TempDirectory
+
+from tests.helpers.base_test_case import BaseTestCase
+from tests.helpers.test_utils import create_git_commit_with_sample_file
+
+from ploigos_step_runner.utils.git import (GitHead, GitRepo, get_git_head,
+                                           read_git_head)
+from ploigos_step_runner.utils.metrics import PhaseMetrics
+
+
+class TestReadGitHead(BaseTestCase):
+    def test_branch_with_loose_ref(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+            repo.create_head('feature/test0').checkout()
+
+            self.assertEqual(
+                read_git_head(temp_dir.path),
+                GitHead(is_bare=False, branch='feature/test0', commit=repo.head.commit.hexsha)
+            )
+
+    def test_branch_with_packed_ref(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+            repo.git.pack_refs('--all')
+            self.assertFalse(os.path.exists(os.path.join(temp_dir.path, '.git/refs/heads/master')))
+
+            self.assertEqual(
+                read_git_head(temp_dir.path),
+                GitHead(is_bare=False, branch='master', commit=repo.head.commit.hexsha)
+            )
+
+    def test_branch_with_no_commits(self):
+        with TempDirectory() as temp_dir:
+            Repo.init(temp_dir.path)
+
+            self.assertEqual(
+                read_git_head(temp_dir.path),
+                GitHead(is_bare=False, branch='master', commit=None)
+            )
+
+    def test_detached_head(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo, 'test0')
+            create_git_commit_with_sample_file(temp_dir, repo, 'test1')
+            repo.git.checkout('master^')
+
+            git_head = read_git_head(temp_dir.path)
+
+            self.assertTrue(git_head.is_detached)
+            self.assertEqual(
+                git_head,
+                GitHead(is_bare=False, branch=None, commit=repo.head.commit.hexsha)
+            )
+
+    def test_branch_with_packed_ref_after_unknown_line(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+            commit = repo.head.commit.hexsha
+            repo.git.pack_refs('--all')
+            with open(os.path.join(temp_dir.path, '.git/packed-refs'), 'w') as packed_refs:
+                packed_refs.write(
+                    f"not-an-object-id refs/heads/master\n{commit} refs/heads/master\n"
+                )
+
+            self.assertEqual(
+                read_git_head(temp_dir.path),
+                GitHead(is_bare=False, branch='master', commit=commit)
+            )
+
+    def test_linked_work_tree(self):
+        with TempDirectory() as temp_dir, TempDirectory() as work_tree_parent_dir:
+            work_tree_path = os.path.join(work_tree_parent_dir.path, 'work-tree')
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+            repo.git.pack_refs('--all')
+            repo.git.worktree('add', '-b', 'feature/work-tree', work_tree_path)
+            self.assertTrue(os.path.isfile(os.path.join(work_tree_path, '.git')))
+
+            self.assertEqual(
+                read_git_head(work_tree_path),
+                GitHead(is_bare=False, branch='feature/work-tree', commit=repo.head.commit.hexsha)
+            )
+
+    def test_not_work_tree_root(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+            os.makedirs(os.path.join(temp_dir.path, 'sub-dir'))
+
+            self.assertIsNone(read_git_head(os.path.join(temp_dir.path, 'sub-dir')))
+
+    def test_no_head(self):
+        with TempDirectory() as temp_dir:
+            Repo.init(temp_dir.path)
+            os.remove(os.path.join(temp_dir.path, '.git', 'HEAD'))
+
+            self.assertIsNone(read_git_head(temp_dir.path))
+
+    def test_head_not_branch(self):
+        with TempDirectory() as temp_dir:
+            Repo.init(temp_dir.path)
+            temp_dir.write('.git/HEAD', b'ref: refs/remotes/origin/master\n')
+
+            self.assertIsNone(read_git_head(temp_dir.path))
+
+    def test_branch_ref_not_object_id(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+            temp_dir.write('.git/refs/heads/master', b'not-an-object-id\n')
+
+            self.assertIsNone(read_git_head(temp_dir.path))
+
+    def test_branch_symbolic_ref_loop(self):
+        with TempDirectory() as temp_dir:
+            Repo.init(temp_dir.path)
+            temp_dir.write('.git/refs/heads/master', b'ref: refs/heads/other\n')
+            temp_dir.write('.git/refs/heads/other', b'ref: refs/heads/master\n')
+
+            self.assertIsNone(read_git_head(temp_dir.path))
+
+    def test_git_file_to_missing_git_dir(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('.git', b'gitdir: does-not-exist\n')
+
+            self.assertIsNone(read_git_head(temp_dir.path))
+
+    def test_reftable_not_supported(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+            os.makedirs(os.path.join(temp_dir.path, '.git', 'reftable'))
+
+            self.assertIsNone(read_git_head(temp_dir.path))
+
+
+class TestGetGitHead(BaseTestCase):
+    def test_does_not_use_git_python_for_work_tree(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo)
+
+            with patch('git.Repo') as repo_mock:
+                git_head = get_git_head(temp_dir.path)
+
+            repo_mock.assert_not_called()
+            self.assertEqual(
+                git_head,
+                GitHead(is_bare=False, branch='master', commit=repo.head.commit.hexsha)
+            )
+
+    def test_same_as_git_python(self):
+        with TempDirectory() as temp_dir:
+            repo = Repo.init(temp_dir.path)
+            create_git_commit_with_sample_file(temp_dir, repo, 'test0')
+            create_git_commit_with_sample_file(temp_dir, repo, 'test1')
+
+            for checkout in ['master', 'master^']:
+                repo.git.checkout(checkout)
+                with self.subTest(checkout=checkout):
+                    with patch('ploigos_step_runner.utils.git.read_git_head', return_value=None):
+                        git_head = get_git_head(temp_dir.path)
+                    self.assertEqual(git_head, read_git_head(temp_dir.path))
+
+    def test_branch_with_no_commits_with_git_python(self):
+        with TempDirectory() as temp_dir:
+            Repo.init(temp_dir.path)
+
+            with patch('ploigos_step_runner.utils.git.read_git_head', return_value=None):
+                git_head = get_git_head(temp_dir.path)
+
+            self.assertEqual(git_head, GitHead(is_bare=False, branch='master', commit=None))
+            self.assertEqual(
+                repr(git_head),
+                "GitHead(is_bare=False, branch=master, commit=None)"
+            )
+
+    def test_bare_repo(self):
+        with TempDirectory() as temp_dir:
+            Repo.init(temp_dir.path, bare=True)
+
+            self.assertEqual(
+                get_git_head(temp_dir.path),
+                GitHead(is_bare=True, branch=None, commit=None)
+            )
+
+    def test_not_git_repo(self):
+        with TempDirectory() as temp_dir:
+            with self.assertRaisesRegex(ValueError, r'is not a Git repository'):
+                get_git_head(temp_dir.path)
+
+
+class TestGitRepo(BaseTestCase):
+    @staticmethod
+    def create_remote_repo(temp_dir):
+        remote_path = os.path.join(temp_dir.path, 'remote.git')
+        with TempDirectory() as source_dir:
+            source_repo = Repo.init(source_dir.path)
+            create_git_commit_with_sample_file(source_dir, source_repo)
+            source_repo.create_head('existing')
+            source_repo.clone(remote_path, bare=True)
+        return Repo(remote_path)
+
+    def clone(self, temp_dir, phase_metrics=None):
+        remote_repo = TestGitRepo.create_remote_repo(temp_dir)
+        git_repo = GitRepo.clone(
+            repo_url=remote_repo.working_dir,
+            repo_dir=os.path.join(temp_dir.path, 'clone'),
+            config={
+                'user.email': 'test@example.com',
+                'user.name': 'Test Robot'
+            },
+            phase_metrics=phase_metrics
+        )
+        return remote_repo, git_repo, Repo(git_repo.repo_dir)
+
+    def test_clone_with_config(self):
+        with TempDirectory() as temp_dir:
+            _, git_repo, repo = self.clone(temp_dir)
+
+            self.assertEqual(git_repo.get_config('user.email'), 'test@example.com')
+            self.assertEqual(git_repo.get_config('user.name'), 'Test Robot')
+            self.assertEqual(git_repo.get_branch(), 'master')
+            self.assertEqual(repo.head.commit.message, 'test')
+
+    def test_checkout_existing_and_new_branch(self):
+        with TempDirectory() as temp_dir:
+            _, git_repo, repo = self.clone(temp_dir)
+
+            git_repo.checkout_branch('existing')
+            self.assertEqual(repo.active_branch.name, 'existing')
+            self.assertEqual(repo.active_branch.tracking_branch().name, 'origin/existing')
+
+            git_repo.checkout_branch('feature/new')
+            self.assertEqual(git_repo.get_branch(), 'feature/new')
+            self.assertIsNone(repo.active_branch.tracking_branch())
+
+    def test_checkout_branch_falls_back_to_git(self):
+        with TempDirectory() as temp_dir:
+            _, git_repo, repo = self.clone(temp_dir)
+
+            with patch('ploigos_step_runner.utils.git._get_git_dirs', return_value=None):
+                git_repo.checkout_branch('existing')
+                git_repo.checkout_branch('feature/new')
+
+            self.assertEqual(repo.active_branch.name, 'feature/new')
+            self.assertEqual(repo.active_branch.commit, repo.heads['existing'].commit)
+
+    def test_checkout_branch_unreadable_ref_falls_back_to_git(self):
+        with TempDirectory() as temp_dir:
+            _, git_repo, repo = self.clone(temp_dir)
+
+            with patch('ploigos_step_runner.utils.git._read_ref', return_value=False):
+                git_repo.checkout_branch('existing')
+
+            self.assertEqual(repo.active_branch.name, 'existing')
+            self.assertEqual(repo.active_branch.tracking_branch().name, 'origin/existing')
+
+    def test_get_branch_detached(self):
+        with TempDirectory() as temp_dir:
+            _, git_repo, repo = self.clone(temp_dir)
+            repo.git.checkout(repo.head.commit.hexsha)
+
+            self.assertEqual(git_repo.get_branch(), 'HEAD')
+            with patch('ploigos_step_runner.utils.git.read_git_head', return_value=None):
+                self.assertEqual(git_repo.get_branch(), 'HEAD')
+
+    def test_get_config_not_set(self):
+        with TempDirectory() as temp_dir:
+            _, git_repo, _ = self.clone(temp_dir)
+
+            with self.assertRaises(sh.ErrorReturnCode):
+                git_repo.get_config('test.not-set')
+
+    def test_commit_tag_and_push_with_one_push(self):
+        with TempDirectory() as temp_dir:
+            remote_repo, git_repo, repo = self.clone(temp_dir)
+            git_repo.checkout_branch('feature/new')
+            temp_dir.write('clone/values.yaml', b'image: test')
+
+            git_repo.add('values.yaml')
+            git_repo.commit('update values', all_changes=True)
+            git_repo.tag(['v1.0.0', 'v1.0.0-test'])
+            with patch.object(
+                GitRepo,
+                '_GitRepo__run',
+                autospec=True,
+                side_effect=GitRepo._GitRepo__run # pylint: disable=no-member
+            ) as run_mock:
+                git_repo.push(refspecs=['HEAD', 'refs/tags/v1.0.0', 'refs/tags/v1.0.0-test'])
+
+            run_mock.assert_called_once()
+            commit = repo.head.commit.hexsha
+            self.assertEqual(remote_repo.heads['feature/new'].commit.hexsha, commit)
+            self.assertEqual(remote_repo.tags['v1.0.0'].commit.hexsha, commit)
+            self.assertEqual(remote_repo.tags['v1.0.0-test'].commit.hexsha, commit)
+
+    def test_tag_force(self):
+        for tags in [['v1.0.0'], ['v1.0.0', 'v1.0.0-test']]:
+            with self.subTest(tags=tags), TempDirectory() as temp_dir:
+                _, git_repo, repo = self.clone(temp_dir)
+                git_repo.tag(tags)
+                git_repo.commit('empty', allow_empty=True)
+
+                with self.assertRaises(sh.ErrorReturnCode):
+                    git_repo.tag(tags)
+                git_repo.tag(tags, force=True)
+
+                for tag in tags:
+                    self.assertEqual(repo.tags[tag].commit, repo.head.commit)
+
+    def test_push_force_only_tag(self):
+        with TempDirectory() as temp_dir:
+            remote_repo, git_repo, repo = self.clone(temp_dir)
+            remote_repo.create_tag('v1.0.0', ref=remote_repo.heads['existing'].commit)
+            git_repo.commit('empty', allow_empty=True)
+            git_repo.tag(['v1.0.0'], force=True)
+
+            with self.assertRaises(sh.ErrorReturnCode):
+                git_repo.push(refspecs=['HEAD', 'refs/tags/v1.0.0'])
+            git_repo.push(refspecs=['HEAD', '+refs/tags/v1.0.0'])
+
+            self.assertEqual(remote_repo.tags['v1.0.0'].commit.hexsha, repo.head.commit.hexsha)
+
+    def test_push_force(self):
+        with TempDirectory() as temp_dir:
+            remote_repo, git_repo, repo = self.clone(temp_dir)
+            git_repo.commit('pushed', allow_empty=True)
+            git_repo.push(refspecs=['HEAD'])
+            repo.git.reset('--hard', 'HEAD^')
+            git_repo.commit('diverged', allow_empty=True)
+
+            with self.assertRaises(sh.ErrorReturnCode):
+                git_repo.push(refspecs=['HEAD'])
+            git_repo.push(refspecs=['HEAD'], force=True)
+
+            self.assertEqual(remote_repo.heads['master'].commit.hexsha, repo.head.commit.hexsha)
+
+    def test_operations_recorded_in_phase_metrics(self):
+        with TempDirectory() as temp_dir:
+            phase_metrics = PhaseMetrics()
+            _, git_repo, _ = self.clone(temp_dir, phase_metrics=phase_metrics)
+            git_repo.checkout_branch('feature/new')
+            git_repo.commit('empty', allow_empty=True)
+            git_repo.tag(['v1.0.0'])
+            with self.assertRaises(sh.ErrorReturnCode):
+                git_repo.push(remote='does-not-exist', tags=True)
+
+            self.assertIs(git_repo.phase_metrics, phase_metrics)
+            self.assertEqual(
+                list(phase_metrics.phases),
+                ['git-clone', 'git-checkout', 'git-commit', 'git-tag', 'git-push']
+            )
@@ -0,0 +1,299 @@
+import os
+import subprocess
+from unittest.mock import patch
+
+from git import GitCommandError, Repo
+from testfixtures import TempDirectory
+
+from tests.helpers.base_test_case import BaseTestCase
+
+from ploigos_step_runner.utils.hashing import get_file_blob_id, get_tree_fingerprint
+
+
+def create_sample_tree(temp_dir):
+    temp_dir.write('pom.xml', b'<project/>')
+    temp_dir.write('src/main/App.java', b'class App {}')
+    temp_dir.write('src/test/AppTest.java', b'class AppTest {}')
+    temp_dir.write('mvnw', b'#!/bin/sh\n')
+    os.chmod(os.path.join(temp_dir.path, 'mvnw'), 0o755)
+    os.symlink('pom.xml', os.path.join(temp_dir.path, 'pom-link.xml'))
+
+
+def create_sample_repo(temp_dir):
+    create_sample_tree(temp_dir)
+    repo = Repo.init(temp_dir.path)
+    repo.git.add('--all')
+    repo.index.commit('test')
+    return repo
+
+
+class TestGetFileBlobId(BaseTestCase):
+    def test_same_as_git(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('small', b'hello world\n')
+            temp_dir.write('large', os.urandom(200000))
+            temp_dir.write('empty', b'')
+
+            for name in ['small', 'large', 'empty']:
+                path = os.path.join(temp_dir.path, name)
+                self.assertEqual(
+                    get_file_blob_id(path),
+                    subprocess.check_output(['git', 'hash-object', path]).decode().strip()
+                )
+
+    def test_symlink(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('target', b'contents')
+            os.symlink('target', os.path.join(temp_dir.path, 'link'))
+
+            self.assertEqual(
+                get_file_blob_id(os.path.join(temp_dir.path, 'link')),
+                subprocess.check_output(
+                    ['git', 'hash-object', '--stdin'],
+                    input=b'target'
+                ).decode().strip()
+            )
+
+
+class TestGetTreeFingerprint(BaseTestCase):
+    def test_walked_changes_with_contents_paths_and_modes(self):
+        with TempDirectory() as temp_dir:
+            create_sample_tree(temp_dir)
+            fingerprint = get_tree_fingerprint(temp_dir.path, use_git=False)
+            self.assertEqual(get_tree_fingerprint(temp_dir.path, use_git=False), fingerprint)
+
+            temp_dir.write('src/main/App.java', b'class App { }')
+            changed_contents_fingerprint = get_tree_fingerprint(temp_dir.path, use_git=False)
+            self.assertNotEqual(changed_contents_fingerprint, fingerprint)
+
+            os.rename(
+                os.path.join(temp_dir.path, 'src/main/App.java'),
+                os.path.join(temp_dir.path, 'src/main/Main.java')
+            )
+            changed_path_fingerprint = get_tree_fingerprint(temp_dir.path, use_git=False)
+            self.assertNotEqual(changed_path_fingerprint, changed_contents_fingerprint)
+
+            os.chmod(os.path.join(temp_dir.path, 'mvnw'), 0o644)
+            self.assertNotEqual(
+                get_tree_fingerprint(temp_dir.path, use_git=False),
+                changed_path_fingerprint
+            )
+
+    def test_not_git_work_tree_falls_back_to_walking(self):
+        with TempDirectory() as temp_dir:
+            create_sample_tree(temp_dir)
+
+            self.assertEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, use_git=False)
+            )
+
+    def test_git_not_installed_falls_back_to_walking(self):
+        with TempDirectory() as temp_dir:
+            create_sample_repo(temp_dir)
+            temp_dir.write('untracked', b'untracked')
+            expected_fingerprint = get_tree_fingerprint(temp_dir.path, use_git=False)
+
+            with patch('subprocess.run', side_effect=FileNotFoundError('git')):
+                fingerprint = get_tree_fingerprint(temp_dir.path)
+
+            self.assertEqual(fingerprint, expected_fingerprint)
+
+    def test_clean_git_work_tree_same_as_walked(self):
+        with TempDirectory() as temp_dir:
+            create_sample_repo(temp_dir)
+
+            self.assertEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, use_git=False)
+            )
+
+    def test_git_work_tree_changes_same_as_walked(self):
+        with TempDirectory() as temp_dir:
+            repo = create_sample_repo(temp_dir)
+            clean_fingerprint = get_tree_fingerprint(temp_dir.path)
+
+            # changed, staged, deleted, and untracked files
+            temp_dir.write('src/main/App.java', b'class App { }')
+            temp_dir.write('src/main/Staged.java', b'class Staged {}')
+            repo.git.add('src/main/Staged.java')
+            os.remove(os.path.join(temp_dir.path, 'src/test/AppTest.java'))
+            temp_dir.write('src/main/Untracked.java', b'class Untracked {}')
+
+            fingerprint = get_tree_fingerprint(temp_dir.path)
+            self.assertNotEqual(fingerprint, clean_fingerprint)
+            self.assertEqual(fingerprint, get_tree_fingerprint(temp_dir.path, use_git=False))
+
+    def test_git_work_tree_subdirectory_same_as_walked(self):
+        with TempDirectory() as temp_dir:
+            create_sample_repo(temp_dir)
+            temp_dir.write('src/main/App.java', b'class App { }')
+            temp_dir.write('src/main/Untracked.java', b'class Untracked {}')
+            sub_dir_path = os.path.join(temp_dir.path, 'src')
+
+            self.assertEqual(
+                get_tree_fingerprint(sub_dir_path),
+                get_tree_fingerprint(sub_dir_path, use_git=False)
+            )
+
+    def test_walked_large_file_same_as_git(self):
+        with TempDirectory() as temp_dir:
+            # larger than the chunk size, so streamed rather than read at once
+            temp_dir.write('lib/large.jar', os.urandom(200000))
+            create_sample_repo(temp_dir)
+
+            self.assertEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, use_git=False)
+            )
+
+    def test_walked_many_files_same_as_git(self):
+        with TempDirectory() as temp_dir:
+            # more than one batch of files, so hashed in parallel
+            for index in range(600):
+                temp_dir.write(f'src/main/File{index}.java', f'class File{index} {{}}'.encode())
+            os.chmod(os.path.join(temp_dir.path, 'src/main/File300.java'), 0o755)
+            create_sample_repo(temp_dir)
+
+            self.assertEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, use_git=False)
+            )
+
+    def test_walked_file_deleted_while_hashing(self):
+        with TempDirectory() as temp_dir:
+            create_sample_tree(temp_dir)
+            fingerprint = get_tree_fingerprint(temp_dir.path, use_git=False)
+            temp_dir.write('src/main/Deleted.java', b'class Deleted {}')
+            deleted_file_path = os.path.join(temp_dir.path, 'src/main/Deleted.java')
+
+            real_open = open
+            def open_deleted(file, *args, **kwargs):
+                if file == deleted_file_path:
+                    os.remove(deleted_file_path)
+                return real_open(file, *args, **kwargs)
+
+            with patch('builtins.open', side_effect=open_deleted):
+                self.assertEqual(get_tree_fingerprint(temp_dir.path, use_git=False), fingerprint)
+
+    def test_git_work_tree_merge_conflict_same_as_walked(self):
+        with TempDirectory() as temp_dir:
+            repo = create_sample_repo(temp_dir)
+            with repo.config_writer() as config:
+                config.set_value('user', 'name', 'test')
+                config.set_value('user', 'email', 'test@example.com')
+            base_branch = repo.active_branch.name
+            repo.git.checkout('-b', 'other')
+            temp_dir.write('src/main/App.java', b'class App { int other; }')
+            repo.index.add(['src/main/App.java'])
+            repo.index.commit('other')
+            repo.git.checkout(base_branch)
+            temp_dir.write('src/main/App.java', b'class App { int base; }')
+            repo.index.add(['src/main/App.java'])
+            repo.index.commit('base')
+            with self.assertRaisesRegex(GitCommandError, 'CONFLICT'):
+                repo.git.merge('other')
+
+            self.assertEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, use_git=False)
+            )
+
+    def test_git_work_tree_untracked_repository(self):
+        with TempDirectory() as temp_dir:
+            create_sample_repo(temp_dir)
+            temp_dir.write('nested/README.md', b'nested')
+            Repo.init(os.path.join(temp_dir.path, 'nested'))
+            fingerprint = get_tree_fingerprint(temp_dir.path)
+
+            temp_dir.write('nested/README.md', b'changed')
+
+            self.assertNotEqual(get_tree_fingerprint(temp_dir.path), fingerprint)
+
+    def test_git_work_tree_leaves_out_files_ignored_by_git(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('.gitignore', b'target/\n')
+            create_sample_repo(temp_dir)
+            fingerprint = get_tree_fingerprint(temp_dir.path)
+
+            temp_dir.write('target/App.class', b'compiled')
+
+            self.assertEqual(get_tree_fingerprint(temp_dir.path), fingerprint)
+
+    def test_walked_includes_files_ignored_by_git(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('.gitignore', b'target/\n')
+            create_sample_repo(temp_dir)
+            temp_dir.write('target/App.class', b'compiled')
+
+            # walking does not read .gitignore files
+            self.assertNotEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, use_git=False)
+            )
+            self.assertEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, ignore_patterns=['target'], use_git=False)
+            )
+            self.assertEqual(
+                get_tree_fingerprint(temp_dir.path),
+                get_tree_fingerprint(temp_dir.path, ignore_patterns=['target'])
+            )
+
+    def test_directory_ignored_by_git_falls_back_to_walking(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('.gitignore', b'target/\n')
+            create_sample_repo(temp_dir)
+            temp_dir.write('target/App.class', b'compiled')
+            target_dir_path = os.path.join(temp_dir.path, 'target')
+            fingerprint = get_tree_fingerprint(target_dir_path)
+
+            temp_dir.write('target/App.class', b'recompiled')
+
+            self.assertNotEqual(get_tree_fingerprint(target_dir_path), fingerprint)
+            self.assertEqual(
+                get_tree_fingerprint(target_dir_path),
+                get_tree_fingerprint(target_dir_path, use_git=False)
+            )
+
+    def test_ignore_patterns_and_excluded_paths(self):
+        for use_git in [True, False]:
+            with self.subTest(use_git=use_git), TempDirectory() as temp_dir:
+                create_sample_repo(temp_dir)
+                fingerprint = get_tree_fingerprint(
+                    temp_dir.path,
+                    ignore_patterns=['target', '*.log', 'docs/*'],
+                    excluded_paths=[os.path.join(temp_dir.path, 'step-runner-working')],
+                    use_git=use_git
+                )
+
+                temp_dir.write('target/App.class', b'compiled')
+                temp_dir.write('src/target/Other.class', b'compiled')
+                temp_dir.write('build.log', b'log')
+                temp_dir.write('docs/index.md', b'docs')
+                temp_dir.write('step-runner-working/step-result.pkl', b'result')
+
+                self.assertEqual(
+                    get_tree_fingerprint(
+                        temp_dir.path,
+                        ignore_patterns=['target', '*.log', 'docs/*'],
+                        excluded_paths=[os.path.join(temp_dir.path, 'step-runner-working')],
+                        use_git=use_git
+                    ),
+                    fingerprint
+                )
+
+    def test_file(self):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('pom.xml', b'<project/>')
+            pom_file_path = os.path.join(temp_dir.path, 'pom.xml')
+            fingerprint = get_tree_fingerprint(pom_file_path)
+
+            temp_dir.write('pom.xml', b'<project></project>')
+
+            self.assertNotEqual(get_tree_fingerprint(pom_file_path), fingerprint)
+
+    def test_missing_path(self):
+        with TempDirectory() as temp_dir:
+            with self.assertRaises(FileNotFoundError):
+                get_tree_fingerprint(os.path.join(temp_dir.path, 'missing'))
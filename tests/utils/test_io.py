@@ -1,15 +1,19 @@
 import copy
 import io
 import json
+import os
 import re
 import sys
-from contextlib import redirect_stdout
+from contextlib import redirect_stderr, redirect_stdout
 from io import StringIO
 
 import yaml
+from testfixtures import TempDirectory
 from tests.helpers.base_test_case import BaseTestCase
-from ploigos_step_runner.utils.io import (TextIOIndenter, TextIOSelectiveObfuscator,
-                           create_sh_redirect_to_multiple_streams_fn_callback)
+from ploigos_step_runner.utils.io import (TextIOIndenter, TextIOPipeline,
+                           TextIOSelectiveObfuscator,
+                           create_sh_redirect_to_multiple_streams_fn_callback,
+                           indented_output)
 
 class TestCreateSHRedirectToMultipleStreamsFNCallback(BaseTestCase):
     def test_one_stream(self):
@@ -409,3 +413,162 @@ class TestTextIOIndenter(BaseTestCase):
             expected=r"    hello world foo bar\n    this is a test, more testing\n    fortytwo\n",
             indent_level=1
         )
+
+    def test_carriage_return_new_lines(self):
+        out = io.StringIO()
+        indenter = TextIOIndenter(parent_stream=out, indent_level=1)
+
+        indenter.write("hello\r\nworld\rfoo\nbar")
+
+        self.assertEqual(out.getvalue(), "    hello\r\n    world\r    foo\n    bar")
+
+    def test_properties(self):
+        out = io.StringIO()
+        indenter = TextIOIndenter(parent_stream=out, indent_level=2, indent_size=3, indent_char='-')
+
+        self.assertIs(indenter.parent_stream, out)
+        self.assertEqual(indenter.indent_level, 2)
+        self.assertEqual(indenter.indent_size, 3)
+        self.assertEqual(indenter.indent_char, '-')
+        self.assertFalse(indenter.line_buffered)
+
+    def test_line_buffered_only_writes_complete_lines(self):
+        out = io.StringIO()
+        indenter = TextIOIndenter(parent_stream=out, indent_level=1, line_buffered=True)
+
+        self.assertEqual(indenter.write("hello "), 6)
+        self.assertEqual(out.getvalue(), "")
+
+        indenter.write("world\nfoo")
+        self.assertEqual(out.getvalue(), "    hello world\n")
+
+        indenter.write(" bar\rbaz\r\n")
+        self.assertEqual(out.getvalue(), "    hello world\n    foo bar\r    baz\r\n")
+
+    def test_line_buffered_flush_writes_buffered_partial_line(self):
+        out = io.StringIO()
+        indenter = TextIOIndenter(parent_stream=out, indent_level=1, line_buffered=True)
+
+        indenter.write("hello\nworld")
+        indenter.flush()
+
+        self.assertEqual(out.getvalue(), "    hello\n    world")
+        self.assertTrue(indenter.line_buffered)
+
+    def test_line_buffered_same_output_as_unbuffered(self):
+        inputs = ["hello world ", "foo bar\n", "this is a test, ", "more testing\n", "fortytwo\n"]
+        buffered_out = io.StringIO()
+        unbuffered_out = io.StringIO()
+        buffered = TextIOIndenter(parent_stream=buffered_out, indent_level=2, line_buffered=True)
+        unbuffered = TextIOIndenter(parent_stream=unbuffered_out, indent_level=2)
+
+        for data in inputs:
+            buffered.write(data)
+            unbuffered.write(data)
+        buffered.flush()
+
+        self.assertEqual(buffered_out.getvalue(), unbuffered_out.getvalue())
+
+
+class TestTextIOPipeline(BaseTestCase):
+    def test_out_and_err_to_streams_and_file(self):
+        with TempDirectory() as temp_dir:
+            log_file_path = os.path.join(temp_dir.path, 'output.txt')
+            out = io.StringIO()
+            err = io.StringIO()
+
+            with TextIOPipeline(
+                out_streams=[out],
+                err_streams=[err],
+                file_paths=[log_file_path]
+            ) as pipeline:
+                pipeline.out.write('hello\n')
+                pipeline.err.write(b'error\n')
+                pipeline.write('world\n')
+
+            self.assertEqual(out.getvalue(), 'hello\nworld\n')
+            self.assertEqual(err.getvalue(), 'error\n')
+            with open(log_file_path) as log_file:
+                self.assertEqual(log_file.read(), 'hello\nerror\nworld\n')
+
+    def test_obfuscates_streams_and_file(self):
+        with TempDirectory() as temp_dir:
+            log_file_path = os.path.join(temp_dir.path, 'output.txt')
+            out = io.StringIO()
+
+            with TextIOPipeline(
+                out_streams=[out],
+                file_paths=[log_file_path],
+                randomize_replacment_length=False
+            ) as pipeline:
+                pipeline.add_obfuscation_targets('secret-password')
+                pipeline.out.write('logging in with secret-password\n')
+
+            self.assertEqual(out.getvalue(), 'logging in with ***************\n')
+            with open(log_file_path) as log_file:
+                self.assertEqual(log_file.read(), 'logging in with ***************\n')
+
+    def test_indents_streams_but_not_file(self):
+        with TempDirectory() as temp_dir:
+            log_file_path = os.path.join(temp_dir.path, 'output.txt')
+            out = io.StringIO()
+
+            with TextIOPipeline(
+                out_streams=[out],
+                file_paths=[log_file_path],
+                indent_level=1
+            ) as pipeline:
+                pipeline.out.write('hello\nworld\n')
+
+            self.assertEqual(out.getvalue(), '    hello\n    world\n    ')
+            with open(log_file_path) as log_file:
+                self.assertEqual(log_file.read(), 'hello\nworld\n')
+
+    def test_append(self):
+        with TempDirectory() as temp_dir:
+            log_file_path = temp_dir.write('output.txt', b'first\n')
+
+            with TextIOPipeline(file_paths=[log_file_path], append=True) as pipeline:
+                pipeline.out.write('second\n')
+
+            with open(log_file_path) as log_file:
+                self.assertEqual(log_file.read(), 'first\nsecond\n')
+
+    def test_file_buffered_until_flush(self):
+        with TempDirectory() as temp_dir:
+            log_file_path = os.path.join(temp_dir.path, 'output.txt')
+            pipeline = TextIOPipeline(file_paths=[log_file_path])
+
+            pipeline.out.write('hello\n')
+            with open(log_file_path) as log_file:
+                self.assertEqual(log_file.read(), '')
+
+            pipeline.flush()
+            with open(log_file_path) as log_file:
+                self.assertEqual(log_file.read(), 'hello\n')
+
+            pipeline.close()
+            pipeline.close()
+            self.assertTrue(pipeline.closed)
+
+    def test_branches_are_sh_callbacks(self):
+        out = io.StringIO()
+        pipeline = TextIOPipeline(out_streams=[out])
+
+        # sh stops calling a callback that returns a truthy value
+        self.assertIsNone(pipeline.out('hello\n'))
+        self.assertIsNone(pipeline.err('world\n'))
+        self.assertEqual(out.getvalue(), 'hello\n')
+
+class TestIndentedOutput(BaseTestCase):
+    def test_indents_stdout_and_stderr(self):
+        stdout = io.StringIO()
+        stderr = io.StringIO()
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            with indented_output(indent_level=2):
+                print('hello')
+                print('world', file=sys.stderr)
+                sys.stdout.write('partial')
+
+        self.assertEqual(stdout.getvalue(), '        hello\n        partial')
+        self.assertIn('        world\n', stderr.getvalue())
@@ -0,0 +1,99 @@
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+from tests.helpers.base_test_case import BaseTestCase
+from ploigos_step_runner.utils import metrics as metrics_utils
+from ploigos_step_runner.utils.metrics import PhaseMetrics
+
+
+class TestPhaseMetrics(BaseTestCase):
+    def test_no_phases(self):
+        self.assertEqual(PhaseMetrics().phases, {})
+
+    def test_measure(self):
+        phase_metrics = PhaseMetrics()
+        with phase_metrics.measure('sleep'):
+            time.sleep(0.01)
+
+        self.assertEqual(list(phase_metrics.phases), ['sleep'])
+        phase = phase_metrics.phases['sleep']
+        self.assertGreaterEqual(phase[PhaseMetrics.WALL_TIME_KEY], 0.01)
+        self.assertGreaterEqual(phase[PhaseMetrics.CPU_TIME_KEY], 0.0)
+        self.assertLess(phase[PhaseMetrics.CPU_TIME_KEY], phase[PhaseMetrics.WALL_TIME_KEY])
+        self.assertGreaterEqual(phase[PhaseMetrics.CHILD_CPU_TIME_KEY], 0.0)
+        self.assertGreater(phase[PhaseMetrics.PEAK_RSS_KEY], 0)
+
+    def test_measure_child_process(self):
+        phase_metrics = PhaseMetrics()
+        with phase_metrics.measure('child'):
+            subprocess.run(
+                [sys.executable, '-c', 'sum(range(3000000))'],
+                check=True
+            )
+
+        self.assertGreater(phase_metrics.phases['child'][PhaseMetrics.CHILD_CPU_TIME_KEY], 0.0)
+
+    def test_measure_phases_in_order(self):
+        phase_metrics = PhaseMetrics()
+        with phase_metrics.measure('b'):
+            pass
+        with phase_metrics.measure('a'):
+            pass
+
+        self.assertEqual(list(phase_metrics.phases), ['b', 'a'])
+
+    def test_measure_same_phase_adds(self):
+        phase_metrics = PhaseMetrics()
+        with phase_metrics.measure('sleep'):
+            time.sleep(0.01)
+        with phase_metrics.measure('sleep'):
+            time.sleep(0.01)
+
+        self.assertGreaterEqual(phase_metrics.phases['sleep'][PhaseMetrics.WALL_TIME_KEY], 0.02)
+
+    def test_measure_error(self):
+        phase_metrics = PhaseMetrics()
+        with self.assertRaisesRegex(ValueError, 'mock error'):
+            with phase_metrics.measure('error'):
+                raise ValueError('mock error')
+
+        self.assertIn(PhaseMetrics.WALL_TIME_KEY, phase_metrics.phases['error'])
+
+    def test_add_phases(self):
+        phase_metrics = PhaseMetrics()
+        with phase_metrics.measure('a'):
+            pass
+        phases = phase_metrics.phases
+        operation_metrics = PhaseMetrics()
+        with operation_metrics.measure('a'):
+            time.sleep(0.01)
+        with operation_metrics.measure('b'):
+            pass
+
+        phase_metrics.add_phases(operation_metrics.phases)
+
+        self.assertIs(phase_metrics.phases, phases)
+        self.assertEqual(list(phase_metrics.phases), ['a', 'b'])
+        self.assertGreaterEqual(phase_metrics.phases['a'][PhaseMetrics.WALL_TIME_KEY], 0.01)
+        self.assertEqual(phase_metrics.phases['b'], operation_metrics.phases['b'])
+        self.assertEqual(
+            phase_metrics.phases['a'][PhaseMetrics.PEAK_RSS_KEY],
+            operation_metrics.phases['a'][PhaseMetrics.PEAK_RSS_KEY]
+        )
+
+    @patch.object(metrics_utils, 'resource', None)
+    def test_measure_no_resource_module(self):
+        phase_metrics = PhaseMetrics()
+        with phase_metrics.measure('phase'):
+            pass
+
+        self.assertEqual(
+            set(phase_metrics.phases['phase']),
+            {
+                PhaseMetrics.WALL_TIME_KEY,
+                PhaseMetrics.CPU_TIME_KEY,
+                PhaseMetrics.CHILD_CPU_TIME_KEY
+            }
+        )
@@ -0,0 +1,172 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+from testfixtures import TempDirectory
+from tests.helpers.base_test_case import BaseTestCase
+from ploigos_step_runner.utils import plugins
+from ploigos_step_runner.utils.plugins import (STEP_IMPLEMENTERS_ENTRY_POINT_GROUP,
+                                               get_installed_distributions_key,
+                                               get_step_implementer_plugins,
+                                               load_entry_point_reference,
+                                               scan_step_implementer_plugins)
+
+ENTRY_POINTS = [
+    ('deploy.Helm', 'my_plugin.deploy.helm:Helm'),
+    ('deploy.Kustomize', 'my_plugin.deploy.kustomize:Kustomize'),
+    ('uat.Cypress', 'my_plugin.uat:Cypress'),
+    ('invalid-no-implementer-name', 'my_plugin:Invalid')
+]
+
+EXPECTED_PLUGINS = {
+    'deploy': {
+        'Helm': 'my_plugin.deploy.helm:Helm',
+        'Kustomize': 'my_plugin.deploy.kustomize:Kustomize'
+    },
+    'uat': {
+        'Cypress': 'my_plugin.uat:Cypress'
+    }
+}
+
+
+@patch.object(plugins, '_iter_entry_points', return_value=ENTRY_POINTS)
+class TestGetStepImplementerPlugins(BaseTestCase):
+    def test_scan(self, iter_entry_points_mock):
+        self.assertEqual(scan_step_implementer_plugins(), EXPECTED_PLUGINS)
+        iter_entry_points_mock.assert_called_once_with(STEP_IMPLEMENTERS_ENTRY_POINT_GROUP)
+
+    def test_scans_once_and_writes_cache(self, iter_entry_points_mock):
+        with TempDirectory() as temp_dir:
+            cache_file_path = os.path.join(temp_dir.path, 'cache', 'plugins.json')
+
+            self.assertEqual(get_step_implementer_plugins(cache_file_path), EXPECTED_PLUGINS)
+            self.assertEqual(get_step_implementer_plugins(cache_file_path), EXPECTED_PLUGINS)
+
+            with open(cache_file_path) as cache_file:
+                cache = json.load(cache_file)
+
+        iter_entry_points_mock.assert_called_once()
+        self.assertEqual(
+            cache,
+            {'key': get_installed_distributions_key(), 'step-implementers': EXPECTED_PLUGINS}
+        )
+
+    def test_reads_cache(self, iter_entry_points_mock):
+        with TempDirectory() as temp_dir:
+            cache_file_path = os.path.join(temp_dir.path, 'plugins.json')
+            temp_dir.write(cache_file_path, bytes(json.dumps({
+                'key': get_installed_distributions_key(),
+                'step-implementers': {'foo': {'Bar': 'cached:Bar'}}
+            }), 'utf-8'))
+
+            self.assertEqual(
+                get_step_implementer_plugins(cache_file_path),
+                {'foo': {'Bar': 'cached:Bar'}}
+            )
+
+        iter_entry_points_mock.assert_not_called()
+
+    def test_stale_cache(self, iter_entry_points_mock):
+        with TempDirectory() as temp_dir:
+            cache_file_path = os.path.join(temp_dir.path, 'plugins.json')
+            temp_dir.write(cache_file_path, bytes(json.dumps({
+                'key': 'stale',
+                'step-implementers': {'foo': {'Bar': 'cached:Bar'}}
+            }), 'utf-8'))
+
+            self.assertEqual(get_step_implementer_plugins(cache_file_path), EXPECTED_PLUGINS)
+
+            with open(cache_file_path) as cache_file:
+                self.assertEqual(json.load(cache_file)['key'], get_installed_distributions_key())
+
+        iter_entry_points_mock.assert_called_once()
+
+    def test_invalid_cache(self, iter_entry_points_mock):
+        with TempDirectory() as temp_dir:
+            cache_file_path = os.path.join(temp_dir.path, 'plugins.json')
+            temp_dir.write(cache_file_path, b'not json')
+
+            self.assertEqual(get_step_implementer_plugins(cache_file_path), EXPECTED_PLUGINS)
+
+        iter_entry_points_mock.assert_called_once()
+
+    def test_cache_not_writable(self, iter_entry_points_mock):
+        with TempDirectory() as temp_dir:
+            temp_dir.write('not-a-dir', b'')
+            cache_file_path = os.path.join(temp_dir.path, 'not-a-dir', 'plugins.json')
+
+            self.assertEqual(get_step_implementer_plugins(cache_file_path), EXPECTED_PLUGINS)
+
+    def test_default_cache_file_path(self, iter_entry_points_mock):
+        with TempDirectory() as temp_dir, \
+                patch.dict(os.environ, {'XDG_CACHE_HOME': temp_dir.path}):
+            get_step_implementer_plugins()
+
+            self.assertTrue(os.path.exists(
+                os.path.join(temp_dir.path, 'ploigos-step-runner', 'step-implementer-plugins.json')
+            ))
+
+
+class TestGetInstalledDistributionsKey(BaseTestCase):
+    def test_changes_when_distribution_installed(self):
+        with TempDirectory() as temp_dir, \
+                patch.object(plugins.sys, 'path', [temp_dir.path, '', 'does-not-exist']):
+            key = get_installed_distributions_key()
+            self.assertEqual(get_installed_distributions_key(), key)
+
+            temp_dir.makedir('my_plugin-1.0.0.dist-info')
+            os.utime(temp_dir.path, ns=(0, os.stat(temp_dir.path).st_mtime_ns + 1))
+            self.assertNotEqual(get_installed_distributions_key(), key)
+
+
+class TestIterEntryPoints(BaseTestCase):
+    def test_installed_distribution(self):
+        with TempDirectory() as temp_dir, \
+                patch.object(plugins.sys, 'path', [temp_dir.path] + plugins.sys.path):
+            temp_dir.write(
+                'my_plugin-1.0.0.dist-info/METADATA',
+                b'Name: my-plugin\nVersion: 1.0.0\n'
+            )
+            temp_dir.write(
+                'my_plugin-1.0.0.dist-info/entry_points.txt',
+                f"[{STEP_IMPLEMENTERS_ENTRY_POINT_GROUP}]\n"
+                "my-step = my_plugin.step_implementers:MyStep\n".encode()
+            )
+
+            self.assertIn(
+                ('my-step', 'my_plugin.step_implementers:MyStep'),
+                list(plugins._iter_entry_points(STEP_IMPLEMENTERS_ENTRY_POINT_GROUP))
+            )
+
+    def test_entry_points_dict(self):
+        entry_point = MagicMock(value='my_plugin.step_implementers:MyStep')
+        entry_point.name = 'my-step'
+
+        with patch('importlib.metadata.entry_points', return_value={
+            STEP_IMPLEMENTERS_ENTRY_POINT_GROUP: [entry_point]
+        }):
+            self.assertEqual(
+                list(plugins._iter_entry_points(STEP_IMPLEMENTERS_ENTRY_POINT_GROUP)),
+                [('my-step', 'my_plugin.step_implementers:MyStep')]
+            )
+            self.assertEqual(list(plugins._iter_entry_points('does-not-exist')), [])
+
+
+class TestLoadEntryPointReference(BaseTestCase):
+    def test_class(self):
+        from tests.helpers.sample_step_implementers import FooStepImplementer
+        self.assertIs(
+            load_entry_point_reference('tests.helpers.sample_step_implementers:FooStepImplementer'),
+            FooStepImplementer
+        )
+
+    def test_module(self):
+        self.assertIs(load_entry_point_reference('ploigos_step_runner.utils.plugins'), plugins)
+
+    def test_attribute_does_not_exist(self):
+        self.assertIsNone(
+            load_entry_point_reference('tests.helpers.sample_step_implementers:DoesNotExist')
+        )
+
+    def test_module_does_not_exist(self):
+        self.assertIsNone(load_entry_point_reference('does.not.exist:Foo'))
@@ -0,0 +1,72 @@
+# pylint: disable=missing-module-docstring
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+import io
+from contextlib import redirect_stdout
+
+from tests.helpers.base_test_case import BaseTestCase
+from ploigos_step_runner.config.config_value import ConfigValue
+from ploigos_step_runner.utils.printing import (print_config, print_data,
+                                                print_section_title)
+
+
+class TestPrintSectionTitle(BaseTestCase):
+    def test_default(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            print_section_title('Title')
+
+        self.assertEqual(
+            stdout.getvalue(),
+            f"\n\n{'=' * 80}\n{'Title'.center(80)}\n{'=' * 80}\n"
+        )
+
+    def test_to_file(self):
+        stdout = io.StringIO()
+        file = io.StringIO()
+        with redirect_stdout(stdout):
+            print_section_title('Title', div_char='-', indent=1, file=file)
+
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertIn(f"    {'-' * 80}\n    {'Title'.center(80)}\n", file.getvalue())
+
+
+class TestPrintData(BaseTestCase):
+    def test_data(self):
+        file = io.StringIO()
+        print_data('Data', {'foo': 'bar'}, file=file)
+
+        self.assertEqual(file.getvalue(), "        Data\n            {'foo': 'bar'}\n\n")
+
+
+class TestPrintConfig(BaseTestCase):
+    def test_keys_and_values(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            print_config(
+                'Configuration',
+                [
+                    ('Source 1', {'foo': ConfigValue('bar')}),
+                    ('Source 2', None)
+                ]
+            )
+
+        self.assertIn('Configuration', stdout.getvalue())
+        self.assertIn("Source 1\n            {'foo': 'bar'}\n", stdout.getvalue())
+        self.assertIn("Source 2\n            None\n", stdout.getvalue())
+
+    def test_keys_only(self):
+        stdout = io.StringIO()
+        with redirect_stdout(stdout):
+            print_config(
+                'Configuration',
+                [
+                    ('Source 1', {'foo': 'bar', 'abc': 'xyz'}),
+                    ('Source 2', None)
+                ],
+                keys_only=True
+            )
+
+        self.assertIn("Source 1\n            ['abc', 'foo']\n", stdout.getvalue())
+        self.assertIn("Source 2\n            []\n", stdout.getvalue())
+        self.assertNotIn('bar', stdout.getvalue())
@@ -5,7 +5,8 @@ from testfixtures import TempDirectory
 
 from tests.helpers.base_test_case import BaseTestCase
 
-from ploigos_step_runner.utils.reflection import import_and_get_class
+from ploigos_step_runner.utils.reflection import (import_and_get_class,
+                                                  install_lazy_attributes)
 
 class TestReflectionUtils(BaseTestCase):
     def test_import_and_get_class_module_does_not_exist(self):
@@ -22,3 +23,41 @@ class TestReflectionUtils(BaseTestCase):
         self.assertIsNotNone(
             import_and_get_class('ploigos_step_runner.step_implementers.container_image_static_compliance_scan', 'OpenSCAP')
         )
+
+
+class TestInstallLazyAttributes(BaseTestCase):
+    def test_attribute_imported_on_first_access(self):
+        module_globals = {'__name__': 'ploigos_step_runner.utils'}
+        install_lazy_attributes(module_globals, {
+            'deep_merge': '.dict',
+            'OrderedDict': 'collections'
+        })
+
+        self.assertNotIn('deep_merge', module_globals)
+        from ploigos_step_runner.utils.dict import deep_merge
+        self.assertIs(module_globals['__getattr__']('deep_merge'), deep_merge)
+        self.assertIs(module_globals['deep_merge'], deep_merge)
+        from collections import OrderedDict
+        self.assertIs(module_globals['__getattr__']('OrderedDict'), OrderedDict)
+        self.assertEqual(
+            module_globals['__dir__'](),
+            sorted(['OrderedDict', '__all__', '__getattr__', '__dir__', '__name__', 'deep_merge'])
+        )
+        self.assertEqual(module_globals['__all__'], ['deep_merge', 'OrderedDict'])
+
+    def test_attribute_does_not_exist(self):
+        module_globals = {'__name__': 'ploigos_step_runner.utils'}
+        install_lazy_attributes(module_globals, {'deep_merge': '.dict'})
+
+        with self.assertRaisesRegex(
+            AttributeError,
+            r"module 'ploigos_step_runner.utils' has no attribute 'HelloWorld'"
+        ):
+            module_globals['__getattr__']('HelloWorld')
+
+    def test_package_attribute(self):
+        import ploigos_step_runner.step_implementers.package as package
+        from ploigos_step_runner.step_implementers.package.maven import Maven
+
+        self.assertIs(package.Maven, Maven)
+        self.assertIn('Maven', dir(package))
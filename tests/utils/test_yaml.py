@@ -0,0 +1,111 @@
+import io
+import os
+from unittest.mock import patch
+
+import yaml
+from tests.helpers.base_test_case import BaseTestCase
+from ploigos_step_runner.utils import yaml as yaml_utils
+from ploigos_step_runner.utils.yaml import (yaml_dump, yaml_safe_load,
+                                            yaml_safe_load_all)
+
+
+class TestYAMLSafeLoad(BaseTestCase):
+    def test_yaml_safe_load_str(self):
+        self.assertEqual(
+            yaml_safe_load("foo:\n  bar: [1, 2]\n  baz: true\n"),
+            {'foo': {'bar': [1, 2], 'baz': True}}
+        )
+
+    def test_yaml_safe_load_file(self):
+        sample_file_path = os.path.join(
+            os.path.dirname(__file__),
+            'files',
+            'sample.yaml'
+        )
+        with open(sample_file_path) as sample_file:
+            sample_dict = yaml_safe_load(sample_file)
+
+        with open(sample_file_path) as sample_file:
+            self.assertEqual(sample_dict, yaml.safe_load(sample_file))
+
+    def test_yaml_safe_load_invalid(self):
+        with self.assertRaises(yaml.parser.ParserError):
+            yaml_safe_load(": blarg this: is {} bad syntax")
+
+    def test_yaml_safe_load_unsafe_tag(self):
+        with self.assertRaises(yaml.constructor.ConstructorError):
+            yaml_safe_load("!!python/tuple [1, 2]")
+
+    def test_yaml_safe_load_all(self):
+        self.assertEqual(
+            list(yaml_safe_load_all("---\nkind: Route\n---\n---\nkind: Ingress\n")),
+            [{'kind': 'Route'}, None, {'kind': 'Ingress'}]
+        )
+
+
+class TestYAMLDump(BaseTestCase):
+    SAMPLE_RESULTS = {
+        'step-runner-results': {
+            'package': {
+                'Maven': {
+                    'sub-step-implementer-name': 'Maven',
+                    'success': False,
+                    'message': "Package failures. See 'maven-output' report artifacts for" \
+                        " details: \n\n  RAN: /usr/bin/mvn clean install\n",
+                    'artifacts': {
+                        'maven-output': {
+                            'description': "Standard out and standard error from 'mvn install'.",
+                            'value': '/tmp/step-runner-working/package/mvn_test_output.txt'
+                        },
+                        'package-artifacts': {
+                            'description': '',
+                            'value': [{'path': '/tmp/target/my-app.jar', 'package-type': 'jar'}]
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    def test_yaml_dump_str(self):
+        self.assertEqual(
+            yaml_dump(self.SAMPLE_RESULTS, indent=4),
+            yaml.dump(self.SAMPLE_RESULTS, indent=4)
+        )
+
+    def test_yaml_dump_stream(self):
+        stream = io.StringIO()
+        self.assertIsNone(yaml_dump(self.SAMPLE_RESULTS, stream))
+        self.assertEqual(stream.getvalue(), yaml.dump(self.SAMPLE_RESULTS))
+
+    def test_yaml_dump_folded_double_quoted_scalar(self):
+        data = {
+            'message': "unicode ü and tab \t " + ("word " * 40),
+            'short': "üü"
+        }
+
+        with patch.object(yaml, 'dump', wraps=yaml.dump) as dump_mock:
+            result = yaml_dump(data, indent=4)
+            self.assertIs(dump_mock.call_args[1]['Dumper'], yaml.Dumper)
+
+        self.assertEqual(result, yaml.dump(data, indent=4))
+
+    def test_yaml_dump_folded_double_quoted_scalar_without_spaces(self):
+        for value in ['x' * 90 + '\tb', 'x' * 90 + '\u2028b', '\u00e9' * 100]:
+            with self.subTest(value=value):
+                data = {'k': value, 'nested': {'list': [value]}}
+
+                self.assertEqual(yaml_dump(data), yaml.dump(data))
+                self.assertEqual(yaml_dump(data, indent=4), yaml.dump(data, indent=4))
+
+    @patch.object(yaml_utils, 'Dumper', yaml.Dumper)
+    def test_yaml_dump_no_libyaml(self):
+        self.assertEqual(
+            yaml_dump(self.SAMPLE_RESULTS, indent=4),
+            yaml.dump(self.SAMPLE_RESULTS, indent=4)
+        )
+
+    def test_yaml_dump_uses_libyaml_when_available(self):
+        with patch.object(yaml, 'dump', wraps=yaml.dump) as dump_mock:
+            yaml_dump({'message': 'Package failures.\nRAN: /usr/bin/mvn clean install'})
+            self.assertIs(dump_mock.call_args[1]['Dumper'], yaml_utils.Dumper)